@@ -23,7 +23,7 @@ contract OverlayV1Market is IOverlayV1Market, Pausable {
     using Oracle for Oracle.Data;
     using Position for mapping(bytes32 => Position.Info);
     using Position for Position.Info;
-    using Risk for uint256[15];
+    using Risk for uint256[4];
     using Roller for Roller.Snapshot;
 
     // internal constants
@@ -40,7 +40,7 @@ contract OverlayV1Market is IOverlayV1Market, Pausable {
     address public immutable factory; // factory that deployed this market
 
     // risk params
-    uint256[15] public params; // params.idx order based on Risk.Parameters enum
+    uint256[4] private _params; // packed into words per Risk.layout
 
     // aggregate oi quantities
     uint256 public oiLong;
@@ -160,18 +160,18 @@ contract OverlayV1Market is IOverlayV1Market, Pausable {
 
     /// @notice initializes the market and its risk params
     /// @notice called only once by factory on deployment
-    function initialize(uint256[15] memory _params) external onlyFactory {
+    function initialize(uint256[15] memory newParams) external onlyFactory {
         // initialize update data
         Oracle.Data memory data = IOverlayV1Feed(feed).latest();
         require(_midFromFeed(data) > 0, "OVLV1:!data");
         timestampUpdateLast = block.timestamp;
 
         // check risk params valid
-        uint256 _capLeverage = _params[uint256(Risk.Parameters.CapLeverage)];
-        uint256 _delta = _params[uint256(Risk.Parameters.Delta)];
+        uint256 _capLeverage = newParams[uint256(Risk.Parameters.CapLeverage)];
+        uint256 _delta = newParams[uint256(Risk.Parameters.Delta)];
         uint256 _maintenanceMarginFraction =
-            _params[uint256(Risk.Parameters.MaintenanceMarginFraction)];
-        uint256 _liquidationFeeRate = _params[uint256(Risk.Parameters.LiquidationFeeRate)];
+            newParams[uint256(Risk.Parameters.MaintenanceMarginFraction)];
+        uint256 _liquidationFeeRate = newParams[uint256(Risk.Parameters.LiquidationFeeRate)];
         require(
             _capLeverage
                 <= ONE.divDown(
@@ -180,7 +180,7 @@ contract OverlayV1Market is IOverlayV1Market, Pausable {
             "OVLV1: max lev immediately liquidatable"
         );
 
-        uint256 _priceDriftUpperLimit = _params[uint256(Risk.Parameters.PriceDriftUpperLimit)];
+        uint256 _priceDriftUpperLimit = newParams[uint256(Risk.Parameters.PriceDriftUpperLimit)];
         require(
             _priceDriftUpperLimit * data.macroWindow < MAX_NATURAL_EXPONENT,
             "OVLV1: price drift exceeds max exp"
@@ -188,8 +188,8 @@ contract OverlayV1Market is IOverlayV1Market, Pausable {
         _cacheRiskCalc(Risk.Parameters.PriceDriftUpperLimit, _priceDriftUpperLimit);
 
         // set the risk params
-        for (uint256 i = 0; i < _params.length; i++) {
-            params[i] = _params[i];
+        for (uint256 i = 0; i < newParams.length; i++) {
+            _params.set(Risk.Parameters(i), newParams[i]);
         }
     }
 
@@ -199,19 +199,61 @@ contract OverlayV1Market is IOverlayV1Market, Pausable {
         notShutdown
         returns (uint256 positionId_)
     {
+        // call to update before any effects
+        Oracle.Data memory data = update();
+
+        uint256[2] memory amounts;
+        positionId_ = _build(data, collateral, leverage, isLong, priceLimit, amounts);
+        _transferBuilt(amounts);
+    }
+
+    /// @dev builds a new position for each (collaterals[i], leverages[i], isLongs[i],
+    /// @dev priceLimits[i]) with a single update, registering volume for each in turn
+    /// @dev as separate builds would, and pulling in collateral plus fees in one
+    /// @dev transfer. Reverts if any of the builds would on its own
+    function buildBatch(
+        uint256[] calldata collaterals,
+        uint256[] calldata leverages,
+        bool[] calldata isLongs,
+        uint256[] calldata priceLimits
+    ) external notShutdown returns (uint256[] memory positionIds_) {
+        require(
+            collaterals.length == leverages.length && collaterals.length == isLongs.length
+                && collaterals.length == priceLimits.length,
+            "OVLV1:!length"
+        );
+
+        // call to update once before any effects
+        Oracle.Data memory data = update();
+
+        uint256[2] memory amounts;
+        positionIds_ = new uint256[](collaterals.length);
+        for (uint256 i = 0; i < collaterals.length; i++) {
+            positionIds_[i] =
+                _build(data, collaterals[i], leverages[i], isLongs[i], priceLimits[i], amounts);
+        }
+        _transferBuilt(amounts);
+    }
+
+    /// @dev builds a new position for the sender given data from update, adding the
+    /// @dev collateral plus trading fee and the trading fee to amounts
+    function _build(
+        Oracle.Data memory data,
+        uint256 collateral,
+        uint256 leverage,
+        bool isLong,
+        uint256 priceLimit,
+        uint256[2] memory amounts
+    ) private returns (uint256 positionId_) {
         require(leverage >= ONE, "OVLV1:lev<min");
-        require(leverage <= params.get(Risk.Parameters.CapLeverage), "OVLV1:lev>max");
-        require(collateral >= params.get(Risk.Parameters.MinCollateral), "OVLV1:collateral<min");
+        require(leverage <= _params.get(Risk.Parameters.CapLeverage), "OVLV1:lev>max");
+        require(collateral >= _params.get(Risk.Parameters.MinCollateral), "OVLV1:collateral<min");
 
         uint256 oi;
         uint256 debt;
         uint256 price;
-        uint256 tradingFee;
         // avoids stack too deep
         {
-            // call to update before any effects
-            Oracle.Data memory data = update();
-
             // calculate notional, oi, and trading fees. fees charged on notional
             // and added to collateral transferred in
             uint256 notional = collateral.mulUp(leverage);
@@ -224,12 +266,16 @@ contract OverlayV1Market is IOverlayV1Market, Pausable {
             // calculate debt and trading fees. fees charged on notional
             // and added to collateral transferred in
             debt = notional - collateral;
-            tradingFee = notional.mulUp(params.get(Risk.Parameters.TradingFeeRate));
+            {
+                uint256 tradingFee = notional.mulUp(_params.get(Risk.Parameters.TradingFeeRate));
+                amounts[0] += collateral + tradingFee;
+                amounts[1] += tradingFee;
+            }
 
             // calculate current notional cap adjusted for front run
             // and back run bounds. transform into a cap on open interest
             uint256 capOi = oiFromNotional(
-                capNotionalAdjustedForBounds(data, params.get(Risk.Parameters.CapNotional)),
+                capNotionalAdjustedForBounds(data, _params.get(Risk.Parameters.CapNotional)),
                 midPrice
             );
 
@@ -264,9 +310,9 @@ contract OverlayV1Market is IOverlayV1Market, Pausable {
                     isLong ? oiLong : oiShort,
                     isLong ? oiLongShares : oiShortShares,
                     midPrice,
-                    params.get(Risk.Parameters.CapPayoff),
-                    params.get(Risk.Parameters.MaintenanceMarginFraction),
-                    params.get(Risk.Parameters.LiquidationFeeRate)
+                    _params.get(Risk.Parameters.CapPayoff),
+                    _params.get(Risk.Parameters.MaintenanceMarginFraction),
+                    _params.get(Risk.Parameters.LiquidationFeeRate)
                 ),
                 "OVLV1:liquidatable"
             );
@@ -288,13 +334,17 @@ contract OverlayV1Market is IOverlayV1Market, Pausable {
             isLong ? oiLong : oiShort,
             isLong ? oiLongShares : oiShortShares
         );
+    }
 
-        // transfer in the OVL collateral needed to back the position + fees
+    /// @dev transfers in the collateral plus trading fees accumulated over builds,
+    /// @dev sending the trading fees on to the trading fee recipient
+    function _transferBuilt(uint256[2] memory amounts) private {
+        // transfer in the OVL collateral needed to back the positions + fees
         // trading fees charged as a percentage on notional size of position
-        ovl.transferFrom(msg.sender, address(this), collateral + tradingFee);
+        ovl.transferFrom(msg.sender, address(this), amounts[0]);
 
         // send trading fees to trading fee recipient
-        ovl.transfer(IOverlayV1Factory(factory).feeRecipient(), tradingFee);
+        ovl.transfer(IOverlayV1Factory(factory).feeRecipient(), amounts[1]);
     }
 
     /// @dev unwinds fraction of an existing position
@@ -302,26 +352,60 @@ contract OverlayV1Market is IOverlayV1Market, Pausable {
         external
         notShutdown
     {
+        // call to update before any effects
+        Oracle.Data memory data = update();
+
+        uint256[3] memory amounts;
+        _unwind(data, positionId, fraction, priceLimit, amounts);
+        _transferUnwound(amounts);
+    }
+
+    /// @dev unwinds fractions[i] of each existing position positionIds[i] with a
+    /// @dev single update, netting the mint or burn and paying out in one transfer.
+    /// @dev Reverts if any of the unwinds would on its own
+    function unwindBatch(
+        uint256[] calldata positionIds,
+        uint256[] calldata fractions,
+        uint256[] calldata priceLimits
+    ) external notShutdown {
+        require(
+            positionIds.length == fractions.length && positionIds.length == priceLimits.length,
+            "OVLV1:!length"
+        );
+
+        // call to update once before any effects
+        Oracle.Data memory data = update();
+
+        uint256[3] memory amounts;
+        for (uint256 i = 0; i < positionIds.length; i++) {
+            _unwind(data, positionIds[i], fractions[i], priceLimits[i], amounts);
+        }
+        _transferUnwound(amounts);
+    }
+
+    /// @dev unwinds fraction of the sender's position given data from update,
+    /// @dev adding the value, cost and trading fee of the unwound fraction to amounts
+    function _unwind(
+        Oracle.Data memory data,
+        uint256 positionId,
+        uint256 fraction,
+        uint256 priceLimit,
+        uint256[3] memory amounts
+    ) private {
         require(fraction <= ONE, "OVLV1:fraction>max");
         // only keep 4 decimal precision (1 bps) for fraction given
         // pos.fractionRemaining only to 4 decimals
         fraction -= fraction % 1e14;
         require(fraction > 0, "OVLV1:fraction<min");
 
-        uint256 value;
-        uint256 cost;
+        // check position exists
+        Position.Info memory pos = positions.get(msg.sender, positionId);
+        require(pos.exists(), "OVLV1:!position");
+
         uint256 price;
-        uint256 tradingFee;
-        Position.Info memory pos;
+        int256 pnl;
         // avoids stack too deep
         {
-            // call to update before any effects
-            Oracle.Data memory data = update();
-
-            // check position exists
-            pos = positions.get(msg.sender, positionId);
-            require(pos.exists(), "OVLV1:!position");
-
             // cache for gas savings
             uint256 oiTotalOnSide = pos.isLong ? oiLong : oiShort;
             uint256 oiTotalSharesOnSide = pos.isLong ? oiLongShares : oiShortShares;
@@ -333,9 +417,9 @@ contract OverlayV1Market is IOverlayV1Market, Pausable {
                     oiTotalOnSide,
                     oiTotalSharesOnSide,
                     _midFromFeed(data),
-                    params.get(Risk.Parameters.CapPayoff),
-                    params.get(Risk.Parameters.MaintenanceMarginFraction),
-                    params.get(Risk.Parameters.LiquidationFeeRate)
+                    _params.get(Risk.Parameters.CapPayoff),
+                    _params.get(Risk.Parameters.MaintenanceMarginFraction),
+                    _params.get(Risk.Parameters.LiquidationFeeRate)
                 ),
                 "OVLV1:liquidatable"
             );
@@ -345,36 +429,47 @@ contract OverlayV1Market is IOverlayV1Market, Pausable {
             // where volume = oi / capOi
             // current cap only adjusted for bounds (no circuit breaker so traders
             // don't get stuck in a position)
-            uint256 capOi = oiFromNotional(
-                capNotionalAdjustedForBounds(data, params.get(Risk.Parameters.CapNotional)),
-                _midFromFeed(data)
-            );
-            price = pos.isLong
-                ? bid(
-                    data,
-                    _registerVolumeBid(
-                        data, pos.oiCurrent(fraction, oiTotalOnSide, oiTotalSharesOnSide), capOi
-                    )
-                )
-                : ask(
-                    data,
-                    _registerVolumeAsk(
-                        data, pos.oiCurrent(fraction, oiTotalOnSide, oiTotalSharesOnSide), capOi
-                    )
+            {
+                uint256 capOi = oiFromNotional(
+                    capNotionalAdjustedForBounds(data, _params.get(Risk.Parameters.CapNotional)),
+                    _midFromFeed(data)
                 );
+                price = pos.isLong
+                    ? bid(
+                        data,
+                        _registerVolumeBid(
+                            data,
+                            pos.oiCurrent(fraction, oiTotalOnSide, oiTotalSharesOnSide),
+                            capOi
+                        )
+                    )
+                    : ask(
+                        data,
+                        _registerVolumeAsk(
+                            data,
+                            pos.oiCurrent(fraction, oiTotalOnSide, oiTotalSharesOnSide),
+                            capOi
+                        )
+                    );
+            }
             // check price hasn't changed more than max slippage specified by trader
             require(pos.isLong ? price >= priceLimit : price <= priceLimit, "OVLV1:slippage>max");
 
             // calculate the value and cost of the position for pnl determinations
             // and amount to transfer
-            uint256 capPayoff = params.get(Risk.Parameters.CapPayoff);
-            value = pos.value(fraction, oiTotalOnSide, oiTotalSharesOnSide, price, capPayoff);
-            cost = pos.cost(fraction);
+            uint256 capPayoff = _params.get(Risk.Parameters.CapPayoff);
+            uint256 value =
+                pos.value(fraction, oiTotalOnSide, oiTotalSharesOnSide, price, capPayoff);
+            uint256 cost = pos.cost(fraction);
 
             // calculate the trading fee as % on notional
-            uint256 tradingFeeRate = params.get(Risk.Parameters.TradingFeeRate);
-            tradingFee = pos.tradingFee(
-                fraction, oiTotalOnSide, oiTotalSharesOnSide, price, capPayoff, tradingFeeRate
+            uint256 tradingFee = pos.tradingFee(
+                fraction,
+                oiTotalOnSide,
+                oiTotalSharesOnSide,
+                price,
+                capPayoff,
+                _params.get(Risk.Parameters.TradingFeeRate)
             );
             tradingFee = Math.min(tradingFee, value); // if value < tradingFee
 
@@ -384,137 +479,191 @@ contract OverlayV1Market is IOverlayV1Market, Pausable {
 
             // register the amount to be minted/burned
             // capPayoff prevents overflow reverts with int256 cast
-            _registerMintOrBurn(int256(value) - int256(cost));
-
-            // store the updated position info data by reducing the
-            // oiShares and fraction remaining of initial position
-            pos.oiShares -= uint240(pos.oiSharesCurrent(fraction));
-            pos.fractionRemaining = pos.updatedFractionRemaining(fraction);
-            // ensure there are no dead shares left
-            if (pos.fractionRemaining == 0 && pos.oiShares > 0) {
-                _reduceOIAndOIShares(pos, ONE);
-                pos.oiShares = 0;
-            }
-            positions.set(msg.sender, positionId, pos);
+            pnl = int256(value) - int256(cost);
+            _registerMintOrBurn(pnl);
+
+            amounts[0] += value;
+            amounts[1] += cost;
+            amounts[2] += tradingFee;
         }
 
+        // store the updated position info data by reducing the
+        // oiShares and fraction remaining of initial position
+        pos.oiShares -= uint240(pos.oiSharesCurrent(fraction));
+        pos.fractionRemaining = pos.updatedFractionRemaining(fraction);
+        // ensure there are no dead shares left
+        if (pos.fractionRemaining == 0 && pos.oiShares > 0) {
+            _reduceOIAndOIShares(pos, ONE);
+            pos.oiShares = 0;
+        }
+        positions.set(msg.sender, positionId, pos);
+
         // emit unwind event
         emit Unwind(
             msg.sender,
             positionId,
             fraction,
-            int256(value) - int256(cost),
+            pnl,
             price,
             pos.isLong ? oiLong : oiShort,
             pos.isLong ? oiLongShares : oiShortShares
         );
+    }
 
-        // mint or burn the pnl for the position
-        if (value >= cost) {
-            ovl.mint(address(this), value - cost);
+    /// @dev mints or burns the net pnl on the value and cost accumulated over unwinds,
+    /// @dev transferring the value less trading fees to the sender
+    function _transferUnwound(uint256[3] memory amounts) private {
+        // mint or burn the pnl for the positions
+        if (amounts[0] >= amounts[1]) {
+            ovl.mint(address(this), amounts[0] - amounts[1]);
         } else {
-            ovl.burn(cost - value);
+            ovl.burn(amounts[1] - amounts[0]);
         }
 
         // transfer out the unwound position value less fees to trader
-        ovl.transfer(msg.sender, value - tradingFee);
+        ovl.transfer(msg.sender, amounts[0] - amounts[2]);
 
         // send trading fees to trading fee recipient
-        ovl.transfer(IOverlayV1Factory(factory).feeRecipient(), tradingFee);
+        ovl.transfer(IOverlayV1Factory(factory).feeRecipient(), amounts[2]);
     }
 
     /// @dev liquidates a liquidatable position
     function liquidate(address owner, uint256 positionId) external notShutdown {
+        // check position exists
+        Position.Info memory pos = positions.get(owner, positionId);
+        require(pos.exists(), "OVLV1:!position");
+
+        // call to update before any effects. Use mid price without volume for
+        // liquidation (oracle price effectively) to prevent market impact
+        // manipulation from causing unneccessary liquidations
+        uint256 price = _midFromFeed(update());
+
+        // check position is liquidatable and liquidate
+        uint256[3] memory amounts;
+        require(_liquidate(owner, positionId, pos, price, amounts), "OVLV1:!liquidatable");
+        _transferLiquidated(amounts);
+    }
+
+    /// @dev liquidates each liquidatable position (owners[i], positionIds[i]) with
+    /// @dev a single update, skipping positions that don't exist or aren't
+    /// @dev liquidatable. Returns the number of positions liquidated
+    function liquidateBatch(address[] calldata owners, uint256[] calldata positionIds)
+        external
+        notShutdown
+        returns (uint256 count_)
+    {
+        require(owners.length == positionIds.length, "OVLV1:!length");
+
+        // call to update once before any effects, at mid price as in liquidate
+        uint256 price = _midFromFeed(update());
+
+        uint256[3] memory amounts;
+        for (uint256 i = 0; i < owners.length; i++) {
+            Position.Info memory pos = positions.get(owners[i], positionIds[i]);
+            if (pos.exists() && _liquidate(owners[i], positionIds[i], pos, price, amounts)) {
+                count_++;
+            }
+        }
+
+        if (count_ > 0) _transferLiquidated(amounts);
+    }
+
+    /// @dev liquidates the position at price if liquidatable, adding the ovl to
+    /// @dev burn, send to the liquidator and send to the fee recipient to amounts.
+    /// @dev Returns whether the position was liquidated
+    function _liquidate(
+        address owner,
+        uint256 positionId,
+        Position.Info memory pos,
+        uint256 price,
+        uint256[3] memory amounts
+    ) private returns (bool) {
+        // entire position should be liquidated
         uint256 value;
-        uint256 cost;
-        uint256 price;
-        uint256 liquidationFee;
-        uint256 marginToBurn;
-        uint256 marginRemaining;
-        Position.Info memory pos;
         // avoids stack too deep
         {
-            // check position exists
-            pos = positions.get(owner, positionId);
-            require(pos.exists(), "OVLV1:!position");
-
-            // call to update before any effects
-            Oracle.Data memory data = update();
-
             // cache for gas savings
             uint256 oiTotalOnSide = pos.isLong ? oiLong : oiShort;
             uint256 oiTotalSharesOnSide = pos.isLong ? oiLongShares : oiShortShares;
-            uint256 capPayoff = params.get(Risk.Parameters.CapPayoff);
-
-            // entire position should be liquidated
-            uint256 fraction = ONE;
-
-            // Use mid price without volume for liquidation (oracle price effectively) to
-            // prevent market impact manipulation from causing unneccessary liquidations
-            price = _midFromFeed(data);
+            uint256 capPayoff = _params.get(Risk.Parameters.CapPayoff);
 
             // check position is liquidatable
-            require(
-                pos.liquidatable(
+            if (
+                !pos.liquidatable(
                     oiTotalOnSide,
                     oiTotalSharesOnSide,
                     price,
                     capPayoff,
-                    params.get(Risk.Parameters.MaintenanceMarginFraction),
-                    params.get(Risk.Parameters.LiquidationFeeRate)
-                ),
-                "OVLV1:!liquidatable"
-            );
+                    _params.get(Risk.Parameters.MaintenanceMarginFraction),
+                    _params.get(Risk.Parameters.LiquidationFeeRate)
+                )
+            ) return false;
 
-            // calculate the value and cost of the position for pnl determinations
+            // calculate the value of the position for pnl determinations
             // and amount to transfer
-            value = pos.value(fraction, oiTotalOnSide, oiTotalSharesOnSide, price, capPayoff);
-            cost = pos.cost(fraction);
+            value = pos.value(ONE, oiTotalOnSide, oiTotalSharesOnSide, price, capPayoff);
+        }
+
+        int256 pnl;
+        {
+            uint256 cost = pos.cost(ONE);
 
             // calculate the liquidation fee as % on remaining value
             // sent as reward to liquidator
-            liquidationFee = value.mulDown(params.get(Risk.Parameters.LiquidationFeeRate));
-            marginRemaining = value - liquidationFee;
+            uint256 liquidationFee =
+                value.mulDown(_params.get(Risk.Parameters.LiquidationFeeRate));
 
             // Reduce burn amount further by the mm burn rate, as insurance
             // for cases when not liquidated in time
-            marginToBurn =
-                marginRemaining.mulDown(params.get(Risk.Parameters.MaintenanceMarginBurnRate));
-            marginRemaining -= marginToBurn;
+            uint256 marginToBurn = (value - liquidationFee).mulDown(
+                _params.get(Risk.Parameters.MaintenanceMarginBurnRate)
+            );
 
             // subtract liquidated open interest from the side's aggregate oi value
             // and decrease number of oi shares issued
-            _reduceOIAndOIShares(pos, fraction);
+            _reduceOIAndOIShares(pos, ONE);
 
             // register the amount to be burned
-            _registerMintOrBurn(int256(value) - int256(cost) - int256(marginToBurn));
-
-            // store the updated position info data. mark as liquidated
-            pos.liquidated = true;
-            pos.oiShares = 0;
-            pos.fractionRemaining = 0;
-            positions.set(owner, positionId, pos);
+            pnl = int256(value) - int256(cost) - int256(marginToBurn);
+            _registerMintOrBurn(pnl);
+
+            // burn the pnl for the position + insurance margin, reward the
+            // liquidation fee and send remaining margin to the fee recipient
+            amounts[0] += cost - value + marginToBurn;
+            amounts[1] += liquidationFee;
+            amounts[2] += value - liquidationFee - marginToBurn;
         }
 
+        // store the updated position info data. mark as liquidated
+        pos.liquidated = true;
+        pos.oiShares = 0;
+        pos.fractionRemaining = 0;
+        positions.set(owner, positionId, pos);
+
         // emit liquidate event
         emit Liquidate(
             msg.sender,
             owner,
             positionId,
-            int256(value) - int256(cost) - int256(marginToBurn),
+            pnl,
             price,
             pos.isLong ? oiLong : oiShort,
             pos.isLong ? oiLongShares : oiShortShares
         );
+        return true;
+    }
 
-        // burn the pnl for the position + insurance margin
-        ovl.burn(cost - value + marginToBurn);
+    /// @dev burns, sends to the liquidator and sends to the trading fee recipient
+    /// @dev the ovl amounts accumulated over liquidations
+    function _transferLiquidated(uint256[3] memory amounts) private {
+        // burn the pnl for the positions + insurance margin
+        ovl.burn(amounts[0]);
 
-        // transfer out the liquidation fee to liquidator for reward
-        ovl.transfer(msg.sender, liquidationFee);
+        // transfer out the liquidation fees to liquidator for reward
+        ovl.transfer(msg.sender, amounts[1]);
 
         // send remaining margin to trading fee recipient
-        ovl.transfer(IOverlayV1Factory(factory).feeRecipient(), marginRemaining);
+        ovl.transfer(IOverlayV1Factory(factory).feeRecipient(), amounts[2]);
     }
 
     /// @dev updates market: pays funding and fetches freshest data from feed
@@ -560,6 +709,123 @@ contract OverlayV1Market is IOverlayV1Market, Pausable {
         return (dp >= _dpLowerLimit && dp <= _dpUpperLimit);
     }
 
+    /// @notice Risk param at idx, in Risk.Parameters enum order
+    /// @dev reverts if idx isn't a valid enum value
+    function params(uint256 idx) external view returns (uint256) {
+        return _params.get(Risk.Parameters(idx));
+    }
+
+    /// @notice Open interest on the long side with funding paid through
+    /// @notice the current block, without the state write of update
+    function oiLongCurrent() external view returns (uint256 oiLong_) {
+        (oiLong_,) = _oiCurrent();
+    }
+
+    /// @notice Open interest on the short side with funding paid through
+    /// @notice the current block, without the state write of update
+    function oiShortCurrent() external view returns (uint256 oiShort_) {
+        (, oiShort_) = _oiCurrent();
+    }
+
+    /// @dev (oiLong, oiShort) update would store were it called now
+    function _oiCurrent() private view returns (uint256 oiLong_, uint256 oiShort_) {
+        uint256 timeElapsed = block.timestamp - timestampUpdateLast;
+        if (timeElapsed == 0) return (oiLong, oiShort);
+        return _oiAfterFundingPaid(oiLong, oiShort, timeElapsed);
+    }
+
+    /// @notice Value of the owner's position with funding paid through the
+    /// @notice current block, at the latest mid price from the feed
+    function value(address owner, uint256 positionId) external view returns (uint256) {
+        (
+            Position.Info memory pos,
+            uint256 oiTotalOnSide,
+            uint256 oiTotalSharesOnSide,
+            uint256 price
+        ) = _positionCurrent(owner, positionId);
+        require(pos.exists(), "OVLV1:!position");
+        return pos.value(
+            ONE, oiTotalOnSide, oiTotalSharesOnSide, price, _params.get(Risk.Parameters.CapPayoff)
+        );
+    }
+
+    /// @notice Notional of the owner's position including pnl with funding paid
+    /// @notice through the current block, at the latest mid price from the feed
+    function notionalWithPnl(address owner, uint256 positionId) external view returns (uint256) {
+        (
+            Position.Info memory pos,
+            uint256 oiTotalOnSide,
+            uint256 oiTotalSharesOnSide,
+            uint256 price
+        ) = _positionCurrent(owner, positionId);
+        require(pos.exists(), "OVLV1:!position");
+        return pos.notionalWithPnl(
+            ONE, oiTotalOnSide, oiTotalSharesOnSide, price, _params.get(Risk.Parameters.CapPayoff)
+        );
+    }
+
+    /// @notice Whether liquidate would liquidate the owner's position were it
+    /// @notice called now. False for positions that don't exist
+    function liquidatable(address owner, uint256 positionId) external view returns (bool) {
+        (
+            Position.Info memory pos,
+            uint256 oiTotalOnSide,
+            uint256 oiTotalSharesOnSide,
+            uint256 price
+        ) = _positionCurrent(owner, positionId);
+        return pos.liquidatable(
+            oiTotalOnSide,
+            oiTotalSharesOnSide,
+            price,
+            _params.get(Risk.Parameters.CapPayoff),
+            _params.get(Risk.Parameters.MaintenanceMarginFraction),
+            _params.get(Risk.Parameters.LiquidationFeeRate)
+        );
+    }
+
+    /// @notice Mid price at which the owner's position becomes liquidatable with
+    /// @notice funding paid through the current block, at or below for longs and
+    /// @notice at or above for shorts
+    function liquidationPrice(address owner, uint256 positionId)
+        external
+        view
+        returns (uint256)
+    {
+        Position.Info memory pos = positions.get(owner, positionId);
+        require(pos.exists(), "OVLV1:!position");
+
+        (uint256 oiLong_, uint256 oiShort_) = _oiCurrent();
+        return pos.liquidationPrice(
+            pos.isLong ? oiLong_ : oiShort_,
+            pos.isLong ? oiLongShares : oiShortShares,
+            _params.get(Risk.Parameters.MaintenanceMarginFraction),
+            _params.get(Risk.Parameters.LiquidationFeeRate)
+        );
+    }
+
+    /// @dev reads the owner's position, the oi on its side with funding paid
+    /// @dev through the current block and the mid price liquidate would use
+    function _positionCurrent(address owner, uint256 positionId)
+        private
+        view
+        returns (
+            Position.Info memory pos_,
+            uint256 oiTotalOnSide_,
+            uint256 oiTotalSharesOnSide_,
+            uint256 price_
+        )
+    {
+        pos_ = positions.get(owner, positionId);
+        (uint256 oiLong_, uint256 oiShort_) = _oiCurrent();
+        oiTotalOnSide_ = pos_.isLong ? oiLong_ : oiShort_;
+        oiTotalSharesOnSide_ = pos_.isLong ? oiLongShares : oiShortShares;
+
+        // same sanity check on data as update
+        Oracle.Data memory data = IOverlayV1Feed(feed).latest();
+        require(dataIsValid(data), "OVLV1:!data");
+        price_ = _midFromFeed(data);
+    }
+
     /// @notice Current open interest after funding payments transferred
     /// @notice from overweight oi side to underweight oi side
     /// @return New rebalanced (oiOverweight, oiUnderweight) after funding payments
@@ -586,7 +852,7 @@ contract OverlayV1Market is IOverlayV1Market, Pausable {
         // draw down the imbalance by factor of e**(-2*k*t)
         // but min to zero if pow = 2*k*t exceeds MAX_NATURAL_EXPONENT
         uint256 fundingFactor;
-        uint256 pow = 2 * params.get(Risk.Parameters.K) * timeElapsed;
+        uint256 pow = 2 * _params.get(Risk.Parameters.K) * timeElapsed;
         if (pow < MAX_NATURAL_EXPONENT) {
             fundingFactor = ONE.divDown(pow.expUp()); // e**(-pow)
         }
@@ -626,7 +892,7 @@ contract OverlayV1Market is IOverlayV1Market, Pausable {
         // but transformed to account for decay in magnitude of minted since
         // last snapshot taken
         Roller.Snapshot memory snapshot = snapshotMinted;
-        uint256 circuitBreakerWindow = params.get(Risk.Parameters.CircuitBreakerWindow);
+        uint256 circuitBreakerWindow = _params.get(Risk.Parameters.CircuitBreakerWindow);
         snapshot = snapshot.transform(block.timestamp, circuitBreakerWindow, 0);
         cap = circuitBreaker(snapshot, cap);
         return cap;
@@ -643,7 +909,7 @@ contract OverlayV1Market is IOverlayV1Market, Pausable {
         returns (uint256)
     {
         int256 minted = int256(snapshot.cumulative());
-        uint256 circuitBreakerMintTarget = params.get(Risk.Parameters.CircuitBreakerMintTarget);
+        uint256 circuitBreakerMintTarget = _params.get(Risk.Parameters.CircuitBreakerMintTarget);
         if (minted <= int256(circuitBreakerMintTarget)) {
             return cap;
         } else if (minted >= 2 * int256(circuitBreakerMintTarget)) {
@@ -675,16 +941,16 @@ contract OverlayV1Market is IOverlayV1Market, Pausable {
     /// @dev bound on notional cap to mitigate front-running attack
     /// @dev bound = lmbda * reserveInOvl
     function frontRunBound(Oracle.Data memory data) public view returns (uint256) {
-        uint256 lmbda = params.get(Risk.Parameters.Lmbda);
+        uint256 lmbda = _params.get(Risk.Parameters.Lmbda);
         return lmbda.mulDown(data.reserveOverMicroWindow);
     }
 
     /// @dev bound on notional cap to mitigate back-running attack
     /// @dev bound = macroWindowInBlocks * reserveInOvl * 2 * delta
     function backRunBound(Oracle.Data memory data) public view returns (uint256) {
-        uint256 averageBlockTime = params.get(Risk.Parameters.AverageBlockTime);
+        uint256 averageBlockTime = _params.get(Risk.Parameters.AverageBlockTime);
         uint256 window = (data.macroWindow * ONE * TO_MS) / averageBlockTime;
-        uint256 delta = params.get(Risk.Parameters.Delta);
+        uint256 delta = _params.get(Risk.Parameters.Delta);
         return delta.mulDown(data.reserveOverMicroWindow).mulDown(window).mulDown(2 * ONE);
     }
 
@@ -699,8 +965,8 @@ contract OverlayV1Market is IOverlayV1Market, Pausable {
         bid_ = Math.min(data.priceOverMicroWindow, data.priceOverMacroWindow);
 
         // add static spread (delta) and market impact (lmbda * volume)
-        uint256 delta = params.get(Risk.Parameters.Delta);
-        uint256 lmbda = params.get(Risk.Parameters.Lmbda);
+        uint256 delta = _params.get(Risk.Parameters.Delta);
+        uint256 lmbda = _params.get(Risk.Parameters.Lmbda);
         uint256 pow = delta + lmbda.mulUp(volume);
         require(pow < MAX_NATURAL_EXPONENT, "OVLV1:slippage>max");
 
@@ -712,8 +978,8 @@ contract OverlayV1Market is IOverlayV1Market, Pausable {
         ask_ = Math.max(data.priceOverMicroWindow, data.priceOverMacroWindow);
 
         // add static spread (delta) and market impact (lmbda * volume)
-        uint256 delta = params.get(Risk.Parameters.Delta);
-        uint256 lmbda = params.get(Risk.Parameters.Lmbda);
+        uint256 delta = _params.get(Risk.Parameters.Delta);
+        uint256 lmbda = _params.get(Risk.Parameters.Lmbda);
         uint256 pow = delta + lmbda.mulUp(volume);
         require(pow < MAX_NATURAL_EXPONENT, "OVLV1:slippage>max");
 
@@ -776,7 +1042,7 @@ contract OverlayV1Market is IOverlayV1Market, Pausable {
 
         // calculates the decay in the rolling amount minted since last snapshot
         // and determines new window to decay over
-        uint256 circuitBreakerWindow = params.get(Risk.Parameters.CircuitBreakerWindow);
+        uint256 circuitBreakerWindow = _params.get(Risk.Parameters.CircuitBreakerWindow);
         snapshot = snapshot.transform(block.timestamp, circuitBreakerWindow, value);
 
         // store the transformed snapshot
@@ -810,24 +1076,32 @@ contract OverlayV1Market is IOverlayV1Market, Pausable {
         // apply funding if at least one second has passed since last update
         uint256 timeElapsed = block.timestamp - timestampUpdateLast;
         if (timeElapsed > 0) {
-            // calculate adjustments to oi due to funding
-            bool isLongOverweight = oiLong > oiShort;
-            uint256 oiOverweight = isLongOverweight ? oiLong : oiShort;
-            uint256 oiUnderweight = isLongOverweight ? oiShort : oiLong;
-
-            // calculate new oi values after funding
-            (oiOverweight, oiUnderweight) =
-                oiAfterFunding(oiOverweight, oiUnderweight, timeElapsed);
-
             // pay funding (ie. update market ois)
-            oiLong = isLongOverweight ? oiOverweight : oiUnderweight;
-            oiShort = isLongOverweight ? oiUnderweight : oiOverweight;
+            (oiLong, oiShort) = _oiAfterFundingPaid(oiLong, oiShort, timeElapsed);
 
             // set last time market was updated
             timestampUpdateLast = block.timestamp;
         }
     }
 
+    /// @dev calculates (oiLong, oiShort) after funding is paid over timeElapsed
+    function _oiAfterFundingPaid(uint256 _oiLong, uint256 _oiShort, uint256 timeElapsed)
+        private
+        view
+        returns (uint256 oiLong_, uint256 oiShort_)
+    {
+        // calculate adjustments to oi due to funding
+        bool isLongOverweight = _oiLong > _oiShort;
+        uint256 oiOverweight = isLongOverweight ? _oiLong : _oiShort;
+        uint256 oiUnderweight = isLongOverweight ? _oiShort : _oiLong;
+
+        // calculate new oi values after funding
+        (oiOverweight, oiUnderweight) = oiAfterFunding(oiOverweight, oiUnderweight, timeElapsed);
+
+        oiLong_ = isLongOverweight ? oiOverweight : oiUnderweight;
+        oiShort_ = isLongOverweight ? oiUnderweight : oiOverweight;
+    }
+
     /// @notice Adds open interest and open interest shares to aggregate storage
     /// @notice pairs (oiLong, oiLongShares) or (oiShort, oiShortShares)
     /// @return oiShares_ as the new position's shares of aggregate open interest
@@ -874,7 +1148,7 @@ contract OverlayV1Market is IOverlayV1Market, Pausable {
         // check then set risk param
         _checkRiskParam(name, value);
         _cacheRiskCalc(name, value);
-        params.set(name, value);
+        _params.set(name, value);
     }
 
     /// @notice Checks the governance per-market risk parameter is valid
@@ -885,10 +1159,10 @@ contract OverlayV1Market is IOverlayV1Market, Pausable {
         // maintenance margin fraction (maintenanceMarginFraction)
         if (name == Risk.Parameters.Delta) {
             uint256 _delta = value;
-            uint256 capLeverage = params.get(Risk.Parameters.CapLeverage);
+            uint256 capLeverage = _params.get(Risk.Parameters.CapLeverage);
             uint256 maintenanceMarginFraction =
-                params.get(Risk.Parameters.MaintenanceMarginFraction);
-            uint256 liquidationFeeRate = params.get(Risk.Parameters.LiquidationFeeRate);
+                _params.get(Risk.Parameters.MaintenanceMarginFraction);
+            uint256 liquidationFeeRate = _params.get(Risk.Parameters.LiquidationFeeRate);
             require(
                 capLeverage
                     <= ONE.divDown(
@@ -904,10 +1178,10 @@ contract OverlayV1Market is IOverlayV1Market, Pausable {
         // maintenance margin fraction (maintenanceMarginFraction)
         if (name == Risk.Parameters.CapLeverage) {
             uint256 _capLeverage = value;
-            uint256 delta = params.get(Risk.Parameters.Delta);
+            uint256 delta = _params.get(Risk.Parameters.Delta);
             uint256 maintenanceMarginFraction =
-                params.get(Risk.Parameters.MaintenanceMarginFraction);
-            uint256 liquidationFeeRate = params.get(Risk.Parameters.LiquidationFeeRate);
+                _params.get(Risk.Parameters.MaintenanceMarginFraction);
+            uint256 liquidationFeeRate = _params.get(Risk.Parameters.LiquidationFeeRate);
             require(
                 _capLeverage
                     <= ONE.divDown(
@@ -923,9 +1197,9 @@ contract OverlayV1Market is IOverlayV1Market, Pausable {
         // and leverage cap (capLeverage)
         if (name == Risk.Parameters.MaintenanceMarginFraction) {
             uint256 _maintenanceMarginFraction = value;
-            uint256 delta = params.get(Risk.Parameters.Delta);
-            uint256 capLeverage = params.get(Risk.Parameters.CapLeverage);
-            uint256 liquidationFeeRate = params.get(Risk.Parameters.LiquidationFeeRate);
+            uint256 delta = _params.get(Risk.Parameters.Delta);
+            uint256 capLeverage = _params.get(Risk.Parameters.CapLeverage);
+            uint256 liquidationFeeRate = _params.get(Risk.Parameters.LiquidationFeeRate);
             require(
                 capLeverage
                     <= ONE.divDown(
@@ -941,10 +1215,10 @@ contract OverlayV1Market is IOverlayV1Market, Pausable {
         // maintenance margin fraction (maintenanceMarginFraction)
         if (name == Risk.Parameters.LiquidationFeeRate) {
             uint256 _liquidationFeeRate = value;
-            uint256 delta = params.get(Risk.Parameters.Delta);
-            uint256 capLeverage = params.get(Risk.Parameters.CapLeverage);
+            uint256 delta = _params.get(Risk.Parameters.Delta);
+            uint256 capLeverage = _params.get(Risk.Parameters.CapLeverage);
             uint256 maintenanceMarginFraction =
-                params.get(Risk.Parameters.MaintenanceMarginFraction);
+                _params.get(Risk.Parameters.MaintenanceMarginFraction);
             require(
                 capLeverage
                     <= ONE.divDown(
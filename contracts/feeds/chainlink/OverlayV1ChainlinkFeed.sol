@@ -61,6 +61,7 @@ contract OverlayV1ChainlinkFeed is OverlayV1Feed {
     function _getAveragePrice(uint80 roundId)
         internal
         view
+        virtual
         returns (
             uint256 priceOverMicroWindow,
             uint256 priceOverMacroWindow,
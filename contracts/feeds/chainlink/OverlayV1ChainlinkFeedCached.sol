@@ -0,0 +1,234 @@
+// SPDX-License-Identifier: GPL-2.0-or-later
+pragma solidity 0.8.10;
+
+import "./OverlayV1ChainlinkFeed.sol";
+
+/// @notice Chainlink feed that folds aggregator rounds into cumulative
+/// @notice price-time observations, so averages over the micro and macro
+/// @notice windows cost O(rounds since last checkpoint) external calls
+/// @notice instead of O(rounds in 2 * macroWindow). Governance can cap the
+/// @notice rounds read per latest() to bound gas on fast updating aggregators
+contract OverlayV1ChainlinkFeedCached is OverlayV1ChainlinkFeed {
+    struct Observation {
+        uint64 updatedAt; // time round was updated
+        uint192 answer; // round answer in aggregator decimals
+        uint256 cumulative; // sum of answer * dt from first observation to updatedAt
+    }
+
+    // observations for each folded round, ascending in updatedAt
+    Observation[] public observations;
+    // last round folded into observations
+    uint80 public roundIdLast;
+    // max aggregator rounds read per latest(), zero for no cap
+    uint256 public maxRounds;
+
+    event Checkpointed(address indexed sender, uint80 roundId, uint256 count);
+    event MaxRoundsSet(uint256 maxRounds);
+
+    constructor(
+        address _ovl,
+        address _aggregator,
+        uint256 _microWindow,
+        uint256 _macroWindow,
+        uint256 _heartbeat
+    ) OverlayV1ChainlinkFeed(_ovl, _aggregator, _microWindow, _macroWindow, _heartbeat) {}
+
+    /// @notice Number of observations folded so far
+    function observationsLength() external view returns (uint256) {
+        return observations.length;
+    }
+
+    /// @notice Caps the aggregator rounds read per latest(). Past the cap, the
+    /// @notice latest rounds are read and the earliest of them is extrapolated
+    /// @notice back to the last checkpoint, or over what is left of the windows
+    /// @notice before the cache covers 2 * macroWindow.
+    /// @notice Zero removes the cap
+    function setMaxRounds(uint256 _maxRounds) external onlyGovernor {
+        maxRounds = _maxRounds;
+        emit MaxRoundsSet(_maxRounds);
+    }
+
+    /// @notice Folds up to maxCount aggregator rounds since the last checkpoint
+    /// @notice into observations, oldest first, so a long gap can be caught up
+    /// @notice over several calls. Permissionless; first call seeds the cache
+    /// @notice with the latest round
+    /// @return count_ number of rounds folded
+    function checkpoint(uint256 maxCount) external returns (uint256 count_) {
+        (uint80 roundId,,, uint256 updatedAt,) = aggregator.latestRoundData();
+        uint256 length = observations.length;
+
+        Observation memory last;
+        uint80 id;
+        if (length == 0) {
+            // nothing to seed with until aggregator has reported
+            if (updatedAt == 0) return 0;
+            id = roundId;
+        } else {
+            last = observations[length - 1];
+            id = roundIdLast + 1;
+        }
+
+        for (; id <= roundId && count_ < maxCount; id++) {
+            (, int256 answer,, uint256 roundUpdatedAt,) = aggregator.getRoundData(id);
+            last = _fold(last, answer, roundUpdatedAt);
+            observations.push(last);
+            count_++;
+        }
+
+        if (count_ > 0) roundIdLast = id - 1;
+        emit Checkpointed(msg.sender, roundIdLast, count_);
+    }
+
+    /// @dev averages from cumulative observations once they cover 2 * macroWindow,
+    /// @dev otherwise walks the aggregator rounds as the parent does. Also walks once
+    /// @dev checkpoints lapse past 2 * macroWindow, so rounds read stay bounded by
+    /// @dev the window rather than growing with rounds since the last checkpoint.
+    /// @dev Reads at most maxRounds rounds when capped
+    function _getAveragePrice(uint80 roundId)
+        internal
+        view
+        virtual
+        override
+        returns (
+            uint256 priceOverMicroWindow,
+            uint256 priceOverMacroWindow,
+            uint256 priceOneMacroWindowAgo
+        )
+    {
+        uint256 length = observations.length;
+        if (
+            length == 0 || observations[0].updatedAt > block.timestamp - 2 * macroWindow
+                || observations[length - 1].updatedAt < block.timestamp - 2 * macroWindow
+        ) {
+            return _walk(roundId);
+        }
+
+        // fold rounds not yet checkpointed in memory. past the cap, fold only the
+        // latest maxRounds rounds, extrapolating the earliest read back to the
+        // last observation over the rounds skipped
+        uint256 count = roundId - roundIdLast;
+        if (maxRounds > 0 && count > maxRounds) count = maxRounds;
+        Observation[] memory pending = new Observation[](count);
+        Observation memory last = observations[length - 1];
+        for (uint256 i = 0; i < count; i++) {
+            uint80 id = roundId - uint80(count - 1 - i);
+            (, int256 answer,, uint256 updatedAt,) = aggregator.getRoundData(id);
+            if (i == 0 && id > roundIdLast + 1) updatedAt = last.updatedAt;
+            last = _fold(last, answer, updatedAt);
+            pending[i] = last;
+        }
+
+        uint256 cumulativeNow = _cumulativeAt(block.timestamp, pending);
+        uint256 cumulativeMacroAgo = _cumulativeAt(block.timestamp - macroWindow, pending);
+        uint256 scale = 10 ** decimals;
+
+        priceOverMicroWindow = (
+            (cumulativeNow - _cumulativeAt(block.timestamp - microWindow, pending)) * (10 ** 18)
+        ) / (microWindow * scale);
+        priceOverMacroWindow =
+            ((cumulativeNow - cumulativeMacroAgo) * (10 ** 18)) / (macroWindow * scale);
+        priceOneMacroWindowAgo = (
+            (cumulativeMacroAgo - _cumulativeAt(block.timestamp - 2 * macroWindow, pending))
+                * (10 ** 18)
+        ) / (macroWindow * scale);
+    }
+
+    /// @dev walks back from roundId as the parent does, reading at most maxRounds
+    /// @dev rounds. The earliest round read is extrapolated back over what is left
+    /// @dev of the windows
+    function _walk(uint80 roundId) private view returns (uint256, uint256, uint256) {
+        if (maxRounds == 0) return super._getAveragePrice(roundId);
+
+        uint256 roundIdMin = roundId >= maxRounds ? roundId + 1 - maxRounds : 0;
+        uint256 nextTimestamp = block.timestamp;
+        uint256 macroAgoTarget = block.timestamp - 2 * macroWindow;
+
+        // time left to sum over in the micro and macro windows, then sums of
+        // answer * dt over the micro, macro and one macro ago windows
+        uint256[2] memory left = [microWindow, macroWindow];
+        uint256[3] memory sums;
+
+        while (true) {
+            (, int256 answer,, uint256 updatedAt,) = aggregator.getRoundData(roundId);
+            if (roundId == roundIdMin && updatedAt >= macroAgoTarget) {
+                updatedAt = macroAgoTarget - 1;
+            }
+
+            for (uint256 j = 0; j < 2; j++) {
+                if (left[j] == 0) continue;
+                uint256 dt = nextTimestamp - updatedAt < left[j]
+                    ? nextTimestamp - updatedAt
+                    : left[j];
+                sums[j] += dt * uint256(answer);
+                left[j] -= dt;
+            }
+
+            if (updatedAt <= block.timestamp - macroWindow) {
+                uint256 startTime = nextTimestamp > block.timestamp - macroWindow
+                    ? block.timestamp - macroWindow
+                    : nextTimestamp;
+                if (updatedAt >= macroAgoTarget) {
+                    sums[2] += (startTime - updatedAt) * uint256(answer);
+                } else {
+                    sums[2] += (startTime - macroAgoTarget) * uint256(answer);
+                    break;
+                }
+            }
+
+            nextTimestamp = updatedAt;
+            roundId--;
+        }
+
+        uint256 scale = 10 ** decimals;
+        return (
+            (sums[0] * (10 ** 18)) / (microWindow * scale),
+            (sums[1] * (10 ** 18)) / (macroWindow * scale),
+            (sums[2] * (10 ** 18)) / (macroWindow * scale)
+        );
+    }
+
+    /// @dev observation for a round given the observation for the round prior
+    function _fold(Observation memory last, int256 answer, uint256 updatedAt)
+        private
+        pure
+        returns (Observation memory obs_)
+    {
+        obs_.updatedAt = uint64(updatedAt);
+        obs_.answer = uint192(uint256(answer));
+        if (last.updatedAt > 0) {
+            obs_.cumulative =
+                last.cumulative + uint256(last.answer) * (updatedAt - uint256(last.updatedAt));
+        }
+    }
+
+    /// @dev sum of answer * dt from first observation to timestamp. Assumes
+    /// @dev timestamp is at or after the first observation
+    function _cumulativeAt(uint256 timestamp, Observation[] memory pending)
+        private
+        view
+        returns (uint256)
+    {
+        Observation memory obs;
+        if (pending.length > 0 && pending[0].updatedAt <= timestamp) {
+            uint256 i = pending.length - 1;
+            while (pending[i].updatedAt > timestamp) i--;
+            obs = pending[i];
+        } else {
+            obs = observations[_search(timestamp)];
+        }
+        return obs.cumulative + uint256(obs.answer) * (timestamp - uint256(obs.updatedAt));
+    }
+
+    /// @dev binary search for the last observation updated at or before timestamp
+    function _search(uint256 timestamp) private view returns (uint256 lo_) {
+        uint256 hi = observations.length - 1;
+        while (lo_ < hi) {
+            uint256 mid = (lo_ + hi + 1) / 2;
+            if (observations[mid].updatedAt <= timestamp) {
+                lo_ = mid;
+            } else {
+                hi = mid - 1;
+            }
+        }
+    }
+}
@@ -27,6 +27,20 @@ interface IOverlayV1Market {
 
     function oiShortShares() external view returns (uint256);
 
+    // current oi with funding paid through the current block
+    function oiLongCurrent() external view returns (uint256 oiLong_);
+
+    function oiShortCurrent() external view returns (uint256 oiShort_);
+
+    // position quantities with funding paid through the current block
+    function value(address owner, uint256 positionId) external view returns (uint256);
+
+    function notionalWithPnl(address owner, uint256 positionId) external view returns (uint256);
+
+    function liquidatable(address owner, uint256 positionId) external view returns (bool);
+
+    function liquidationPrice(address owner, uint256 positionId) external view returns (uint256);
+
     // rollers
     function snapshotVolumeBid()
         external
@@ -75,10 +89,27 @@ interface IOverlayV1Market {
         external
         returns (uint256 positionId_);
 
+    function buildBatch(
+        uint256[] calldata collaterals,
+        uint256[] calldata leverages,
+        bool[] calldata isLongs,
+        uint256[] calldata priceLimits
+    ) external returns (uint256[] memory positionIds_);
+
     function unwind(uint256 positionId, uint256 fraction, uint256 priceLimit) external;
 
+    function unwindBatch(
+        uint256[] calldata positionIds,
+        uint256[] calldata fractions,
+        uint256[] calldata priceLimits
+    ) external;
+
     function liquidate(address owner, uint256 positionId) external;
 
+    function liquidateBatch(address[] calldata owners, uint256[] calldata positionIds)
+        external
+        returns (uint256 count_);
+
     // updates market
     function update() external returns (Oracle.Data memory);
 
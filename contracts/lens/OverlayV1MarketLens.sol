@@ -0,0 +1,194 @@
+// SPDX-License-Identifier: MIT
+pragma solidity 0.8.10;
+
+import "@openzeppelin/contracts/utils/math/Math.sol";
+
+import "../interfaces/IOverlayV1Market.sol";
+import "../interfaces/feeds/IOverlayV1Feed.sol";
+import "../libraries/FixedPoint.sol";
+import "../libraries/Oracle.sol";
+import "../libraries/Position.sol";
+import "../libraries/Risk.sol";
+import "../libraries/Roller.sol";
+
+/// @notice Read-only aggregator of market state so off-chain clients can
+/// @notice fetch everything at one block in a single eth_call
+contract OverlayV1MarketLens {
+    using FixedPoint for uint256;
+    using Position for Position.Info;
+
+    uint256 internal constant ONE = 1e18;
+
+    struct MarketState {
+        uint256[15] params;
+        uint256 oiLong;
+        uint256 oiShort;
+        uint256 oiLongShares;
+        uint256 oiShortShares;
+        Roller.Snapshot snapshotVolumeBid;
+        Roller.Snapshot snapshotVolumeAsk;
+        Roller.Snapshot snapshotMinted;
+        uint256 timestampUpdateLast;
+        uint256 dpUpperLimit;
+        bool isShutdown;
+        Oracle.Data data; // latest data from the market's feed
+        uint256 blockNumber;
+        uint256 timestamp;
+    }
+
+    struct PositionState {
+        address owner;
+        uint256 id;
+        Position.Info info;
+        uint256 oi; // current oi accounting for funding
+        uint256 cost; // collateral remaining at entry
+        uint256 value;
+        uint256 notionalWithPnl;
+        uint256 maintenanceMargin;
+        uint256 liquidationFee; // reward to liquidator were it liquidated now
+        bool liquidatable;
+    }
+
+    /// @dev market quantities shared by all positions in a batch read
+    struct MarketContext {
+        uint256 oiLong;
+        uint256 oiShort;
+        uint256 oiLongShares;
+        uint256 oiShortShares;
+        uint256 price; // mid price, as used for liquidations
+        uint256 capPayoff;
+        uint256 maintenanceMarginFraction;
+        uint256 liquidationFeeRate;
+    }
+
+    /// @notice Returns the stored state of the market along with the
+    /// @notice latest feed data at the current block. Open interest is
+    /// @notice as of timestampUpdateLast, prior to funding since
+    function marketState(IOverlayV1Market market)
+        external
+        view
+        returns (MarketState memory state_)
+    {
+        for (uint256 i = 0; i < 15; i++) {
+            state_.params[i] = market.params(i);
+        }
+
+        state_.oiLong = market.oiLong();
+        state_.oiShort = market.oiShort();
+        state_.oiLongShares = market.oiLongShares();
+        state_.oiShortShares = market.oiShortShares();
+
+        (uint32 timestamp, uint32 window, int192 accumulator) = market.snapshotVolumeBid();
+        state_.snapshotVolumeBid = Roller.Snapshot(timestamp, window, accumulator);
+        (timestamp, window, accumulator) = market.snapshotVolumeAsk();
+        state_.snapshotVolumeAsk = Roller.Snapshot(timestamp, window, accumulator);
+        (timestamp, window, accumulator) = market.snapshotMinted();
+        state_.snapshotMinted = Roller.Snapshot(timestamp, window, accumulator);
+
+        state_.timestampUpdateLast = market.timestampUpdateLast();
+        state_.dpUpperLimit = market.dpUpperLimit();
+        state_.isShutdown = market.isShutdown();
+        state_.data = IOverlayV1Feed(market.feed()).latest();
+
+        state_.blockNumber = block.number;
+        state_.timestamp = block.timestamp;
+    }
+
+    /// @notice Returns the derived state of each (owners[i], ids[i]) position
+    /// @notice at the current block, with funding paid through now and
+    /// @notice valued at the mid price from the feed's latest data
+    /// @dev derived fields are zero for positions that don't exist, have
+    /// @dev been unwound or liquidated. Callers should page through large
+    /// @dev batches to stay under the node's eth_call gas cap
+    function positionStates(
+        IOverlayV1Market market,
+        address[] calldata owners,
+        uint256[] calldata ids
+    ) external view returns (PositionState[] memory states_) {
+        require(owners.length == ids.length, "OVLV1: !length");
+        MarketContext memory ctx = _marketContext(market);
+
+        states_ = new PositionState[](owners.length);
+        for (uint256 i = 0; i < owners.length; i++) {
+            states_[i] = _positionState(market, ctx, owners[i], ids[i]);
+        }
+    }
+
+    /// @dev caches oi after funding, mid price and relevant risk params
+    function _marketContext(IOverlayV1Market market)
+        private
+        view
+        returns (MarketContext memory ctx_)
+    {
+        ctx_.oiLong = market.oiLong();
+        ctx_.oiShort = market.oiShort();
+        ctx_.oiLongShares = market.oiLongShares();
+        ctx_.oiShortShares = market.oiShortShares();
+
+        // pay funding through now as the market would on update
+        uint256 timeElapsed = block.timestamp - market.timestampUpdateLast();
+        if (timeElapsed > 0) {
+            bool isLongOverweight = ctx_.oiLong > ctx_.oiShort;
+            (uint256 oiOverweight, uint256 oiUnderweight) = market.oiAfterFunding(
+                isLongOverweight ? ctx_.oiLong : ctx_.oiShort,
+                isLongOverweight ? ctx_.oiShort : ctx_.oiLong,
+                timeElapsed
+            );
+            ctx_.oiLong = isLongOverweight ? oiOverweight : oiUnderweight;
+            ctx_.oiShort = isLongOverweight ? oiUnderweight : oiOverweight;
+        }
+
+        Oracle.Data memory data = IOverlayV1Feed(market.feed()).latest();
+        ctx_.price = Math.average(data.priceOverMicroWindow, data.priceOverMacroWindow);
+
+        ctx_.capPayoff = market.params(uint256(Risk.Parameters.CapPayoff));
+        ctx_.maintenanceMarginFraction =
+            market.params(uint256(Risk.Parameters.MaintenanceMarginFraction));
+        ctx_.liquidationFeeRate = market.params(uint256(Risk.Parameters.LiquidationFeeRate));
+    }
+
+    /// @dev reads a single position and derives its state given ctx
+    function _positionState(
+        IOverlayV1Market market,
+        MarketContext memory ctx,
+        address owner,
+        uint256 id
+    ) private view returns (PositionState memory state_) {
+        state_.owner = owner;
+        state_.id = id;
+
+        Position.Info memory pos = _position(market, owner, id);
+        state_.info = pos;
+        if (!pos.exists()) return state_;
+
+        uint256 oiTotalOnSide = pos.isLong ? ctx.oiLong : ctx.oiShort;
+        uint256 oiTotalSharesOnSide = pos.isLong ? ctx.oiLongShares : ctx.oiShortShares;
+
+        state_.oi = pos.oiCurrent(ONE, oiTotalOnSide, oiTotalSharesOnSide);
+        state_.cost = pos.cost(ONE);
+        state_.value =
+            pos.value(ONE, oiTotalOnSide, oiTotalSharesOnSide, ctx.price, ctx.capPayoff);
+        state_.notionalWithPnl = state_.value + pos.debtInitial(ONE);
+        state_.maintenanceMargin = pos.notionalInitial(ONE).mulUp(ctx.maintenanceMarginFraction);
+        state_.liquidationFee = state_.value.mulDown(ctx.liquidationFeeRate);
+        state_.liquidatable = state_.value < state_.maintenanceMargin + state_.liquidationFee;
+    }
+
+    /// @dev unpacks the market's positions getter into a Position.Info
+    function _position(IOverlayV1Market market, address owner, uint256 id)
+        private
+        view
+        returns (Position.Info memory pos_)
+    {
+        (
+            pos_.notionalInitial,
+            pos_.debtInitial,
+            pos_.midTick,
+            pos_.entryTick,
+            pos_.isLong,
+            pos_.liquidated,
+            pos_.oiShares,
+            pos_.fractionRemaining
+        ) = market.positions(keccak256(abi.encodePacked(owner, id)));
+    }
+}
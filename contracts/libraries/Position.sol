@@ -325,4 +325,35 @@ library Position {
         uint256 liquidationFee = val.mulDown(liquidationFeeRate);
         can_ = val < maintenanceMargin + liquidationFee;
     }
+
+    /// @notice Computes the mid price at which a position becomes liquidatable,
+    /// @notice at or below for longs and at or above for shorts
+    /// @dev solves value * (1 - liq fee rate) = maintenance margin with value linear
+    /// @dev in price below the payoff cap, so agrees with liquidatable up to rounding
+    function liquidationPrice(
+        Info memory self,
+        uint256 oiTotalOnSide,
+        uint256 oiTotalSharesOnSide,
+        uint256 maintenanceMarginFraction,
+        uint256 liquidationFeeRate
+    ) internal pure returns (uint256 liquidationPrice_) {
+        uint256 fraction = ONE;
+        uint256 posOiCurrent = oiCurrent(self, fraction, oiTotalOnSide, oiTotalSharesOnSide);
+
+        // no oi left backing position, so liquidatable at any price
+        if (posOiCurrent == 0) return self.isLong ? type(uint256).max : 0;
+
+        // value below which liquidatable, plus debt, per unit of current oi
+        uint256 maintenanceMargin =
+            notionalInitial(self, fraction).mulUp(maintenanceMarginFraction);
+        uint256 threshold = maintenanceMargin.divUp(ONE - liquidationFeeRate);
+        uint256 dp = (threshold + debtInitial(self, fraction)).divUp(posOiCurrent);
+
+        // NOTE: value = notionalInitial * oiCurrent / oiInitial - debt
+        // NOTE:         +/- oiCurrent * (price - entryPrice)
+        // NOTE: where notionalInitial / oiInitial = midPriceAtEntry
+        liquidationPrice_ = self.isLong
+            ? (entryPrice(self) + dp).subFloor(midPriceAtEntry(self))
+            : (entryPrice(self) + midPriceAtEntry(self)).subFloor(dp);
+    }
 }
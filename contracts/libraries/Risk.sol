@@ -21,6 +21,21 @@ library Risk {
 
     }
 
+    // layout of params packed into four storage words, grouped so params
+    // read together on a trade share a word. Widths cover the max bound
+    // OverlayV1Factory enforces on each param:
+    //   word 0: CapPayoff (72), MaintenanceMarginFraction (64),
+    //           LiquidationFeeRate (64), TradingFeeRate (56)
+    //   word 1: CapLeverage (72), MinCollateral (80), Delta (56)
+    //   word 2: CapNotional (96), Lmbda (64), CircuitBreakerWindow (32),
+    //           AverageBlockTime (32)
+    //   word 3: CircuitBreakerMintTarget (96), MaintenanceMarginBurnRate (64),
+    //           K (48), PriceDriftUpperLimit (48)
+    // 16 bits per param in enum order: bit position (word * 256 + offset) / 8
+    // in the high byte and width / 8 in the low byte
+    uint256 internal constant LAYOUT =
+        0x58047a06290a190711086c080908600c54042009400c000933074c087406;
+
     /// @notice Gets the value associated with the given parameter type
     function get(uint256[15] storage self, Parameters name) internal view returns (uint256) {
         return self[uint256(name)];
@@ -30,4 +45,34 @@ library Risk {
     function set(uint256[15] storage self, Parameters name, uint256 value) internal {
         self[uint256(name)] = value;
     }
+
+    /// @notice Gets the value associated with the given parameter type
+    /// @notice from params packed into four storage words
+    function get(uint256[4] storage self, Parameters name) internal view returns (uint256) {
+        (uint256 word, uint256 offset, uint256 mask) = layout(name);
+        return (self[word] >> offset) & mask;
+    }
+
+    /// @notice Sets the value associated with the given parameter type
+    /// @notice in params packed into four storage words
+    /// @dev reverts if value doesn't fit in the param's width
+    function set(uint256[4] storage self, Parameters name, uint256 value) internal {
+        (uint256 word, uint256 offset, uint256 mask) = layout(name);
+        require(value <= mask, "OVLV1: param exceeds width");
+        self[word] = (self[word] & ~(mask << offset)) | (value << offset);
+    }
+
+    /// @notice Gets the word, bit offset in the word and mask of the
+    /// @notice param when packed
+    function layout(Parameters name)
+        internal
+        pure
+        returns (uint256 word_, uint256 offset_, uint256 mask_)
+    {
+        uint256 entry = LAYOUT >> (16 * uint256(name));
+        uint256 position = ((entry >> 8) & 0xff) << 3;
+        word_ = position >> 8;
+        offset_ = position & 0xff;
+        mask_ = (1 << ((entry & 0xff) << 3)) - 1;
+    }
 }
@@ -179,4 +179,16 @@ contract PositionMock {
             liquidationFeeRate
         );
     }
+
+    function liquidationPrice(
+        Position.Info memory pos,
+        uint256 oiTotalOnSide,
+        uint256 oiTotalSharesOnSide,
+        uint256 maintenanceMarginFraction,
+        uint256 liquidationFeeRate
+    ) external pure returns (uint256) {
+        return pos.liquidationPrice(
+            oiTotalOnSide, oiTotalSharesOnSide, maintenanceMarginFraction, liquidationFeeRate
+        );
+    }
 }
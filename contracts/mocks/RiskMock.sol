@@ -5,9 +5,11 @@ import "../libraries/Risk.sol";
 
 contract RiskMock {
     using Risk for uint256[15];
+    using Risk for uint256[4];
 
     // risk params
     uint256[15] public params; // params.idx order based on Risk.Parameters enum
+    uint256[4] public packed; // packed into words per Risk.layout
 
     function get(Risk.Parameters name) external view returns (uint256) {
         return params.get(name);
@@ -17,6 +19,36 @@ contract RiskMock {
         params.set(name, value);
     }
 
+    function getPacked(Risk.Parameters name) external view returns (uint256) {
+        return packed.get(name);
+    }
+
+    function setPacked(Risk.Parameters name, uint256 value) external {
+        packed.set(name, value);
+    }
+
+    function layout(Risk.Parameters name)
+        external
+        pure
+        returns (uint256 word_, uint256 offset_, uint256 mask_)
+    {
+        return Risk.layout(name);
+    }
+
+    /// @dev sent as a tx to benchmark reading names from cold storage
+    function readAll(Risk.Parameters[] calldata names) external returns (uint256 sum_) {
+        for (uint256 i = 0; i < names.length; i++) {
+            sum_ += params.get(names[i]);
+        }
+    }
+
+    /// @dev sent as a tx to benchmark reading names from cold storage
+    function readAllPacked(Risk.Parameters[] calldata names) external returns (uint256 sum_) {
+        for (uint256 i = 0; i < names.length; i++) {
+            sum_ += packed.get(names[i]);
+        }
+    }
+
     function getEnumFromUint(uint256 idx) external pure returns (Risk.Parameters name) {
         return Risk.Parameters(idx);
     }
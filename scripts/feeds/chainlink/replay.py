@@ -0,0 +1,165 @@
+"""
+Replays OverlayV1ChainlinkFeed and OverlayV1ChainlinkFeedZero over a
+recorded series of aggregator rounds.
+
+Rounds are folded once into prefix sums of answer * dt (the same
+observations OverlayV1ChainlinkFeedCached stores), after which the
+averages the feed's latest() would return at any timestamp are the
+difference of two prefix sums found by bisection, O(log n) per query.
+
+`latest` is exact in integers. `window_sums` and `prices` evaluate whole
+arrays of timestamps with NumPy: prefix sums are kept modulo 2**64, which
+leaves each window's sum exact so long as it fits in an int64 (answer *
+macroWindow < 2**63), and only the final scaling to 18 decimals is
+float64. Chunk the timestamps to bound memory when replaying e.g. every
+second of a year.
+"""
+from typing import Iterable, Optional, Tuple
+
+import numpy as np
+
+from scripts.feeds.chainlink.round_cache import (
+    Observation, Round, RoundCache
+)
+
+ONE = 10 ** 18
+
+
+def zero_adjusted(price_over_micro_window, price_over_macro_window,
+                  spot_price):
+    """
+    Moves the micro and macro averages out to the scaled spot price, as
+    OverlayV1ChainlinkFeedZero does. Works on ints or arrays
+    """
+    micro, macro, spot = (price_over_micro_window, price_over_macro_window,
+                          spot_price)
+    if isinstance(micro, np.ndarray):
+        above = macro > micro
+        below = macro < micro
+        return (np.where(above, np.minimum(spot, micro),
+                         np.where(below, np.maximum(spot, micro), spot)),
+                np.where(above, np.maximum(spot, macro),
+                         np.where(below, np.minimum(spot, macro), macro)))
+
+    if macro > micro:
+        return min(spot, micro), max(spot, macro)
+    elif macro < micro:
+        return max(spot, micro), min(spot, macro)
+    return spot, macro
+
+
+class TwapReplay:
+    """
+    Feed prices at arbitrary timestamps given rounds ascending in round
+    id. Set zero for OverlayV1ChainlinkFeedZero, and heartbeat to raise
+    where the feed would revert on a stale price
+    """
+
+    def __init__(self, rounds: Iterable[Round], micro_window: int,
+                 macro_window: int, decimals: int, zero: bool = False,
+                 heartbeat: Optional[int] = None):
+        self.cache = RoundCache(micro_window, macro_window, decimals)
+        self.cache.checkpoint(rounds)
+        if len(self.cache) == 0:
+            raise ValueError("no rounds")
+
+        self.micro_window = micro_window
+        self.macro_window = macro_window
+        self.decimals = decimals
+        self.zero = zero
+        self.heartbeat = heartbeat
+
+        observations = self.cache.observations
+        self._updated_ats = np.array([o.updated_at for o in observations],
+                                     dtype=np.int64)
+        self._answers = np.array([o.answer % 2 ** 64 for o in observations],
+                                 dtype=np.uint64)
+        self._cumulatives = np.array(
+            [o.cumulative % 2 ** 64 for o in observations], dtype=np.uint64)
+
+    @property
+    def start(self) -> int:
+        """
+        Earliest timestamp the replay covers
+        """
+        return int(self._updated_ats[0]) + 2 * self.macro_window
+
+    def spot(self, timestamp: int) -> Observation:
+        """
+        Observation for the latest round as of timestamp, i.e. the round
+        aggregator.latestRoundData() returns
+        """
+        i = int(np.searchsorted(self._updated_ats, timestamp,
+                                side="right")) - 1
+        if i < 0:
+            raise ValueError("timestamp before first round")
+        return self.cache.observations[i]
+
+    def latest(self, timestamp: int) -> Tuple[int, int, int]:
+        """
+        Returns (priceOverMicroWindow, priceOverMacroWindow,
+        priceOneMacroWindowAgo) the feed returns at timestamp
+        """
+        spot = self.spot(timestamp)
+        if self.heartbeat is not None \
+                and spot.updated_at < timestamp - self.heartbeat:
+            raise ValueError("stale price feed")
+
+        micro, macro, macro_ago = self.cache.average_prices(timestamp)
+        if self.zero:
+            scaled_spot = spot.answer * 10 ** (18 - self.decimals)
+            micro, macro = zero_adjusted(micro, macro, scaled_spot)
+        return micro, macro, macro_ago
+
+    def _cumulative_at(self, timestamps: np.ndarray) -> np.ndarray:
+        i = np.searchsorted(self._updated_ats, timestamps, side="right") - 1
+        if np.any(i < 0):
+            raise ValueError("timestamp before first round")
+        dt = (timestamps - self._updated_ats[i]).astype(np.uint64)
+        return self._cumulatives[i] + self._answers[i] * dt
+
+    def window_sums(self, timestamps) -> Tuple[np.ndarray, np.ndarray,
+                                               np.ndarray]:
+        """
+        Exact sums of answer * dt over the micro window, the macro window
+        and the macro window one macro window ago for each timestamp, as
+        int64 arrays
+        """
+        timestamps = np.asarray(timestamps, dtype=np.int64)
+        if np.any(timestamps < self.start):
+            raise ValueError("rounds do not cover 2 * macroWindow")
+
+        with np.errstate(over="ignore"):
+            now = self._cumulative_at(timestamps)
+            micro_ago = self._cumulative_at(timestamps - self.micro_window)
+            macro_ago = self._cumulative_at(timestamps - self.macro_window)
+            two_macro_ago = self._cumulative_at(
+                timestamps - 2 * self.macro_window)
+            # wrapped differences are exact while the true sums fit
+            return ((now - micro_ago).view(np.int64),
+                    (now - macro_ago).view(np.int64),
+                    (macro_ago - two_macro_ago).view(np.int64))
+
+    def prices(self, timestamps) -> Tuple[np.ndarray, np.ndarray,
+                                          np.ndarray]:
+        """
+        Float64 (priceOverMicroWindow, priceOverMacroWindow,
+        priceOneMacroWindowAgo) in 18 decimals for each timestamp
+        """
+        timestamps = np.asarray(timestamps, dtype=np.int64)
+        sum_micro, sum_macro, sum_macro_ago = self.window_sums(timestamps)
+        scale = float(10 ** (18 - self.decimals))
+        micro = sum_micro / self.micro_window * scale
+        macro = sum_macro / self.macro_window * scale
+        macro_ago = sum_macro_ago / self.macro_window * scale
+
+        if self.heartbeat is not None or self.zero:
+            i = np.searchsorted(self._updated_ats, timestamps,
+                                side="right") - 1
+            if self.heartbeat is not None and np.any(
+                    self._updated_ats[i] < timestamps - self.heartbeat):
+                raise ValueError("stale price feed")
+            if self.zero:
+                spot = self._answers[i].astype(np.float64) * scale
+                micro, macro = zero_adjusted(micro, macro, spot)
+        return micro, macro, macro_ago
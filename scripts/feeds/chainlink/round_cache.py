@@ -0,0 +1,203 @@
+"""
+Integer reference for OverlayV1ChainlinkFeedCached.
+
+Aggregator rounds are folded into observations carrying the cumulative
+sum of answer * dt since the first observation, so the sum over any
+window is the difference of two cumulatives found by bisection and a
+TWAP costs O(log n) once rounds are folded, against the O(rounds in
+window) backwards walk of OverlayV1ChainlinkFeed._getAveragePrice.
+`walk_average_prices` ports that walk for comparison and as the
+fallback before the cache covers 2 * macroWindow.
+
+Both take the feed's maxRounds cap on rounds read per latest(): the walk
+extrapolates the earliest round read back over the rest of the windows,
+and the cache folds the latest pending rounds up to the cap,
+extrapolating the earliest of them back to the last observation over
+the rounds skipped.
+"""
+from bisect import bisect_right
+from typing import Iterable, List, NamedTuple, Sequence, Tuple
+
+
+class Round(NamedTuple):
+    round_id: int
+    answer: int  # in aggregator decimals
+    updated_at: int
+
+
+class Observation(NamedTuple):
+    updated_at: int  # time round was updated
+    answer: int  # round answer in aggregator decimals
+    cumulative: int  # sum of answer * dt from first observation
+
+
+def fold(last: Observation, answer: int, updated_at: int) -> Observation:
+    """
+    Observation for a round given the observation for the round prior
+    """
+    if last is None:
+        return Observation(updated_at, answer, 0)
+    if updated_at < last.updated_at:
+        raise ValueError("rounds out of order")
+    return Observation(updated_at, answer, last.cumulative
+                       + last.answer * (updated_at - last.updated_at))
+
+
+def _scaled(total: int, window: int, decimals: int) -> int:
+    return (total * 10 ** 18) // (window * 10 ** decimals)
+
+
+def capped(pending: Sequence[Round], max_rounds: int = 0,
+           updated_at_last: int = 0) -> List[Round]:
+    """
+    Rounds pending a checkpoint the feed reads with maxRounds, ascending
+    in round id: the latest max_rounds, with the earliest of them
+    extrapolated back to updated_at_last, the last observation
+    """
+    if max_rounds == 0 or len(pending) <= max_rounds:
+        return list(pending)
+    rounds = list(pending[-max_rounds:])
+    rounds[0] = rounds[0]._replace(updated_at=updated_at_last)
+    return rounds
+
+
+class RoundCache:
+    """
+    Cumulative observations for an aggregator's rounds, as stored by
+    OverlayV1ChainlinkFeedCached
+    """
+
+    def __init__(self, micro_window: int, macro_window: int,
+                 decimals: int):
+        self.micro_window = micro_window
+        self.macro_window = macro_window
+        self.decimals = decimals
+        self.observations: List[Observation] = []
+        self._updated_ats: List[int] = []
+        self.round_id_last = 0
+
+    def __len__(self) -> int:
+        return len(self.observations)
+
+    def checkpoint(self, rounds: Iterable[Round], max_count: int = 0) -> int:
+        """
+        Folds rounds newer than round_id_last, ascending in round id, up
+        to max_count of them if given. Returns the number of rounds folded
+        """
+        count = 0
+        last = self.observations[-1] if self.observations else None
+        for r in rounds:
+            if self.observations and r.round_id <= self.round_id_last:
+                continue
+            if max_count and count == max_count:
+                break
+            last = fold(last, r.answer, r.updated_at)
+            self.observations.append(last)
+            self._updated_ats.append(last.updated_at)
+            self.round_id_last = r.round_id
+            count += 1
+        return count
+
+    def covers(self, timestamp: int) -> bool:
+        """
+        Whether observations reach back 2 * macroWindow from timestamp
+        """
+        return len(self.observations) > 0 and \
+            self._updated_ats[0] <= timestamp - 2 * self.macro_window
+
+    def fresh(self, timestamp: int) -> bool:
+        """
+        Whether the last observation is within 2 * macroWindow of
+        timestamp. The feed walks rounds once checkpoints lapse past it
+        """
+        return len(self.observations) > 0 and \
+            self._updated_ats[-1] >= timestamp - 2 * self.macro_window
+
+    def cumulative_at(self, timestamp: int) -> int:
+        """
+        Sum of answer * dt from first observation through timestamp
+        """
+        i = bisect_right(self._updated_ats, timestamp) - 1
+        if i < 0:
+            raise ValueError("timestamp before first observation")
+        obs = self.observations[i]
+        return obs.cumulative + obs.answer * (timestamp - obs.updated_at)
+
+    def average_prices(self, timestamp: int, pending: Sequence[Round] = (),
+                       max_rounds: int = 0) -> Tuple[int, int, int]:
+        """
+        Returns (priceOverMicroWindow, priceOverMacroWindow,
+        priceOneMacroWindowAgo) at timestamp in 18 decimals. Rounds up to
+        timestamp not yet checkpointed are passed as pending and folded
+        for this read only, up to max_rounds
+        """
+        if not self.covers(timestamp):
+            raise ValueError("cache does not cover 2 * macroWindow")
+        if pending:
+            cache = RoundCache(self.micro_window, self.macro_window,
+                               self.decimals)
+            cache.observations = list(self.observations)
+            cache._updated_ats = list(self._updated_ats)
+            cache.round_id_last = self.round_id_last
+            cache.checkpoint(capped(pending, max_rounds,
+                                    self._updated_ats[-1]))
+            return cache.average_prices(timestamp)
+
+        micro, macro = self.micro_window, self.macro_window
+        now = self.cumulative_at(timestamp)
+        macro_ago = self.cumulative_at(timestamp - macro)
+        return (
+            _scaled(now - self.cumulative_at(timestamp - micro), micro,
+                    self.decimals),
+            _scaled(now - macro_ago, macro, self.decimals),
+            _scaled(macro_ago - self.cumulative_at(timestamp - 2 * macro),
+                    macro, self.decimals),
+        )
+
+
+def walk_average_prices(rounds: Sequence[Round], timestamp: int,
+                        micro_window: int, macro_window: int,
+                        decimals: int,
+                        max_rounds: int = 0) -> Tuple[int, int, int]:
+    """
+    Port of OverlayV1ChainlinkFeed._getAveragePrice, walking rounds
+    (ascending in round id, through the latest) backwards from timestamp.
+    With max_rounds, reads at most that many rounds as
+    OverlayV1ChainlinkFeedCached does
+    """
+    next_timestamp = timestamp
+    micro_left, macro_left = micro_window, macro_window
+    macro_ago_target = timestamp - 2 * macro_window
+    macro_ago_start = timestamp - macro_window
+    round_id_min = rounds[-1].round_id + 1 - max_rounds if max_rounds \
+        else None
+
+    sum_micro = sum_macro = sum_macro_ago = 0
+    for r in reversed(rounds):
+        if r.round_id == round_id_min and r.updated_at >= macro_ago_target:
+            # extrapolate back over what is left of the windows
+            r = r._replace(updated_at=macro_ago_target - 1)
+        dt = next_timestamp - r.updated_at
+        if micro_left > 0:
+            step = min(dt, micro_left)
+            sum_micro += step * r.answer
+            micro_left -= step
+        if macro_left > 0:
+            step = min(dt, macro_left)
+            sum_macro += step * r.answer
+            macro_left -= step
+        if r.updated_at <= macro_ago_start:
+            start = min(next_timestamp, macro_ago_start)
+            if r.updated_at >= macro_ago_target:
+                sum_macro_ago += (start - r.updated_at) * r.answer
+            else:
+                sum_macro_ago += (start - macro_ago_target) * r.answer
+                break
+        next_timestamp = r.updated_at
+    else:
+        # aggregator reverts rather than running out of rounds
+        raise ValueError("rounds do not cover 2 * macroWindow")
+
+    return (_scaled(sum_micro, micro_window, decimals),
+            _scaled(sum_macro, macro_window, decimals),
+            _scaled(sum_macro_ago, macro_window, decimals))
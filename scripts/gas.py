@@ -0,0 +1,240 @@
+import os
+import sys
+
+import click
+import yaml
+
+from brownie import (
+    AggregatorMock, OverlayV1ChainlinkFeedFactory, OverlayV1Factory,
+    OverlayV1Market, OverlayV1Token, accounts, chain, network, web3
+)
+from hexbytes import HexBytes
+
+from scripts.market.gas import (
+    MACRO_WINDOW, ROUND_INTERVALS, VERSION, Baseline, Case, cases, dump,
+    load, regressions, rounds_for
+)
+
+
+BASELINE = os.path.join("benchmarks", "gas.json")
+
+MICRO_WINDOW = 600
+HEARTBEAT = 7200
+
+# risk params as in the market tests
+PARAMS = [
+    122000000000,  # k
+    500000000000000000,  # lmbda
+    2500000000000000,  # delta
+    5000000000000000000,  # capPayoff
+    800000000000000000000000,  # capNotional
+    5000000000000000000,  # capLeverage
+    2592000,  # circuitBreakerWindow
+    66670000000000000000000,  # circuitBreakerMintTarget
+    100000000000000000,  # maintenanceMarginFraction
+    100000000000000000,  # maintenanceMarginBurnRate
+    50000000000000000,  # liquidationFeeRate
+    750000000000000,  # tradingFeeRate
+    100000000000000,  # minCollateral
+    25000000000000,  # priceDriftUpperLimit
+    250,  # averageBlockTime
+]
+
+# aggregator answer, 8 decimals, and the drop that makes a 5x long
+# liquidatable without tripping the price drift check
+PRICE = 2000 * 10 ** 8
+PRICE_LIQUIDATE = PRICE * 8 // 10
+
+COLLATERAL = 100 * 10 ** 18
+
+# ROLES
+ADMIN = "ADMIN"
+GOVERNOR = "GOVERNOR"
+GUARDIAN = "GUARDIAN"
+MINTER = "MINTER"
+
+
+def _role(name):
+    if name == ADMIN:
+        return HexBytes("0x00")
+    return web3.solidityKeccak(['string'], [name])
+
+
+def _at(timestamp):
+    # pin the next block's timestamp so rounds line up the same every run
+    web3.provider.make_request("evm_setNextBlockTimestamp", [timestamp])
+
+
+def _deploy(interval):
+    """
+    Deploys a market on a chainlink feed whose aggregator has rounds every
+    interval seconds back past 2 * macroWindow. Returns the contracts and
+    the timestamp of the last round
+    """
+    gov, alice, bob, carol = accounts[0], accounts[1], accounts[2], \
+        accounts[3]
+
+    ovl = OverlayV1Token.deploy({"from": gov})
+    for role in (GOVERNOR, GUARDIAN, MINTER):
+        ovl.grantRole(_role(role), gov, {"from": gov})
+    for trader in (alice, bob, carol):
+        ovl.mint(trader, 1000 * COLLATERAL, {"from": gov})
+
+    sequencer = AggregatorMock.deploy({"from": gov})
+    sequencer.setData(1, 0, {"from": gov})
+    factory = OverlayV1Factory.deploy(ovl, gov, sequencer, 0, {"from": gov})
+    ovl.grantRole(_role(ADMIN), factory, {"from": gov})
+
+    feed_factory = OverlayV1ChainlinkFeedFactory.deploy(
+        ovl, MICRO_WINDOW, MACRO_WINDOW, {"from": gov})
+    factory.addFeedFactory(feed_factory, {"from": gov})
+
+    aggregator = AggregatorMock.deploy({"from": gov})
+    start = web3.eth.get_block("latest").timestamp + 100
+    count = (2 * MACRO_WINDOW + interval) // interval + 1
+    for i in range(count):
+        _at(start + i * interval)
+        aggregator.setData(i + 1, PRICE, {"from": gov})
+    timestamp_last = start + (count - 1) * interval
+
+    feed_factory.deployFeed(aggregator, HEARTBEAT, {"from": gov})
+    feed = feed_factory.getFeed(aggregator)
+    _at(timestamp_last + 1)
+    tx = factory.deployMarket(feed_factory, feed, PARAMS, {"from": gov})
+    market = OverlayV1Market.at(tx.return_value)
+    for i, trader in enumerate((alice, bob, carol)):
+        _at(timestamp_last + 2 + i)
+        ovl.approve(market, 2**256-1, {"from": trader})
+
+    return factory, aggregator, feed, market, timestamp_last
+
+
+def _measure(case, factory, aggregator, feed, market, timestamp_last):
+    """
+    Sets up the market for the case then returns gas used by its op
+    """
+    gov, alice, bob, carol = accounts[0], accounts[1], accounts[2], \
+        accounts[3]
+    round_id = aggregator.latestRoundId()
+    timestamp = timestamp_last + 1000
+
+    if case.other_side:
+        _at(timestamp_last + 10)
+        market.build(COLLATERAL, 2 * 10**18, False, 0, {"from": bob})
+
+    # alice's 5x long to unwind, liquidate or withdraw
+    if case.op != "build":
+        _at(timestamp_last + 20)
+        tx = market.build(COLLATERAL, 5 * 10**18, True, 2**256-1,
+                          {"from": alice})
+        pos_id = tx.return_value
+    if case.op.startswith("unwind"):
+        _at(timestamp_last + 25)
+        tx = market.build(COLLATERAL, 10**18, True, 2**256-1,
+                          {"from": carol})
+        carol_id = tx.return_value
+
+    # one more round, dropping the price when liquidating
+    price = PRICE_LIQUIDATE if case.op == "liquidate" else PRICE
+    _at(timestamp_last + 30)
+    aggregator.setData(round_id + 1, price, {"from": gov})
+
+    # trade on the same side of the roller as the op, either within the
+    # micro window or long enough ago to have decayed
+    if case.roller != "empty":
+        _at(timestamp - (60 if case.roller == "active" else 900))
+        if case.op == "build":
+            market.build(COLLATERAL, 10**18, True, 2**256-1,
+                         {"from": carol})
+        else:
+            market.unwind(carol_id, 5 * 10**17, 0, {"from": carol})
+
+    if case.op == "emergency_withdraw":
+        _at(timestamp - 10)
+        factory.shutdown(feed, {"from": gov})
+
+    _at(timestamp)
+    if case.op == "build":
+        tx = market.build(COLLATERAL, 2 * 10**18, True, 2**256-1,
+                          {"from": alice})
+    elif case.op == "unwind_partial":
+        tx = market.unwind(pos_id, 5 * 10**17, 0, {"from": alice})
+    elif case.op == "unwind_full":
+        tx = market.unwind(pos_id, 10**18, 0, {"from": alice})
+    elif case.op == "liquidate":
+        tx = market.liquidate(alice, pos_id, {"from": carol})
+    elif case.op == "update":
+        tx = market.update({"from": carol})
+    else:
+        tx = market.emergencyWithdraw(pos_id, {"from": alice})
+    return tx.gas_used
+
+
+def measure():
+    """
+    Measures gas used for every case on the active network
+    """
+    measured = {}
+    for interval in ROUND_INTERVALS:
+        chain.reset()
+        deployed = _deploy(interval)
+        chain.snapshot()
+        for case in cases():
+            if case.rounds != rounds_for(interval):
+                continue
+            chain.revert()
+            measured[case] = _measure(case, *deployed)
+    return measured
+
+
+def _settings():
+    with open("brownie-config.yaml") as f:
+        solc = yaml.safe_load(f)["compiler"]["solc"]
+    return {"solc": solc["version"], "optimizer_runs":
+            solc["optimizer"]["runs"], "params": PARAMS}
+
+
+def main(update="false", tolerance="0", strict="false"):
+    """
+    Measures gas used by OverlayV1Market hot paths and compares against
+    the baseline, failing on regressions. Pass update=true to store the
+    measurement as the new baseline, and strict=true to also fail when
+    there is no baseline measured with the same settings to compare
+    against, as in CI
+    """
+    click.echo(f"You are using the '{network.show_active()}' network")
+    measured = measure()
+    settings = _settings()
+
+    baseline = None
+    if os.path.exists(BASELINE):
+        baseline = load(BASELINE)
+        if baseline.version != VERSION or baseline.settings != settings:
+            click.echo("Baseline was measured with other settings")
+            baseline = None
+
+    for case in sorted(measured, key=Case.name.fget):
+        line = f"{case.name:<64} {measured[case]:>9}"
+        if baseline is not None and case in baseline.gas:
+            diff = measured[case] - baseline.gas[case]
+            line += f" {diff:>+8}"
+        click.echo(line)
+
+    if update.lower() == "true":
+        os.makedirs(os.path.dirname(BASELINE), exist_ok=True)
+        dump(Baseline(VERSION, settings, measured), BASELINE)
+        click.echo(f"Baseline written to {BASELINE}")
+        return
+
+    if baseline is None:
+        click.echo("No baseline to compare against")
+        if strict.lower() == "true":
+            click.echo(f"Store one with update=true and commit {BASELINE}")
+            sys.exit(1)
+        return
+
+    worse = regressions(baseline, measured, float(tolerance))
+    for case, expect, gas in worse:
+        click.echo(f"Regression {case.name}: {expect} -> {gas}")
+    if worse:
+        sys.exit(1)
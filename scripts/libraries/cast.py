@@ -0,0 +1,20 @@
+"""
+Integer port of contracts/libraries/Cast.sol.
+"""
+UINT32_MAX = 2 ** 32 - 1
+INT192_MAX = 2 ** 191 - 1
+INT192_MIN = -2 ** 191
+
+
+def to_uint32_bounded(value: int) -> int:
+    """
+    Casts a uint256 to a uint32 bounded by the uint32 range of values
+    """
+    return min(value, UINT32_MAX)
+
+
+def to_int192_bounded(value: int) -> int:
+    """
+    Casts an int256 to an int192 bounded by the int192 range of values
+    """
+    return max(INT192_MIN, min(value, INT192_MAX))
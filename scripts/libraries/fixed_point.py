@@ -0,0 +1,191 @@
+"""
+Integer port of contracts/libraries/FixedPoint.sol.
+
+Values are unsigned 18 decimal fixed point integers. Rounding follows
+the contract exactly; uint256 overflow checks are not replicated, as
+no in-range market value comes near 2**256.
+
+ExpTable precomputes expUp/expDown for a fixed set of exponents, e.g. the
+delta + lmbda * volume exponents a quoting loop keeps hitting, and falls
+back to the exact computation for any other exponent.
+"""
+from typing import Dict, Iterable, Tuple
+
+from . import log_exp_math
+
+ONE = 10 ** 18
+TWO = 2 * ONE
+FOUR = 4 * ONE
+MAX_POW_RELATIVE_ERROR = 10000  # 10^(-14)
+
+
+def sub_floor(a: int, b: int) -> int:
+    """
+    a - b but floors to zero if a <= b
+    """
+    return a - b if a > b else 0
+
+
+def mul_down(a: int, b: int) -> int:
+    return (a * b) // ONE
+
+
+def mul_up(a: int, b: int) -> int:
+    product = a * b
+    if product == 0:
+        return 0
+    return ((product - 1) // ONE) + 1
+
+
+def div_down(a: int, b: int) -> int:
+    if a == 0:
+        return 0
+    return (a * ONE) // b
+
+
+def div_up(a: int, b: int) -> int:
+    if a == 0:
+        return 0
+    return ((a * ONE - 1) // b) + 1
+
+
+def pow_down(x: int, y: int) -> int:
+    """
+    Returns x^y, assuming both are fixed point numbers, rounding down
+    """
+    if y == 0 or x == ONE:
+        return ONE
+    elif x == 0:
+        return 0
+    elif y == ONE:
+        return x
+    elif y == TWO:
+        return mul_down(x, x)
+    elif y == FOUR:
+        square = mul_down(x, x)
+        return mul_down(square, square)
+
+    raw = log_exp_math.pow(x, y)
+    max_error = mul_up(raw, MAX_POW_RELATIVE_ERROR) + 1
+    return 0 if raw < max_error else raw - max_error
+
+
+def pow_up(x: int, y: int) -> int:
+    """
+    Returns x^y, assuming both are fixed point numbers, rounding up
+    """
+    if y == 0 or x == ONE:
+        return ONE
+    elif x == 0:
+        return 0
+    elif y == ONE:
+        return x
+    elif y == TWO:
+        return mul_up(x, x)
+    elif y == FOUR:
+        square = mul_up(x, x)
+        return mul_up(square, square)
+
+    raw = log_exp_math.pow(x, y)
+    max_error = mul_up(raw, MAX_POW_RELATIVE_ERROR) + 1
+    return raw + max_error
+
+
+def log_down(a: int, b: int) -> int:
+    """
+    Returns log_b(a), assuming a, b are fixed point numbers, rounding down
+    """
+    if not 0 < a < 2 ** 255:
+        raise ValueError("FixedPoint: a out of bounds")
+    if not 0 < b < 2 ** 255:
+        raise ValueError("FixedPoint: b out of bounds")
+
+    raw = log_exp_math.log(a, b)
+    max_error = mul_up(abs(raw), MAX_POW_RELATIVE_ERROR) + 1
+    return raw - max_error
+
+
+def exp_down(x: int) -> int:
+    """
+    Returns e^x, assuming x is a fixed point number, rounding down
+    """
+    if x == 0:
+        return ONE
+    if not x < 2 ** 255:
+        raise ValueError("FixedPoint: x out of bounds")
+
+    raw = log_exp_math.exp(x)
+    max_error = mul_up(raw, MAX_POW_RELATIVE_ERROR) + 1
+    return 0 if raw < max_error else raw - max_error
+
+
+def exp_up(x: int) -> int:
+    """
+    Returns e^x, assuming x is a fixed point number, rounding up
+    """
+    if x == 0:
+        return ONE
+    if not x < 2 ** 255:
+        raise ValueError("FixedPoint: x out of bounds")
+
+    raw = log_exp_math.exp(x)
+    max_error = mul_up(raw, MAX_POW_RELATIVE_ERROR) + 1
+    return raw + max_error
+
+
+def log_up(a: int, b: int) -> int:
+    """
+    Returns log_b(a), assuming a, b are fixed point numbers, rounding up
+    """
+    if not 0 < a < 2 ** 255:
+        raise ValueError("FixedPoint: a out of bounds")
+    if not 0 < b < 2 ** 255:
+        raise ValueError("FixedPoint: b out of bounds")
+
+    raw = log_exp_math.log(a, b)
+    max_error = mul_up(abs(raw), MAX_POW_RELATIVE_ERROR) + 1
+    return raw + max_error
+
+
+def complement(x: int) -> int:
+    """
+    Returns 1 - x, capped to 0 if x is larger than 1
+    """
+    return ONE - x if x < ONE else 0
+
+
+class ExpTable:
+    """
+    Lookup table of (expUp(x), expDown(x)) for precomputed exponents x.
+    Lookups of exponents outside the table compute the exact value.
+    """
+
+    def __init__(self, exponents: Iterable[int] = ()):
+        self._table: Dict[int, Tuple[int, int]] = {}
+        self.extend(exponents)
+
+    def __len__(self) -> int:
+        return len(self._table)
+
+    def __contains__(self, x: int) -> bool:
+        return x in self._table
+
+    @classmethod
+    def for_impact(cls, delta: int, lmbda: int, volumes: Iterable[int]):
+        """
+        Table of the bid/ask exponents delta + lmbda * volume over volumes
+        """
+        return cls(delta + mul_up(lmbda, volume) for volume in volumes)
+
+    def extend(self, exponents: Iterable[int]):
+        for x in exponents:
+            if x not in self._table:
+                self._table[x] = (exp_up(x), exp_down(x))
+
+    def exp_up(self, x: int) -> int:
+        entry = self._table.get(x)
+        return exp_up(x) if entry is None else entry[0]
+
+    def exp_down(self, x: int) -> int:
+        entry = self._table.get(x)
+        return exp_down(x) if entry is None else entry[1]
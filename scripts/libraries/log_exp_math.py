@@ -0,0 +1,275 @@
+"""
+Integer port of contracts/libraries/LogExpMath.sol.
+
+All arguments and return values are 18 decimal fixed point integers, as
+on chain. Signed divisions truncate toward zero like the EVM's SDIV and
+SMOD rather than flooring like Python's // and %, so results match the
+contract wei-for-wei. Failed requires raise ValueError with the revert
+string.
+"""
+
+ONE_18 = 10 ** 18
+ONE_20 = 10 ** 20
+ONE_36 = 10 ** 36
+
+MAX_NATURAL_EXPONENT = 130 * ONE_18
+MIN_NATURAL_EXPONENT = -41 * ONE_18
+
+LN_36_LOWER_BOUND = ONE_18 - 10 ** 17
+LN_36_UPPER_BOUND = ONE_18 + 10 ** 17
+
+MILD_EXPONENT_BOUND = 2 ** 254 // ONE_20
+
+# 18 decimal constants
+x0 = 128000000000000000000  # 2ˆ7
+a0 = 38877084059945950922200000000000000000000000000000000000  # eˆ(x0)
+x1 = 64000000000000000000  # 2ˆ6
+a1 = 6235149080811616882910000000  # eˆ(x1) (no decimals)
+
+# 20 decimal constants
+x2 = 3200000000000000000000  # 2ˆ5
+a2 = 7896296018268069516100000000000000  # eˆ(x2)
+x3 = 1600000000000000000000  # 2ˆ4
+a3 = 888611052050787263676000000  # eˆ(x3)
+x4 = 800000000000000000000  # 2ˆ3
+a4 = 298095798704172827474000  # eˆ(x4)
+x5 = 400000000000000000000  # 2ˆ2
+a5 = 5459815003314423907810  # eˆ(x5)
+x6 = 200000000000000000000  # 2ˆ1
+a6 = 738905609893065022723  # eˆ(x6)
+x7 = 100000000000000000000  # 2ˆ0
+a7 = 271828182845904523536  # eˆ(x7)
+x8 = 50000000000000000000  # 2ˆ-1
+a8 = 164872127070012814685  # eˆ(x8)
+x9 = 25000000000000000000  # 2ˆ-2
+a9 = 128402541668774148407  # eˆ(x9)
+x10 = 12500000000000000000  # 2ˆ-3
+a10 = 113314845306682631683  # eˆ(x10)
+x11 = 6250000000000000000  # 2ˆ-4
+a11 = 106449445891785942956  # eˆ(x11)
+
+
+def sdiv(a: int, b: int) -> int:
+    """
+    Signed integer division truncating toward zero (EVM SDIV)
+    """
+    q = abs(a) // abs(b)
+    return q if (a < 0) == (b < 0) else -q
+
+
+def smod(a: int, b: int) -> int:
+    """
+    Signed integer remainder with the sign of the dividend (EVM SMOD)
+    """
+    return a - b * sdiv(a, b)
+
+
+def pow(x: int, y: int) -> int:
+    """
+    Exponentiation (x^y) with unsigned 18 decimal fixed point base and
+    exponent
+    """
+    if y == 0:
+        return ONE_18
+
+    if x == 0:
+        return 0
+
+    if x >= 2 ** 255:
+        raise ValueError("x out of bounds")
+
+    if y >= MILD_EXPONENT_BOUND:
+        raise ValueError("y out of bounds")
+
+    if LN_36_LOWER_BOUND < x < LN_36_UPPER_BOUND:
+        ln_36_x = _ln_36(x)
+        logx_times_y = (sdiv(ln_36_x, ONE_18) * y
+                        + sdiv(smod(ln_36_x, ONE_18) * y, ONE_18))
+    else:
+        logx_times_y = _ln(x) * y
+    logx_times_y = sdiv(logx_times_y, ONE_18)
+
+    if not (MIN_NATURAL_EXPONENT <= logx_times_y <= MAX_NATURAL_EXPONENT):
+        raise ValueError("product out of bounds")
+
+    return exp(logx_times_y)
+
+
+def _products() -> list:
+    """
+    Precomputes the truncated product of a2..a9 applied in the
+    contract's order for every 8 bit combination of x2..x9
+    """
+    products = []
+    for quarters in range(2 ** 8):
+        x = quarters * x9
+        product = ONE_20
+        for xn, an in ((x2, a2), (x3, a3), (x4, a4), (x5, a5), (x6, a6),
+                       (x7, a7), (x8, a8), (x9, a9)):
+            if x >= xn:
+                x -= xn
+                product = (product * an) // ONE_20
+        products.append(product)
+    return products
+
+
+_PRODUCTS = _products()
+
+
+def exp(x: int) -> int:
+    """
+    Natural exponentiation (e^x) with signed 18 decimal fixed point
+    exponent
+    """
+    if x < MIN_NATURAL_EXPONENT or x > MAX_NATURAL_EXPONENT:
+        raise ValueError("invalid exponent")
+
+    if x < 0:
+        # e^(-x) = 1 / e^x; both operands positive so floor == truncate
+        return (ONE_18 * ONE_18) // exp(-x)
+
+    if x >= x0:
+        x -= x0
+        first_an = a0
+    elif x >= x1:
+        x -= x1
+        first_an = a1
+    else:
+        first_an = 1
+
+    # transform x into a 20 decimal fixed point number
+    x *= 100
+
+    # x2..x9 are 2^5..2^-2, so the chain of "if x >= xn" below is the
+    # binary expansion of x in quarters. Look up the product instead
+    quarters = x // x9
+    x -= quarters * x9
+    product = _PRODUCTS[quarters]
+
+    # taylor series for the remainder, 12 terms. x is non-negative here
+    series_sum = ONE_20
+    term = x
+    series_sum += term
+    for n in range(2, 13):
+        term = ((term * x) // ONE_20) // n
+        series_sum += term
+
+    return (((product * series_sum) // ONE_20) * first_an) // 100
+
+
+def log(arg: int, base: int) -> int:
+    """
+    Logarithm (log(arg, base)) with signed 18 decimal fixed point base
+    and argument
+    """
+    if LN_36_LOWER_BOUND < base < LN_36_UPPER_BOUND:
+        log_base = _ln_36(base)
+    else:
+        log_base = _ln(base) * ONE_18
+
+    if LN_36_LOWER_BOUND < arg < LN_36_UPPER_BOUND:
+        log_arg = _ln_36(arg)
+    else:
+        log_arg = _ln(arg) * ONE_18
+
+    return sdiv(log_arg * ONE_18, log_base)
+
+
+def ln(a: int) -> int:
+    """
+    Natural logarithm (ln(a)) with signed 18 decimal fixed point argument
+    """
+    if a <= 0:
+        raise ValueError("out of bounds")
+
+    if LN_36_LOWER_BOUND < a < LN_36_UPPER_BOUND:
+        return sdiv(_ln_36(a), ONE_18)
+    return _ln(a)
+
+
+def _ln(a: int) -> int:
+    """
+    Internal natural logarithm (ln(a)) with signed 18 decimal fixed point
+    argument
+    """
+    if a < ONE_18:
+        return -_ln((ONE_18 * ONE_18) // a)
+
+    # a >= ONE_18 below, so every intermediate is non-negative
+    total = 0
+    if a >= a0 * ONE_18:
+        a //= a0
+        total += x0
+
+    if a >= a1 * ONE_18:
+        a //= a1
+        total += x1
+
+    # convert the sum and a to 20 decimal fixed point
+    total *= 100
+    a *= 100
+
+    if a >= a2:
+        a = (a * ONE_20) // a2
+        total += x2
+    if a >= a3:
+        a = (a * ONE_20) // a3
+        total += x3
+    if a >= a4:
+        a = (a * ONE_20) // a4
+        total += x4
+    if a >= a5:
+        a = (a * ONE_20) // a5
+        total += x5
+    if a >= a6:
+        a = (a * ONE_20) // a6
+        total += x6
+    if a >= a7:
+        a = (a * ONE_20) // a7
+        total += x7
+    if a >= a8:
+        a = (a * ONE_20) // a8
+        total += x8
+    if a >= a9:
+        a = (a * ONE_20) // a9
+        total += x9
+    if a >= a10:
+        a = (a * ONE_20) // a10
+        total += x10
+    if a >= a11:
+        a = (a * ONE_20) // a11
+        total += x11
+
+    # taylor series for ln(remainder), 6 terms
+    z = ((a - ONE_20) * ONE_20) // (a + ONE_20)
+    z_squared = (z * z) // ONE_20
+
+    num = z
+    series_sum = num
+    for n in (3, 5, 7, 9, 11):
+        num = (num * z_squared) // ONE_20
+        series_sum += num // n
+
+    series_sum *= 2
+
+    return (total + series_sum) // 100
+
+
+def _ln_36(x: int) -> int:
+    """
+    Internal high precision (36 decimal places) natural logarithm (ln(x))
+    with signed 18 decimal fixed point argument, for x close to one
+    """
+    x *= ONE_18
+
+    # z is negative for x < 1, so use truncating division throughout
+    z = sdiv((x - ONE_36) * ONE_36, x + ONE_36)
+    z_squared = (z * z) // ONE_36
+
+    num = z
+    series_sum = num
+    for n in (3, 5, 7, 9, 11, 13, 15):
+        num = sdiv(num * z_squared, ONE_36)
+        series_sum += sdiv(num, n)
+
+    return series_sum * 2
@@ -0,0 +1,24 @@
+"""
+Mirror of contracts/libraries/Oracle.sol. `Data(*feed.latest())` works
+as is.
+"""
+from typing import NamedTuple
+
+
+class Data(NamedTuple):
+    timestamp: int
+    micro_window: int
+    macro_window: int
+    price_over_micro_window: int  # p(now) averaged over micro
+    price_over_macro_window: int  # p(now) averaged over macro
+    price_one_macro_window_ago: int  # p(now - macro) avg over macro
+    reserve_over_micro_window: int  # r(now) in ovl averaged over micro
+    has_reserve: bool  # whether oracle has manipulable reserve pool
+
+
+def mid(data: Data) -> int:
+    """
+    Mid price without impact/spread, as in OverlayV1Market._midFromFeed
+    """
+    # Math.average rounds down
+    return (data.price_over_micro_window + data.price_over_macro_window) // 2
@@ -0,0 +1,275 @@
+"""
+Integer port of contracts/libraries/Position.sol for off-chain valuation.
+
+Each function mirrors its Solidity counterpart wei-for-wei, including the
+mulUp/divUp rounding, FullMath.mulDiv in oi_current and the 4 decimal
+uint16 fraction remaining. Positions are the tuples returned by
+`market.positions(key)`, so `Info(*market.positions(key))` works as is.
+"""
+from typing import NamedTuple
+
+from eth_utils import keccak, to_bytes
+
+from .fixed_point import div_down, div_up, mul_down, mul_up, sub_floor
+from .tick import tick_to_price
+
+ONE = 10 ** 18
+PRECISION_CHANGER = 10 ** 14  # FixedCast uint16 <-> uint256 fixed
+UINT16_MAX = 2 ** 16 - 1
+
+
+class Info(NamedTuple):
+    notional_initial: int  # initial notional = collateral * leverage
+    debt_initial: int  # initial debt = notional - collateral
+    mid_tick: int  # midPrice = 1.0001 ** midTick at build
+    entry_tick: int  # entryPrice = 1.0001 ** entryTick at build
+    is_long: bool  # whether long or short
+    liquidated: bool  # whether has been liquidated (mutable)
+    oi_shares: int  # current shares of aggregate oi on side (mutable)
+    fraction_remaining: int  # fraction of initial position left (mutable)
+
+
+def get_key(owner: str, id: int) -> bytes:
+    """
+    Returns the positions mapping key keccak256(abi.encodePacked(owner, id))
+    """
+    return keccak(to_bytes(hexstr=owner) + id.to_bytes(32, 'big'))
+
+
+def to_uint256_fixed(value: int) -> int:
+    """
+    Casts a 4 decimal uint16 to an 18 decimal fixed point integer
+    """
+    return value * PRECISION_CHANGER
+
+
+def to_uint16_fixed(value: int) -> int:
+    """
+    Casts an 18 decimal fixed point integer to a 4 decimal uint16
+    """
+    ret = value // PRECISION_CHANGER
+    if ret > UINT16_MAX:
+        raise ValueError("OVLV1: FixedCast out of bounds")
+    return ret
+
+
+def mul_div(a: int, b: int, denominator: int) -> int:
+    """
+    floor(a * b / denominator) as in v3-core FullMath.mulDiv
+    """
+    if denominator == 0:
+        raise ZeroDivisionError("FullMath: denominator == 0")
+    return (a * b) // denominator
+
+
+def exists(self: Info) -> bool:
+    """
+    Whether the position exists
+    """
+    return self.fraction_remaining > 0
+
+
+def get_fraction_remaining(self: Info) -> int:
+    """
+    Gets the current fraction remaining of the initial position
+    """
+    return to_uint256_fixed(self.fraction_remaining)
+
+
+def updated_fraction_remaining(self: Info, fraction_removed: int) -> int:
+    """
+    Computes an updated fraction remaining of the initial position given
+    fraction_removed unwound/liquidated from remaining position
+    """
+    fraction_remaining = mul_down(to_uint256_fixed(self.fraction_remaining),
+                                  ONE - fraction_removed)
+    return to_uint16_fixed(fraction_remaining)
+
+
+def mid_price_at_entry(self: Info) -> int:
+    """
+    Computes the mid price of the position at entry from its mid tick
+    """
+    return tick_to_price(self.mid_tick)
+
+
+def entry_price(self: Info) -> int:
+    """
+    Computes the entry price of the position from its entry tick
+    """
+    return tick_to_price(self.entry_tick)
+
+
+def calc_oi_shares(oi: int, oi_total_on_side: int,
+                   oi_total_shares_on_side: int) -> int:
+    """
+    Computes the amount of shares of open interest to issue a newly
+    built position
+    """
+    if oi_total_on_side == 0 or oi_total_shares_on_side == 0:
+        return oi
+    return mul_div(oi, oi_total_shares_on_side, oi_total_on_side)
+
+
+def _oi_initial(self: Info) -> int:
+    return div_down(self.notional_initial, mid_price_at_entry(self))
+
+
+def notional_initial(self: Info, fraction: int) -> int:
+    """
+    Computes the initial notional of position when built accounting for
+    amount of position remaining
+    """
+    notional_for_remaining = mul_up(
+        self.notional_initial, to_uint256_fixed(self.fraction_remaining))
+    return mul_up(notional_for_remaining, fraction)
+
+
+def oi_initial(self: Info, fraction: int) -> int:
+    """
+    Computes the initial open interest of position when built accounting
+    for amount of position remaining
+    """
+    oi_initial_for_remaining = mul_up(
+        _oi_initial(self), to_uint256_fixed(self.fraction_remaining))
+    return mul_up(oi_initial_for_remaining, fraction)
+
+
+def oi_shares_current(self: Info, fraction: int) -> int:
+    """
+    Computes the current shares of open interest position holds
+    """
+    return mul_down(self.oi_shares, fraction)
+
+
+def debt_initial(self: Info, fraction: int) -> int:
+    """
+    Computes the current debt position holds accounting for amount of
+    position remaining
+    """
+    debt_for_remaining = mul_up(
+        self.debt_initial, to_uint256_fixed(self.fraction_remaining))
+    return mul_up(debt_for_remaining, fraction)
+
+
+def oi_current(self: Info, fraction: int, oi_total_on_side: int,
+               oi_total_shares_on_side: int) -> int:
+    """
+    Computes the current open interest of remaining position accounting
+    for potential funding payments between long/short sides
+    """
+    oi_shares = oi_shares_current(self, fraction)
+    if oi_shares == 0 or oi_total_on_side == 0 \
+            or oi_total_shares_on_side == 0:
+        return 0
+    return mul_div(oi_shares, oi_total_on_side, oi_total_shares_on_side)
+
+
+def cost(self: Info, fraction: int) -> int:
+    """
+    Computes the remaining position's cost
+    """
+    return sub_floor(notional_initial(self, fraction),
+                     debt_initial(self, fraction))
+
+
+def value(self: Info, fraction: int, oi_total_on_side: int,
+          oi_total_shares_on_side: int, current_price: int,
+          cap_payoff: int) -> int:
+    """
+    Computes the value of remaining position. Floors to zero
+    """
+    pos_oi_initial = oi_initial(self, fraction)
+    pos_notional_initial = notional_initial(self, fraction)
+    pos_debt = debt_initial(self, fraction)
+
+    pos_oi_current = oi_current(self, fraction, oi_total_on_side,
+                                oi_total_shares_on_side)
+    pos_entry_price = entry_price(self)
+
+    if self.is_long:
+        val = div_up(mul_up(pos_notional_initial, pos_oi_current),
+                     pos_oi_initial) \
+            + min(mul_up(pos_oi_current, current_price),
+                  mul_up(mul_up(pos_oi_current, pos_entry_price),
+                         ONE + cap_payoff))
+        return sub_floor(val,
+                         pos_debt + mul_up(pos_oi_current, pos_entry_price))
+
+    val = div_up(mul_up(pos_notional_initial, pos_oi_current),
+                 pos_oi_initial) \
+        + mul_up(pos_oi_current, pos_entry_price)
+    return sub_floor(val, pos_debt + mul_up(pos_oi_current, current_price))
+
+
+def notional_with_pnl(self: Info, fraction: int, oi_total_on_side: int,
+                      oi_total_shares_on_side: int, current_price: int,
+                      cap_payoff: int) -> int:
+    """
+    Computes the current notional of remaining position including PnL.
+    Floors to debt if value <= 0
+    """
+    pos_value = value(self, fraction, oi_total_on_side,
+                      oi_total_shares_on_side, current_price, cap_payoff)
+    return pos_value + debt_initial(self, fraction)
+
+
+def trading_fee(self: Info, fraction: int, oi_total_on_side: int,
+                oi_total_shares_on_side: int, current_price: int,
+                cap_payoff: int, trading_fee_rate: int) -> int:
+    """
+    Computes the trading fees to be imposed on remaining position for
+    build/unwind
+    """
+    pos_notional = notional_with_pnl(self, fraction, oi_total_on_side,
+                                     oi_total_shares_on_side, current_price,
+                                     cap_payoff)
+    return mul_up(pos_notional, trading_fee_rate)
+
+
+def liquidatable(self: Info, oi_total_on_side: int,
+                 oi_total_shares_on_side: int, current_price: int,
+                 cap_payoff: int, maintenance_margin_fraction: int,
+                 liquidation_fee_rate: int) -> bool:
+    """
+    Whether a position can be liquidated, i.e.
+    value * (1 - liq fee rate) < maintenance margin
+    """
+    if self.fraction_remaining == 0:
+        # already been liquidated or doesn't exist
+        return False
+
+    fraction = ONE
+    pos_notional_initial = notional_initial(self, fraction)
+    val = value(self, fraction, oi_total_on_side, oi_total_shares_on_side,
+                current_price, cap_payoff)
+    maintenance_margin = mul_up(pos_notional_initial,
+                                maintenance_margin_fraction)
+    liquidation_fee = mul_down(val, liquidation_fee_rate)
+    return val < maintenance_margin + liquidation_fee
+
+
+def liquidation_price(self: Info, oi_total_on_side: int,
+                      oi_total_shares_on_side: int,
+                      maintenance_margin_fraction: int,
+                      liquidation_fee_rate: int) -> int:
+    """
+    Mid price at which a position becomes liquidatable, at or below for
+    longs and at or above for shorts. Solves
+    value * (1 - liq fee rate) = maintenance margin
+    """
+    fraction = ONE
+    pos_oi_current = oi_current(self, fraction, oi_total_on_side,
+                                oi_total_shares_on_side)
+
+    # no oi left backing position, so liquidatable at any price
+    if pos_oi_current == 0:
+        return 2**256 - 1 if self.is_long else 0
+
+    maintenance_margin = mul_up(notional_initial(self, fraction),
+                                maintenance_margin_fraction)
+    threshold = div_up(maintenance_margin, ONE - liquidation_fee_rate)
+    dp = div_up(threshold + debt_initial(self, fraction), pos_oi_current)
+    if self.is_long:
+        return sub_floor(entry_price(self) + dp, mid_price_at_entry(self))
+    return sub_floor(entry_price(self) + mid_price_at_entry(self), dp)
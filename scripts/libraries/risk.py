@@ -0,0 +1,131 @@
+"""
+Mirror of contracts/libraries/Risk.sol. Values index into a market's
+`params(i)` getter. Also carries the per-param bounds OverlayV1Factory
+checks on deployMarket and setRiskParam, and the layout a market packs
+its params into storage words with.
+"""
+from enum import IntEnum
+from typing import Iterable, List, Sequence, Set
+
+
+class Parameters(IntEnum):
+    K = 0  # funding constant
+    LMBDA = 1  # market impact constant
+    DELTA = 2  # bid-ask static spread constant
+    CAP_PAYOFF = 3  # payoff cap
+    CAP_NOTIONAL = 4  # initial notional cap
+    CAP_LEVERAGE = 5  # initial leverage cap
+    CIRCUIT_BREAKER_WINDOW = 6  # trailing window for circuit breaker
+    CIRCUIT_BREAKER_MINT_TARGET = 7  # target worst case inflation rate
+    MAINTENANCE_MARGIN_FRACTION = 8  # maintenance margin (mm) constant
+    MAINTENANCE_MARGIN_BURN_RATE = 9  # burn rate for mm constant
+    LIQUIDATION_FEE_RATE = 10  # liquidation fee charged on liquidate
+    TRADING_FEE_RATE = 11  # trading fee charged on build/unwind
+    MIN_COLLATERAL = 12  # minimum ovl collateral to open position
+    PRICE_DRIFT_UPPER_LIMIT = 13  # upper limit for feed price changes
+    AVERAGE_BLOCK_TIME = 14  # average block time of the respective chain
+
+
+# bounds on each param enforced by OverlayV1Factory, 1bps = 1e14
+PARAMS_MIN = [
+    0,  # MIN_K = 0
+    10 ** 16,  # MIN_LMBDA = 0.01
+    0,  # MIN_DELTA = 0
+    10 ** 18,  # MIN_CAP_PAYOFF = 1x
+    0,  # MIN_CAP_NOTIONAL = 0 OVL
+    10 ** 18,  # MIN_CAP_LEVERAGE = 1x
+    86400,  # MIN_CIRCUIT_BREAKER_WINDOW = 1 day
+    0,  # MIN_CIRCUIT_BREAKER_MINT_TARGET = 0 OVL
+    10 ** 16,  # MIN_MAINTENANCE_MARGIN_FRACTION = 1%
+    10 ** 16,  # MIN_MAINTENANCE_MARGIN_BURN_RATE = 1%
+    10 ** 15,  # MIN_LIQUIDATION_FEE_RATE = 0.10% (10 bps)
+    10 ** 14,  # MIN_TRADING_FEE_RATE = 0.01% (1 bps)
+    10 ** 14,  # MIN_MINIMUM_COLLATERAL = 1e-4 OVL
+    10 ** 12,  # MIN_PRICE_DRIFT_UPPER_LIMIT = 0.01 bps/s
+    100,  # MIN_AVERAGE_BLOCK_TIME = 0.1s
+]
+PARAMS_MAX = [
+    4 * 10 ** 12,  # MAX_K = ~ 1000 bps / 8 hr
+    10 * 10 ** 18,  # MAX_LMBDA = 10
+    200 * 10 ** 14,  # MAX_DELTA = 2% (200 bps)
+    100 * 10 ** 18,  # MAX_CAP_PAYOFF = 100x
+    88888888 * 10 ** 18,  # MAX_CAP_NOTIONAL = 88,888,888 OVL
+    99 * 10 ** 18,  # MAX_CAP_LEVERAGE = 99x
+    31536000,  # MAX_CIRCUIT_BREAKER_WINDOW = 365 days
+    88888888 * 10 ** 18,  # MAX_CIRCUIT_BREAKER_MINT_TARGET = 88,888,888 OVL
+    2 * 10 ** 17,  # MAX_MAINTENANCE_MARGIN_FRACTION = 20%
+    5 * 10 ** 17,  # MAX_MAINTENANCE_MARGIN_BURN_RATE = 50%
+    2 * 10 ** 17,  # MAX_LIQUIDATION_FEE_RATE = 20.00% (2000 bps)
+    100 * 10 ** 14,  # MAX_TRADING_FEE_RATE = 1% (100 bps)
+    100000 * 10 ** 18,  # MAX_MINIMUM_COLLATERAL = 100,000 OVL
+    10 ** 14,  # MAX_PRICE_DRIFT_UPPER_LIMIT = 1 bps/s
+    3600000,  # MAX_AVERAGE_BLOCK_TIME = 1h (arbitrary but large)
+]
+
+
+def check_risk_param(name: Parameters, value: int):
+    """
+    Checks a risk param is within bounds, as OverlayV1Factory does
+    """
+    if not PARAMS_MIN[name] <= value <= PARAMS_MAX[name]:
+        raise ValueError("OVLV1: param out of bounds")
+
+
+def check_risk_params(params: Sequence[int]):
+    """
+    Checks all risk params are within bounds, as OverlayV1Factory does
+    on deployMarket
+    """
+    for name in Parameters:
+        check_risk_param(name, params[name])
+
+
+# (word, bit offset in word, bit width) of each param packed into storage,
+# grouped so params read together on a trade share a word
+LAYOUT = [
+    (3, 160, 48),  # K
+    (2, 96, 64),  # LMBDA
+    (1, 152, 56),  # DELTA
+    (0, 0, 72),  # CAP_PAYOFF
+    (2, 0, 96),  # CAP_NOTIONAL
+    (1, 0, 72),  # CAP_LEVERAGE
+    (2, 160, 32),  # CIRCUIT_BREAKER_WINDOW
+    (3, 0, 96),  # CIRCUIT_BREAKER_MINT_TARGET
+    (0, 72, 64),  # MAINTENANCE_MARGIN_FRACTION
+    (3, 96, 64),  # MAINTENANCE_MARGIN_BURN_RATE
+    (0, 136, 64),  # LIQUIDATION_FEE_RATE
+    (0, 200, 56),  # TRADING_FEE_RATE
+    (1, 72, 80),  # MIN_COLLATERAL
+    (3, 208, 48),  # PRICE_DRIFT_UPPER_LIMIT
+    (2, 192, 32),  # AVERAGE_BLOCK_TIME
+]
+WORDS = 4
+
+
+def pack(params: Sequence[int]) -> List[int]:
+    """
+    Packs params into storage words, as Risk.set does one param at a time
+    """
+    words = [0] * WORDS
+    for name in Parameters:
+        word, offset, width = LAYOUT[name]
+        if params[name] >= 1 << width:
+            raise ValueError("OVLV1: param exceeds width")
+        words[word] |= params[name] << offset
+    return words
+
+
+def unpack(words: Sequence[int]) -> List[int]:
+    """
+    Unpacks params from storage words, as Risk.get does one param at a time
+    """
+    return [(words[word] >> offset) & ((1 << width) - 1)
+            for word, offset, width in LAYOUT]
+
+
+def words_read(names: Iterable[Parameters]) -> Set[int]:
+    """
+    Storage words read to get params names, so cold SLOADs paid the first
+    time they are read in a tx
+    """
+    return {LAYOUT[name][0] for name in names}
@@ -0,0 +1,57 @@
+"""
+Integer port of contracts/libraries/Roller.sol. Snapshots are the tuples
+returned by e.g. `market.snapshotVolumeBid()`, so
+`Snapshot(*market.snapshotVolumeBid())` works as is.
+"""
+from typing import NamedTuple
+
+from .cast import to_int192_bounded, to_uint32_bounded
+from .log_exp_math import sdiv
+
+
+class Snapshot(NamedTuple):
+    timestamp: int  # time last snapshot was taken
+    window: int  # window (length of time) over which will decay
+    accumulator: int  # accumulator value which will decay to zero
+
+
+def cumulative(self: Snapshot) -> int:
+    """
+    Returns the stored accumulator value
+    """
+    return self.accumulator
+
+
+def transform(self: Snapshot, timestamp: int, window: int,
+              value: int) -> Snapshot:
+    """
+    Decays the accumulator linearly to zero over its window since the
+    last snapshot, then adds value, as in Roller.transform
+    """
+    timestamp32 = timestamp % 2 ** 32  # truncated by compiler
+
+    dt = timestamp32 - self.timestamp if timestamp32 >= self.timestamp \
+        else 2 ** 32 + timestamp32 - self.timestamp
+    snap_window = self.window
+    snap_accumulator = cumulative(self)
+
+    if dt >= snap_window or snap_window == 0:
+        # if one window has passed, prior value has decayed to zero
+        return Snapshot(timestamp32, to_uint32_bounded(window),
+                        to_int192_bounded(value))
+
+    # decay prior value linearly toward zero, truncating like SDIV
+    snap_accumulator = sdiv(snap_accumulator * (snap_window - dt),
+                            snap_window)
+
+    accumulator_now = snap_accumulator + value
+    if accumulator_now == 0:
+        return Snapshot(timestamp32, to_uint32_bounded(window), 0)
+
+    # new window is the value weighted average time of time left in
+    # last window for last accumulator and window for value
+    w1 = abs(snap_accumulator)
+    w2 = abs(value)
+    window_now = (w1 * (snap_window - dt) + w2 * window) // (w1 + w2)
+    return Snapshot(timestamp32, to_uint32_bounded(window_now),
+                    to_int192_bounded(accumulator_now))
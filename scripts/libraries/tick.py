@@ -0,0 +1,154 @@
+"""
+Integer port of contracts/libraries/Tick.sol, where price = 1.0001 ** tick.
+
+TickTable serves the same prices from a precomputed memory-mapped table
+over every valid tick, and maps prices back to ticks by bisection.
+"""
+import os
+from functools import lru_cache
+
+import numpy as np
+
+from . import fixed_point
+from .log_exp_math import sdiv
+
+ONE = 10 ** 18
+PRICE_BASE = 10001 * 10 ** 14  # 1.0001e18
+MAX_TICK_256 = 120 * 10 ** 22
+MIN_TICK_256 = -41 * 10 ** 22
+MAX_TICK = MAX_TICK_256 // ONE
+MIN_TICK = MIN_TICK_256 // ONE
+
+# below this, wei rounding of table prices is coarser than the offset
+# between a table price and where the on-chain tick changes
+TABLE_PRICE_MIN = 10 ** 13
+# relative distance from a table price within which to compute exactly
+TABLE_PRICE_TOLERANCE = 10 ** 9
+
+
+def price_to_tick(price: int) -> int:
+    """
+    Returns the tick associated with the given price
+    """
+    tick256 = fixed_point.log_down(price, PRICE_BASE)
+    if tick256 < MIN_TICK_256 or tick256 > MAX_TICK_256:
+        raise ValueError("OVLV1: tick out of bounds")
+
+    # truncate toward zero like int24(tick256 / int256(ONE))
+    return sdiv(tick256, ONE)
+
+
+@lru_cache(maxsize=None)
+def tick_to_price(tick: int) -> int:
+    """
+    Returns the price associated with the given tick
+
+    Cached given positions only ever store ticks and the same few
+    entry/mid ticks repeat across a market's book.
+    """
+    tick256 = tick * ONE
+    if tick256 < MIN_TICK_256 or tick256 > MAX_TICK_256:
+        raise ValueError("OVLV1: tick out of bounds")
+
+    if tick256 >= 0:
+        return fixed_point.pow_down(PRICE_BASE, tick256)
+    return fixed_point.div_down(ONE, fixed_point.pow_up(PRICE_BASE, -tick256))
+
+
+class TickTable:
+    """
+    Memory-mapped tick_to_price for every tick in [MIN_TICK, MAX_TICK].
+
+    Prices are stored exactly as four little-endian uint64 limbs
+    (`prices.u256`) alongside a float64 copy (`prices.f64`) to bisect.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self.size = MAX_TICK - MIN_TICK + 1
+        limbs = np.memmap(os.path.join(path, "prices.u256"), dtype="u1",
+                          mode="r", shape=(32 * self.size,))
+        floats = np.memmap(os.path.join(path, "prices.f64"), dtype="<f8",
+                           mode="r", shape=(self.size,))
+        # plain views of the maps skip np.memmap's per-access overhead
+        self._bytes = memoryview(limbs.view(np.ndarray))
+        self._floats = floats.view(np.ndarray)
+
+    @classmethod
+    def open(cls, path: str):
+        """
+        Opens the table at path, building it first if it doesn't exist.
+        Building evaluates tick_to_price ~1.6M times, so takes a while
+        """
+        if not os.path.exists(os.path.join(path, "prices.f64")):
+            cls.build(path)
+        return cls(path)
+
+    @staticmethod
+    def build(path: str):
+        os.makedirs(path, exist_ok=True)
+        limbs = os.path.join(path, "prices.u256")
+        floats = os.path.join(path, "prices.f64")
+        with open(f"{limbs}.tmp", "wb") as f_limbs, \
+                open(f"{floats}.tmp", "wb") as f_floats:
+            for start in range(MIN_TICK, MAX_TICK + 1, 2 ** 16):
+                stop = min(start + 2 ** 16, MAX_TICK + 1)
+                # uncached so the build doesn't fill the lru cache
+                prices = [tick_to_price.__wrapped__(tick)
+                          for tick in range(start, stop)]
+                f_limbs.write(b"".join(price.to_bytes(32, "little")
+                                       for price in prices))
+                f_floats.write(np.array(prices, dtype="<f8").tobytes())
+        os.replace(f"{limbs}.tmp", limbs)
+        os.replace(f"{floats}.tmp", floats)
+
+    def _price(self, i: int) -> int:
+        return int.from_bytes(self._bytes[32 * i:32 * (i + 1)], "little")
+
+    def tick_to_price(self, tick: int) -> int:
+        """
+        Returns the price associated with the given tick
+        """
+        if tick < MIN_TICK or tick > MAX_TICK:
+            raise ValueError("OVLV1: tick out of bounds")
+        return self._price(tick - MIN_TICK)
+
+    def prices(self, ticks) -> np.ndarray:
+        """
+        Returns the float64 prices associated with an array of ticks
+        """
+        ticks = np.asarray(ticks)
+        if ticks.size and (ticks.min() < MIN_TICK or ticks.max() > MAX_TICK):
+            raise ValueError("OVLV1: tick out of bounds")
+        return self._floats[ticks - MIN_TICK]
+
+    def price_to_tick(self, price: int) -> int:
+        """
+        Returns the tick associated with the given price, as in
+        price_to_tick. Prices too close to a table price to decide
+        by bisection are computed exactly.
+        """
+        if price < TABLE_PRICE_MIN:
+            return price_to_tick(price)
+
+        # bisect for the table prices either side of price. float64
+        # rounding can leave the index one off, so step to the exact one
+        i = int(np.searchsorted(self._floats, float(price), "right")) - 1
+        lower = self._price(i) if 0 <= i < self.size else None
+        while lower is not None and lower > price:
+            i -= 1
+            lower = self._price(i) if i >= 0 else None
+        upper = self._price(i + 1) if i + 1 < self.size else None
+        while upper is not None and upper <= price:
+            i, lower = i + 1, upper
+            upper = self._price(i + 1) if i + 1 < self.size else None
+        if lower is None or upper is None:
+            return price_to_tick(price)
+
+        if price - lower <= lower // TABLE_PRICE_TOLERANCE \
+                or upper - price <= upper // TABLE_PRICE_TOLERANCE:
+            return price_to_tick(price)
+
+        # int24(tick256 / ONE) truncates toward zero, so rounds up below 1
+        tick = MIN_TICK + i
+        return tick if price >= ONE else tick + 1
@@ -0,0 +1,336 @@
+"""
+Columnar store of a market's positions with vectorized valuation.
+
+Columns follow the Position.Info layout. Amount columns are numpy object
+arrays of python ints so the exact mode matches Position.sol
+wei-for-wei; the default float64 mode trades the last few wei of the
+amounts for speed. Tick prices are decoded once per distinct tick rather
+than once per position. One call to `mark()` re-marks the whole book.
+"""
+from typing import Dict, Iterable, NamedTuple, Optional, Tuple
+
+import numpy as np
+
+from scripts.libraries import position
+from scripts.libraries.position import Info, PRECISION_CHANGER
+from scripts.libraries.tick import TickTable, tick_to_price
+
+ONE = 10 ** 18
+
+
+class Marks(NamedTuple):
+    value: np.ndarray
+    notional_with_pnl: np.ndarray
+    trading_fee: np.ndarray
+    liquidatable: np.ndarray
+
+
+def _mul_down(a, b):
+    return (a * b) // ONE
+
+
+def _mul_up(a, b):
+    product = a * b
+    return np.where(product == 0, 0, (product - 1) // ONE + 1)
+
+
+def _div_down(a, b):
+    # a == 0 returns 0 before dividing, as in FixedPoint.divDown
+    b = np.where(a == 0, 1, b)
+    return np.where(a == 0, 0, (a * ONE) // b)
+
+
+def _div_up(a, b):
+    # a == 0 returns 0 before dividing, as in FixedPoint.divUp
+    b = np.where(a == 0, 1, b)
+    return np.where(a == 0, 0, (a * ONE - 1) // b + 1)
+
+
+def _sub_floor(a, b):
+    return np.where(a > b, a - b, 0)
+
+
+def _tick_prices(ticks: np.ndarray,
+                 table: Optional[TickTable] = None) -> np.ndarray:
+    """
+    Decodes ticks into prices, evaluating each distinct tick only once
+    """
+    decode = tick_to_price if table is None else table.tick_to_price
+    uniq, inverse = np.unique(ticks, return_inverse=True)
+    prices = np.array([decode(int(t)) for t in uniq], dtype=object)
+    return prices[inverse]
+
+
+def _tick_prices_float(ticks: np.ndarray,
+                       table: Optional[TickTable] = None) -> np.ndarray:
+    if table is None:
+        return _tick_prices(ticks).astype(np.float64)
+    return table.prices(ticks)
+
+
+class PositionBook:
+    """
+    Array-backed table of positions keyed by position key
+    (keccak256(owner, id)). Given a TickTable, entry and mid ticks are
+    decoded by table lookup.
+    """
+
+    def __init__(self, capacity: int = 1024,
+                 tick_table: Optional[TickTable] = None):
+        self.tick_table = tick_table
+        self._size = 0
+        self._index: Dict[bytes, int] = {}
+        self.keys = np.empty(capacity, dtype=object)
+        self.notional_initial = np.zeros(capacity, dtype=object)
+        self.debt_initial = np.zeros(capacity, dtype=object)
+        self.mid_tick = np.zeros(capacity, dtype=np.int32)
+        self.entry_tick = np.zeros(capacity, dtype=np.int32)
+        self.is_long = np.zeros(capacity, dtype=bool)
+        self.liquidated = np.zeros(capacity, dtype=bool)
+        self.oi_shares = np.zeros(capacity, dtype=object)
+        self.fraction_remaining = np.zeros(capacity, dtype=np.uint16)
+
+    def __len__(self) -> int:
+        return self._size
+
+    def __contains__(self, key: bytes) -> bool:
+        return key in self._index
+
+    @classmethod
+    def from_positions(cls, positions: Iterable[Tuple[bytes, Info]],
+                       tick_table: Optional[TickTable] = None):
+        """
+        Builds a book from (key, position) pairs, where position is the
+        tuple returned by `market.positions(key)`
+        """
+        positions = list(positions)
+        book = cls(capacity=max(len(positions), 1), tick_table=tick_table)
+        for key, pos in positions:
+            book.set(key, pos)
+        return book
+
+    def _columns(self):
+        return ('keys', 'notional_initial', 'debt_initial', 'mid_tick',
+                'entry_tick', 'is_long', 'liquidated', 'oi_shares',
+                'fraction_remaining')
+
+    def _grow(self):
+        capacity = 2 * len(self.keys)
+        for name in self._columns():
+            col = getattr(self, name)
+            grown = np.zeros(capacity, dtype=col.dtype)
+            grown[:len(col)] = col
+            setattr(self, name, grown)
+
+    def set(self, key: bytes, pos: Info):
+        """
+        Inserts or overwrites the position stored under key
+        """
+        pos = Info(*pos)
+        row = self._index.get(key)
+        if row is None:
+            if self._size == len(self.keys):
+                self._grow()
+            row = self._size
+            self._index[key] = row
+            self._size += 1
+
+        self.keys[row] = key
+        self.notional_initial[row] = int(pos.notional_initial)
+        self.debt_initial[row] = int(pos.debt_initial)
+        self.mid_tick[row] = pos.mid_tick
+        self.entry_tick[row] = pos.entry_tick
+        self.is_long[row] = pos.is_long
+        self.liquidated[row] = pos.liquidated
+        self.oi_shares[row] = int(pos.oi_shares)
+        self.fraction_remaining[row] = pos.fraction_remaining
+
+    def get(self, key: bytes) -> Info:
+        """
+        Returns the position stored under key
+        """
+        return self._info(self._index[key])
+
+    def _info(self, row: int) -> Info:
+        return Info(
+            notional_initial=self.notional_initial[row],
+            debt_initial=self.debt_initial[row],
+            mid_tick=int(self.mid_tick[row]),
+            entry_tick=int(self.entry_tick[row]),
+            is_long=bool(self.is_long[row]),
+            liquidated=bool(self.liquidated[row]),
+            oi_shares=self.oi_shares[row],
+            fraction_remaining=int(self.fraction_remaining[row])
+        )
+
+    def mark(self, oi_long: int, oi_short: int, oi_long_shares: int,
+             oi_short_shares: int, current_price: int, cap_payoff: int,
+             trading_fee_rate: int, maintenance_margin_fraction: int,
+             liquidation_fee_rate: int, fraction: int = ONE,
+             exact: bool = False) -> Marks:
+        """
+        Computes value, notional with PnL, trading fee and liquidatable
+        for every position in the book in one pass.
+
+        With exact=True, each row matches Position.value/notionalWithPnl/
+        tradingFee/liquidatable wei-for-wei. Otherwise amounts are
+        float64 (still in wei) and only liquidatable is exact: rows whose
+        float margin is too close to call are re-checked with the integer
+        port. Liquidatable is always evaluated on the full remaining
+        position, as on chain.
+        """
+        args = (oi_long, oi_short, oi_long_shares, oi_short_shares,
+                current_price, cap_payoff, trading_fee_rate,
+                maintenance_margin_fraction, liquidation_fee_rate, fraction)
+        return self._mark_exact(*args) if exact else self._mark_float(*args)
+
+    def _mark_float(self, oi_long, oi_short, oi_long_shares,
+                    oi_short_shares, current_price, cap_payoff,
+                    trading_fee_rate, maintenance_margin_fraction,
+                    liquidation_fee_rate, fraction):
+        n = self._size
+        is_long = self.is_long[:n]
+        remaining = self.fraction_remaining[:n] / 1e4
+        notional_initial = self.notional_initial[:n].astype(np.float64)
+        debt_initial = self.debt_initial[:n].astype(np.float64)
+        oi_shares = self.oi_shares[:n].astype(np.float64)
+
+        mid_price = _tick_prices_float(self.mid_tick[:n], self.tick_table)
+        entry_price = _tick_prices_float(self.entry_tick[:n],
+                                         self.tick_table)
+
+        # current oi per unit of share on each side
+        oi_per_share = np.where(
+            is_long,
+            oi_long / oi_long_shares if oi_long_shares > 0 else 0.0,
+            oi_short / oi_short_shares if oi_short_shares > 0 else 0.0)
+
+        notional_all = notional_initial * remaining
+        debt_all = debt_initial * remaining
+        oi_initial_all = notional_initial / mid_price * 1e18 * remaining
+        oi_current_all = oi_shares * oi_per_share
+        value_all = self._value_float(
+            notional_all, debt_all, oi_initial_all, oi_current_all, is_long,
+            entry_price, current_price, cap_payoff)
+
+        f = fraction / 1e18
+        value = value_all if fraction == ONE else self._value_float(
+            notional_all * f, debt_all * f, oi_initial_all * f,
+            oi_current_all * f, is_long, entry_price, current_price,
+            cap_payoff)
+
+        notional_with_pnl = value + debt_all * f
+        trading_fee = notional_with_pnl * (trading_fee_rate / 1e18)
+
+        # value < mm + liq fee, re-checking exactly where too close to call
+        threshold = notional_all * (maintenance_margin_fraction / 1e18) \
+            + value_all * (liquidation_fee_rate / 1e18)
+        liquidatable = (value_all < threshold) & (remaining > 0)
+        close = np.flatnonzero(
+            (np.abs(value_all - threshold)
+             <= 1e-9 * (threshold + value_all) + 1.0) & (remaining > 0))
+        for row in close:
+            pos = self._info(row)
+            liquidatable[row] = position.liquidatable(
+                pos,
+                oi_long if pos.is_long else oi_short,
+                oi_long_shares if pos.is_long else oi_short_shares,
+                current_price, cap_payoff, maintenance_margin_fraction,
+                liquidation_fee_rate)
+
+        return Marks(value, notional_with_pnl, trading_fee, liquidatable)
+
+    @staticmethod
+    def _value_float(notional, debt, oi_initial, oi_current, is_long,
+                     entry_price, current_price, cap_payoff):
+        """
+        Float64 approximation of Position.value
+        """
+        with np.errstate(divide='ignore', invalid='ignore'):
+            funded = np.where(oi_initial > 0,
+                              notional * oi_current / oi_initial, 0.0)
+        oi_at_entry = oi_current * entry_price / 1e18
+        oi_at_current = oi_current * (current_price / 1e18)
+
+        long_val = funded + np.minimum(
+            oi_at_current, oi_at_entry * (1 + cap_payoff / 1e18)) \
+            - debt - oi_at_entry
+        short_val = funded + oi_at_entry - debt - oi_at_current
+        return np.maximum(np.where(is_long, long_val, short_val), 0.0)
+
+    def _mark_exact(self, oi_long, oi_short, oi_long_shares,
+                    oi_short_shares, current_price, cap_payoff,
+                    trading_fee_rate, maintenance_margin_fraction,
+                    liquidation_fee_rate, fraction):
+        n = self._size
+        is_long = self.is_long[:n]
+        fraction_remaining = \
+            self.fraction_remaining[:n].astype(object) * PRECISION_CHANGER
+        oi_shares = self.oi_shares[:n]
+
+        mid_price = _tick_prices(self.mid_tick[:n], self.tick_table)
+        entry_price = _tick_prices(self.entry_tick[:n], self.tick_table)
+
+        # initial quantities for the remaining position (fraction = ONE)
+        notional_all = _mul_up(self.notional_initial[:n], fraction_remaining)
+        debt_all = _mul_up(self.debt_initial[:n], fraction_remaining)
+        oi_initial_all = _mul_up(
+            _div_down(self.notional_initial[:n], mid_price),
+            fraction_remaining)
+
+        value_all = self._value_exact(
+            notional_all, debt_all, oi_initial_all, oi_shares, is_long,
+            entry_price, oi_long, oi_short, oi_long_shares, oi_short_shares,
+            current_price, cap_payoff)
+
+        if fraction == ONE:
+            value = value_all
+            debt = debt_all
+        else:
+            debt = _mul_up(debt_all, fraction)
+            value = self._value_exact(
+                _mul_up(notional_all, fraction), debt,
+                _mul_up(oi_initial_all, fraction),
+                _mul_down(oi_shares, fraction), is_long, entry_price,
+                oi_long, oi_short, oi_long_shares, oi_short_shares,
+                current_price, cap_payoff)
+
+        notional_with_pnl = value + debt
+        trading_fee = _mul_up(notional_with_pnl, trading_fee_rate)
+
+        maintenance_margin = _mul_up(notional_all,
+                                     maintenance_margin_fraction)
+        liquidation_fee = _mul_down(value_all, liquidation_fee_rate)
+        liquidatable = (self.fraction_remaining[:n] > 0) \
+            & (value_all < maintenance_margin + liquidation_fee).astype(bool)
+
+        return Marks(value, notional_with_pnl, trading_fee, liquidatable)
+
+    @staticmethod
+    def _value_exact(notional, debt, oi_initial, oi_shares, is_long,
+                     entry_price, oi_long, oi_short, oi_long_shares,
+                     oi_short_shares, current_price, cap_payoff):
+        """
+        Position.value for already fractioned notional, debt, oi initial
+        and oi shares columns
+        """
+        # oi current per side. zero when either side's totals are zero
+        oi_current = np.zeros(len(oi_shares), dtype=object)
+        if oi_long > 0 and oi_long_shares > 0:
+            oi_current = np.where(
+                is_long, (oi_shares * oi_long) // oi_long_shares, oi_current)
+        if oi_short > 0 and oi_short_shares > 0:
+            oi_current = np.where(
+                ~is_long, (oi_shares * oi_short) // oi_short_shares,
+                oi_current)
+
+        funded = _div_up(_mul_up(notional, oi_current), oi_initial)
+        oi_at_entry = _mul_up(oi_current, entry_price)
+        oi_at_current = _mul_up(oi_current, current_price)
+
+        long_val = _sub_floor(
+            funded + np.minimum(oi_at_current,
+                                _mul_up(oi_at_entry, ONE + cap_payoff)),
+            debt + oi_at_entry)
+        short_val = _sub_floor(funded + oi_at_entry, debt + oi_at_current)
+        return np.where(is_long, long_val, short_val)
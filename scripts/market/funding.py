@@ -0,0 +1,152 @@
+"""
+Off-chain port of OverlayV1Market funding.
+
+`oi_after_funding` and `pay_funding` reproduce the market wei-for-wei,
+including the expUp, powDown(ONE / 2) and rounding up of the underweight
+side through the oiUnderweight * oiOverweight invariant. `replay` steps
+a market through a sequence of updates for long horizons.
+
+The float64 functions evaluate the same closed form with NumPy
+broadcasting, so a whole grid of candidate k values against a grid of
+time elapsed costs one vectorized pass instead of a contract call per
+point.
+"""
+from typing import Iterable, List, Tuple
+
+import numpy as np
+
+from scripts.libraries.fixed_point import (
+    div_down, exp_up, mul_down, pow_down
+)
+
+ONE = 10 ** 18
+
+# cap for euler exponent powers in OverlayV1Market, not LogExpMath's
+MAX_NATURAL_EXPONENT = 20 * ONE
+
+
+def oi_after_funding(oi_overweight: int, oi_underweight: int,
+                     time_elapsed: int, k: int) -> Tuple[int, int]:
+    """
+    Returns (oiOverweight, oiUnderweight) after the overweight side pays
+    the underweight side for time_elapsed seconds, as in
+    OverlayV1Market.oiAfterFunding
+    """
+    oi_total = oi_overweight + oi_underweight
+    oi_imbalance = oi_overweight - oi_underweight
+    if oi_imbalance < 0:
+        raise ValueError("oiOverweight < oiUnderweight")
+
+    # this invariant must hold after updating both sides
+    oi_invariant = oi_underweight * oi_overweight
+
+    # no oi or imbalance, no funding
+    if oi_total == 0 or oi_imbalance == 0:
+        return oi_overweight, oi_underweight
+
+    # draw down imbalance by e**(-2*k*t), min to zero past max exponent
+    funding_factor = 0
+    exponent = 2 * k * time_elapsed
+    if exponent < MAX_NATURAL_EXPONENT:
+        funding_factor = div_down(ONE, exp_up(exponent))
+
+    # total oi decays to compensate protocol for imbalance liability
+    oi_imb_fraction = div_down(oi_imbalance, oi_total)
+    under_root = ONE - mul_down(
+        mul_down(oi_imb_fraction, oi_imb_fraction),
+        ONE - mul_down(funding_factor, funding_factor))
+    oi_total = mul_down(oi_total, pow_down(under_root, ONE // 2))
+    oi_imbalance = mul_down(oi_imbalance, funding_factor)
+
+    # overweight pays underweight, rounding underweight up
+    oi_overweight = (oi_total + oi_imbalance) // 2
+    if oi_overweight != 0:
+        oi_underweight = 0 if oi_invariant == 0 \
+            else (oi_invariant - 1) // oi_overweight + 1
+    return oi_overweight, oi_underweight
+
+
+def pay_funding(oi_long: int, oi_short: int, time_elapsed: int,
+                k: int) -> Tuple[int, int]:
+    """
+    Returns (oiLong, oiShort) after funding, as in
+    OverlayV1Market._payFunding
+    """
+    if time_elapsed == 0:
+        return oi_long, oi_short
+
+    is_long_overweight = oi_long > oi_short
+    oi_overweight = oi_long if is_long_overweight else oi_short
+    oi_underweight = oi_short if is_long_overweight else oi_long
+
+    oi_overweight, oi_underweight = oi_after_funding(
+        oi_overweight, oi_underweight, time_elapsed, k)
+    if is_long_overweight:
+        return oi_overweight, oi_underweight
+    return oi_underweight, oi_overweight
+
+
+def replay(oi_long: int, oi_short: int, k: int,
+           intervals: Iterable[int]) -> List[Tuple[int, int]]:
+    """
+    Applies funding for each interval between market updates in turn.
+    Returns (oiLong, oiShort) after each update
+    """
+    ois = []
+    for time_elapsed in intervals:
+        oi_long, oi_short = pay_funding(oi_long, oi_short, time_elapsed, k)
+        ois.append((oi_long, oi_short))
+    return ois
+
+
+def oi_after_funding_float(oi_overweight, oi_underweight, time_elapsed,
+                           k) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Float64 version of oi_after_funding. Arguments broadcast, and k is
+    given in the contract's 18 decimal units
+    """
+    oi_overweight = np.asarray(oi_overweight, dtype=np.float64)
+    oi_underweight = np.asarray(oi_underweight, dtype=np.float64)
+    exponent = 2 * np.asarray(k, dtype=np.float64) / ONE \
+        * np.asarray(time_elapsed, dtype=np.float64)
+
+    oi_total = oi_overweight + oi_underweight
+    oi_imbalance = oi_overweight - oi_underweight
+    oi_invariant = oi_overweight * oi_underweight
+
+    funding_factor = np.where(exponent < MAX_NATURAL_EXPONENT / ONE,
+                              np.exp(-exponent), 0.0)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        oi_imb_fraction = np.where(oi_total > 0, oi_imbalance / oi_total, 0.0)
+        under_root = 1 - oi_imb_fraction ** 2 * (1 - funding_factor ** 2)
+        oi_total_after = oi_total * np.sqrt(under_root)
+        oi_overweight_after = (oi_total_after
+                               + oi_imbalance * funding_factor) / 2
+        oi_underweight_after = np.where(
+            oi_overweight_after > 0, oi_invariant / oi_overweight_after,
+            oi_underweight)
+
+    # no oi or imbalance, no funding
+    unchanged = (oi_total == 0) | (oi_imbalance == 0)
+    return (np.where(unchanged, oi_overweight, oi_overweight_after),
+            np.where(unchanged, oi_underweight, oi_underweight_after))
+
+
+def funding_grid(oi_long: int, oi_short: int, ks: Iterable[int],
+                 times: Iterable[int]) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Projects (oiLong, oiShort) after funding for every candidate k
+    against every time elapsed since the last update. Returns two
+    float64 arrays of shape (len(ks), len(times))
+    """
+    ks = np.asarray(ks, dtype=np.float64)[:, None]
+    times = np.asarray(times, dtype=np.float64)[None, :]
+
+    is_long_overweight = oi_long > oi_short
+    oi_overweight = max(oi_long, oi_short)
+    oi_underweight = min(oi_long, oi_short)
+    oi_overweight, oi_underweight = oi_after_funding_float(
+        oi_overweight, oi_underweight, times, ks)
+    if is_long_overweight:
+        return oi_overweight, oi_underweight
+    return oi_underweight, oi_overweight
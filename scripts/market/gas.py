@@ -0,0 +1,254 @@
+"""
+Gas baseline for OverlayV1Market hot paths.
+
+A Case is one op (build, partial and full unwind, liquidate, update and
+emergencyWithdraw) measured with a given number of Chainlink rounds per
+2 * macroWindow for the feed to walk back through, with or without a
+position open on the other side of the market, and with the volume
+Roller snapshot the trade registers against empty, active within the
+micro window, or decayed past it. `scripts/gas.py` measures every case on
+a local chain and stores the gas used as a versioned baseline.
+
+`regressions` compares a measurement against the baseline, and GasModel
+fits gas used as linear in rounds for each (op, other side, roller) so
+per-trade cost models can price trades on feeds of any round cadence.
+With a feed's maxRounds cap, rounds read and so gas are bounded whatever
+the cadence, and `GasModel.worst_case` gives that bound.
+
+Cases are measured on the walking OverlayV1ChainlinkFeed only. maxRounds
+exists only on OverlayV1ChainlinkFeedCached, whose cost depends instead
+on rounds pending a checkpoint, so estimates under a cap are
+extrapolated from walk costs at the capped round count, not measured
+on the cached feed.
+
+`risk_param_gas_saved` counts the cold SLOADs per op that packing the
+market's risk params into storage words removes, for comparison with
+measured deltas against a baseline taken before packing.
+"""
+import json
+from typing import Dict, List, NamedTuple, Tuple
+
+from scripts.libraries.risk import Parameters, words_read
+
+# bump when the cases or how they are set up change, so stale baselines
+# aren't compared against
+VERSION = 1
+
+OPS = ("build", "unwind_partial", "unwind_full", "liquidate", "update",
+       "emergency_withdraw")
+ROLLERS = ("empty", "active", "decayed")
+
+# seconds between Chainlink rounds measured against, one an hour to one a
+# minute, with macroWindow = 3600
+ROUND_INTERVALS = (3600, 600, 60)
+MACRO_WINDOW = 3600
+
+# ops that register volume on the roller
+VOLUME_OPS = ("build", "unwind_partial", "unwind_full")
+# ops that read from the feed
+FEED_OPS = ("build", "unwind_partial", "unwind_full", "liquidate",
+            "update")
+
+# risk params each op reads from market storage, funding included
+RISK_PARAMS_READ = {
+    "build": (
+        Parameters.K, Parameters.CAP_LEVERAGE, Parameters.MIN_COLLATERAL,
+        Parameters.TRADING_FEE_RATE, Parameters.CAP_NOTIONAL,
+        Parameters.LMBDA, Parameters.AVERAGE_BLOCK_TIME, Parameters.DELTA,
+        Parameters.CAP_PAYOFF, Parameters.MAINTENANCE_MARGIN_FRACTION,
+        Parameters.LIQUIDATION_FEE_RATE, Parameters.CIRCUIT_BREAKER_WINDOW,
+        Parameters.CIRCUIT_BREAKER_MINT_TARGET,
+    ),
+    "unwind_partial": (
+        Parameters.K, Parameters.CAP_PAYOFF,
+        Parameters.MAINTENANCE_MARGIN_FRACTION,
+        Parameters.LIQUIDATION_FEE_RATE, Parameters.CAP_NOTIONAL,
+        Parameters.LMBDA, Parameters.AVERAGE_BLOCK_TIME, Parameters.DELTA,
+        Parameters.TRADING_FEE_RATE, Parameters.CIRCUIT_BREAKER_WINDOW,
+    ),
+    "liquidate": (
+        Parameters.K, Parameters.CAP_PAYOFF,
+        Parameters.MAINTENANCE_MARGIN_FRACTION,
+        Parameters.LIQUIDATION_FEE_RATE,
+        Parameters.MAINTENANCE_MARGIN_BURN_RATE,
+        Parameters.CIRCUIT_BREAKER_WINDOW,
+    ),
+    "update": (Parameters.K,),
+    "emergency_withdraw": (),
+}
+RISK_PARAMS_READ["unwind_full"] = RISK_PARAMS_READ["unwind_partial"]
+
+# EIP-2929 cost of the first and later SLOADs of a slot in a tx
+COLD_SLOAD = 2100
+WARM_SLOAD = 100
+
+
+def risk_param_slots(op: str, packed: bool = True) -> int:
+    """
+    Storage slots op reads its risk params from, with params packed into
+    words per Risk.layout or one slot each as before packing
+    """
+    names = RISK_PARAMS_READ[op]
+    return len(words_read(names)) if packed else len(names)
+
+
+def risk_param_gas_saved(op: str) -> int:
+    """
+    Gas saved on op's risk param reads by packing: the cold SLOADs that
+    become warm. An upper bound, counted from the slots read rather than
+    measured, before the bit ops to unpack each param
+    """
+    saved = risk_param_slots(op, False) - risk_param_slots(op)
+    return saved * (COLD_SLOAD - WARM_SLOAD)
+
+
+class Case(NamedTuple):
+    op: str
+    rounds: int  # chainlink rounds per 2 * macroWindow
+    other_side: bool  # position open on the other side of the market
+    roller: str  # volume snapshot state before the trade
+
+    @property
+    def name(self) -> str:
+        return (f"{self.op}:rounds={self.rounds}"
+                f":other_side={int(self.other_side)}:roller={self.roller}")
+
+    @classmethod
+    def from_name(cls, name: str):
+        op, *fields = name.split(":")
+        values = dict(field.split("=") for field in fields)
+        return cls(op, int(values["rounds"]), values["other_side"] == "1",
+                   values["roller"])
+
+
+def rounds_for(interval: int) -> int:
+    """
+    Chainlink rounds per 2 * macroWindow for rounds every interval seconds
+    """
+    return 2 * MACRO_WINDOW // interval
+
+
+def rounds_read(interval: int, max_rounds: int = 0) -> int:
+    """
+    Rounds per 2 * macroWindow read for a feed with rounds every interval
+    seconds, capped at the feed's maxRounds
+    """
+    rounds = rounds_for(interval)
+    return min(rounds, max_rounds) if max_rounds else rounds
+
+
+def cases() -> List[Case]:
+    """
+    Every case in the benchmark. Dimensions an op doesn't depend on are
+    held at the first value
+    """
+    all_cases = []
+    for op in OPS:
+        intervals = ROUND_INTERVALS if op in FEED_OPS \
+            else ROUND_INTERVALS[:1]
+        rollers = ROLLERS if op in VOLUME_OPS else ROLLERS[:1]
+        for interval in intervals:
+            for other_side in (False, True):
+                for roller in rollers:
+                    all_cases.append(Case(op, rounds_for(interval),
+                                          other_side, roller))
+    return all_cases
+
+
+class Baseline(NamedTuple):
+    version: int
+    settings: Dict  # compiler and market settings measured with
+    gas: Dict[Case, int]  # gas used by the measured tx per case
+
+
+def load(path: str) -> Baseline:
+    with open(path) as f:
+        data = json.load(f)
+    return Baseline(data["version"], data["settings"],
+                    {Case.from_name(k): v for k, v in data["gas"].items()})
+
+
+def dump(baseline: Baseline, path: str):
+    with open(path, "w") as f:
+        json.dump({
+            "version": baseline.version,
+            "settings": baseline.settings,
+            "gas": {case.name: gas for case, gas in baseline.gas.items()},
+        }, f, indent=2)
+        f.write("\n")
+
+
+def regressions(baseline: Baseline, measured: Dict[Case, int],
+                tolerance: float = 0.0) -> List[Tuple[Case, int, int]]:
+    """
+    Returns (case, baseline gas, measured gas) for each case measured to
+    use more than tolerance above its baseline
+    """
+    if baseline.version != VERSION:
+        raise ValueError(f"baseline version {baseline.version} != {VERSION}")
+
+    worse = []
+    for case, gas in measured.items():
+        expect = baseline.gas.get(case)
+        if expect is not None and gas > expect * (1 + tolerance):
+            worse.append((case, expect, gas))
+    return worse
+
+
+class GasModel:
+    """
+    Gas used per op, linear in Chainlink rounds per 2 * macroWindow for
+    each (op, other side, roller)
+    """
+
+    def __init__(self, gas: Dict[Case, int]):
+        points: Dict[Tuple[str, bool, str], List[Tuple[int, int]]] = {}
+        for case, used in gas.items():
+            key = (case.op, case.other_side, case.roller)
+            points.setdefault(key, []).append((case.rounds, used))
+
+        # least squares fit of gas = base + per_round * rounds
+        self.fits: Dict[Tuple[str, bool, str], Tuple[float, float]] = {}
+        for key, pts in points.items():
+            n = len(pts)
+            mean_x = sum(x for x, _ in pts) / n
+            mean_y = sum(y for _, y in pts) / n
+            var = sum((x - mean_x) ** 2 for x, _ in pts)
+            per_round = 0.0 if var == 0 else sum(
+                (x - mean_x) * (y - mean_y) for x, y in pts) / var
+            self.fits[key] = (mean_y - per_round * mean_x, per_round)
+
+    @classmethod
+    def from_baseline(cls, path: str):
+        return cls(load(path).gas)
+
+    def estimate(self, op: str, rounds: int = 0, other_side: bool = True,
+                 roller: str = "active") -> int:
+        """
+        Estimated gas used by op against a feed with rounds per
+        2 * macroWindow
+        """
+        if op not in VOLUME_OPS:
+            roller = ROLLERS[0]
+        base, per_round = self.fits[(op, other_side, roller)]
+        return round(base + per_round * rounds)
+
+    def estimate_for_interval(self, op: str, interval: int,
+                              max_rounds: int = 0, other_side: bool = True,
+                              roller: str = "active") -> int:
+        """
+        Estimated gas used by op against a feed with rounds every interval
+        seconds and maxRounds cap. Under a cap, extrapolated from walk
+        costs at max_rounds rounds
+        """
+        return self.estimate(op, rounds_read(interval, max_rounds),
+                             other_side, roller)
+
+    def worst_case(self, op: str, max_rounds: int) -> int:
+        """
+        Most gas op is estimated to use against a feed capped at max_rounds,
+        whatever the feed's round cadence. Extrapolated from walk costs,
+        not measured on the cached feed
+        """
+        return max(self.estimate(op, max_rounds, other_side, roller)
+                   for o, other_side, roller in self.fits if o == op)
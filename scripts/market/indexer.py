@@ -0,0 +1,284 @@
+"""
+Streaming log indexer for OverlayV1Market.
+
+Replays Build, Unwind, Liquidate, EmergencyWithdraw, Update and
+CacheRiskCalc logs into a local table of Position.Info keyed by
+(owner, id), so services can enumerate a market's positions without
+brute-forcing get_position_key lookups.
+
+Mutable position fields are reconstructed from the logs with the same
+arithmetic as the market. The only read per position is at its Build,
+for the two fields the log omits (notional_initial and mid_tick), which
+never change afterwards.
+
+Progress is saved as a JSON checkpoint at block boundaries; an indexer
+created from the same path resumes from the block after it.
+"""
+import json
+import os
+from typing import Dict, Iterator, List, Optional, Tuple
+
+from brownie import web3
+from eth_utils import keccak, to_checksum_address
+from hexbytes import HexBytes
+
+from scripts.libraries import position
+from scripts.libraries.position import Info, ONE
+from scripts.libraries.tick import TickTable, price_to_tick
+from scripts.market.book import PositionBook
+from scripts.market.store import MarketStore
+
+EVENTS = ("Build", "Unwind", "Liquidate", "EmergencyWithdraw", "Update",
+          "CacheRiskCalc")
+
+PositionId = Tuple[str, int]  # (owner, id)
+
+
+def _word(data: bytes, i: int) -> bytes:
+    return data[32*i:32*(i+1)]
+
+
+def _decode(abi_type: str, word: bytes):
+    if abi_type == "address":
+        return to_checksum_address(word[12:])
+    if abi_type == "bool":
+        return int.from_bytes(word, "big") != 0
+    if abi_type == "int256":
+        return int.from_bytes(word, "big", signed=True)
+    if abi_type == "uint256":
+        return int.from_bytes(word, "big")
+    raise ValueError(f"unsupported event arg type {abi_type}")
+
+
+class _EventDecoder:
+    """
+    Decodes logs for the market's static-typed events, keyed by topic0
+    """
+
+    def __init__(self, abi: List[dict]):
+        self.events = {}
+        for item in abi:
+            if item.get("type") != "event" or item["name"] not in EVENTS:
+                continue
+            types = ",".join(i["type"] for i in item["inputs"])
+            topic = keccak(text=f"{item['name']}({types})")
+            self.events[topic] = item
+
+    @property
+    def topics(self) -> List[str]:
+        return ["0x" + topic.hex() for topic in self.events]
+
+    def decode(self, log) -> Tuple[str, dict]:
+        topics = [HexBytes(t) for t in log["topics"]]
+        item = self.events[bytes(topics[0])]
+        data = bytes(HexBytes(log["data"]))
+        args = {}
+        n_indexed, n_data = 1, 0
+        for i in item["inputs"]:
+            if i["indexed"]:
+                word = bytes(topics[n_indexed])
+                n_indexed += 1
+            else:
+                word = _word(data, n_data)
+                n_data += 1
+            args[i["name"]] = _decode(i["type"], word)
+        return item["name"], args
+
+
+class PositionIndexer:
+    """
+    Local position table for one market, kept in sync from its logs.
+
+    `start_block` should be the market's deployment block (or earlier)
+    so oi share totals are replayed from zero. `confirmations` keeps the
+    indexer that many blocks behind head to stay clear of reorgs. Given a
+    MarketStore, every replayed event is also appended to its history.
+    """
+
+    def __init__(self, market, start_block: int = 0,
+                 checkpoint_path: Optional[str] = None,
+                 confirmations: int = 0, store: Optional[MarketStore] = None):
+        self.market = market
+        self.checkpoint_path = checkpoint_path
+        self.confirmations = confirmations
+        self.store = store
+        self._decoder = _EventDecoder(market.abi)
+
+        self.block = start_block - 1  # last fully processed block
+        self.positions: Dict[PositionId, Info] = {}
+        self.oi_long = 0
+        self.oi_short = 0
+        self.oi_long_shares = 0
+        self.oi_short_shares = 0
+        self.dp_upper_limit = 0
+
+        if checkpoint_path is not None and os.path.exists(checkpoint_path):
+            self.load(checkpoint_path)
+
+    def __len__(self) -> int:
+        return len(self.positions)
+
+    def open_positions(self) -> Iterator[Tuple[PositionId, Info]]:
+        """
+        Yields ((owner, id), pos) for positions that still exist
+        """
+        for ident, pos in self.positions.items():
+            if position.exists(pos):
+                yield ident, pos
+
+    def to_book(self, tick_table: Optional[TickTable] = None
+                ) -> PositionBook:
+        """
+        Returns a PositionBook of the open positions for batch valuation
+        """
+        return PositionBook.from_positions(
+            ((position.get_key(owner, id), pos)
+             for (owner, id), pos in self.open_positions()),
+            tick_table=tick_table)
+
+    def sync(self, to_block: Optional[int] = None,
+             batch_size: int = 2000) -> int:
+        """
+        Replays logs up to to_block (default head less confirmations),
+        checkpointing after each batch. Returns the number of logs applied
+        """
+        head = web3.eth.block_number - self.confirmations
+        to_block = head if to_block is None else min(to_block, head)
+
+        count = 0
+        while self.block < to_block:
+            from_block = self.block + 1
+            end_block = min(from_block + batch_size - 1, to_block)
+            logs = web3.eth.get_logs({
+                "address": self.market.address,
+                "fromBlock": from_block,
+                "toBlock": end_block,
+                "topics": [self._decoder.topics],
+            })
+            logs = sorted(logs, key=lambda log: (log["blockNumber"],
+                                                 log["logIndex"]))
+            for log in logs:
+                name, args = self._decoder.decode(log)
+                self.apply(name, args, log["blockNumber"])
+                if self.store is not None:
+                    self.store.append(name, args, log["blockNumber"],
+                                      log["logIndex"])
+            count += len(logs)
+
+            self.block = end_block
+            if self.store is not None:
+                self.store.flush()
+            if self.checkpoint_path is not None:
+                self.save(self.checkpoint_path)
+        return count
+
+    def apply(self, name: str, args: dict, block: int):
+        """
+        Applies a single decoded market event to the table
+        """
+        getattr(self, f"_on_{name}")(args, block)
+
+    def _set_side(self, is_long: bool, oi: int, oi_shares: int):
+        if is_long:
+            self.oi_long, self.oi_long_shares = oi, oi_shares
+        else:
+            self.oi_short, self.oi_short_shares = oi, oi_shares
+
+    def _on_Build(self, args: dict, block: int):
+        owner, id = args["sender"], args["positionId"]
+        is_long = args["isLong"]
+        oi_shares_before = self.oi_long_shares if is_long \
+            else self.oi_short_shares
+
+        # notional and mid tick are not logged, so read them once
+        stored = Info(*self.market.positions(
+            position.get_key(owner, id), block_identifier=block))
+
+        self.positions[(owner, id)] = Info(
+            notional_initial=stored.notional_initial,
+            debt_initial=args["debt"],
+            mid_tick=stored.mid_tick,
+            entry_tick=price_to_tick(args["price"]),
+            is_long=is_long,
+            liquidated=False,
+            oi_shares=args["oiSharesAfterBuild"] - oi_shares_before,
+            fraction_remaining=position.to_uint16_fixed(ONE),
+        )
+        self._set_side(is_long, args["oiAfterBuild"],
+                       args["oiSharesAfterBuild"])
+
+    def _on_Unwind(self, args: dict, block: int):
+        ident = (args["sender"], args["positionId"])
+        pos = self.positions[ident]
+        fraction = args["fraction"]
+
+        # same updates to stored info as OverlayV1Market.unwind
+        oi_shares = pos.oi_shares - position.oi_shares_current(pos, fraction)
+        fraction_remaining = position.updated_fraction_remaining(pos,
+                                                                 fraction)
+        if fraction_remaining == 0:
+            oi_shares = 0
+        self.positions[ident] = pos._replace(
+            oi_shares=oi_shares, fraction_remaining=fraction_remaining)
+        self._set_side(pos.is_long, args["oiAfterUnwind"],
+                       args["oiSharesAfterUnwind"])
+
+    def _on_Liquidate(self, args: dict, block: int):
+        ident = (args["owner"], args["positionId"])
+        pos = self.positions[ident]
+        self.positions[ident] = pos._replace(
+            liquidated=True, oi_shares=0, fraction_remaining=0)
+        self._set_side(pos.is_long, args["oiAfterLiquidate"],
+                       args["oiSharesAfterLiquidate"])
+
+    def _on_EmergencyWithdraw(self, args: dict, block: int):
+        ident = (args["sender"], args["positionId"])
+        pos = self.positions[ident]
+        self.positions[ident] = pos._replace(fraction_remaining=0)
+
+    def _on_Update(self, args: dict, block: int):
+        self.oi_long = args["oiLong"]
+        self.oi_short = args["oiShort"]
+
+    def _on_CacheRiskCalc(self, args: dict, block: int):
+        self.dp_upper_limit = args["newDpUpperLimit"]
+
+    def save(self, path: str):
+        """
+        Atomically writes a checkpoint of the table at self.block
+        """
+        state = {
+            "market": self.market.address,
+            "block": self.block,
+            "oi_long": self.oi_long,
+            "oi_short": self.oi_short,
+            "oi_long_shares": self.oi_long_shares,
+            "oi_short_shares": self.oi_short_shares,
+            "dp_upper_limit": self.dp_upper_limit,
+            "positions": [[owner, id, *pos]
+                          for (owner, id), pos in self.positions.items()],
+        }
+        tmp = f"{path}.tmp"
+        with open(tmp, "w") as f:
+            json.dump(state, f)
+        os.replace(tmp, path)
+
+    def load(self, path: str):
+        """
+        Restores the table from a checkpoint written by save()
+        """
+        with open(path) as f:
+            state = json.load(f)
+        if state["market"] != self.market.address:
+            raise ValueError(f"checkpoint {path} is for {state['market']}")
+
+        self.block = state["block"]
+        self.oi_long = state["oi_long"]
+        self.oi_short = state["oi_short"]
+        self.oi_long_shares = state["oi_long_shares"]
+        self.oi_short_shares = state["oi_short_shares"]
+        self.dp_upper_limit = state["dp_upper_limit"]
+        self.positions = {
+            (owner, id): Info(*fields)
+            for owner, id, *fields in state["positions"]
+        }
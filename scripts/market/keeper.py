@@ -0,0 +1,342 @@
+"""
+Liquidation keeper built around OverlayV1Market.liquidate and
+liquidateBatch.
+
+Open positions are indexed by liquidation mid price in two heaps: a
+max-heap for longs (liquidatable once price falls to or below the key)
+and a min-heap for shorts (liquidatable once price rises to or above).
+On each new price only positions whose key has been crossed are popped,
+then confirmed with the exact Position.liquidatable port.
+
+Funding moves a side's oi per share, which moves every liquidation price
+on that side. Keys are therefore computed at a ratio slightly below the
+current oi per share, which keeps them conservative (popped early, never
+late) until funding draws the ratio down past it. Only then is the side
+re-keyed.
+"""
+import heapq
+import itertools
+import math
+from typing import Dict, List, Tuple
+
+from brownie.exceptions import VirtualMachineError
+
+from scripts.libraries import position
+from scripts.libraries.oracle import Data, mid
+from scripts.libraries.position import Info
+from scripts.libraries.risk import Parameters
+
+ONE = 10 ** 18
+
+PositionId = Tuple[str, int]  # (owner, id)
+
+
+class _Side:
+    def __init__(self, is_long: bool):
+        self.is_long = is_long
+        self.heap: List[list] = []
+        self.entries: Dict[PositionId, list] = {}
+        self.positions: Dict[PositionId, Tuple[Info, float, float]] = {}
+        self.watch: Dict[PositionId, list] = {}
+        self.ratio_key = 0.0  # oi per share keys were computed at
+
+    def key(self, c: float, k: float) -> float:
+        """
+        Liquidation mid price p_liq = c +/- k / ratio_key
+        """
+        if math.isinf(k):
+            # no oi left to back position: liquidatable at any price
+            return math.inf if self.is_long else -math.inf
+        # pad by float error so keys stay conservative
+        if self.is_long:
+            key = c + k / self.ratio_key
+            return key + abs(key) * 1e-12
+        key = c - k / self.ratio_key
+        return key - abs(key) * 1e-12
+
+    def push(self, ident: PositionId, key: float, seq: int):
+        # heapq is a min-heap, so negate long keys
+        entry = [-key if self.is_long else key, seq, ident]
+        self.entries[ident] = entry
+        heapq.heappush(self.heap, entry)
+
+    def discard(self, ident: PositionId):
+        entry = self.entries.pop(ident, None)
+        if entry is not None:
+            entry[-1] = None  # lazily deleted on pop
+        self.watch.pop(ident, None)
+        self.positions.pop(ident, None)
+
+    def crosses(self, key: float, price: int) -> bool:
+        return key >= price if self.is_long else key <= price
+
+    def top(self) -> float:
+        sort_key = self.heap[0][0]
+        return -sort_key if self.is_long else sort_key
+
+
+class LiquidationIndex:
+    """
+    Price-ordered index of open positions by liquidation mid price.
+
+    Detection costs O(log N + k) for k crossed positions. Re-keying a
+    side after funding drifts its oi per share past the headroom costs
+    O(N).
+    """
+
+    def __init__(self, cap_payoff: int, maintenance_margin_fraction: int,
+                 liquidation_fee_rate: int, headroom: float = 1e-4):
+        self.cap_payoff = cap_payoff
+        self.maintenance_margin_fraction = maintenance_margin_fraction
+        self.liquidation_fee_rate = liquidation_fee_rate
+        self.headroom = headroom
+        self._seq = itertools.count()
+        self._long = _Side(True)
+        self._short = _Side(False)
+
+    def __len__(self) -> int:
+        return len(self._long.positions) + len(self._short.positions)
+
+    def __contains__(self, ident: PositionId) -> bool:
+        return ident in self._long.positions \
+            or ident in self._short.positions
+
+    def _side(self, is_long: bool) -> _Side:
+        return self._long if is_long else self._short
+
+    def _invariants(self, pos: Info) -> Tuple[float, float]:
+        """
+        Returns (c, k) such that the position's liquidation mid price is
+        c + k / r for longs and c - k / r for shorts, where r is the oi
+        per share on the position's side.
+
+        From value * (1 - liqFeeRate) < mm with value linear in price
+        below the payoff cap.
+        """
+        notional = position.notional_initial(pos, ONE)
+        debt = position.debt_initial(pos, ONE)
+        oi_initial = position.oi_initial(pos, ONE)
+        entry_price = position.entry_price(pos)
+        if pos.oi_shares == 0 or oi_initial == 0:
+            return 0.0, math.inf
+
+        maintenance_margin = position.mul_up(
+            notional, self.maintenance_margin_fraction)
+        threshold = maintenance_margin \
+            / (1 - self.liquidation_fee_rate / ONE)
+        k = (threshold + debt) * ONE / pos.oi_shares
+        mid_at_entry = notional * ONE / oi_initial
+        c = entry_price - mid_at_entry if pos.is_long \
+            else entry_price + mid_at_entry
+        return c, k
+
+    def add(self, owner: str, id: int, pos: Info, oi_total_on_side: int,
+            oi_total_shares_on_side: int):
+        """
+        Indexes (or re-indexes) a position. Positions that no longer
+        exist are dropped.
+        """
+        pos = Info(*pos)
+        self.remove(owner, id)
+        if not position.exists(pos):
+            return
+
+        side = self._side(pos.is_long)
+        if not side.positions:
+            side.ratio_key = self._ratio(
+                oi_total_on_side, oi_total_shares_on_side)
+
+        c, k = self._invariants(pos)
+        ident = (owner, id)
+        side.positions[ident] = (pos, c, k)
+        side.push(ident, side.key(c, k), next(self._seq))
+
+    def remove(self, owner: str, id: int):
+        """
+        Removes a position, e.g. once fully unwound or liquidated
+        """
+        self._long.discard((owner, id))
+        self._short.discard((owner, id))
+
+    def _ratio(self, oi_total: int, oi_total_shares: int) -> float:
+        ratio = oi_total / oi_total_shares if oi_total_shares > 0 else 1.0
+        return ratio * (1 - self.headroom)
+
+    def rekey(self, is_long: bool, oi_total: int, oi_total_shares: int):
+        """
+        Recomputes every key on a side at the side's current oi per share
+        """
+        side = self._side(is_long)
+        side.ratio_key = self._ratio(oi_total, oi_total_shares)
+        side.heap = []
+        side.entries = {}
+        side.watch = {}
+        for ident, (_, c, k) in side.positions.items():
+            entry = [None, next(self._seq), ident]
+            key = side.key(c, k)
+            entry[0] = -key if is_long else key
+            side.entries[ident] = entry
+            side.heap.append(entry)
+        heapq.heapify(side.heap)
+
+    def set_params(self, cap_payoff: int, maintenance_margin_fraction: int,
+                   liquidation_fee_rate: int):
+        """
+        Updates the risk params used and re-derives every key
+        """
+        self.cap_payoff = cap_payoff
+        self.maintenance_margin_fraction = maintenance_margin_fraction
+        self.liquidation_fee_rate = liquidation_fee_rate
+        for side in (self._long, self._short):
+            for ident, (pos, _, _) in list(side.positions.items()):
+                c, k = self._invariants(pos)
+                side.positions[ident] = (pos, c, k)
+
+    def crossed(self, price: int, oi_long: int, oi_short: int,
+                oi_long_shares: int, oi_short_shares: int
+                ) -> List[PositionId]:
+        """
+        Returns the (owner, id) of every indexed position liquidatable at
+        the given mid price and side totals, and drops them from the index
+        """
+        liquidatable = []
+        for side, oi_total, oi_total_shares in (
+                (self._long, oi_long, oi_long_shares),
+                (self._short, oi_short, oi_short_shares)):
+            if not side.positions:
+                continue
+
+            # re-key when funding has moved oi per share out of headroom
+            ratio = self._ratio(oi_total, oi_total_shares) \
+                / (1 - self.headroom)
+            if ratio < side.ratio_key \
+                    or ratio > side.ratio_key * (1 + 2 * self.headroom):
+                self.rekey(side.is_long, oi_total, oi_total_shares)
+
+            # pop crossed keys into the watch list for an exact check
+            while side.heap and (side.heap[0][-1] is None
+                                 or side.crosses(side.top(), price)):
+                entry = heapq.heappop(side.heap)
+                ident = entry[-1]
+                if ident is None:
+                    continue
+                side.entries.pop(ident)
+                side.watch[ident] = entry
+
+            for ident, entry in list(side.watch.items()):
+                pos = side.positions[ident][0]
+                if position.liquidatable(
+                        pos, oi_total, oi_total_shares, price,
+                        self.cap_payoff, self.maintenance_margin_fraction,
+                        self.liquidation_fee_rate):
+                    liquidatable.append(ident)
+                    side.discard(ident)
+                elif not side.crosses(-entry[0] if side.is_long
+                                      else entry[0], price):
+                    # price moved back away, return to the heap
+                    del side.watch[ident]
+                    side.entries[ident] = entry
+                    heapq.heappush(side.heap, entry)
+
+        return liquidatable
+
+
+class Keeper:
+    """
+    Watches an OverlayV1Market and liquidates positions as price crosses
+    their liquidation price.
+    """
+
+    def __init__(self, market, account):
+        self.market = market
+        self.account = account
+        params = self._params()
+        self.index = LiquidationIndex(*params)
+
+    def _params(self) -> Tuple[int, int, int]:
+        return (self.market.params(Parameters.CAP_PAYOFF),
+                self.market.params(Parameters.MAINTENANCE_MARGIN_FRACTION),
+                self.market.params(Parameters.LIQUIDATION_FEE_RATE))
+
+    def refresh_params(self):
+        """
+        Re-reads risk params, e.g. after governance calls setRiskParam
+        """
+        self.index.set_params(*self._params())
+        self.index.rekey(True, self.market.oiLong(),
+                         self.market.oiLongShares())
+        self.index.rekey(False, self.market.oiShort(),
+                         self.market.oiShortShares())
+
+    def oi(self) -> Tuple[int, int, int, int]:
+        """
+        Returns (oiLong, oiShort, oiLongShares, oiShortShares) with
+        funding applied up to now, as update() would before liquidating
+        """
+        return (self.market.oiLongCurrent(), self.market.oiShortCurrent(),
+                self.market.oiLongShares(), self.market.oiShortShares())
+
+    def track(self, owner: str, id: int):
+        """
+        Reads a position from the market and indexes it
+        """
+        pos = Info(*self.market.positions(position.get_key(owner, id)))
+        oi_long, oi_short, oi_long_shares, oi_short_shares = self.oi()
+        self.index.add(owner, id, pos,
+                       oi_long if pos.is_long else oi_short,
+                       oi_long_shares if pos.is_long else oi_short_shares)
+
+    def untrack(self, owner: str, id: int):
+        self.index.remove(owner, id)
+
+    def poll(self) -> List[PositionId]:
+        """
+        Returns the positions liquidatable at the feed's latest mid price
+        """
+        data = Data(*self.market.update.call({"from": self.account}))
+        return self.index.crossed(mid(data), *self.oi())
+
+    def run(self) -> List[PositionId]:
+        """
+        Liquidates every position crossed since the last run. Positions
+        whose liquidate reverts (e.g. front-run by another keeper) are
+        re-tracked from the market's current state.
+        """
+        liquidated = []
+        for owner, id in self.poll():
+            try:
+                self.market.liquidate(owner, id, {"from": self.account})
+                liquidated.append((owner, id))
+            except VirtualMachineError:
+                self.track(owner, id)
+        return liquidated
+
+    def run_batch(self, batch_size: int = 100) -> List[PositionId]:
+        """
+        Liquidates every position crossed since the last run with
+        liquidateBatch, batch_size positions per transaction so funding
+        and the feed are read once per batch. Positions the batch skips
+        (e.g. front-run by another keeper), or every position in a batch
+        that reverts, are re-tracked from the market's current state.
+        """
+        liquidated = []
+        crossed = self.poll()
+        for i in range(0, len(crossed), batch_size):
+            batch = crossed[i:i + batch_size]
+            owners, ids = zip(*batch)
+            try:
+                tx = self.market.liquidateBatch(owners, ids,
+                                                {"from": self.account})
+            except VirtualMachineError:
+                for owner, id in batch:
+                    self.track(owner, id)
+                continue
+            done = {(e["owner"], e["positionId"])
+                    for e in tx.events["Liquidate"]} \
+                if "Liquidate" in tx.events else set()
+            for owner, id in batch:
+                if (owner, id) in done:
+                    liquidated.append((owner, id))
+                else:
+                    self.track(owner, id)
+        return liquidated
@@ -0,0 +1,239 @@
+"""
+Off-chain quotes for OverlayV1Market build and unwind.
+
+Quoter reproduces the market's bid/ask wei-for-wei: the rolling volume
+registered through Roller.transform, the notional cap adjusted for front
+and back run bounds, and for builds the oi cap adjusted for the circuit
+breaker. Everything is computed from inputs a client already holds
+(risk params, feed data, the market's snapshots and oi), so a quote is
+a handful of integer operations rather than a round of eth_calls.
+
+Requires that would revert on chain raise ValueError with the revert
+string.
+"""
+from typing import List, NamedTuple, Optional, Sequence, Tuple
+
+from scripts.libraries import position, roller
+from scripts.libraries.fixed_point import (
+    ExpTable, div_down, div_up, exp_up, mul_down, mul_up
+)
+from scripts.libraries.oracle import Data, mid
+from scripts.libraries.position import Info
+from scripts.libraries.risk import Parameters
+from scripts.libraries.roller import Snapshot
+
+ONE = 10 ** 18
+TO_MS = 10 ** 3  # convert seconds to milliseconds
+
+# cap for euler exponent powers in OverlayV1Market
+MAX_NATURAL_EXPONENT = 20 * ONE
+
+
+class Quote(NamedTuple):
+    price: int  # entry price on build, exit price on unwind
+    oi: int  # oi traded
+    cap_oi: int  # oi cap the volume is normalized by
+    volume: int  # rolling volume on the side traded, after the trade
+    snapshot: Snapshot  # volume snapshot the market would store
+
+
+class Quoter:
+    """
+    Quotes for a market with the given risk params, indexed by
+    Parameters. Pass an ExpTable to serve common exponents by lookup.
+    """
+
+    def __init__(self, params: Sequence[int],
+                 exp_table: Optional[ExpTable] = None):
+        self.params = list(params)
+        self.exp_table = exp_table
+
+    @classmethod
+    def from_market(cls, market, exp_table: Optional[ExpTable] = None):
+        return cls([market.params(i) for i in Parameters], exp_table)
+
+    def _exp_up(self, x: int) -> int:
+        if self.exp_table is None:
+            return exp_up(x)
+        return self.exp_table.exp_up(x)
+
+    def front_run_bound(self, data: Data) -> int:
+        """
+        Bound on notional cap to mitigate front-running attack
+        """
+        lmbda = self.params[Parameters.LMBDA]
+        return mul_down(lmbda, data.reserve_over_micro_window)
+
+    def back_run_bound(self, data: Data) -> int:
+        """
+        Bound on notional cap to mitigate back-running attack
+        """
+        average_block_time = self.params[Parameters.AVERAGE_BLOCK_TIME]
+        window = (data.macro_window * ONE * TO_MS) // average_block_time
+        delta = self.params[Parameters.DELTA]
+        return mul_down(mul_down(mul_down(
+            delta, data.reserve_over_micro_window), window), 2 * ONE)
+
+    def cap_notional_adjusted_for_bounds(self, data: Data,
+                                         cap: int) -> int:
+        """
+        Current notional cap with adjustments to prevent front-running
+        and back-running trades
+        """
+        if data.has_reserve:
+            cap = min(cap, self.front_run_bound(data))
+            cap = min(cap, self.back_run_bound(data))
+        return cap
+
+    def circuit_breaker(self, snapshot: Snapshot, cap: int) -> int:
+        """
+        Bound on oi cap from circuit breaker
+        """
+        minted = roller.cumulative(snapshot)
+        target = self.params[Parameters.CIRCUIT_BREAKER_MINT_TARGET]
+        if minted <= target:
+            return cap
+        elif minted >= 2 * target:
+            return 0
+
+        adjustment = 2 * ONE - div_down(minted, target)
+        return mul_down(cap, adjustment)
+
+    def cap_oi_adjusted_for_circuit_breaker(self, snapshot_minted: Snapshot,
+                                            timestamp: int, cap: int) -> int:
+        """
+        Current oi cap lowered in the event the market has printed a lot
+        in the recent past
+        """
+        window = self.params[Parameters.CIRCUIT_BREAKER_WINDOW]
+        snapshot = roller.transform(snapshot_minted, timestamp, window, 0)
+        return self.circuit_breaker(snapshot, cap)
+
+    def _impact(self, volume: int) -> int:
+        delta = self.params[Parameters.DELTA]
+        lmbda = self.params[Parameters.LMBDA]
+        exponent = delta + mul_up(lmbda, volume)
+        if exponent >= MAX_NATURAL_EXPONENT:
+            raise ValueError("OVLV1:slippage>max")
+        return exponent
+
+    def bid(self, data: Data, volume: int) -> int:
+        """
+        Bid price given oracle data and rolling volume
+        """
+        bid = min(data.price_over_micro_window, data.price_over_macro_window)
+        exponent = self._impact(volume)
+        return mul_down(bid, div_down(ONE, self._exp_up(exponent)))
+
+    def ask(self, data: Data, volume: int) -> int:
+        """
+        Ask price given oracle data and rolling volume
+        """
+        ask = max(data.price_over_micro_window, data.price_over_macro_window)
+        exponent = self._impact(volume)
+        return mul_up(ask, self._exp_up(exponent))
+
+    def _register_volume(self, data: Data, snapshot: Snapshot,
+                         timestamp: int, oi: int,
+                         cap_oi: int) -> Snapshot:
+        value = div_up(oi, cap_oi)
+        return roller.transform(snapshot, timestamp, data.micro_window,
+                                value)
+
+    def build(self, data: Data, timestamp: int, snapshot_volume: Snapshot,
+              collateral: int, leverage: int, is_long: bool,
+              snapshot_minted: Optional[Snapshot] = None,
+              oi_total_on_side: Optional[int] = None) -> Quote:
+        """
+        Quotes a build at timestamp. snapshot_volume is the market's
+        snapshotVolumeAsk for longs and snapshotVolumeBid for shorts.
+
+        Given snapshot_minted and the side's oi after funding, also
+        checks the build fits under the circuit breaker adjusted oi cap.
+        """
+        if leverage < ONE:
+            raise ValueError("OVLV1:lev<min")
+        if leverage > self.params[Parameters.CAP_LEVERAGE]:
+            raise ValueError("OVLV1:lev>max")
+        if collateral < self.params[Parameters.MIN_COLLATERAL]:
+            raise ValueError("OVLV1:collateral<min")
+
+        notional = mul_up(collateral, leverage)
+        mid_price = mid(data)
+        oi = div_down(notional, mid_price)
+        if oi == 0:
+            raise ValueError("OVLV1:oi==0")
+
+        cap_notional = self.cap_notional_adjusted_for_bounds(
+            data, self.params[Parameters.CAP_NOTIONAL])
+        cap_oi = div_down(cap_notional, mid_price)
+
+        snapshot = self._register_volume(data, snapshot_volume, timestamp,
+                                         oi, cap_oi)
+        volume = roller.cumulative(snapshot)
+        price = self.ask(data, volume) if is_long else self.bid(data, volume)
+
+        if snapshot_minted is not None and oi_total_on_side is not None:
+            cap_oi_circuited = self.cap_oi_adjusted_for_circuit_breaker(
+                snapshot_minted, timestamp, cap_oi)
+            if oi_total_on_side + oi > cap_oi_circuited:
+                raise ValueError("OVLV1:oi>cap")
+
+        return Quote(price, oi, cap_oi, volume, snapshot)
+
+    def build_batch(self, data: Data, timestamp: int,
+                    snapshot_volume_ask: Snapshot,
+                    snapshot_volume_bid: Snapshot,
+                    builds: Sequence[Tuple[int, int, bool]]) -> List[Quote]:
+        """
+        Quotes builds of (collateral, leverage, is_long) made in turn at
+        timestamp, as buildBatch makes them. Each build's volume moves the
+        price for the builds after it on the same side.
+        """
+        snapshots = {True: snapshot_volume_ask, False: snapshot_volume_bid}
+        quotes = []
+        for collateral, leverage, is_long in builds:
+            quote = self.build(data, timestamp, snapshots[is_long],
+                               collateral, leverage, is_long)
+            snapshots[is_long] = quote.snapshot
+            quotes.append(quote)
+        return quotes
+
+    def build_amount(self, builds: Sequence[Tuple[int, int, bool]]) -> int:
+        """
+        OVL transferred in from the trader on builds of (collateral,
+        leverage, is_long): collateral plus trading fees on notional
+        """
+        rate = self.params[Parameters.TRADING_FEE_RATE]
+        return sum(collateral + mul_up(mul_up(collateral, leverage), rate)
+                   for collateral, leverage, _ in builds)
+
+    def unwind(self, data: Data, timestamp: int, snapshot_volume: Snapshot,
+               pos: Info, fraction: int, oi_total_on_side: int,
+               oi_total_shares_on_side: int) -> Quote:
+        """
+        Quotes unwinding fraction of a position at timestamp, given the
+        side's oi after funding. snapshot_volume is the market's
+        snapshotVolumeBid for longs and snapshotVolumeAsk for shorts.
+        """
+        if fraction > ONE:
+            raise ValueError("OVLV1:fraction>max")
+        # only keep 4 decimal precision (1 bps) for fraction given
+        fraction -= fraction % 10 ** 14
+        if fraction == 0:
+            raise ValueError("OVLV1:fraction<min")
+
+        # no circuit breaker so traders don't get stuck in a position
+        mid_price = mid(data)
+        cap_notional = self.cap_notional_adjusted_for_bounds(
+            data, self.params[Parameters.CAP_NOTIONAL])
+        cap_oi = div_down(cap_notional, mid_price)
+
+        oi = position.oi_current(pos, fraction, oi_total_on_side,
+                                 oi_total_shares_on_side)
+        snapshot = self._register_volume(data, snapshot_volume, timestamp,
+                                         oi, cap_oi)
+        volume = roller.cumulative(snapshot)
+        price = self.bid(data, volume) if pos.is_long \
+            else self.ask(data, volume)
+        return Quote(price, oi, cap_oi, volume, snapshot)
@@ -0,0 +1,624 @@
+"""
+Discrete-event simulator of OverlayV1Market.
+
+MarketSimulator holds the market's storage (risk params, oi and oi
+shares, the volume and mint rollers, positions, last update) and steps
+it through build, unwind, liquidate and update exactly as the contract
+would: funding, feed data validity, the notional cap adjusted for front
+and back run bounds, the circuit breaker, rolling volume impact, and the
+liquidatable checks, all on the integer ports in scripts/libraries.
+
+Calls that would revert on chain raise Revert with the revert string and
+leave the state untouched, including the funding payment update() would
+have made. `run` drives the market from a sequence of Event tuples,
+counting reverts rather than raising.
+
+Prices come from a feed callable mapping a timestamp to Oracle Data,
+e.g. `replay_feed` over a TwapReplay of recorded Chainlink rounds. The
+Arbitrum sequencer check, pausing and emergency shutdown are not
+modelled.
+"""
+from typing import (
+    Callable, Dict, Iterable, List, NamedTuple, Optional, Sequence, Tuple
+)
+
+from scripts.libraries import position, roller
+from scripts.libraries.fixed_point import (
+    ExpTable, div_down, div_up, exp_up, mul_down, mul_up, sub_floor
+)
+from scripts.libraries.oracle import Data, mid
+from scripts.libraries.position import Info
+from scripts.libraries.risk import (
+    Parameters, check_risk_param as check_param_bounds, check_risk_params
+)
+from scripts.libraries.roller import Snapshot
+from scripts.libraries.tick import TickTable, price_to_tick
+from scripts.market.funding import pay_funding
+from scripts.market.quote import Quoter
+
+ONE = 10 ** 18
+
+# cap for euler exponent powers in OverlayV1Market
+MAX_NATURAL_EXPONENT = 20 * ONE
+
+Feed = Callable[[int], Data]
+
+
+class Revert(ValueError):
+    """
+    Raised where the market call would revert
+    """
+
+
+class Build(NamedTuple):
+    sender: str
+    position_id: int
+    oi: int
+    debt: int
+    is_long: bool
+    price: int
+    oi_after_build: int
+    oi_shares_after_build: int
+    trading_fee: int
+
+
+class Unwind(NamedTuple):
+    sender: str
+    position_id: int
+    fraction: int
+    mint: int
+    price: int
+    oi_after_unwind: int
+    oi_shares_after_unwind: int
+    trading_fee: int
+
+
+class Liquidate(NamedTuple):
+    sender: str
+    owner: str
+    position_id: int
+    mint: int
+    price: int
+    oi_after_liquidate: int
+    oi_shares_after_liquidate: int
+    liquidation_fee: int
+
+
+class Update(NamedTuple):
+    oi_long: int
+    oi_short: int
+
+
+class Event(NamedTuple):
+    """
+    A market call at timestamp. kind is one of "build", "build_batch",
+    "unwind", "unwind_batch", "liquidate", "liquidate_batch" or "update",
+    with args following timestamp in the MarketSimulator method of the
+    same name
+    """
+    timestamp: int
+    kind: str
+    args: tuple = ()
+
+
+class ReplayFeed:
+    """
+    Feed reading from a scripts.feeds.chainlink.replay.TwapReplay, as an
+    OverlayV1ChainlinkFeed over the replayed rounds would. Picklable, so
+    simulations can be shipped to worker processes
+    """
+
+    def __init__(self, replay):
+        self.replay = replay
+
+    def __call__(self, timestamp: int) -> Data:
+        try:
+            micro, macro, macro_ago = self.replay.latest(timestamp)
+        except ValueError as err:
+            raise Revert(str(err))
+        return Data(timestamp, self.replay.micro_window,
+                    self.replay.macro_window, micro, macro, macro_ago, 0,
+                    False)
+
+
+def replay_feed(replay) -> Feed:
+    return ReplayFeed(replay)
+
+
+def check_risk_param(params: Sequence[int], name: Parameters, value: int,
+                     macro_window: int):
+    """
+    Checks setting param name to value in a market with params, as
+    OverlayV1Market._checkRiskParam does
+    """
+    # max leverage must not be immediately liquidatable given spread,
+    # maintenance margin and liquidation fee rate
+    if name in (Parameters.DELTA, Parameters.CAP_LEVERAGE,
+                Parameters.MAINTENANCE_MARGIN_FRACTION,
+                Parameters.LIQUIDATION_FEE_RATE):
+        params = list(params)
+        params[name] = value
+        cap_leverage = params[Parameters.CAP_LEVERAGE]
+        delta = params[Parameters.DELTA]
+        maintenance_margin_fraction = \
+            params[Parameters.MAINTENANCE_MARGIN_FRACTION]
+        liquidation_fee_rate = params[Parameters.LIQUIDATION_FEE_RATE]
+        if cap_leverage > div_down(ONE, 2 * delta + div_down(
+                maintenance_margin_fraction, ONE - liquidation_fee_rate)):
+            raise Revert("OVLV1: max lev immediately liquidatable")
+
+    # price drift must not exceed max exponent in dataIsValid
+    if name == Parameters.PRICE_DRIFT_UPPER_LIMIT \
+            and value * macro_window >= MAX_NATURAL_EXPONENT:
+        raise Revert("OVLV1: price drift exceeds max exp")
+
+
+def check_params(params: Sequence[int], macro_window: int):
+    """
+    Checks risk params as OverlayV1Factory.deployMarket and
+    OverlayV1Market.initialize do
+    """
+    try:
+        check_risk_params(params)
+    except ValueError as err:
+        raise Revert(str(err))
+    check_risk_param(params, Parameters.CAP_LEVERAGE,
+                     params[Parameters.CAP_LEVERAGE], macro_window)
+    check_risk_param(params, Parameters.PRICE_DRIFT_UPPER_LIMIT,
+                     params[Parameters.PRICE_DRIFT_UPPER_LIMIT],
+                     macro_window)
+
+
+class MarketSimulator:
+    """
+    State of a single market initialized with params at timestamp.
+    Pass a TickTable to serve price to tick and tick to price by lookup
+    and an ExpTable for common impact exponents.
+    """
+
+    # attributes calls change, other than positions
+    _STATE = ("oi_long", "oi_short", "oi_long_shares", "oi_short_shares",
+              "snapshot_volume_bid", "snapshot_volume_ask",
+              "snapshot_minted", "total_positions", "timestamp_update_last",
+              "minted", "trading_fees", "liquidation_fees",
+              "circuit_breaker_trips")
+
+    def __init__(self, params: Sequence[int], feed: Feed, timestamp: int,
+                 tick_table: Optional[TickTable] = None,
+                 exp_table: Optional[ExpTable] = None):
+        data = feed(timestamp)
+        if mid(data) == 0:
+            raise Revert("OVLV1:!data")
+        check_params(params, data.macro_window)
+
+        self.params = list(params)
+        self.feed = feed
+        self.quoter = Quoter(self.params, exp_table)
+        self.tick_table = tick_table
+
+        self.oi_long = 0
+        self.oi_short = 0
+        self.oi_long_shares = 0
+        self.oi_short_shares = 0
+        self.snapshot_volume_bid = Snapshot(0, 0, 0)
+        self.snapshot_volume_ask = Snapshot(0, 0, 0)
+        self.snapshot_minted = Snapshot(0, 0, 0)
+        self.positions: Dict[Tuple[str, int], Info] = {}
+        self.total_positions = 0
+        self.timestamp_update_last = timestamp
+        self.dp_upper_limit = exp_up(
+            params[Parameters.PRICE_DRIFT_UPPER_LIMIT] * data.macro_window)
+
+        # running totals for backtests
+        self.minted = 0  # net ovl minted (+) or burned (-) on pnl
+        self.trading_fees = 0
+        self.liquidation_fees = 0
+        self.circuit_breaker_trips = 0  # builds with oi cap lowered
+
+    def _param(self, name: Parameters) -> int:
+        return self.params[name]
+
+    def _price_to_tick(self, price: int) -> int:
+        if self.tick_table is None:
+            return price_to_tick(price)
+        return self.tick_table.price_to_tick(price)
+
+    def data_is_valid(self, data: Data) -> bool:
+        """
+        Sanity check on data fetched from the feed, as in
+        OverlayV1Market.dataIsValid
+        """
+        dp_lower_limit = div_down(ONE, self.dp_upper_limit)
+        price_now = data.price_over_macro_window
+        price_last = data.price_one_macro_window_ago
+        if price_last == 0 or price_now == 0:
+            return False
+        dp = div_up(price_now, price_last)
+        return dp_lower_limit <= dp <= self.dp_upper_limit
+
+    def _update(self, timestamp: int) -> Tuple[int, int, Data]:
+        """
+        Returns (oiLong, oiShort, data) update() would leave the market
+        with at timestamp, without storing them
+        """
+        if timestamp < self.timestamp_update_last:
+            raise ValueError("timestamp before last update")
+        oi_long, oi_short = pay_funding(
+            self.oi_long, self.oi_short,
+            timestamp - self.timestamp_update_last, self._param(Parameters.K))
+
+        data = self.feed(timestamp)
+        if not self.data_is_valid(data):
+            raise Revert("OVLV1:!data")
+        return oi_long, oi_short, data
+
+    def _liquidatable(self, pos: Info, oi_total: int, oi_total_shares: int,
+                      price: int) -> bool:
+        return position.liquidatable(
+            pos, oi_total, oi_total_shares, price,
+            self._param(Parameters.CAP_PAYOFF),
+            self._param(Parameters.MAINTENANCE_MARGIN_FRACTION),
+            self._param(Parameters.LIQUIDATION_FEE_RATE))
+
+    def _register_mint_or_burn(self, timestamp: int, value: int):
+        self.snapshot_minted = roller.transform(
+            self.snapshot_minted, timestamp,
+            self._param(Parameters.CIRCUIT_BREAKER_WINDOW), value)
+        self.minted += value
+
+    def update(self, timestamp: int) -> Update:
+        """
+        Pays funding through timestamp and checks the feed's data
+        """
+        oi_long, oi_short, _ = self._update(timestamp)
+        self.oi_long, self.oi_short = oi_long, oi_short
+        self.timestamp_update_last = timestamp
+        return Update(oi_long, oi_short)
+
+    def build(self, timestamp: int, sender: str, collateral: int,
+              leverage: int, is_long: bool,
+              price_limit: Optional[int] = None) -> Build:
+        """
+        Builds a position for sender. No price_limit accepts any price
+        """
+        if leverage < ONE:
+            raise Revert("OVLV1:lev<min")
+        if leverage > self._param(Parameters.CAP_LEVERAGE):
+            raise Revert("OVLV1:lev>max")
+        if collateral < self._param(Parameters.MIN_COLLATERAL):
+            raise Revert("OVLV1:collateral<min")
+
+        oi_long, oi_short, data = self._update(timestamp)
+        snapshot_volume = self.snapshot_volume_ask if is_long \
+            else self.snapshot_volume_bid
+        try:
+            quote = self.quoter.build(data, timestamp, snapshot_volume,
+                                      collateral, leverage, is_long)
+        except ValueError as err:
+            raise Revert(str(err))
+
+        if price_limit is not None and (quote.price > price_limit if is_long
+                                        else quote.price < price_limit):
+            raise Revert("OVLV1:slippage>max")
+
+        # add to the side's oi and oi shares, checking the circuit breaker
+        oi_total = oi_long if is_long else oi_short
+        oi_total_shares = self.oi_long_shares if is_long \
+            else self.oi_short_shares
+        oi_shares = position.calc_oi_shares(quote.oi, oi_total,
+                                            oi_total_shares)
+        oi_total += quote.oi
+        oi_total_shares += oi_shares
+        cap_oi_circuited = self.quoter.cap_oi_adjusted_for_circuit_breaker(
+            self.snapshot_minted, timestamp, quote.cap_oi)
+        if oi_total > cap_oi_circuited:
+            raise Revert("OVLV1:oi>cap")
+
+        mid_price = mid(data)
+        notional = mul_up(collateral, leverage)
+        debt = notional - collateral
+        pos = Info(notional, debt, self._price_to_tick(mid_price),
+                   self._price_to_tick(quote.price), is_long, False,
+                   oi_shares, ONE // position.PRECISION_CHANGER)
+        if self._liquidatable(pos, oi_total, oi_total_shares, mid_price):
+            raise Revert("OVLV1:liquidatable")
+
+        # no reverts past here, so store
+        trading_fee = mul_up(notional,
+                             self._param(Parameters.TRADING_FEE_RATE))
+        if cap_oi_circuited < quote.cap_oi:
+            self.circuit_breaker_trips += 1
+        if is_long:
+            self.oi_long, self.oi_short = oi_total, oi_short
+            self.oi_long_shares = oi_total_shares
+            self.snapshot_volume_ask = quote.snapshot
+        else:
+            self.oi_long, self.oi_short = oi_long, oi_total
+            self.oi_short_shares = oi_total_shares
+            self.snapshot_volume_bid = quote.snapshot
+        self.timestamp_update_last = timestamp
+
+        position_id = self.total_positions
+        self.positions[(sender, position_id)] = pos
+        self.total_positions += 1
+        self.trading_fees += trading_fee
+        return Build(sender, position_id, quote.oi, debt, is_long,
+                     quote.price, oi_total, oi_total_shares, trading_fee)
+
+    def build_batch(self, timestamp: int, sender: str,
+                    builds: Sequence[Tuple[int, int, bool, Optional[int]]]
+                    ) -> List[Build]:
+        """
+        Builds a position for sender for each (collateral, leverage,
+        is_long, price limit) with a single update as buildBatch does.
+        Raises Revert and leaves the state untouched if any of the builds
+        would on its own
+        """
+        return self._batch(self.build, timestamp, sender, builds)
+
+    def _batch(self, call: Callable, timestamp: int, sender: str,
+               calls: Iterable[tuple]) -> list:
+        # calls at the same timestamp pay no further funding and see the
+        # same feed data, so apply in turn, restoring state on a revert
+        state = {name: getattr(self, name) for name in self._STATE}
+        state["positions"] = dict(self.positions)
+        try:
+            return [call(timestamp, sender, *args) for args in calls]
+        except Revert:
+            for name, value in state.items():
+                setattr(self, name, value)
+            raise
+
+    def _reduce_oi_and_oi_shares(self, pos: Info, fraction: int):
+        if pos.is_long:
+            self.oi_long = sub_floor(self.oi_long, position.oi_current(
+                pos, fraction, self.oi_long, self.oi_long_shares))
+            self.oi_long_shares -= position.oi_shares_current(pos, fraction)
+        else:
+            self.oi_short = sub_floor(self.oi_short, position.oi_current(
+                pos, fraction, self.oi_short, self.oi_short_shares))
+            self.oi_short_shares -= position.oi_shares_current(pos, fraction)
+
+    def unwind(self, timestamp: int, sender: str, position_id: int,
+               fraction: int, price_limit: Optional[int] = None) -> Unwind:
+        """
+        Unwinds fraction of sender's position. No price_limit accepts any
+        price
+        """
+        if fraction > ONE:
+            raise Revert("OVLV1:fraction>max")
+        fraction -= fraction % position.PRECISION_CHANGER
+        if fraction == 0:
+            raise Revert("OVLV1:fraction<min")
+
+        oi_long, oi_short, data = self._update(timestamp)
+        pos = self.positions.get((sender, position_id))
+        if pos is None or not position.exists(pos):
+            raise Revert("OVLV1:!position")
+
+        oi_total = oi_long if pos.is_long else oi_short
+        oi_total_shares = self.oi_long_shares if pos.is_long \
+            else self.oi_short_shares
+        if self._liquidatable(pos, oi_total, oi_total_shares, mid(data)):
+            raise Revert("OVLV1:liquidatable")
+
+        snapshot_volume = self.snapshot_volume_bid if pos.is_long \
+            else self.snapshot_volume_ask
+        try:
+            quote = self.quoter.unwind(data, timestamp, snapshot_volume, pos,
+                                       fraction, oi_total, oi_total_shares)
+        except ValueError as err:
+            raise Revert(str(err))
+
+        price = quote.price
+        if price_limit is not None and (price < price_limit if pos.is_long
+                                        else price > price_limit):
+            raise Revert("OVLV1:slippage>max")
+
+        cap_payoff = self._param(Parameters.CAP_PAYOFF)
+        value = position.value(pos, fraction, oi_total, oi_total_shares,
+                               price, cap_payoff)
+        cost = position.cost(pos, fraction)
+        trading_fee = min(position.trading_fee(
+            pos, fraction, oi_total, oi_total_shares, price, cap_payoff,
+            self._param(Parameters.TRADING_FEE_RATE)), value)
+        fraction_remaining = position.updated_fraction_remaining(pos,
+                                                                 fraction)
+
+        # no reverts past here, so store
+        self.oi_long, self.oi_short = oi_long, oi_short
+        self.timestamp_update_last = timestamp
+        if pos.is_long:
+            self.snapshot_volume_bid = quote.snapshot
+        else:
+            self.snapshot_volume_ask = quote.snapshot
+
+        self._reduce_oi_and_oi_shares(pos, fraction)
+        self._register_mint_or_burn(timestamp, value - cost)
+
+        pos = pos._replace(
+            oi_shares=pos.oi_shares - position.oi_shares_current(pos,
+                                                                 fraction),
+            fraction_remaining=fraction_remaining)
+        # ensure there are no dead shares left
+        if pos.fraction_remaining == 0 and pos.oi_shares > 0:
+            self._reduce_oi_and_oi_shares(pos, ONE)
+            pos = pos._replace(oi_shares=0)
+        self.positions[(sender, position_id)] = pos
+        self.trading_fees += trading_fee
+
+        return Unwind(sender, position_id, fraction, value - cost, price,
+                      self.oi_long if pos.is_long else self.oi_short,
+                      self.oi_long_shares if pos.is_long
+                      else self.oi_short_shares,
+                      trading_fee)
+
+    def unwind_batch(self, timestamp: int, sender: str,
+                     unwinds: Sequence[Tuple[int, int, Optional[int]]]
+                     ) -> List[Unwind]:
+        """
+        Unwinds each (position id, fraction, price limit) of sender's with
+        a single update as unwindBatch does. Raises Revert and leaves the
+        state untouched if any of the unwinds would on its own
+        """
+        return self._batch(self.unwind, timestamp, sender, unwinds)
+
+    def _liquidate(self, sender: str, owner: str, position_id: int,
+                   pos: Info, price: int) -> Optional[Liquidate]:
+        """
+        Liquidates owner's position at price with funding already paid,
+        or returns None if it isn't liquidatable
+        """
+        oi_total = self.oi_long if pos.is_long else self.oi_short
+        oi_total_shares = self.oi_long_shares if pos.is_long \
+            else self.oi_short_shares
+        if not self._liquidatable(pos, oi_total, oi_total_shares, price):
+            return None
+
+        value = position.value(pos, ONE, oi_total, oi_total_shares, price,
+                               self._param(Parameters.CAP_PAYOFF))
+        cost = position.cost(pos, ONE)
+        liquidation_fee = mul_down(
+            value, self._param(Parameters.LIQUIDATION_FEE_RATE))
+        margin_to_burn = mul_down(
+            value - liquidation_fee,
+            self._param(Parameters.MAINTENANCE_MARGIN_BURN_RATE))
+        mint = value - cost - margin_to_burn
+
+        self._reduce_oi_and_oi_shares(pos, ONE)
+        self._register_mint_or_burn(self.timestamp_update_last, mint)
+        self.positions[(owner, position_id)] = pos._replace(
+            liquidated=True, oi_shares=0, fraction_remaining=0)
+        self.liquidation_fees += liquidation_fee
+
+        return Liquidate(sender, owner, position_id, mint, price,
+                         self.oi_long if pos.is_long else self.oi_short,
+                         self.oi_long_shares if pos.is_long
+                         else self.oi_short_shares,
+                         liquidation_fee)
+
+    def liquidate(self, timestamp: int, sender: str, owner: str,
+                  position_id: int) -> Liquidate:
+        """
+        Liquidates owner's position on behalf of sender
+        """
+        pos = self.positions.get((owner, position_id))
+        if pos is None or not position.exists(pos):
+            raise Revert("OVLV1:!position")
+
+        oi_long, oi_short, data = self._update(timestamp)
+        state = (self.oi_long, self.oi_short, self.timestamp_update_last)
+        self.oi_long, self.oi_short = oi_long, oi_short
+        self.timestamp_update_last = timestamp
+
+        # mid price without volume to prevent manipulation of liquidations
+        result = self._liquidate(sender, owner, position_id, pos, mid(data))
+        if result is None:
+            self.oi_long, self.oi_short, self.timestamp_update_last = state
+            raise Revert("OVLV1:!liquidatable")
+        return result
+
+    def liquidate_batch(self, timestamp: int, sender: str,
+                        keys: Sequence[Tuple[str, int]]) -> List[Liquidate]:
+        """
+        Liquidates each liquidatable (owner, id) position in keys on behalf
+        of sender with a single update, skipping the rest as
+        liquidateBatch does
+        """
+        oi_long, oi_short, data = self._update(timestamp)
+        self.oi_long, self.oi_short = oi_long, oi_short
+        self.timestamp_update_last = timestamp
+
+        price = mid(data)
+        liquidated = []
+        for owner, position_id in keys:
+            pos = self.positions.get((owner, position_id))
+            if pos is None or not position.exists(pos):
+                continue
+            result = self._liquidate(sender, owner, position_id, pos, price)
+            if result is not None:
+                liquidated.append(result)
+        return liquidated
+
+    def liquidatable(self, timestamp: int, owner: str,
+                     position_id: int) -> bool:
+        """
+        Whether owner's position could be liquidated at timestamp
+        """
+        pos = self.positions.get((owner, position_id))
+        if pos is None or not position.exists(pos):
+            return False
+        oi_long, oi_short, data = self._update(timestamp)
+        return self._liquidatable(
+            pos, oi_long if pos.is_long else oi_short,
+            self.oi_long_shares if pos.is_long else self.oi_short_shares,
+            mid(data))
+
+    def liquidatable_positions(
+            self, timestamp: int,
+            keys: Iterable[Tuple[str, int]]) -> List[Tuple[str, int]]:
+        """
+        Which of the (owner, id) positions in keys could be liquidated at
+        timestamp. Funding and the feed are evaluated once for all of them
+        """
+        oi_long, oi_short, data = self._update(timestamp)
+        price = mid(data)
+        liquidatable = []
+        for key in keys:
+            pos = self.positions.get(key)
+            if pos is None or not position.exists(pos):
+                continue
+            if self._liquidatable(
+                    pos, oi_long if pos.is_long else oi_short,
+                    self.oi_long_shares if pos.is_long
+                    else self.oi_short_shares, price):
+                liquidatable.append(key)
+        return liquidatable
+
+    def set_risk_param(self, timestamp: int, name: Parameters, value: int):
+        """
+        Sets a risk param as governance would through
+        OverlayV1Factory.setRiskParam. Pays funding but doesn't fetch
+        from the feed other than for the price drift checks
+        """
+        try:
+            check_param_bounds(name, value)
+        except ValueError as err:
+            raise Revert(str(err))
+
+        macro_window = 0
+        if name == Parameters.PRICE_DRIFT_UPPER_LIMIT:
+            macro_window = self.feed(timestamp).macro_window
+        check_risk_param(self.params, name, value, macro_window)
+
+        if timestamp < self.timestamp_update_last:
+            raise ValueError("timestamp before last update")
+        self.oi_long, self.oi_short = pay_funding(
+            self.oi_long, self.oi_short,
+            timestamp - self.timestamp_update_last, self._param(Parameters.K))
+        self.timestamp_update_last = timestamp
+
+        if name == Parameters.PRICE_DRIFT_UPPER_LIMIT:
+            self.dp_upper_limit = exp_up(value * macro_window)
+        self.params[name] = value
+        self.quoter.params[name] = value
+
+    def apply(self, event: Event):
+        """
+        Applies a single event, raising Revert where the market would
+        """
+        return getattr(self, event.kind)(event.timestamp, *event.args)
+
+    def run(self, events: Iterable[Event]) -> Tuple[List, int]:
+        """
+        Applies events in order. Returns the resulting market events and
+        the number of calls that reverted
+        """
+        results = []
+        reverts = 0
+        for event in events:
+            try:
+                results.append(self.apply(event))
+            except Revert:
+                reverts += 1
+        return results, reverts
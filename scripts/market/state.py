@@ -0,0 +1,145 @@
+"""
+Typed snapshot of OverlayV1Market state.
+
+`load_state` reads everything a client needs to quote or mark positions
+(risk params, oi and oi shares, rolling snapshots, last update and the
+feed's latest data) through OverlayV1MarketLens in a single eth_call, so
+every field is consistent as of one block. `load_positions` does the same
+for batches of (owner, id) pairs, paging them through
+OverlayV1MarketLens.positionStates with each position's current oi,
+value, notional with PnL and liquidation status derived on chain.
+
+`from_calls` falls back to the
+individual getters where no lens is deployed, at the cost of one round
+trip per field and no guarantee the reads land on the same block unless
+block_identifier is pinned.
+"""
+from typing import Iterable, Iterator, List, NamedTuple, Tuple
+
+from brownie import web3
+
+from scripts.libraries.oracle import Data
+from scripts.libraries.position import Info
+from scripts.libraries.risk import Parameters
+from scripts.libraries.roller import Snapshot
+from scripts.market.funding import pay_funding
+
+
+class MarketState(NamedTuple):
+    params: List[int]  # risk params indexed by Parameters
+    oi_long: int
+    oi_short: int
+    oi_long_shares: int
+    oi_short_shares: int
+    snapshot_volume_bid: Snapshot
+    snapshot_volume_ask: Snapshot
+    snapshot_minted: Snapshot
+    timestamp_update_last: int
+    dp_upper_limit: int
+    is_shutdown: bool
+    data: Data  # latest data from the market's feed
+    block_number: int
+    timestamp: int  # block timestamp of the read
+
+    @classmethod
+    def from_tuple(cls, state) -> "MarketState":
+        """
+        Builds from the MarketState struct returned by the lens
+        """
+        (params, oi_long, oi_short, oi_long_shares, oi_short_shares,
+         bid, ask, minted, timestamp_update_last, dp_upper_limit,
+         is_shutdown, data, block_number, timestamp) = state
+        return cls(list(params), oi_long, oi_short, oi_long_shares,
+                   oi_short_shares, Snapshot(*bid), Snapshot(*ask),
+                   Snapshot(*minted), timestamp_update_last,
+                   dp_upper_limit, bool(is_shutdown), Data(*data),
+                   block_number, timestamp)
+
+    def oi_after_funding(self, timestamp: int) -> Tuple[int, int]:
+        """
+        Returns (oiLong, oiShort) once funding is paid through timestamp,
+        i.e. what the market would store on an update at timestamp
+        """
+        return pay_funding(self.oi_long, self.oi_short,
+                           timestamp - self.timestamp_update_last,
+                           self.params[Parameters.K])
+
+
+class PositionState(NamedTuple):
+    owner: str
+    id: int
+    info: Info
+    oi: int  # current oi accounting for funding
+    cost: int  # collateral remaining at entry
+    value: int
+    notional_with_pnl: int
+    maintenance_margin: int
+    liquidation_fee: int  # reward to liquidator were it liquidated now
+    liquidatable: bool
+
+    @classmethod
+    def from_tuple(cls, state) -> "PositionState":
+        """
+        Builds from a PositionState struct returned by the lens
+        """
+        owner, id, info, *rest = state
+        liquidatable = bool(rest.pop())
+        return cls(str(owner), id, Info(*info), *rest, liquidatable)
+
+
+def load_state(lens, market, block_identifier=None) -> MarketState:
+    """
+    Reads market state through the lens in one call
+    """
+    state = lens.marketState(market, block_identifier=block_identifier)
+    return MarketState.from_tuple(state)
+
+
+def from_calls(market, feed, block_identifier=None) -> MarketState:
+    """
+    Reads market state field by field through the market and feed
+    getters. Pin block_identifier for a consistent read
+    """
+    if block_identifier is None:
+        block_identifier = web3.eth.block_number
+    block = web3.eth.get_block(block_identifier)
+    kwargs = {"block_identifier": block.number}
+    params = [market.params(i, **kwargs) for i in Parameters]
+    return MarketState(
+        params,
+        market.oiLong(**kwargs),
+        market.oiShort(**kwargs),
+        market.oiLongShares(**kwargs),
+        market.oiShortShares(**kwargs),
+        Snapshot(*market.snapshotVolumeBid(**kwargs)),
+        Snapshot(*market.snapshotVolumeAsk(**kwargs)),
+        Snapshot(*market.snapshotMinted(**kwargs)),
+        market.timestampUpdateLast(**kwargs),
+        market.dpUpperLimit(**kwargs),
+        market.isShutdown(**kwargs),
+        Data(*feed.latest(**kwargs)),
+        block.number,
+        block.timestamp,
+    )
+
+
+def load_positions(lens, market, keys: Iterable[Tuple[str, int]],
+                   page_size: int = 500,
+                   block_identifier=None) -> Iterator[PositionState]:
+    """
+    Yields the derived state of each (owner, id) in keys, reading
+    page_size positions per call through the lens. Every page is read at
+    the same block
+    """
+    if block_identifier is None:
+        block_identifier = web3.eth.block_number
+
+    keys = list(keys)
+    for start in range(0, len(keys), page_size):
+        page = keys[start:start + page_size]
+        owners = [owner for owner, _ in page]
+        ids = [id for _, id in page]
+        states = lens.positionStates(market, owners, ids,
+                                     block_identifier=block_identifier)
+        for state in states:
+            yield PositionState.from_tuple(state)
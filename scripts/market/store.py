@@ -0,0 +1,261 @@
+"""
+Append-only columnar store of a market's event history.
+
+Each event type is a table directory holding one raw little-endian file
+per column plus a meta.json with the committed row count. Rows are keyed
+by (block, logIndex) and only ever appended in that order, so block
+ranges are a binary search on the block column.
+
+Amounts are fixed-width uint256/int256 stored as four little-endian
+uint64 limbs, ticks as 3 byte int24 and addresses as 20 raw bytes.
+Readers memory-map the column files and hand back views without
+copying; `to_float` and `to_int` decode limbs only when asked.
+"""
+import json
+import os
+from typing import Dict, Iterable, Optional, Tuple
+
+import numpy as np
+
+from scripts.libraries.tick import price_to_tick
+
+DTYPES = {
+    "block": np.dtype("<u8"),
+    "logIndex": np.dtype("<u4"),
+    "address": np.dtype((np.uint8, 20)),
+    "bool": np.dtype("u1"),
+    "int24": np.dtype((np.uint8, 3)),
+    "uint256": np.dtype(("<u8", 4)),
+    "int256": np.dtype(("<u8", 4)),
+}
+
+# (column, type) per table. entryTick is derived from the Build price
+SCHEMAS = {
+    "Build": (
+        ("sender", "address"),
+        ("positionId", "uint256"),
+        ("oi", "uint256"),
+        ("debt", "uint256"),
+        ("isLong", "bool"),
+        ("price", "uint256"),
+        ("entryTick", "int24"),
+        ("oiAfterBuild", "uint256"),
+        ("oiSharesAfterBuild", "uint256"),
+    ),
+    "Unwind": (
+        ("sender", "address"),
+        ("positionId", "uint256"),
+        ("fraction", "uint256"),
+        ("mint", "int256"),
+        ("price", "uint256"),
+        ("oiAfterUnwind", "uint256"),
+        ("oiSharesAfterUnwind", "uint256"),
+    ),
+    "Liquidate": (
+        ("sender", "address"),
+        ("owner", "address"),
+        ("positionId", "uint256"),
+        ("mint", "int256"),
+        ("price", "uint256"),
+        ("oiAfterLiquidate", "uint256"),
+        ("oiSharesAfterLiquidate", "uint256"),
+    ),
+    "Update": (
+        ("oiLong", "uint256"),
+        ("oiShort", "uint256"),
+    ),
+}
+
+KEY_COLUMNS = (("block", "block"), ("logIndex", "logIndex"))
+
+UINT64_MASK = 2 ** 64 - 1
+
+
+def _encode(abi_type: str, value) -> bytes:
+    if abi_type == "address":
+        return bytes.fromhex(value[2:])
+    if abi_type == "bool":
+        return b"\x01" if value else b"\x00"
+    if abi_type == "int24":
+        return value.to_bytes(3, "little", signed=True)
+    if abi_type in ("uint256", "int256"):
+        return value.to_bytes(32, "little", signed=(abi_type == "int256"))
+    return int(value).to_bytes(DTYPES[abi_type].itemsize, "little")
+
+
+def _negate(limbs: np.ndarray) -> np.ndarray:
+    """
+    Two's complement negation of rows of uint64 limbs, lowest limb first
+    """
+    out = ~limbs
+    carry = np.ones(len(limbs), dtype=bool)
+    for i in range(limbs.shape[1]):
+        out[:, i] += carry
+        carry &= out[:, i] == 0
+    return out
+
+
+def to_float(limbs: np.ndarray, signed: bool = False) -> np.ndarray:
+    """
+    Decodes (n, 4) uint64 limbs to float64, e.g. amounts in wei
+    """
+    limbs = np.asarray(limbs)
+    negative = np.zeros(len(limbs), dtype=bool)
+    if signed:
+        negative = limbs[:, -1] >= 2 ** 63
+        if negative.any():
+            limbs = np.where(negative[:, None], _negate(limbs), limbs)
+
+    out = np.zeros(len(limbs), dtype=np.float64)
+    for i in reversed(range(limbs.shape[1])):
+        out = out * 2.0 ** 64 + limbs[:, i].astype(np.float64)
+    return np.where(negative, -out, out)
+
+
+def to_int(limbs: np.ndarray, signed: bool = False) -> np.ndarray:
+    """
+    Decodes (n, 4) uint64 limbs to an object array of exact python ints
+    """
+    limbs = np.asarray(limbs)
+    out = np.zeros(len(limbs), dtype=object)
+    for i in reversed(range(limbs.shape[1])):
+        out = (out << 64) + limbs[:, i].astype(object)
+    if signed:
+        out = np.where(out >= 2 ** 255, out - 2 ** 256, out)
+    return out
+
+
+def to_int24(raw: np.ndarray) -> np.ndarray:
+    """
+    Decodes (n, 3) little-endian bytes to int32 ticks
+    """
+    raw = np.asarray(raw).astype(np.int32)
+    value = raw[:, 0] | (raw[:, 1] << 8) | (raw[:, 2] << 16)
+    return np.where(value >= 2 ** 23, value - 2 ** 24, value)
+
+
+class Table:
+    """
+    One event type's columns. Appends are buffered and become visible to
+    readers on flush(), which commits the new row count.
+    """
+
+    def __init__(self, path: str, schema: Tuple[Tuple[str, str], ...]):
+        self.path = path
+        self.schema = KEY_COLUMNS + tuple(schema)
+        self.types = dict(self.schema)
+        self._buffer = {name: bytearray() for name, _ in self.schema}
+        self._pending = 0
+        os.makedirs(path, exist_ok=True)
+
+        self._meta_path = os.path.join(path, "meta.json")
+        self.rows = 0
+        self.last_key = (-1, -1)
+        if os.path.exists(self._meta_path):
+            with open(self._meta_path) as f:
+                meta = json.load(f)
+            self.rows = meta["rows"]
+            self.last_key = tuple(meta["last_key"])
+            self._truncate()
+
+    def __len__(self) -> int:
+        return self.rows
+
+    def _column_path(self, name: str) -> str:
+        return os.path.join(self.path, f"{name}.bin")
+
+    def _truncate(self):
+        # drop bytes appended after the last committed row count
+        for name, abi_type in self.schema:
+            size = self.rows * DTYPES[abi_type].itemsize
+            path = self._column_path(name)
+            if os.path.exists(path) and os.path.getsize(path) > size:
+                os.truncate(path, size)
+
+    def append(self, block: int, log_index: int, args: Dict):
+        """
+        Buffers a row. Rows at or before the last appended (block,
+        logIndex) are ignored, so replaying a range twice is harmless.
+        """
+        if (block, log_index) <= self.last_key:
+            return
+        row = dict(args, block=block, logIndex=log_index)
+        for name, abi_type in self.schema:
+            self._buffer[name] += _encode(abi_type, row[name])
+        self.last_key = (block, log_index)
+        self._pending += 1
+
+    def flush(self):
+        """
+        Writes buffered rows to the column files and commits them
+        """
+        if self._pending == 0:
+            return
+        for name, _ in self.schema:
+            with open(self._column_path(name), "ab") as f:
+                f.write(self._buffer[name])
+                f.flush()
+                os.fsync(f.fileno())
+            self._buffer[name] = bytearray()
+        self.rows += self._pending
+        self._pending = 0
+
+        tmp = f"{self._meta_path}.tmp"
+        with open(tmp, "w") as f:
+            json.dump({"rows": self.rows, "last_key": self.last_key}, f)
+        os.replace(tmp, self._meta_path)
+
+    def column(self, name: str) -> np.ndarray:
+        """
+        Zero-copy read-only view of a committed column. Amount columns
+        have shape (rows, 4), ticks (rows, 3) and addresses (rows, 20)
+        """
+        dtype = DTYPES[self.types[name]]
+        if self.rows == 0:
+            return np.zeros((0,) + dtype.shape, dtype=dtype.base)
+        return np.memmap(self._column_path(name), dtype=dtype, mode="r",
+                         shape=(self.rows,))
+
+    def block_range(self, from_block: int,
+                    to_block: Optional[int] = None) -> slice:
+        """
+        Row slice of events with from_block <= block <= to_block
+        """
+        blocks = self.column("block")
+        start = int(np.searchsorted(blocks, from_block, side="left"))
+        stop = self.rows if to_block is None \
+            else int(np.searchsorted(blocks, to_block, side="right"))
+        return slice(start, stop)
+
+
+class MarketStore:
+    """
+    Columnar event history for one market rooted at a directory
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self.tables = {name: Table(os.path.join(path, name), schema)
+                       for name, schema in SCHEMAS.items()}
+
+    def __getitem__(self, name: str) -> Table:
+        return self.tables[name]
+
+    def append(self, name: str, args: Dict, block: int, log_index: int):
+        """
+        Buffers a decoded market event. Events without a table are skipped
+        """
+        table = self.tables.get(name)
+        if table is None:
+            return
+        if name == "Build":
+            args = dict(args, entryTick=price_to_tick(args["price"]))
+        table.append(block, log_index, args)
+
+    def extend(self, events: Iterable[Tuple[str, Dict, int, int]]):
+        for name, args, block, log_index in events:
+            self.append(name, args, block, log_index)
+
+    def flush(self):
+        for table in self.tables.values():
+            table.flush()
@@ -0,0 +1,249 @@
+"""
+Monte Carlo sweep of OverlayV1Market risk params.
+
+Every combination in a grid of params is first checked against the same
+bounds OverlayV1Factory enforces and the max leverage and price drift
+checks in OverlayV1Market, so infeasible sets are pruned rather than
+simulated. Each feasible set is then run through MarketSimulator over
+every scenario (a feed and an order flow), fanned out across a process
+pool, with a keeper batch liquidating positions as they become
+liquidatable.
+
+Results are one row per (params, scenario) with the ovl minted on PnL,
+fees, liquidations, circuit breaker trips and the worst imbalance
+liability the protocol carried, |oiLong - oiShort| at the mid price.
+"""
+import csv
+import itertools
+import math
+import os
+import random
+from concurrent.futures import ProcessPoolExecutor
+from typing import (
+    Dict, Iterable, Iterator, List, NamedTuple, Optional, Sequence, Set,
+    Tuple
+)
+
+from scripts.feeds.chainlink.round_cache import Round
+from scripts.libraries.oracle import mid
+from scripts.libraries.risk import Parameters
+from scripts.market.simulator import (
+    Build, Event, Feed, Liquidate, MarketSimulator, Revert, Unwind,
+    check_params
+)
+
+ONE = 10 ** 18
+
+
+class Scenario(NamedTuple):
+    feed: Feed  # must be picklable, e.g. a ReplayFeed
+    # order flow, ascending in timestamp. unwinds refer to positions by
+    # the index of their build among the build events, not by position id
+    events: Sequence[Event]
+    start: int  # timestamp the market is initialized at
+
+
+class Result(NamedTuple):
+    params: Tuple[int, ...]
+    scenario: int  # index into the scenarios swept
+    minted: int  # net ovl minted (+) or burned (-) on pnl
+    trading_fees: int
+    liquidation_fees: int
+    liquidations: int
+    circuit_breaker_trips: int
+    reverts: int  # order flow calls that reverted
+    max_imbalance_liability: int  # max |oiLong - oiShort| * mid, in ovl
+
+
+def grid(base: Sequence[int],
+         ranges: Dict[Parameters, Iterable[int]]) -> Iterator[Tuple[int, ...]]:
+    """
+    Yields base params with every combination of values in ranges
+    substituted in
+    """
+    names = list(ranges)
+    for values in itertools.product(*(ranges[name] for name in names)):
+        params = list(base)
+        for name, value in zip(names, values):
+            params[name] = value
+        yield tuple(params)
+
+
+def feasible(params: Sequence[int], macro_window: int) -> bool:
+    """
+    Whether a market could be deployed with params
+    """
+    try:
+        check_params(params, macro_window)
+    except Revert:
+        return False
+    return True
+
+
+def simulate(params: Sequence[int], scenario: Scenario,
+             index: int = 0, liquidation_interval: int = 600) -> Result:
+    """
+    Runs the scenario's order flow through a market with params. Every
+    liquidation_interval seconds a keeper liquidates whatever open
+    positions have become liquidatable in one batch. Unwinds are resolved
+    to the id the market assigned their build, and skipped if it reverted
+    """
+    sim = MarketSimulator(params, scenario.feed, scenario.start)
+    open_positions: Set[Tuple[str, int]] = set()
+    position_ids: Dict[int, int] = {}  # build index to position id
+    builds = 0
+    liquidations = 0
+    reverts = 0
+    max_liability = 0
+    keeper_last = scenario.start
+
+    for event in scenario.events:
+        if event.timestamp - keeper_last >= liquidation_interval:
+            keeper_last = event.timestamp
+            try:
+                liquidated = sim.liquidate_batch(event.timestamp, "keeper",
+                                                 sorted(open_positions))
+            except Revert:
+                liquidated = []
+            for result in liquidated:
+                open_positions.discard((result.owner, result.position_id))
+                liquidations += 1
+
+        build_index = None
+        if event.kind == "build":
+            build_index = builds
+            builds += 1
+        elif event.kind == "unwind":
+            owner, index, *rest = event.args
+            if index not in position_ids:
+                continue
+            event = event._replace(args=(owner, position_ids[index], *rest))
+
+        try:
+            result = sim.apply(event)
+        except Revert:
+            reverts += 1
+            continue
+
+        if isinstance(result, Build):
+            position_ids[build_index] = result.position_id
+            open_positions.add((result.sender, result.position_id))
+        elif isinstance(result, Unwind):
+            key = (result.sender, result.position_id)
+            if sim.positions[key].fraction_remaining == 0:
+                open_positions.discard(key)
+        elif isinstance(result, Liquidate):
+            open_positions.discard((result.owner, result.position_id))
+            liquidations += 1
+
+        imbalance = abs(sim.oi_long - sim.oi_short)
+        if imbalance > 0:
+            liability = imbalance * mid(sim.feed(event.timestamp)) // ONE
+            max_liability = max(max_liability, liability)
+
+    return Result(tuple(params), index, sim.minted, sim.trading_fees,
+                  sim.liquidation_fees, liquidations,
+                  sim.circuit_breaker_trips, reverts, max_liability)
+
+
+# scenarios shared with worker processes on start up
+_scenarios: List[Scenario] = []
+
+
+def _init_worker(scenarios: List[Scenario]):
+    global _scenarios
+    _scenarios = scenarios
+
+
+def _simulate_task(task: Tuple[Tuple[int, ...], int, int]) -> Result:
+    params, index, liquidation_interval = task
+    return simulate(params, _scenarios[index], index, liquidation_interval)
+
+
+def sweep(candidates: Iterable[Sequence[int]], scenarios: List[Scenario],
+          processes: Optional[int] = None, liquidation_interval: int = 600,
+          chunksize: int = 4) -> Tuple[List[Result], int]:
+    """
+    Simulates every feasible candidate params over every scenario across
+    a pool of processes, defaulting to one per core. Returns the results
+    and the number of candidates pruned as infeasible
+    """
+    macro_windows = {s.feed(s.start).macro_window for s in scenarios}
+    tasks = []
+    pruned = 0
+    for params in candidates:
+        params = tuple(params)
+        if not all(feasible(params, w) for w in macro_windows):
+            pruned += 1
+            continue
+        tasks.extend((params, i, liquidation_interval)
+                     for i in range(len(scenarios)))
+
+    if processes == 1:
+        _init_worker(scenarios)
+        return [_simulate_task(task) for task in tasks], pruned
+
+    with ProcessPoolExecutor(max_workers=processes or os.cpu_count(),
+                             initializer=_init_worker,
+                             initargs=(scenarios,)) as pool:
+        results = list(pool.map(_simulate_task, tasks, chunksize=chunksize))
+    return results, pruned
+
+
+def to_csv(results: Iterable[Result], path: str):
+    """
+    Writes results to path, one column per risk param
+    """
+    with open(path, "w", newline="") as f:
+        writer = csv.writer(f)
+        writer.writerow([p.name.lower() for p in Parameters]
+                        + list(Result._fields[1:]))
+        for result in results:
+            writer.writerow(list(result.params) + list(result[1:]))
+
+
+def gbm_rounds(seed: int, start: int, count: int, interval: int,
+               price: float, sigma: float, decimals: int = 8) -> List[Round]:
+    """
+    Aggregator rounds every interval seconds following geometric brownian
+    motion with volatility sigma per sqrt(second)
+    """
+    rng = random.Random(seed)
+    rounds = []
+    scale = 10 ** decimals
+    vol = sigma * math.sqrt(interval)
+    for i in range(count):
+        rounds.append(Round(i + 1, int(price * scale), start + i * interval))
+        price *= math.exp(vol * rng.gauss(0, 1) - vol * vol / 2)
+    return rounds
+
+
+def random_flow(seed: int, start: int, end: int, rate: float,
+                traders: int = 10, collateral: int = 100 * ONE,
+                leverages: Sequence[int] = (ONE, 2 * ONE, 3 * ONE, 5 * ONE),
+                unwind_share: float = 0.4) -> List[Event]:
+    """
+    Poisson order flow at rate calls per second between start and end.
+    Builds pick a random leverage and side; unwinds pick a random
+    position built earlier in the flow, by its build index, and fraction
+    """
+    rng = random.Random(seed)
+    events = []
+    built: List[Tuple[str, int]] = []  # owner and build index
+    timestamp = float(start)
+    while True:
+        timestamp += rng.expovariate(rate)
+        if timestamp >= end:
+            return events
+
+        if built and rng.random() < unwind_share:
+            owner, index = rng.choice(built)
+            fraction = rng.choice((ONE // 4, ONE // 2, ONE))
+            events.append(Event(int(timestamp), "unwind",
+                                (owner, index, fraction)))
+        else:
+            owner = f"trader{rng.randrange(traders)}"
+            events.append(Event(int(timestamp), "build", (
+                owner, collateral, rng.choice(leverages),
+                rng.random() < 0.5)))
+            built.append((owner, len(built)))
@@ -0,0 +1,267 @@
+// SPDX-License-Identifier: MIT
+pragma solidity 0.8.10;
+
+import {BaseChainlinkFeedTest} from "./BaseChainlinkFeedTest.sol";
+import {OverlayV1Feed} from "contracts/feeds/OverlayV1Feed.sol";
+import {OverlayV1ChainlinkFeed} from "contracts/feeds/chainlink/OverlayV1ChainlinkFeed.sol";
+import {OverlayV1ChainlinkFeedCached} from
+    "contracts/feeds/chainlink/OverlayV1ChainlinkFeedCached.sol";
+import {OverlayV1ChainlinkFeedCachedFactory} from
+    "contracts/feeds/chainlink/OverlayV1ChainlinkFeedCachedFactory.sol";
+import "contracts/libraries/Oracle.sol";
+
+/**
+ * @title OverlayV1ChainlinkFeedCachedTest
+ * @notice Tests for the Chainlink feed caching cumulative round observations
+ */
+contract OverlayV1ChainlinkFeedCachedTest is BaseChainlinkFeedTest {
+    uint256 constant MAX_COUNT = 1000; // rounds folded per checkpoint
+
+    OverlayV1ChainlinkFeedCachedFactory feedFactory;
+
+    /**
+     * @dev Create the cached feed implementation
+     */
+    function createFeed(address _aggregator, address _ovl, uint256 _heartbeat)
+        internal
+        override
+        returns (OverlayV1Feed)
+    {
+        feedFactory = new OverlayV1ChainlinkFeedCachedFactory(_ovl, MICRO_WINDOW, MACRO_WINDOW);
+        return OverlayV1Feed(feedFactory.deployFeed(_aggregator, _heartbeat));
+    }
+
+    /**
+     * @dev Test setting the heartbeat for the cached implementation
+     */
+    function testSetHeartbeat() public override {
+        vm.startPrank(GOVERNOR);
+
+        OverlayV1ChainlinkFeedCached cachedFeed = OverlayV1ChainlinkFeedCached(address(feed));
+        cachedFeed.setHeartbeat(120 minutes);
+
+        vm.stopPrank();
+        aggregator.setData(1, 105);
+
+        skip(119 minutes);
+        feed.latest();
+
+        vm.startPrank(GOVERNOR);
+
+        cachedFeed.setHeartbeat(30 minutes);
+
+        vm.stopPrank();
+
+        skip(61 minutes);
+        vm.expectRevert("stale price feed");
+        feed.latest();
+    }
+
+    /**
+     * @dev Test checkpoints fold only rounds since the last checkpoint
+     */
+    function testCheckpointFoldsNewRounds() public {
+        OverlayV1ChainlinkFeedCached cachedFeed = OverlayV1ChainlinkFeedCached(address(feed));
+
+        // nothing to seed with before the aggregator reports
+        assertEq(cachedFeed.checkpoint(MAX_COUNT), 0);
+
+        aggregator.setData(1, 10e8);
+        assertEq(cachedFeed.checkpoint(MAX_COUNT), 1);
+        assertEq(cachedFeed.checkpoint(MAX_COUNT), 0);
+
+        skip(300);
+        aggregator.setData(2, 11e8);
+        skip(300);
+        aggregator.setData(3, 12e8);
+        assertEq(cachedFeed.checkpoint(MAX_COUNT), 2);
+        assertEq(cachedFeed.observationsLength(), 3);
+        assertEq(cachedFeed.roundIdLast(), 3);
+
+        (,, uint256 cumulative) = cachedFeed.observations(2);
+        assertEq(cumulative, 10e8 * 300 + 11e8 * 300);
+    }
+
+    /**
+     * @dev Test a gap too long to fold in one call is caught up in chunks of
+     * @dev maxCount rounds, ending with the same observations as one call
+     */
+    function testCheckpointCatchesUpInChunks() public {
+        OverlayV1ChainlinkFeedCached cachedFeed = OverlayV1ChainlinkFeedCached(address(feed));
+        OverlayV1ChainlinkFeedCached oneCallFeed = new OverlayV1ChainlinkFeedCached(
+            address(ovl), address(aggregator), MICRO_WINDOW, MACRO_WINDOW, DEFAULT_HEARTBEAT
+        );
+
+        aggregator.setData(1, 10e8);
+        cachedFeed.checkpoint(MAX_COUNT);
+        oneCallFeed.checkpoint(MAX_COUNT);
+        for (uint80 i = 2; i <= 251; i++) {
+            skip(60);
+            aggregator.setData(i, int256(10e8 + uint256(i) * 3e6));
+        }
+
+        // 250 rounds pending, folded 100 at a time
+        assertEq(cachedFeed.checkpoint(100), 100);
+        assertEq(cachedFeed.roundIdLast(), 101);
+        assertEq(cachedFeed.checkpoint(100), 100);
+        assertEq(cachedFeed.roundIdLast(), 201);
+        assertEq(cachedFeed.checkpoint(100), 50);
+        assertEq(cachedFeed.roundIdLast(), 251);
+        assertEq(cachedFeed.checkpoint(100), 0);
+
+        assertEq(oneCallFeed.checkpoint(MAX_COUNT), 250);
+        assertEq(cachedFeed.observationsLength(), oneCallFeed.observationsLength());
+        for (uint256 i = 0; i < 251; i += 25) {
+            (uint64 updatedAt, uint192 answer, uint256 cumulative) = cachedFeed.observations(i);
+            (uint64 expectUpdatedAt, uint192 expectAnswer, uint256 expectCumulative) =
+                oneCallFeed.observations(i);
+            assertEq(updatedAt, expectUpdatedAt);
+            assertEq(answer, expectAnswer);
+            assertEq(cumulative, expectCumulative);
+        }
+    }
+
+    /**
+     * @dev Test averages from the cache match walking the aggregator rounds,
+     * @dev with and without rounds pending a checkpoint
+     */
+    function testCachedMatchesWalk() public {
+        OverlayV1ChainlinkFeed walkFeed = new OverlayV1ChainlinkFeed(
+            address(ovl), address(aggregator), MICRO_WINDOW, MACRO_WINDOW, DEFAULT_HEARTBEAT
+        );
+        OverlayV1ChainlinkFeedCached cachedFeed = OverlayV1ChainlinkFeedCached(address(feed));
+
+        aggregator.setData(1, 10e8);
+        cachedFeed.checkpoint(MAX_COUNT);
+        for (uint80 i = 2; i < 60; i++) {
+            skip(137 * (i % 7) + 1);
+            aggregator.setData(i, int256(10e8 + uint256(i) * 3e6));
+            if (i % 5 == 0) cachedFeed.checkpoint(MAX_COUNT);
+
+            Oracle.Data memory expect = walkFeed.latest();
+            Oracle.Data memory data = feed.latest();
+            assertEq(data.priceOverMicroWindow, expect.priceOverMicroWindow);
+            assertEq(data.priceOverMacroWindow, expect.priceOverMacroWindow);
+            assertEq(data.priceOneMacroWindowAgo, expect.priceOneMacroWindowAgo);
+        }
+    }
+
+    /**
+     * @dev Test max rounds is governor only and a cap above the rounds read leaves
+     * @dev averages unchanged
+     */
+    function testSetMaxRounds() public {
+        OverlayV1ChainlinkFeed walkFeed = new OverlayV1ChainlinkFeed(
+            address(ovl), address(aggregator), MICRO_WINDOW, MACRO_WINDOW, DEFAULT_HEARTBEAT
+        );
+        OverlayV1ChainlinkFeedCached cachedFeed = OverlayV1ChainlinkFeedCached(address(feed));
+
+        vm.expectRevert("OVLV1: !governor");
+        cachedFeed.setMaxRounds(1000);
+
+        vm.prank(GOVERNOR);
+        cachedFeed.setMaxRounds(1000);
+        assertEq(cachedFeed.maxRounds(), 1000);
+
+        aggregator.setData(1, 10e8);
+        for (uint80 i = 2; i < 40; i++) {
+            skip(211 * (i % 5) + 1);
+            aggregator.setData(i, int256(10e8 + uint256(i) * 3e6));
+            if (i % 9 == 0) cachedFeed.checkpoint(MAX_COUNT);
+
+            Oracle.Data memory expect = walkFeed.latest();
+            Oracle.Data memory data = feed.latest();
+            assertEq(data.priceOverMicroWindow, expect.priceOverMicroWindow);
+            assertEq(data.priceOverMacroWindow, expect.priceOverMacroWindow);
+            assertEq(data.priceOneMacroWindowAgo, expect.priceOneMacroWindowAgo);
+        }
+    }
+
+    /**
+     * @dev Test latest stays within the gas of reading max rounds however many
+     * @dev rounds the aggregator reports per macro window
+     */
+    function testMaxRoundsBoundsGas() public {
+        OverlayV1ChainlinkFeedCached cachedFeed = OverlayV1ChainlinkFeedCached(address(feed));
+        vm.prank(GOVERNOR);
+        cachedFeed.setMaxRounds(16);
+
+        aggregator.setData(1, 10e8);
+        for (uint80 i = 2; i < 16; i++) {
+            skip(60);
+            aggregator.setData(i, int256(10e8 + uint256(i) * 3e6));
+        }
+        uint256 gasStart = gasleft();
+        feed.latest();
+        uint256 gasCapped = gasStart - gasleft();
+
+        // 8x the rounds, none checkpointed, reads no more than the cap
+        for (uint80 i = 16; i < 128; i++) {
+            skip(60);
+            aggregator.setData(i, int256(10e8 + uint256(i) * 3e6));
+        }
+        gasStart = gasleft();
+        Oracle.Data memory data = feed.latest();
+        assertLe(gasStart - gasleft(), gasCapped + 20000);
+        assertGt(data.priceOverMacroWindow, 0);
+    }
+
+    /**
+     * @dev Test past the cap latest reads the latest rounds pending a checkpoint,
+     * @dev so averages aren't built from stale answers
+     */
+    function testMaxRoundsReadsLatestRounds() public {
+        OverlayV1ChainlinkFeedCached cachedFeed = OverlayV1ChainlinkFeedCached(address(feed));
+        vm.prank(GOVERNOR);
+        cachedFeed.setMaxRounds(8);
+
+        aggregator.setData(1, 10e8);
+        cachedFeed.checkpoint(MAX_COUNT);
+        skip(2 * MACRO_WINDOW);
+        for (uint80 i = 2; i < 102; i++) {
+            skip(60);
+            aggregator.setData(i, i < 52 ? int256(11e8) : int256(12e8));
+        }
+
+        Oracle.Data memory data = feed.latest();
+        assertEq(data.priceOverMicroWindow, 12e18);
+        assertEq(data.priceOverMacroWindow, 12e18);
+    }
+
+    /**
+     * @dev Test once checkpoints lapse past 2 * macroWindow latest walks the window
+     * @dev as the uncached feed does rather than folding every round since
+     */
+    function testLatestWalksWhenCheckpointsLapse() public {
+        OverlayV1ChainlinkFeed walkFeed = new OverlayV1ChainlinkFeed(
+            address(ovl), address(aggregator), MICRO_WINDOW, MACRO_WINDOW, DEFAULT_HEARTBEAT
+        );
+        OverlayV1ChainlinkFeedCached cachedFeed = OverlayV1ChainlinkFeedCached(address(feed));
+
+        aggregator.setData(1, 10e8);
+        cachedFeed.checkpoint(MAX_COUNT);
+        for (uint80 i = 2; i < 22; i++) {
+            skip(600);
+            aggregator.setData(i, int256(10e8 + uint256(i) * 3e6));
+        }
+        cachedFeed.checkpoint(MAX_COUNT);
+
+        // no checkpoint for three hours of rounds a minute
+        for (uint80 i = 22; i < 202; i++) {
+            skip(60);
+            aggregator.setData(i, int256(10e8 + uint256(i) * 3e6));
+        }
+
+        uint256 gasStart = gasleft();
+        Oracle.Data memory expect = walkFeed.latest();
+        uint256 gasWalk = gasStart - gasleft();
+
+        gasStart = gasleft();
+        Oracle.Data memory data = feed.latest();
+        assertLe(gasStart - gasleft(), gasWalk + 20000);
+
+        assertEq(data.priceOverMicroWindow, expect.priceOverMicroWindow);
+        assertEq(data.priceOverMacroWindow, expect.priceOverMacroWindow);
+        assertEq(data.priceOneMacroWindowAgo, expect.priceOneMacroWindowAgo);
+    }
+}
@@ -0,0 +1,10 @@
+import pytest
+from brownie import network
+
+
+@pytest.fixture(scope="session")
+def is_forked():
+    # forked networks (e.g. arbitrum-main-fork) fetch live contracts from
+    # the explorer. anything else (e.g. anvil) is a hermetic local chain
+    # and deploys mock stand-ins for them instead
+    yield network.show_active().endswith("-fork")
@@ -1,15 +1,25 @@
 import pytest
 from brownie import (
-    OverlayV1Factory, OverlayV1Market,
+    AggregatorMock, OverlayV1Factory, OverlayV1Market,
     OverlayV1Deployer, OverlayV1Token, OverlayV1FeedFactoryMock,
-    web3, Contract
+    chain, web3, Contract
 )
 
 
 @pytest.fixture(scope="module")
-def sequencer_aggregator():
-    # Arbitrum One sequencer aggregator
-    yield Contract.from_explorer("0xFdB631F5EE196F0ed6FAa767959853A9F217697D")
+def sequencer_aggregator(gov, is_forked):
+    if is_forked:
+        # Arbitrum One sequencer aggregator
+        yield Contract.from_explorer(
+            "0xFdB631F5EE196F0ed6FAa767959853A9F217697D")
+        return
+
+    # local stand-in reporting the sequencer up (answer == 0). step past
+    # the update so the zero grace period has strictly passed
+    aggregator = gov.deploy(AggregatorMock)
+    aggregator.setData(1, 0, {"from": gov})
+    chain.sleep(1)
+    yield aggregator
 
 
 @pytest.fixture(scope="module")
@@ -86,8 +96,8 @@ def create_token(gov, alice, bob, minter_role, risk_manager_role, request):
         tok.mint(gov, supply * 10 ** tok.decimals(), {"from": gov})
         tok.renounceRole(minter_role, gov, {"from": gov})
 
-        tok.transfer(alice, (supply/2) * 10 ** tok.decimals(), {"from": gov})
-        tok.transfer(bob, (supply/2) * 10 ** tok.decimals(), {"from": gov})
+        tok.transfer(alice, supply * 10 ** tok.decimals() // 2, {"from": gov})
+        tok.transfer(bob, supply * 10 ** tok.decimals() // 2, {"from": gov})
         return tok
 
     yield create_token
@@ -31,7 +31,9 @@ def minter_role():
 
 
 @pytest.fixture(scope="module")
-def chainlink_aggregator():
+def chainlink_aggregator(is_forked):
+    if not is_forked:
+        pytest.skip("chainlink aggregator is only available on a fork")
     # to be used as example aggregator (Arbitrum One)
     # corresponds to the feed 0x46b4143caf2fe2965349fca53730e83f91247e2c
     yield Contract.from_explorer("0x91F9C89891575C2E41edfFB5953565A9aE2Dbd9F")
@@ -49,8 +51,8 @@ def create_token(gov, alice, bob, minter_role, request):
         tok.mint(gov, supply * 10 ** tok.decimals(), {"from": gov})
         tok.renounceRole(minter_role, gov, {"from": gov})
 
-        tok.transfer(alice, (supply/2) * 10 ** tok.decimals(), {"from": gov})
-        tok.transfer(bob, (supply/2) * 10 ** tok.decimals(), {"from": gov})
+        tok.transfer(alice, supply * 10 ** tok.decimals() // 2, {"from": gov})
+        tok.transfer(bob, supply * 10 ** tok.decimals() // 2, {"from": gov})
         return tok
 
     yield create_token
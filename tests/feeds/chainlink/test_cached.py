@@ -0,0 +1,184 @@
+import pytest
+from brownie import OverlayV1ChainlinkFeedCached, chain, reverts, web3
+
+from scripts.feeds.chainlink.round_cache import (
+    Round, RoundCache, walk_average_prices
+)
+
+# rounds folded per checkpoint
+MAX_COUNT = 1000
+
+
+@pytest.fixture(autouse=True)
+def isolation(fn_isolation):
+    pass
+
+
+@pytest.fixture(scope="module")
+def cached_feed(ovl, gov, mock_aggregator):
+    yield gov.deploy(OverlayV1ChainlinkFeedCached, ovl, mock_aggregator,
+                     600, 3600, 3601)
+
+
+def test_checkpoint_matches_reference(cached_feed, mock_aggregator, gov):
+    cache = RoundCache(600, 3600, mock_aggregator.decimals())
+    for i in range(1, 8):
+        answer = 10**9 + i * 3 * 10**6
+        tx = mock_aggregator.setData(i, answer, {"from": gov})
+        cache.checkpoint([Round(i, answer, tx.timestamp)])
+        if i % 3 == 1:
+            cached_feed.checkpoint(MAX_COUNT, {"from": gov})
+        chain.sleep(300)
+
+    cached_feed.checkpoint(MAX_COUNT, {"from": gov})
+    assert cached_feed.observationsLength() == len(cache)
+    assert cached_feed.roundIdLast() == cache.round_id_last
+    for i, obs in enumerate(cache.observations):
+        assert cached_feed.observations(i) == obs
+
+
+def test_checkpoint_catches_up_in_chunks(cached_feed, mock_aggregator,
+                                         gov):
+    cache = RoundCache(600, 3600, mock_aggregator.decimals())
+    rounds = []
+    for i in range(1, 42):
+        answer = 10**9 + i * 3 * 10**6
+        tx = mock_aggregator.setData(i, answer, {"from": gov})
+        rounds.append(Round(i, answer, tx.timestamp))
+        if i == 1:
+            cached_feed.checkpoint(MAX_COUNT, {"from": gov})
+            cache.checkpoint(rounds, 16)
+        chain.sleep(60)
+
+    # 40 rounds pending, folded 16 at a time
+    for expect in (16, 16, 8, 0):
+        tx = cached_feed.checkpoint(16, {"from": gov})
+        assert tx.return_value == expect
+        assert cache.checkpoint(rounds, 16) == expect
+        assert cached_feed.roundIdLast() == cache.round_id_last
+        assert tx.events["Checkpointed"]["roundId"] == cache.round_id_last
+
+    assert cached_feed.observationsLength() == len(cache) == 41
+    for i, obs in enumerate(cache.observations):
+        assert cached_feed.observations(i) == obs
+
+
+def test_latest_matches_walk(cached_feed, mock_aggregator, gov):
+    # round 0 is never set on the mock, so walks end on a zero price
+    rounds = [Round(0, 0, 0)]
+
+    tx = mock_aggregator.setData(1, 10**9, {"from": gov})
+    rounds.append(Round(1, 10**9, tx.timestamp))
+    cached_feed.checkpoint(MAX_COUNT, {"from": gov})
+    for i in range(2, 40):
+        chain.sleep(97 * (i % 11) + 1)
+        answer = 10**9 + i * 3 * 10**6
+        tx = mock_aggregator.setData(i, answer, {"from": gov})
+        rounds.append(Round(i, answer, tx.timestamp))
+        if i % 4 == 0:
+            cached_feed.checkpoint(MAX_COUNT, {"from": gov})
+
+        # whether from the cache or the walk before the cache covers two
+        # macro windows, prices must equal the parent feed's walk
+        data = cached_feed.latest()
+        assert tuple(data[3:6]) \
+            == walk_average_prices(rounds, data[0], 600, 3600, 8)
+
+    cache = RoundCache(600, 3600, 8)
+    cache.checkpoint(rounds[1:])
+    assert cache.covers(data[0])
+    assert cache.average_prices(data[0]) == tuple(data[3:6])
+
+
+def test_latest_matches_capped_reference(cached_feed, mock_aggregator, ovl,
+                                         gov, alice):
+    with reverts("OVLV1: !governor"):
+        cached_feed.setMaxRounds(8, {"from": alice})
+    governor_role = web3.solidityKeccak(['string'], ["GOVERNOR"])
+    ovl.grantRole(governor_role, gov, {"from": gov})
+    tx = cached_feed.setMaxRounds(8, {"from": gov})
+    assert tx.events["MaxRoundsSet"]["maxRounds"] == 8
+
+    rounds = [Round(0, 0, 0)]
+    cache = RoundCache(600, 3600, 8)
+    pending = []
+    for i in range(1, 80):
+        chain.sleep(61 + 37 * (i % 5))
+        answer = 10**9 + i * 3 * 10**6
+        tx = mock_aggregator.setData(i, answer, {"from": gov})
+        rounds.append(Round(i, answer, tx.timestamp))
+        pending.append(rounds[-1])
+        if i == 1 or i % 25 == 0:
+            cached_feed.checkpoint(MAX_COUNT, {"from": gov})
+            cache.checkpoint(pending)
+            pending = []
+
+        # walks at most 8 rounds before the cache covers two macro windows,
+        # then folds at most 8 of the rounds pending a checkpoint
+        data = cached_feed.latest()
+        if cache.covers(data[0]) and cache.fresh(data[0]):
+            expect = cache.average_prices(data[0], pending, 8)
+        else:
+            expect = walk_average_prices(rounds, data[0], 600, 3600, 8, 8)
+        assert tuple(data[3:6]) == expect
+
+
+def test_latest_capped_reads_latest_rounds(cached_feed, mock_aggregator,
+                                           ovl, gov):
+    governor_role = web3.solidityKeccak(['string'], ["GOVERNOR"])
+    ovl.grantRole(governor_role, gov, {"from": gov})
+    cached_feed.setMaxRounds(8, {"from": gov})
+
+    # cache covers two macro windows, then 100 rounds a minute go
+    # not checkpointed with the answer moving halfway through
+    tx = mock_aggregator.setData(1, 10**9, {"from": gov})
+    rounds = [Round(1, 10**9, tx.timestamp)]
+    cached_feed.checkpoint(MAX_COUNT, {"from": gov})
+    chain.sleep(7200)
+    for i in range(2, 102):
+        chain.sleep(60)
+        answer = 11 * 10**8 if i < 52 else 12 * 10**8
+        tx = mock_aggregator.setData(i, answer, {"from": gov})
+        rounds.append(Round(i, answer, tx.timestamp))
+
+    # averages are from the latest answer rather than stale ones
+    data = cached_feed.latest()
+    assert data[3] == 12 * 10**18
+    assert data[4] == 12 * 10**18
+
+    # checkpoints lapsed past two macro windows, so the feed walks
+    expect = walk_average_prices([Round(0, 0, 0)] + rounds, data[0], 600,
+                                 3600, 8, 8)
+    assert tuple(data[3:6]) == expect
+
+
+def test_latest_walks_when_checkpoints_lapse(cached_feed, chainlink_feed,
+                                             mock_aggregator, gov):
+    rounds = [Round(0, 0, 0)]
+    tx = mock_aggregator.setData(1, 10**9, {"from": gov})
+    rounds.append(Round(1, 10**9, tx.timestamp))
+    cached_feed.checkpoint(MAX_COUNT, {"from": gov})
+    for i in range(2, 22):
+        chain.sleep(600)
+        answer = 10**9 + i * 3 * 10**6
+        tx = mock_aggregator.setData(i, answer, {"from": gov})
+        rounds.append(Round(i, answer, tx.timestamp))
+    cached_feed.checkpoint(MAX_COUNT, {"from": gov})
+
+    # no checkpoint for three hours of rounds a minute
+    for i in range(22, 202):
+        chain.sleep(60)
+        answer = 10**9 + i * 3 * 10**6
+        tx = mock_aggregator.setData(i, answer, {"from": gov})
+        rounds.append(Round(i, answer, tx.timestamp))
+
+    # reads as the uncached feed does rather than folding every round
+    # since the last checkpoint
+    data = cached_feed.latest()
+    assert tuple(data[3:6]) \
+        == walk_average_prices(rounds, data[0], 600, 3600, 8)
+    assert tuple(data[3:6]) == tuple(chainlink_feed.latest()[3:6])
+
+    gas = cached_feed.latest.estimate_gas()
+    gas_walk = chainlink_feed.latest.estimate_gas()
+    assert gas <= gas_walk + 20000
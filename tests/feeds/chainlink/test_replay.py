@@ -0,0 +1,52 @@
+import pytest
+from brownie import OverlayV1ChainlinkFeedZero, chain
+from pytest import approx
+
+from scripts.feeds.chainlink.replay import TwapReplay
+from scripts.feeds.chainlink.round_cache import Round
+
+
+@pytest.fixture(autouse=True)
+def isolation(fn_isolation):
+    pass
+
+
+@pytest.fixture(scope="module")
+def chainlink_feed_zero(ovl, gov, mock_aggregator):
+    yield gov.deploy(OverlayV1ChainlinkFeedZero, ovl, mock_aggregator,
+                     600, 3600, 3601)
+
+
+def test_replay_matches_feeds(chainlink_feed, chainlink_feed_zero,
+                              mock_aggregator, gov):
+    rounds = []
+    for i in range(1, 40):
+        answer = 10**9 + (i % 9) * 3 * 10**7
+        tx = mock_aggregator.setData(i, answer, {"from": gov})
+        rounds.append(Round(i, answer, tx.timestamp))
+        chain.sleep(97 * (i % 11) + 1)
+    chain.mine()
+
+    replay = TwapReplay(rounds, 600, 3600, 8, heartbeat=3601)
+    replay_zero = TwapReplay(rounds, 600, 3600, 8, zero=True,
+                             heartbeat=3601)
+    for feed, r in ((chainlink_feed, replay),
+                    (chainlink_feed_zero, replay_zero)):
+        data = feed.latest()
+        timestamp = data[0]
+        assert timestamp >= r.start
+        assert r.latest(timestamp) == tuple(data[3:6])
+
+        micro, macro, macro_ago = r.prices([timestamp])
+        assert [micro[0], macro[0], macro_ago[0]] \
+            == approx(list(data[3:6]), rel=1e-15)
+
+
+def test_replay_raises_on_stale(mock_aggregator, gov):
+    tx = mock_aggregator.setData(1, 10**9, {"from": gov})
+    replay = TwapReplay([Round(1, 10**9, tx.timestamp)], 600, 3600, 8,
+                        heartbeat=3601)
+    with pytest.raises(ValueError, match="stale price feed"):
+        replay.latest(replay.start)
+    with pytest.raises(ValueError, match="cover"):
+        replay.prices([replay.start - 1])
@@ -0,0 +1,63 @@
+import pytest
+from brownie.exceptions import VirtualMachineError
+from brownie.test import given, strategy
+
+from scripts.libraries import fixed_point as offchain
+
+
+def check_matches(onchain_fn, offchain_fn, *args):
+    """
+    Checks the off-chain port returns the same value as the contract, or
+    raises where the contract reverts
+    """
+    try:
+        expect = onchain_fn(*args)
+    except VirtualMachineError:
+        with pytest.raises((ValueError, ZeroDivisionError)):
+            offchain_fn(*args)
+        return
+    assert offchain_fn(*args) == expect
+
+
+@given(a=strategy('uint256', max_value=str(2**127)),
+       b=strategy('uint256', max_value=str(2**127)))
+def test_mul_div_matches(fixed_point, a, b):
+    check_matches(fixed_point.mulDown, offchain.mul_down, a, b)
+    check_matches(fixed_point.mulUp, offchain.mul_up, a, b)
+    check_matches(fixed_point.divDown, offchain.div_down, a, b)
+    check_matches(fixed_point.divUp, offchain.div_up, a, b)
+    check_matches(fixed_point.subFloor, offchain.sub_floor, a, b)
+    check_matches(fixed_point.complement, offchain.complement, a)
+
+
+@given(x=strategy('uint256', max_value='120000000000000000000'))
+def test_exp_matches(fixed_point, x):
+    check_matches(fixed_point.expUp, offchain.exp_up, x)
+    check_matches(fixed_point.expDown, offchain.exp_down, x)
+
+
+@given(x=strategy('uint256', min_value='1', max_value=str(2**64)),
+       y=strategy('uint256', max_value='10000000000000000000'))
+def test_pow_matches(fixed_point, x, y):
+    check_matches(fixed_point.powUp, offchain.pow_up, x, y)
+    check_matches(fixed_point.powDown, offchain.pow_down, x, y)
+
+
+@given(a=strategy('uint256', min_value='1', max_value=str(2**255-1)),
+       b=strategy('uint256', min_value='1', max_value=str(2**255-1)))
+def test_log_matches(fixed_point, a, b):
+    check_matches(fixed_point.logUp, offchain.log_up, a, b)
+    check_matches(fixed_point.logDown, offchain.log_down, a, b)
+
+
+def test_exp_table_matches(fixed_point):
+    delta = 2500000000000000
+    lmbda = 500000000000000000
+    volumes = [0, 1, 10**12, 10**16, 3 * 10**17, 10**18, 2 * 10**18]
+    table = offchain.ExpTable.for_impact(delta, lmbda, volumes)
+    assert len(table) == len(volumes)
+
+    for volume in volumes + [123456789]:
+        x = delta + offchain.mul_up(lmbda, volume)
+        assert table.exp_up(x) == fixed_point.expUp(x)
+        assert table.exp_down(x) == fixed_point.expDown(x)
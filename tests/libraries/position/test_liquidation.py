@@ -1,5 +1,7 @@
 from decimal import Decimal
+from pytest import approx
 
+from scripts.libraries import position as offchain
 from .utils import price_to_tick
 
 
@@ -294,3 +296,39 @@ def test_liquidatable_when_leverage_one(position):
     actual = position.liquidatable(pos, oi, oi_shares, current_price,
                                    cap_payoff, maintenance, liq_fee_rate)
     assert expect == actual
+
+
+def test_liquidation_price(position):
+    notional = 10000000000000000000  # 10
+    debt = 8000000000000000000  # 8
+    maintenance = 100000000000000000  # 10%
+    liq_fee_rate = 50000000000000000  # 5%
+    fraction_remaining = 8000  # 0.8
+    liquidated = False
+
+    entry_price = 100000000000000000000  # 100
+    entry_tick = price_to_tick(entry_price)
+    mid_tick = entry_tick
+
+    oi = int(Decimal(notional) / Decimal(entry_price) * Decimal(1e18)
+             * Decimal(fraction_remaining) / Decimal(1e4))  # 0.08
+    shares_to_oi_ratio = 800000000000000000  # 0.8
+    oi_shares = int(Decimal(oi) * Decimal(shares_to_oi_ratio)
+                    / Decimal(1e18))  # 0.064
+
+    # price liquidatable reaches as in test_liquidatable, long then short
+    for is_long, expect in ((True, 90526315789473677312),
+                            (False, 109473684210526322688)):
+        pos = (notional, debt, mid_tick, entry_tick, is_long,
+               liquidated, oi_shares, fraction_remaining)
+        actual = position.liquidationPrice(pos, oi, oi_shares, maintenance,
+                                           liq_fee_rate)
+        assert actual == approx(expect, rel=1e-6)
+        assert actual == offchain.liquidation_price(
+            offchain.Info(*pos), oi, oi_shares, maintenance, liq_fee_rate)
+
+    # liquidatable at any price when no oi left backing position
+    pos = (notional, debt, mid_tick, entry_tick, True, liquidated, oi_shares,
+           fraction_remaining)
+    assert position.liquidationPrice(pos, 0, oi_shares, maintenance,
+                                     liq_fee_rate) == 2**256 - 1
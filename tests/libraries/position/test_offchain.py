@@ -0,0 +1,190 @@
+from pytest import approx
+from brownie.test import given, strategy
+
+from scripts.libraries import position as offchain
+from scripts.libraries.fixed_point import div_down, mul_down
+from scripts.libraries.tick import tick_to_price
+from scripts.market.book import PositionBook
+
+
+# NOTE: differential tests of the pure-python port in
+# NOTE: scripts/libraries/position.py against PositionMock. All
+# NOTE: comparisons are exact (wei-for-wei)
+@given(
+    notional=strategy('uint96', min_value='100000000000000',
+                      max_value='8000000000000000000000000'),
+    leverage=strategy('uint256', min_value='1000000000000000000',
+                      max_value='5000000000000000000'),
+    mid_tick=strategy('int24', min_value='-100000', max_value='100000'),
+    spread_tick=strategy('int24', min_value='-500', max_value='500'),
+    is_long=strategy('bool'),
+    fraction_remaining=strategy('uint16', min_value='1', max_value='10000'),
+    fraction=strategy('uint256', min_value='100000000000000',
+                      max_value='1000000000000000000'),
+    shares_to_oi_ratio=strategy('uint256', min_value='500000000000000000',
+                                max_value='2000000000000000000'),
+    price_change=strategy('uint256', min_value='200000000000000000',
+                          max_value='3000000000000000000'))
+def test_value_matches(position, notional, leverage, mid_tick, spread_tick,
+                       is_long, fraction_remaining, fraction,
+                       shares_to_oi_ratio, price_change):
+    collateral = div_down(notional, leverage)
+    debt = notional - collateral
+    entry_tick = mid_tick + spread_tick
+    liquidated = False
+
+    mid_price = tick_to_price(mid_tick)
+    oi = div_down(notional, mid_price)
+    oi_shares = mul_down(oi, shares_to_oi_ratio)
+    current_price = mul_down(mid_price, price_change)
+    cap_payoff = 5000000000000000000  # 5
+    trading_fee_rate = 750000000000000  # 0.075%
+
+    pos = (notional, debt, mid_tick, entry_tick, is_long,
+           liquidated, oi_shares, fraction_remaining)
+    info = offchain.Info(*pos)
+
+    assert offchain.mid_price_at_entry(info) == position.midPriceAtEntry(pos)
+    assert offchain.entry_price(info) == position.entryPrice(pos)
+    assert offchain.oi_initial(info, fraction) \
+        == position.oiInitial(pos, fraction)
+    assert offchain.notional_initial(info, fraction) \
+        == position.notionalInitial(pos, fraction)
+    assert offchain.debt_initial(info, fraction) \
+        == position.debtInitial(pos, fraction)
+    assert offchain.oi_current(info, fraction, oi, oi_shares) \
+        == position.oiCurrent(pos, fraction, oi, oi_shares)
+    assert offchain.cost(info, fraction) == position.cost(pos, fraction)
+
+    expect = position.value(pos, fraction, oi, oi_shares, current_price,
+                            cap_payoff)
+    actual = offchain.value(info, fraction, oi, oi_shares, current_price,
+                            cap_payoff)
+    assert expect == actual
+
+    expect = position.notionalWithPnl(pos, fraction, oi, oi_shares,
+                                      current_price, cap_payoff)
+    actual = offchain.notional_with_pnl(info, fraction, oi, oi_shares,
+                                        current_price, cap_payoff)
+    assert expect == actual
+
+    expect = position.tradingFee(pos, fraction, oi, oi_shares, current_price,
+                                 cap_payoff, trading_fee_rate)
+    actual = offchain.trading_fee(info, fraction, oi, oi_shares,
+                                  current_price, cap_payoff, trading_fee_rate)
+    assert expect == actual
+
+
+@given(
+    notional=strategy('uint96', min_value='100000000000000',
+                      max_value='8000000000000000000000000'),
+    leverage=strategy('uint256', min_value='1000000000000000000',
+                      max_value='5000000000000000000'),
+    mid_tick=strategy('int24', min_value='-100000', max_value='100000'),
+    is_long=strategy('bool'),
+    fraction_remaining=strategy('uint16', min_value='0', max_value='10000'),
+    price_change=strategy('uint256', min_value='500000000000000000',
+                          max_value='1500000000000000000'))
+def test_liquidatable_matches(position, notional, leverage, mid_tick,
+                              is_long, fraction_remaining, price_change):
+    collateral = div_down(notional, leverage)
+    debt = notional - collateral
+    liquidated = False
+
+    mid_price = tick_to_price(mid_tick)
+    oi = div_down(notional, mid_price)
+    oi_shares = oi
+    current_price = mul_down(mid_price, price_change)
+    cap_payoff = 5000000000000000000  # 5
+    maintenance = 100000000000000000  # 10%
+    liq_fee_rate = 50000000000000000  # 5%
+
+    pos = (notional, debt, mid_tick, mid_tick, is_long,
+           liquidated, oi_shares, fraction_remaining)
+    info = offchain.Info(*pos)
+
+    expect = position.liquidatable(pos, oi, oi_shares, current_price,
+                                   cap_payoff, maintenance, liq_fee_rate)
+    actual = offchain.liquidatable(info, oi, oi_shares, current_price,
+                                   cap_payoff, maintenance, liq_fee_rate)
+    assert expect == actual
+
+
+@given(
+    fraction_remaining=strategy('uint16', min_value='0', max_value='10000'),
+    fraction_removed=strategy('uint256', min_value='0',
+                              max_value='1000000000000000000'))
+def test_updated_fraction_remaining_matches(position, fraction_remaining,
+                                            fraction_removed):
+    pos = (0, 0, 0, 0, True, False, 0, fraction_remaining)
+    info = offchain.Info(*pos)
+
+    expect = position.updatedFractionRemaining(pos, fraction_removed)
+    actual = offchain.updated_fraction_remaining(info, fraction_removed)
+    assert expect == actual
+
+
+@given(tick=strategy('int24', min_value='-410000', max_value='1200000'))
+def test_tick_to_price_matches(position, tick):
+    pos = (0, 0, tick, tick, True, False, 0, 10000)
+    expect = position.entryPrice(pos)
+    actual = tick_to_price(tick)
+    assert expect == actual
+
+
+@given(
+    notionals=strategy('uint96[4]', min_value='100000000000000',
+                       max_value='8000000000000000000000000'),
+    mid_tick=strategy('int24', min_value='-100000', max_value='100000'),
+    price_change=strategy('uint256', min_value='500000000000000000',
+                          max_value='1500000000000000000'))
+def test_book_mark_matches(position, notionals, mid_tick, price_change):
+    mid_price = tick_to_price(mid_tick)
+    current_price = mul_down(mid_price, price_change)
+    leverage = 3000000000000000000  # 3
+    cap_payoff = 5000000000000000000  # 5
+    trading_fee_rate = 750000000000000  # 0.075%
+    maintenance = 100000000000000000  # 10%
+    liq_fee_rate = 50000000000000000  # 5%
+
+    # alternate long/short with differing fraction remaining
+    positions = []
+    oi_long, oi_short = 0, 0
+    for i, notional in enumerate(notionals):
+        is_long = (i % 2 == 0)
+        debt = notional - div_down(notional, leverage)
+        oi = div_down(notional, mid_price)
+        if is_long:
+            oi_long += oi
+        else:
+            oi_short += oi
+        pos = (notional, debt, mid_tick, mid_tick + i, is_long,
+               False, oi, 10000 - 1000 * i)
+        positions.append((i.to_bytes(32, 'big'), pos))
+
+    book = PositionBook.from_positions(positions)
+    marks = book.mark(oi_long, oi_short, oi_long, oi_short, current_price,
+                      cap_payoff, trading_fee_rate, maintenance,
+                      liq_fee_rate, exact=True)
+    approx_marks = book.mark(oi_long, oi_short, oi_long, oi_short,
+                             current_price, cap_payoff, trading_fee_rate,
+                             maintenance, liq_fee_rate)
+
+    fraction = 1000000000000000000  # 1
+    for row, (_, pos) in enumerate(positions):
+        oi_total = oi_long if pos[4] else oi_short
+        assert marks.value[row] == position.value(
+            pos, fraction, oi_total, oi_total, current_price, cap_payoff)
+        assert marks.notional_with_pnl[row] == position.notionalWithPnl(
+            pos, fraction, oi_total, oi_total, current_price, cap_payoff)
+        assert marks.trading_fee[row] == position.tradingFee(
+            pos, fraction, oi_total, oi_total, current_price, cap_payoff,
+            trading_fee_rate)
+
+        expect = position.liquidatable(pos, oi_total, oi_total,
+                                       current_price, cap_payoff,
+                                       maintenance, liq_fee_rate)
+        assert marks.liquidatable[row] == expect
+        assert approx_marks.liquidatable[row] == expect
+        assert approx(approx_marks.value[row], rel=1e-9, abs=1e6) \
+            == marks.value[row]
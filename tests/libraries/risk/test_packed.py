@@ -0,0 +1,109 @@
+from brownie import reverts
+
+from scripts.libraries.risk import (
+    LAYOUT, PARAMS_MAX, Parameters, pack, words_read
+)
+
+# params read by build, in the order the market reads them
+BUILD_PARAMS = [
+    Parameters.K,
+    Parameters.CAP_LEVERAGE,
+    Parameters.MIN_COLLATERAL,
+    Parameters.TRADING_FEE_RATE,
+    Parameters.CIRCUIT_BREAKER_WINDOW,
+    Parameters.CIRCUIT_BREAKER_MINT_TARGET,
+    Parameters.CAP_NOTIONAL,
+    Parameters.LMBDA,
+    Parameters.AVERAGE_BLOCK_TIME,
+    Parameters.DELTA,
+    Parameters.CAP_PAYOFF,
+    Parameters.MAINTENANCE_MARGIN_FRACTION,
+    Parameters.LIQUIDATION_FEE_RATE,
+]
+
+
+def test_layout(risk):
+    for name in Parameters:
+        word, offset, width = LAYOUT[name]
+        expect = (word, offset, 2**width - 1)
+        actual = risk.layout(name)
+        assert expect == actual
+
+
+def test_layout_fits_factory_bounds():
+    used = set()
+    for name in Parameters:
+        word, offset, width = LAYOUT[name]
+        assert offset + width <= 256
+        assert PARAMS_MAX[name] < 2**width
+
+        # check no two params share a bit
+        bits = {word * 256 + offset + i for i in range(width)}
+        assert not bits & used
+        used |= bits
+
+
+def test_set_packed(create_risk):
+    risk = create_risk()
+    for name in Parameters:
+        risk.setPacked(name, PARAMS_MAX[name])
+
+    for name in Parameters:
+        expect = PARAMS_MAX[name]
+        actual = risk.getPacked(name)
+        assert expect == actual
+
+    # check words stored match the python packing
+    expect = pack(PARAMS_MAX)
+    actual = [risk.packed(i) for i in range(len(expect))]
+    assert expect == actual
+
+
+def test_set_packed_leaves_other_params(create_risk):
+    risk = create_risk()
+    values = list(PARAMS_MAX)
+    for name in Parameters:
+        risk.setPacked(name, values[name])
+
+    # overwrite each param in turn, checking the rest are unchanged
+    for name in Parameters:
+        values[name] = name + 1
+        risk.setPacked(name, values[name])
+
+        expect = values
+        actual = [risk.getPacked(n) for n in Parameters]
+        assert expect == actual
+
+
+def test_set_packed_reverts_when_exceeds_width(create_risk):
+    risk = create_risk()
+    for name in Parameters:
+        _, _, width = LAYOUT[name]
+        with reverts("OVLV1: param exceeds width"):
+            risk.setPacked(name, 2**width)
+
+        # check passes at the max width allows
+        risk.setPacked(name, 2**width - 1)
+        assert risk.getPacked(name) == 2**width - 1
+
+
+def test_set_packed_reverts_when_non_valid_enum(risk):
+    with reverts():
+        risk.setPacked(15, 1)
+
+
+def test_read_packed_saves_gas(create_risk, alice):
+    risk = create_risk()
+    for name in Parameters:
+        risk.set(name, PARAMS_MAX[name])
+        risk.setPacked(name, PARAMS_MAX[name])
+
+    # each tx reads the build params from cold storage
+    tx = risk.readAll(BUILD_PARAMS, {"from": alice})
+    tx_packed = risk.readAllPacked(BUILD_PARAMS, {"from": alice})
+    assert tx.return_value == tx_packed.return_value
+
+    # cold sloads are 2100 gas vs 100 warm, less the bit ops to unpack
+    sloads_saved = len(BUILD_PARAMS) - len(words_read(BUILD_PARAMS))
+    assert sloads_saved == len(BUILD_PARAMS) - 4
+    assert tx.gas_used - tx_packed.gas_used >= 1000 * sloads_saved
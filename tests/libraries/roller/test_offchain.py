@@ -0,0 +1,25 @@
+from brownie.test import given, strategy
+
+from scripts.libraries import roller as offchain
+from scripts.libraries.roller import Snapshot
+
+
+@given(
+    timestamp_last=strategy('uint32'),
+    window_last=strategy('uint32', max_value='7776000'),
+    accumulator_last=strategy('int192', min_value=str(-10**25),
+                              max_value=str(10**25)),
+    dt=strategy('uint32', max_value='10000000'),
+    window=strategy('uint256', max_value='7776000'),
+    value=strategy('int256', min_value=str(-10**25), max_value=str(10**25)))
+def test_transform_matches(roller, timestamp_last, window_last,
+                           accumulator_last, dt, window, value):
+    # timestamps past uint32 max wrap as on chain
+    snapshot = (timestamp_last, window_last, accumulator_last)
+    timestamp = timestamp_last + dt
+
+    expect = roller.transform(snapshot, timestamp, window, value)
+    actual = offchain.transform(Snapshot(*snapshot), timestamp, window,
+                                value)
+    assert actual == tuple(expect)
+    assert offchain.cumulative(actual) == roller.cumulative(expect)
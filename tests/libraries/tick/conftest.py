@@ -1,6 +1,8 @@
 import pytest
 from brownie import TickMock
 
+from scripts.libraries.tick import TickTable
+
 
 @pytest.fixture(scope="module")
 def gov(accounts):
@@ -33,3 +35,9 @@ def create_tick_mock(alice):
 @pytest.fixture(scope="module")
 def tick_mock(create_tick_mock):
     yield create_tick_mock()
+
+
+@pytest.fixture(scope="session")
+def tick_table(tmp_path_factory):
+    # builds the full table once per session
+    yield TickTable.open(str(tmp_path_factory.mktemp("ticks")))
@@ -0,0 +1,29 @@
+from brownie.test import given, strategy
+
+from scripts.libraries import tick as offchain
+
+
+@given(tick=strategy('int24', min_value='-410000', max_value='1200000'))
+def test_tick_to_price_matches(tick_mock, tick_table, tick):
+    expect = tick_mock.tickToPrice(tick)
+    assert offchain.tick_to_price(tick) == expect
+    assert tick_table.tick_to_price(tick) == expect
+    assert tick_table.prices([tick])[0] == float(expect)
+
+
+@given(price=strategy('uint256', min_value='2',
+                      max_value=str(10**70)))
+def test_price_to_tick_matches(tick_mock, tick_table, price):
+    expect = tick_mock.priceToTick(price)
+    assert offchain.price_to_tick(price) == expect
+    assert tick_table.price_to_tick(price) == expect
+
+
+@given(tick=strategy('int24', min_value='-400000', max_value='1199999'),
+       offset=strategy('int256', min_value='-2', max_value='2'))
+def test_price_to_tick_matches_near_table_prices(tick_mock, tick_table,
+                                                 tick, offset):
+    # prices at the edges of each tick are where bisection is least sure
+    price = tick_table.tick_to_price(tick) + offset
+    expect = tick_mock.priceToTick(price)
+    assert tick_table.price_to_tick(price) == expect
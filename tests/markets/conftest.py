@@ -1,15 +1,25 @@
 import pytest
 from brownie import (
-    Contract, OverlayV1Token, OverlayV1Market, OverlayV1Factory,
-    OverlayV1FeedFactoryMock,
-    OverlayV1FeedMock, OverlayV1Deployer, web3
+    AggregatorMock, Contract, OverlayV1Token, OverlayV1Market,
+    OverlayV1Factory, OverlayV1FeedFactoryMock,
+    OverlayV1FeedMock, OverlayV1Deployer, chain, web3
 )
 
 
 @pytest.fixture(scope="module")
-def sequencer_aggregator():
-    # Arbitrum One sequencer aggregator
-    yield Contract.from_explorer("0xFdB631F5EE196F0ed6FAa767959853A9F217697D")
+def sequencer_aggregator(gov, is_forked):
+    if is_forked:
+        # Arbitrum One sequencer aggregator
+        yield Contract.from_explorer(
+            "0xFdB631F5EE196F0ed6FAa767959853A9F217697D")
+        return
+
+    # local stand-in reporting the sequencer up (answer == 0). step past
+    # the update so the zero grace period has strictly passed
+    aggregator = gov.deploy(AggregatorMock)
+    aggregator.setData(1, 0, {"from": gov})
+    chain.sleep(1)
+    yield aggregator
 
 
 @pytest.fixture(scope="module")
@@ -86,8 +96,8 @@ def create_token(gov, alice, bob, minter_role, risk_manager_role, request):
         tok.mint(gov, supply * 10 ** tok.decimals(), {"from": gov})
         tok.renounceRole(minter_role, gov, {"from": gov})
 
-        tok.transfer(alice, (supply/2) * 10 ** tok.decimals(), {"from": gov})
-        tok.transfer(bob, (supply/2) * 10 ** tok.decimals(), {"from": gov})
+        tok.transfer(alice, supply * 10 ** tok.decimals() // 2, {"from": gov})
+        tok.transfer(bob, supply * 10 ** tok.decimals() // 2, {"from": gov})
         return tok
 
     yield create_token
@@ -119,21 +129,38 @@ def fake_feed(create_fake_feed):
 
 
 @pytest.fixture(scope="module")
-def uni():
+def uni(is_forked):
+    if not is_forked:
+        pytest.skip("uni is only available on a fork")
     # to be used as example ovl
     yield Contract.from_explorer("0xFa7F8980b0f1E64A2062791cc3b0871572f1F7f0")
 
 
 @pytest.fixture(scope="module")
-def feed_factory():
-    # to be used as example - deployed OverlayV1ChainlinkFeedFactory
-    yield Contract.from_explorer("0x92ee7A26Dbc18E9C0157831d79C2906A02fD1FAe")
+def feed_factory(gov, is_forked):
+    if is_forked:
+        # to be used as example - deployed OverlayV1ChainlinkFeedFactory
+        yield Contract.from_explorer(
+            "0x92ee7A26Dbc18E9C0157831d79C2906A02fD1FAe")
+        return
+
+    # local stand-in with the same windows as the deployed factory
+    yield gov.deploy(OverlayV1FeedFactoryMock, 600, 3600)
 
 
 @pytest.fixture(scope="module")
-def feed():
-    # to be used as example - deployed CS2 feed
-    yield Contract.from_explorer("0x46B4143CAf2fE2965349FCa53730e83f91247E2C")
+def feed(feed_factory, is_forked):
+    if is_forked:
+        # to be used as example - deployed CS2 feed
+        yield Contract.from_explorer(
+            "0x46B4143CAf2fE2965349FCa53730e83f91247E2C")
+        return
+
+    # local stand-in for the CS2 feed. reserve large enough that the
+    # front and back run bounds never bind for params within factory
+    # bounds, as with the chainlink feed which has no reserve
+    tx = feed_factory.deployFeed(1000000000000000000, 10 ** 28)
+    yield OverlayV1FeedMock.at(tx.return_value)
 
 
 @pytest.fixture(scope="module", params=[(600, 1800)])
@@ -0,0 +1,103 @@
+import pytest
+from brownie import reverts
+
+from scripts.libraries.oracle import Data
+from scripts.libraries.position import Info
+from scripts.libraries.risk import Parameters
+from scripts.libraries.roller import Snapshot
+from scripts.market.quote import Quoter
+from scripts.market.simulator import MarketSimulator
+from .utils import get_position_key
+
+
+@pytest.fixture(autouse=True)
+def isolation(fn_isolation):
+    pass
+
+
+def test_build_batch_matches_simulator(mock_market, mock_feed, ovl, factory,
+                                       alice):
+    params = [mock_market.params(i) for i in Parameters]
+    sim = MarketSimulator(params,
+                          lambda t: Data(t, *mock_feed.latest()[1:]),
+                          mock_market.timestampUpdateLast())
+
+    # a ladder of longs at increasing leverage and a short
+    builds = [(100 * 10**18, 2 * 10**18, True),
+              (100 * 10**18, 3 * 10**18, True),
+              (50 * 10**18, 5 * 10**18, True),
+              (200 * 10**18, 10**18, False)]
+    price_limits = [2**256-1, 2**256-1, 2**256-1, 0]
+    collaterals, leverages, is_longs = zip(*builds)
+
+    quoter = Quoter(params)
+    amount = quoter.build_amount(builds)
+    ovl.approve(mock_market, amount, {"from": alice})
+    fee_recipient = factory.feeRecipient()
+    balance_alice = ovl.balanceOf(alice)
+    balance_recipient = ovl.balanceOf(fee_recipient)
+    snapshot_ask = Snapshot(*mock_market.snapshotVolumeAsk())
+    snapshot_bid = Snapshot(*mock_market.snapshotVolumeBid())
+
+    tx = mock_market.buildBatch(collaterals, leverages, is_longs,
+                                price_limits, {"from": alice})
+    assert tx.return_value == [0, 1, 2, 3]
+    assert len(tx.events["Update"]) == 1
+    # pulls in collateral plus fees and pays out fees in a transfer each
+    assert len(tx.events["Transfer"]) == 2
+    assert ovl.balanceOf(alice) == balance_alice - amount
+
+    expect = sim.build_batch(tx.timestamp, alice.address,
+                             [b + (p,) for b, p in zip(builds, price_limits)])
+    assert [tuple(e.values())[1:] for e in tx.events["Build"]] \
+        == [e[1:-1] for e in expect]
+    assert ovl.balanceOf(fee_recipient) - balance_recipient \
+        == sum(e.trading_fee for e in expect)
+
+    # volume registers in turn, as for separate builds in the same block
+    quotes = quoter.build_batch(Data(tx.timestamp, *mock_feed.latest()[1:]),
+                                tx.timestamp, snapshot_ask, snapshot_bid,
+                                builds)
+    assert [q.price for q in quotes] == [e.price for e in expect]
+    assert quotes[0].price < quotes[1].price < quotes[2].price
+
+    assert (sim.oi_long, sim.oi_short) \
+        == (mock_market.oiLong(), mock_market.oiShort())
+    assert (sim.oi_long_shares, sim.oi_short_shares) \
+        == (mock_market.oiLongShares(), mock_market.oiShortShares())
+    assert sim.snapshot_volume_bid == mock_market.snapshotVolumeBid()
+    assert sim.snapshot_volume_ask == mock_market.snapshotVolumeAsk()
+    for (owner, id), pos in sim.positions.items():
+        assert pos == Info(*mock_market.positions(get_position_key(owner,
+                                                                   id)))
+
+
+def test_build_batch_reverts_when_any_build_reverts(mock_market, ovl, alice):
+    ovl.approve(mock_market, 2**256-1, {"from": alice})
+    collaterals = [100 * 10**18, 100 * 10**18]
+    is_longs = [True, False]
+
+    with reverts("OVLV1:lev>max"):
+        mock_market.buildBatch(collaterals, [10**18, 6 * 10**18], is_longs,
+                               [2**256-1, 0], {"from": alice})
+    with reverts("OVLV1:slippage>max"):
+        mock_market.buildBatch(collaterals, [10**18, 10**18], is_longs,
+                               [2**256-1, 2**256-1], {"from": alice})
+    with reverts("OVLV1:!length"):
+        mock_market.buildBatch(collaterals, [10**18], is_longs,
+                               [2**256-1, 0], {"from": alice})
+
+    # no positions built by the reverted batches
+    tx = mock_market.buildBatch(collaterals, [10**18, 10**18], is_longs,
+                                [2**256-1, 0], {"from": alice})
+    assert tx.return_value == [0, 1]
+
+
+def test_build_batch_reverts_when_has_shutdown(factory, mock_feed,
+                                               mock_market, ovl, alice,
+                                               guardian):
+    ovl.approve(mock_market, 2**256-1, {"from": alice})
+    factory.shutdown(mock_feed, {"from": guardian})
+    with reverts("OVLV1: shutdown"):
+        mock_market.buildBatch([10**18], [10**18], [True], [2**256-1],
+                               {"from": alice})
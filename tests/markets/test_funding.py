@@ -3,6 +3,7 @@ from brownie.test import given, strategy
 from decimal import Decimal
 from math import exp, sqrt
 
+from scripts.market import funding as offchain
 from .utils import RiskParameter
 
 
@@ -150,3 +151,44 @@ def test_oi_after_funding_when_underweight_is_zero_dt_infinite(market):
 
     assert actual_oi_underweight == 0
     assert actual_oi_overweight > 0
+
+
+@given(
+    oi_long=strategy('uint256', min_value='0',
+                     max_value='800000000000000000000000'),
+    oi_short=strategy('uint256', min_value='0',
+                      max_value='800000000000000000000000'),
+    dt=strategy('uint256', min_value='0', max_value='31536000'))
+def test_oi_after_funding_offchain_matches(market, oi_long, oi_short, dt):
+    oi_overweight = max(oi_long, oi_short)
+    oi_underweight = min(oi_long, oi_short)
+    k = market.params(RiskParameter.K.value)
+
+    expect = market.oiAfterFunding(oi_overweight, oi_underweight, dt)
+    actual = offchain.oi_after_funding(oi_overweight, oi_underweight, dt, k)
+    assert actual == tuple(expect)
+
+
+def test_funding_grid_offchain_matches(market):
+    oi_long = 800000 * 10**18
+    oi_short = 123456 * 10**18
+    k = market.params(RiskParameter.K.value)
+    times = [0, 600, 3600, 86400, 2592000]
+
+    # float grid over k values vs the exact port at the market's k
+    expect_long, expect_short = zip(*[
+        offchain.pay_funding(oi_long, oi_short, dt, k) for dt in times])
+    actual_long, actual_short = offchain.funding_grid(
+        oi_long, oi_short, [k // 2, k, 2 * k], times)
+
+    assert actual_long[1] == approx(expect_long, rel=1e-12)
+    assert actual_short[1] == approx(expect_short, rel=1e-12)
+
+    # longer exposure to a larger k pays more funding
+    assert (actual_long[2] <= actual_long[0]).all()
+    assert (actual_short[2] >= actual_short[0]).all()
+
+    # replaying updates every hour lands close to one update over a day
+    ois = offchain.replay(oi_long, oi_short, k, [3600] * 24)
+    assert ois[-1][0] == approx(expect_long[3], rel=1e-9)
+    assert ois[-1][1] == approx(expect_short[3], rel=1e-9)
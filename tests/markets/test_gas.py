@@ -0,0 +1,76 @@
+import pytest
+
+from scripts.market.gas import (
+    OPS, VERSION, Baseline, Case, GasModel, cases, dump, load, regressions,
+    risk_param_gas_saved, risk_param_slots
+)
+
+
+def test_case_names_round_trip():
+    all_cases = cases()
+    assert len({case.name for case in all_cases}) == len(all_cases)
+    for case in all_cases:
+        assert Case.from_name(case.name) == case
+
+    # emergencyWithdraw doesn't read the feed or register volume
+    withdraws = [c for c in all_cases if c.op == "emergency_withdraw"]
+    assert len(withdraws) == 2
+
+
+def test_baseline_round_trip_and_regressions(tmp_path):
+    build = Case("build", 12, True, "active")
+    update = Case("update", 12, True, "empty")
+    baseline = Baseline(VERSION, {"solc": "0.8.10"},
+                        {build: 200000, update: 80000})
+    path = str(tmp_path / "gas.json")
+    dump(baseline, path)
+    assert load(path) == baseline
+
+    measured = {build: 201000, update: 79000}
+    assert regressions(baseline, measured) == [(build, 200000, 201000)]
+    assert regressions(baseline, measured, tolerance=0.01) == []
+
+    with pytest.raises(ValueError):
+        regressions(baseline._replace(version=VERSION + 1), measured)
+
+
+def test_gas_model_linear_in_rounds():
+    gas = {Case("update", rounds, False, "empty"): 50000 + 3000 * rounds
+           for rounds in (2, 12, 120)}
+    model = GasModel(gas)
+    assert model.estimate("update", 60, other_side=False) == 230000
+    # roller is ignored for ops that don't register volume
+    assert model.estimate("update", 2, False, "active") == 56000
+
+
+def test_gas_model_bounded_by_max_rounds():
+    gas = {Case("update", rounds, other_side, "empty"):
+           50000 + 3000 * rounds + 10000 * other_side
+           for rounds in (2, 12, 120) for other_side in (False, True)}
+    model = GasModel(gas)
+    # one round a minute reads 120 rounds uncapped, 16 capped
+    assert model.estimate_for_interval("update", 60) == 420000
+    assert model.estimate_for_interval("update", 60, 16) == 108000
+    # cap above the rounds a feed has leaves the estimate unchanged
+    assert model.estimate_for_interval("update", 3600, 16) == 66000
+    assert model.worst_case("update", 16) == 108000
+
+
+def test_risk_param_slots_packed():
+    # (slots read one param a slot, slots read packed) per op
+    expect = {
+        "build": (13, 4),
+        "unwind_partial": (10, 4),
+        "unwind_full": (10, 4),
+        "liquidate": (6, 3),
+        "update": (1, 1),
+        "emergency_withdraw": (0, 0),
+    }
+    for op in OPS:
+        assert (risk_param_slots(op, False), risk_param_slots(op)) \
+            == expect[op]
+
+    assert risk_param_gas_saved("build") == 9 * 2000
+    assert risk_param_gas_saved("unwind_full") == 6 * 2000
+    assert risk_param_gas_saved("liquidate") == 3 * 2000
+    assert risk_param_gas_saved("update") == 0
@@ -0,0 +1,99 @@
+import pytest
+from brownie import chain
+
+from scripts.libraries.position import Info
+from scripts.market.indexer import PositionIndexer
+from .utils import get_position_key
+
+
+@pytest.fixture(autouse=True)
+def isolation(fn_isolation):
+    pass
+
+
+def build(market, ovl, trader, leverage, is_long):
+    collateral = 100 * 10**18
+    ovl.approve(market, 2**256-1, {"from": trader})
+    price_limit = 2**256-1 if is_long else 0
+    tx = market.build(collateral, int(leverage * 1e18), is_long, price_limit,
+                      {"from": trader})
+    return tx.return_value
+
+
+def trade(market, feed, ovl, alice, bob, rando):
+    """
+    Builds, unwinds and liquidates a mix of positions. Returns the
+    (owner, id) of each position touched
+    """
+    ids = [(alice.address, build(market, ovl, alice, lev, True))
+           for lev in (1, 2.5, 5)]
+    ids += [(bob.address, build(market, ovl, bob, lev, False))
+            for lev in (1.5, 3)]
+
+    chain.mine(timedelta=3600)
+    market.unwind(ids[0][1], 333300000000000000, 0, {"from": alice})
+    market.unwind(ids[3][1], 1000000000000000000, 2**256-1, {"from": bob})
+    market.update({"from": rando})
+
+    feed.setPrice(850000000000000000, {"from": rando})
+    market.liquidate(*ids[2], {"from": rando})
+    return ids
+
+
+def test_sync_reconstructs_positions(mock_market, mock_feed, ovl, alice,
+                                     bob, rando):
+    start_block = chain.height
+    ids = trade(mock_market, mock_feed, ovl, alice, bob, rando)
+
+    indexer = PositionIndexer(mock_market, start_block=start_block)
+    assert indexer.sync() > 0
+    assert indexer.block == chain.height
+    assert len(indexer) == len(ids)
+
+    for owner, id in ids:
+        expect = Info(*mock_market.positions(get_position_key(owner, id)))
+        assert indexer.positions[(owner, id)] == expect
+
+    assert indexer.oi_long_shares == mock_market.oiLongShares()
+    assert indexer.oi_short_shares == mock_market.oiShortShares()
+    assert indexer.oi_long == mock_market.oiLong()
+    assert indexer.oi_short == mock_market.oiShort()
+
+    # liquidated and fully unwound positions drop out of open positions
+    open_ids = {ident for ident, _ in indexer.open_positions()}
+    assert open_ids == {ids[0], ids[1], ids[4]}
+    assert len(indexer.to_book()) == 3
+
+
+def test_sync_resumes_from_checkpoint(mock_market, mock_feed, ovl, alice,
+                                      bob, rando, tmp_path):
+    path = str(tmp_path / "checkpoint.json")
+    start_block = chain.height
+    build(mock_market, ovl, alice, 2, True)
+    build(mock_market, ovl, bob, 2, False)
+    checkpoint_block = chain.height
+
+    indexer = PositionIndexer(mock_market, start_block=start_block,
+                              checkpoint_path=path)
+    indexer.sync()
+    assert indexer.block == checkpoint_block
+
+    ids = trade(mock_market, mock_feed, ovl, alice, bob, rando)
+
+    # resumes after the checkpointed block rather than start block
+    resumed = PositionIndexer(mock_market, start_block=start_block,
+                              checkpoint_path=path)
+    assert resumed.block == checkpoint_block
+    assert len(resumed) == 2
+    resumed.sync(batch_size=3)
+
+    full = PositionIndexer(mock_market, start_block=start_block)
+    full.sync()
+
+    assert resumed.block == full.block
+    assert resumed.positions == full.positions
+    assert resumed.oi_long_shares == full.oi_long_shares
+    assert resumed.oi_short_shares == full.oi_short_shares
+    for owner, id in ids:
+        expect = Info(*mock_market.positions(get_position_key(owner, id)))
+        assert resumed.positions[(owner, id)] == expect
@@ -0,0 +1,128 @@
+import pytest
+from brownie import chain, reverts
+
+from scripts.market.keeper import Keeper
+from .utils import get_position_key
+
+
+@pytest.fixture(autouse=True)
+def isolation(fn_isolation):
+    pass
+
+
+def build(market, ovl, trader, leverage, is_long):
+    collateral = 100 * 10**18
+    ovl.approve(market, 2**256-1, {"from": trader})
+    price_limit = 2**256-1 if is_long else 0
+    tx = market.build(collateral, int(leverage * 1e18), is_long, price_limit,
+                      {"from": trader})
+    return (trader.address, tx.return_value)
+
+
+def test_keeper_liquidates_crossed_positions(mock_market, mock_feed, ovl,
+                                             alice, bob, rando):
+    longs = {lev: build(mock_market, ovl, alice, lev, True)
+             for lev in (1.5, 3, 5)}
+    shorts = {lev: build(mock_market, ovl, bob, lev, False)
+              for lev in (1.5, 3, 5)}
+
+    keeper = Keeper(mock_market, rando)
+    for owner, id in list(longs.values()) + list(shorts.values()):
+        keeper.track(owner, id)
+    assert len(keeper.index) == 6
+
+    # nothing crossed at entry
+    chain.mine(timedelta=3600)
+    assert keeper.poll() == []
+
+    # 15% drop crosses only the 5x long
+    mock_feed.setPrice(850000000000000000, {"from": rando})
+    assert keeper.run() == [longs[5]]
+    owner, id = longs[5]
+    assert mock_market.positions(get_position_key(owner, id))[5]
+
+    # 30% rise from start crosses the 3x and 5x shorts
+    mock_feed.setPrice(1300000000000000000, {"from": rando})
+    assert sorted(keeper.run()) == sorted([shorts[3], shorts[5]])
+    assert len(keeper.index) == 3
+
+    # remaining positions are not liquidatable on chain either
+    for owner, id in (longs[1.5], longs[3], shorts[1.5]):
+        with reverts("OVLV1:!liquidatable"):
+            mock_market.liquidate(owner, id, {"from": rando})
+
+
+def test_keeper_retracks_reverted_liquidations(mock_market, mock_feed, ovl,
+                                               alice, rando, bob):
+    owner, id = build(mock_market, ovl, alice, 5, True)
+
+    keeper = Keeper(mock_market, rando)
+    keeper.track(owner, id)
+
+    # another keeper front-runs the liquidation
+    mock_feed.setPrice(850000000000000000, {"from": rando})
+    mock_market.liquidate(owner, id, {"from": bob})
+
+    # liquidate reverts and the dead position is dropped on re-track
+    assert keeper.run() == []
+    assert len(keeper.index) == 0
+
+
+def test_keeper_run_batch_liquidates_and_retracks(mock_market, mock_feed, ovl,
+                                                  alice, bob, rando):
+    longs = [build(mock_market, ovl, alice, lev, True)
+             for lev in (1.5, 5, 5, 5)]
+
+    keeper = Keeper(mock_market, rando)
+    for owner, id in longs:
+        keeper.track(owner, id)
+
+    # another keeper front-runs one of the crossed positions, which the
+    # batch skips rather than reverting
+    mock_feed.setPrice(850000000000000000, {"from": rando})
+    mock_market.liquidate(*longs[3], {"from": bob})
+    assert sorted(keeper.run_batch(batch_size=2)) == sorted(longs[1:3])
+    assert len(keeper.index) == 1
+    for owner, id in longs[1:]:
+        assert mock_market.positions(get_position_key(owner, id))[5]
+
+
+class RevertingBatchMarket:
+    """
+    Market whose first liquidateBatch drops an id, so the tx reverts on
+    chain with mismatched lengths
+    """
+
+    def __init__(self, market):
+        self.market = market
+        self.reverts = 1
+
+    def __getattr__(self, name):
+        return getattr(self.market, name)
+
+    def liquidateBatch(self, owners, ids, tx_params):
+        if self.reverts > 0:
+            self.reverts -= 1
+            ids = ids[:-1]
+        return self.market.liquidateBatch(owners, ids, tx_params)
+
+
+def test_keeper_run_batch_retracks_reverted_batch(mock_market, mock_feed,
+                                                  ovl, alice, rando):
+    longs = [build(mock_market, ovl, alice, 5, True) for _ in range(3)]
+
+    market = RevertingBatchMarket(mock_market)
+    keeper = Keeper(market, rando)
+    for owner, id in longs:
+        keeper.track(owner, id)
+
+    # batch reverts, so every position in it is tracked again
+    mock_feed.setPrice(850000000000000000, {"from": rando})
+    assert keeper.run_batch() == []
+    assert len(keeper.index) == 3
+
+    # and liquidated on the next poll
+    assert sorted(keeper.run_batch()) == sorted(longs)
+    assert len(keeper.index) == 0
+    for owner, id in longs:
+        assert mock_market.positions(get_position_key(owner, id))[5]
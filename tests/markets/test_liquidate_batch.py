@@ -0,0 +1,124 @@
+import pytest
+from brownie import chain, reverts
+
+from scripts.libraries import position
+from scripts.libraries.oracle import Data
+from scripts.libraries.position import Info
+from scripts.libraries.risk import Parameters
+from scripts.market.simulator import MarketSimulator
+from .utils import get_position_key
+
+
+@pytest.fixture(autouse=True)
+def isolation(fn_isolation):
+    pass
+
+
+def build_positions(market, ovl, sim, trades):
+    ids = []
+    for trader, leverage, is_long in trades:
+        ovl.approve(market, 2**256-1, {"from": trader})
+        price_limit = 2**256-1 if is_long else 0
+        tx = market.build(100 * 10**18, int(leverage * 10**18), is_long,
+                          price_limit, {"from": trader})
+        sim.build(tx.timestamp, trader.address, 100 * 10**18,
+                  int(leverage * 10**18), is_long, price_limit)
+        ids.append((trader.address, tx.return_value))
+    return ids
+
+
+def test_liquidate_batch_matches_simulator(mock_market, mock_feed, ovl,
+                                           factory, alice, bob, rando):
+    params = [mock_market.params(i) for i in Parameters]
+    sim = MarketSimulator(params,
+                          lambda t: Data(t, *mock_feed.latest()[1:]),
+                          mock_market.timestampUpdateLast())
+    ids = build_positions(mock_market, ovl, sim, [
+        (alice, 5, True), (bob, 5, True), (alice, 1.5, True),
+        (bob, 2, False)])
+
+    # 15% drop leaves only the 5x longs liquidatable. the batch skips the
+    # rest, positions that don't exist and repeats
+    mock_feed.setPrice(850000000000000000, {"from": rando})
+    chain.mine(timedelta=600)
+    keys = ids + [(alice.address, 99), ids[0]]
+    owners, position_ids = zip(*keys)
+
+    fee_recipient = factory.feeRecipient()
+    balance_rando = ovl.balanceOf(rando)
+    balance_recipient = ovl.balanceOf(fee_recipient)
+    balance_market = ovl.balanceOf(mock_market)
+    total_supply = ovl.totalSupply()
+    positions = [Info(*mock_market.positions(get_position_key(*key)))
+                 for key in ids]
+
+    tx = mock_market.liquidateBatch(owners, position_ids, {"from": rando})
+    assert tx.return_value == 2
+    assert len(tx.events["Update"]) == 1
+
+    expect = sim.liquidate_batch(tx.timestamp, rando.address, keys)
+    assert [(e.owner, e.position_id) for e in expect] == ids[:2]
+    assert [tuple(e.values())[1:] for e in tx.events["Liquidate"]] \
+        == [e[1:-1] for e in expect]
+
+    # burns the pnl and insurance margin, rewards liquidation fees, and
+    # sends remaining margin to the fee recipient
+    fees = sum(e.liquidation_fee for e in expect)
+    minted = sum(e.mint for e in expect)
+    costs = sum(position.cost(pos, 10**18) for pos in positions[:2])
+    assert ovl.balanceOf(rando) - balance_rando == fees
+    assert ovl.totalSupply() - total_supply == minted
+    assert balance_market - ovl.balanceOf(mock_market) == costs
+    assert ovl.balanceOf(fee_recipient) - balance_recipient \
+        == costs + minted - fees
+
+    assert (sim.oi_long, sim.oi_short) \
+        == (mock_market.oiLong(), mock_market.oiShort())
+    assert (sim.oi_long_shares, sim.oi_short_shares) \
+        == (mock_market.oiLongShares(), mock_market.oiShortShares())
+    assert sim.snapshot_minted == mock_market.snapshotMinted()
+    for key in ids:
+        assert sim.positions[key] \
+            == Info(*mock_market.positions(get_position_key(*key)))
+
+
+def test_liquidate_batch_skips_when_none_liquidatable(mock_market, mock_feed,
+                                                      ovl, alice, rando):
+    ovl.approve(mock_market, 2**256-1, {"from": alice})
+    tx = mock_market.build(100 * 10**18, 2 * 10**18, True, 2**256-1,
+                           {"from": alice})
+    pos_id = tx.return_value
+    balance_market = ovl.balanceOf(mock_market)
+
+    # still pays funding without reverting or transferring
+    chain.mine(timedelta=600)
+    tx = mock_market.liquidateBatch([alice, alice], [pos_id, pos_id + 1],
+                                    {"from": rando})
+    assert tx.return_value == 0
+    assert "Liquidate" not in tx.events
+    assert "Transfer" not in tx.events
+    assert mock_market.timestampUpdateLast() == tx.timestamp
+    assert ovl.balanceOf(mock_market) == balance_market
+
+    tx = mock_market.liquidateBatch([], [], {"from": rando})
+    assert tx.return_value == 0
+
+
+def test_liquidate_batch_reverts_when_lengths_differ(mock_market, alice,
+                                                     rando):
+    with reverts("OVLV1:!length"):
+        mock_market.liquidateBatch([alice, alice], [0], {"from": rando})
+
+
+def test_liquidate_batch_reverts_when_has_shutdown(factory, mock_feed,
+                                                   mock_market, ovl, alice,
+                                                   guardian, rando):
+    ovl.approve(mock_market, 2**256-1, {"from": alice})
+    tx = mock_market.build(10**18, 2 * 10**18, True, 2**256-1,
+                           {"from": alice})
+    mock_feed.setPrice(int(mock_feed.price() / 2.0), {"from": rando})
+
+    factory.shutdown(mock_feed, {"from": guardian})
+    with reverts("OVLV1: shutdown"):
+        mock_market.liquidateBatch([alice], [tx.return_value],
+                                   {"from": rando})
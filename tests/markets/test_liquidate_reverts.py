@@ -0,0 +1,436 @@
+import pytest
+from brownie import chain, reverts
+from decimal import Decimal
+
+from .utils import (
+    calculate_position_info,
+    get_position_key,
+    tick_to_price,
+    RiskParameter
+)
+
+
+# NOTE: Tests passing with isolation fixture
+# TODO: Fix tests to pass even without isolation fixture (?)
+@pytest.fixture(autouse=True)
+def isolation(fn_isolation):
+    pass
+
+
+def test_liquidate_reverts_when_not_position_owner(mock_market, mock_feed,
+                                                   alice, bob,
+                                                   rando, ovl):
+    # position build attributes
+    notional_initial = Decimal(1000)
+    leverage = Decimal(1.5)
+    is_long = True
+
+    # tolerance
+    tol = 1e-4
+
+    # calculate expected pos info data
+    idx_trade = RiskParameter.TRADING_FEE_RATE.value
+    trading_fee_rate = Decimal(mock_market.params(idx_trade) / 1e18)
+    collateral, _, _, trade_fee \
+        = calculate_position_info(notional_initial, leverage, trading_fee_rate)
+
+    # input values for build
+    input_collateral = int(collateral * Decimal(1e18))
+    input_leverage = int(leverage * Decimal(1e18))
+    input_is_long = is_long
+
+    # NOTE: slippage tests in test_slippage.py
+    # NOTE: setting to min/max here, so never reverts with slippage>max
+    input_price_limit = 2**256-1 if is_long else 0
+
+    # approve collateral amount: collateral + trade fee
+    approve_collateral = int((collateral + trade_fee) * Decimal(1e18))
+
+    # approve then build
+    # NOTE: build() tests in test_build.py
+    ovl.approve(mock_market, approve_collateral, {"from": alice})
+    tx = mock_market.build(input_collateral, input_leverage, input_is_long,
+                           input_price_limit, {"from": alice})
+    pos_id = tx.return_value
+
+    # get position info
+    pos_key = get_position_key(alice.address, pos_id)
+    (expect_notional, expect_debt, expect_mid_tick, expect_entry_tick,
+     expect_is_long, expect_liquidated, expect_oi_shares,
+     expect_fraction_remaining) = mock_market.positions(pos_key)
+
+    # calculate the entry and mid prices
+    expect_mid_price = tick_to_price(expect_mid_tick)
+    expect_entry_price = tick_to_price(expect_entry_tick)
+
+    # mine the chain forward for some time difference with build and liquidate
+    # funding should occur within this interval.
+    # Use update() to update state to query values for checks vs expected
+    # after liquidate.
+    # NOTE: update() tests in test_update.py
+    chain.mine(timedelta=3600)
+    tx = mock_market.update({"from": rando})
+
+    # calculate current oi, debt values of position
+    expect_total_oi = mock_market.oiLong() if is_long \
+        else mock_market.oiShort()
+    expect_total_oi_shares = mock_market.oiLongShares() if is_long \
+        else mock_market.oiShortShares()
+    expect_oi_current = (Decimal(expect_total_oi)*Decimal(expect_oi_shares)) \
+        / Decimal(expect_total_oi_shares)
+    expect_oi_initial = Decimal(expect_notional) * \
+        Decimal(1e18) / Decimal(expect_mid_price)
+
+    # calculate position attributes at current time, ignore payoff cap
+    liq_oi = expect_oi_current
+    liq_oi_initial = expect_oi_initial
+    liq_notional = Decimal(expect_notional)
+    liq_debt = Decimal(expect_debt)
+
+    # calculate expected liquidation price
+    # NOTE: p_liq = p_entry * ( MM * OI(0) + D ) / OI if long
+    # NOTE:       = p_entry * ( 2 - ( MM * OI(0) + D ) / OI ) if short
+    idx_mmf = RiskParameter.MAINTENANCE_MARGIN_FRACTION.value
+    idx_liq = RiskParameter.LIQUIDATION_FEE_RATE.value
+    maintenance_fraction = Decimal(mock_market.params(idx_mmf)) \
+        / Decimal(1e18)
+    liq_fee_rate = Decimal(mock_market.params(idx_liq)) / Decimal(1e18)
+
+    # calculate the liquidation price factor
+    # then infer market impact required to slip to this price
+    # liq_price = entry_price - notional_initial / oi_initial
+    #             + (mm * notional_initial + debt) / oi_current
+    # liq_price = entry_price + notional_initial / oi_initial
+    #             - (mm * notional_initial + debt) / oi_current
+    if is_long:
+        liq_price = Decimal(expect_entry_price) / Decimal(1e18) \
+            - liq_notional / liq_oi_initial \
+            + (maintenance_fraction * liq_notional / (1-liq_fee_rate)
+               + liq_debt) / liq_oi
+        liq_price = liq_price * Decimal(1e18) * Decimal(1 - tol)
+    else:
+        liq_price = Decimal(expect_entry_price) / Decimal(1e18) \
+            + liq_notional / liq_oi_initial \
+            - (maintenance_fraction * liq_notional / (1-liq_fee_rate)
+               + liq_debt) / liq_oi
+        liq_price = liq_price * Decimal(1e18) * Decimal(1 + tol)
+
+    # change price to liq_price so position becomes liquidatable
+    mock_feed.setPrice(liq_price, {"from": rando})
+
+    # input values for liquidate
+    input_pos_id = pos_id
+
+    # check liquidate reverts when owner is assumed to be bob
+    input_owner = bob.address
+    with reverts("OVLV1:!position"):
+        mock_market.liquidate(input_owner, input_pos_id, {"from": rando})
+
+    # check liquidate succeeds when owner is specified as alice
+    input_owner = alice.address
+    mock_market.liquidate(input_owner, input_pos_id, {"from": rando})
+
+
+def test_liquidate_reverts_when_position_not_exists(mock_market, alice, rando,
+                                                    ovl):
+    pos_id = 100
+
+    # check liquidate reverts when position does not exist
+    with reverts("OVLV1:!position"):
+        mock_market.liquidate(alice, pos_id, {"from": rando})
+
+
+def test_liquidate_reverts_when_position_liquidated(mock_market, mock_feed,
+                                                    alice, rando,
+                                                    ovl):
+    # position build attributes
+    notional_initial = Decimal(1000)
+    leverage = Decimal(1.5)
+    is_long = True
+
+    # tolerance
+    tol = 1e-4
+
+    # calculate expected pos info data
+    idx_trade = RiskParameter.TRADING_FEE_RATE.value
+    trading_fee_rate = Decimal(mock_market.params(idx_trade) / 1e18)
+    collateral, _, _, trade_fee \
+        = calculate_position_info(notional_initial, leverage, trading_fee_rate)
+
+    # input values for build
+    input_collateral = int(collateral * Decimal(1e18))
+    input_leverage = int(leverage * Decimal(1e18))
+    input_is_long = is_long
+
+    # NOTE: slippage tests in test_slippage.py
+    # NOTE: setting to min/max here, so never reverts with slippage>max
+    input_price_limit = 2**256-1 if is_long else 0
+
+    # approve collateral amount: collateral + trade fee
+    approve_collateral = int((collateral + trade_fee) * Decimal(1e18))
+
+    # approve then build
+    # NOTE: build() tests in test_build.py
+    ovl.approve(mock_market, approve_collateral, {"from": alice})
+    tx = mock_market.build(input_collateral, input_leverage, input_is_long,
+                           input_price_limit, {"from": alice})
+    pos_id = tx.return_value
+
+    # get position info
+    pos_key = get_position_key(alice.address, pos_id)
+    (expect_notional, expect_debt, expect_mid_tick, expect_entry_tick,
+     expect_is_long, expect_liquidated, expect_oi_shares,
+     expect_fraction_remaining) = mock_market.positions(pos_key)
+
+    # calculate the entry and mid prices
+    expect_mid_price = tick_to_price(expect_mid_tick)
+    expect_entry_price = tick_to_price(expect_entry_tick)
+
+    # mine the chain forward for some time difference with build and liquidate
+    # funding should occur within this interval.
+    # Use update() to update state to query values for checks vs expected
+    # after liquidate.
+    # NOTE: update() tests in test_update.py
+    chain.mine(timedelta=3600)
+    tx = mock_market.update({"from": rando})
+
+    # calculate current oi, debt values of position
+    expect_total_oi = mock_market.oiLong() if is_long \
+        else mock_market.oiShort()
+    expect_total_oi_shares = mock_market.oiLongShares() if is_long \
+        else mock_market.oiShortShares()
+    expect_oi_current = (Decimal(expect_total_oi)*Decimal(expect_oi_shares)) \
+        / Decimal(expect_total_oi_shares)
+    expect_oi_initial = Decimal(expect_notional) * \
+        Decimal(1e18) / Decimal(expect_mid_price)
+
+    # calculate position attributes at current time, ignore payoff cap
+    liq_oi = expect_oi_current
+    liq_oi_initial = expect_oi_initial
+    liq_notional = Decimal(expect_notional)
+    liq_debt = Decimal(expect_debt)
+
+    # calculate expected liquidation price
+    # NOTE: p_liq = p_entry * ( MM * OI(0) + D ) / OI if long
+    # NOTE:       = p_entry * ( 2 - ( MM * OI(0) + D ) / OI ) if short
+    idx_mmf = RiskParameter.MAINTENANCE_MARGIN_FRACTION.value
+    idx_liq = RiskParameter.LIQUIDATION_FEE_RATE.value
+    maintenance_fraction = Decimal(mock_market.params(idx_mmf)) \
+        / Decimal(1e18)
+    liq_fee_rate = Decimal(mock_market.params(idx_liq)) / Decimal(1e18)
+
+    # calculate the liquidation price factor
+    # then infer market impact required to slip to this price
+    # liq_price = entry_price - notional_initial / oi_initial
+    #             + (mm * notional_initial + debt) / oi_current
+    # liq_price = entry_price + notional_initial / oi_initial
+    #             - (mm * notional_initial + debt) / oi_current
+    if is_long:
+        liq_price = Decimal(expect_entry_price) / Decimal(1e18) \
+            - liq_notional / liq_oi_initial \
+            + (maintenance_fraction * liq_notional / (1-liq_fee_rate)
+               + liq_debt) / liq_oi
+        liq_price = liq_price * Decimal(1e18) * Decimal(1 - tol)
+    else:
+        liq_price = Decimal(expect_entry_price) / Decimal(1e18) \
+            + liq_notional / liq_oi_initial \
+            - (maintenance_fraction * liq_notional / (1-liq_fee_rate)
+               + liq_debt) / liq_oi
+        liq_price = liq_price * Decimal(1e18) * Decimal(1 + tol)
+
+    # change price to liq_price so position becomes liquidatable
+    mock_feed.setPrice(liq_price, {"from": rando})
+
+    # input values for liquidate
+    input_pos_id = pos_id
+
+    # liquidate the position
+    input_owner = alice.address
+    mock_market.liquidate(input_owner, input_pos_id, {"from": rando})
+
+    # check attempting to liquidate again reverts
+    with reverts("OVLV1:!position"):
+        mock_market.liquidate(input_owner, input_pos_id, {"from": rando})
+
+
+def test_liquidate_reverts_when_position_not_liquidatable(mock_market,
+                                                          mock_feed, alice,
+                                                          rando, ovl):
+    # position build attributes
+    notional_initial = Decimal(1000)
+    leverage = Decimal(1.5)
+    is_long = True
+
+    # tolerance
+    tol = 1e-4
+
+    # calculate expected pos info data
+    idx_trade = RiskParameter.TRADING_FEE_RATE.value
+    trading_fee_rate = Decimal(mock_market.params(idx_trade) / 1e18)
+    collateral, _, _, trade_fee \
+        = calculate_position_info(notional_initial, leverage, trading_fee_rate)
+
+    # input values for build
+    input_collateral = int(collateral * Decimal(1e18))
+    input_leverage = int(leverage * Decimal(1e18))
+    input_is_long = is_long
+
+    # NOTE: slippage tests in test_slippage.py
+    # NOTE: setting to min/max here, so never reverts with slippage>max
+    input_price_limit = 2**256-1 if is_long else 0
+
+    # approve collateral amount: collateral + trade fee
+    approve_collateral = int((collateral + trade_fee) * Decimal(1e18))
+
+    # approve then build
+    # NOTE: build() tests in test_build.py
+    ovl.approve(mock_market, approve_collateral, {"from": alice})
+    tx = mock_market.build(input_collateral, input_leverage, input_is_long,
+                           input_price_limit, {"from": alice})
+    pos_id = tx.return_value
+
+    # get position info
+    pos_key = get_position_key(alice.address, pos_id)
+    (expect_notional, expect_debt, expect_mid_tick, expect_entry_tick,
+     expect_is_long, expect_liquidated, expect_oi_shares,
+     expect_fraction_remaining) = mock_market.positions(pos_key)
+
+    # calculate the entry and mid prices
+    expect_mid_price = tick_to_price(expect_mid_tick)
+    expect_entry_price = tick_to_price(expect_entry_tick)
+
+    # mine the chain forward for some time difference with build and liquidate
+    # funding should occur within this interval.
+    # Use update() to update state to query values for checks vs expected
+    # after liquidate.
+    # NOTE: update() tests in test_update.py
+    chain.mine(timedelta=3600)
+    tx = mock_market.update({"from": rando})
+
+    # calculate current oi, debt values of position
+    expect_total_oi = mock_market.oiLong() if is_long \
+        else mock_market.oiShort()
+    expect_total_oi_shares = mock_market.oiLongShares() if is_long \
+        else mock_market.oiShortShares()
+    expect_oi_current = (Decimal(expect_total_oi)*Decimal(expect_oi_shares)) \
+        / Decimal(expect_total_oi_shares)
+    expect_oi_initial = Decimal(expect_notional) * \
+        Decimal(1e18) / Decimal(expect_mid_price)
+
+    # calculate position attributes at current time, ignore payoff cap
+    liq_oi = expect_oi_current
+    liq_oi_initial = expect_oi_initial
+    liq_notional = Decimal(expect_notional)
+    liq_debt = Decimal(expect_debt)
+
+    # calculate expected liquidation price
+    # NOTE: p_liq = p_entry * ( MM * OI(0) + D ) / OI if long
+    # NOTE:       = p_entry * ( 2 - ( MM * OI(0) + D ) / OI ) if short
+    idx_mmf = RiskParameter.MAINTENANCE_MARGIN_FRACTION.value
+    idx_liq = RiskParameter.LIQUIDATION_FEE_RATE.value
+    maintenance_fraction = Decimal(mock_market.params(idx_mmf)) \
+        / Decimal(1e18)
+    liq_fee_rate = Decimal(mock_market.params(idx_liq)) / Decimal(1e18)
+
+    # calculate the liquidation price factor
+    # then infer market impact required to slip to this price
+    # liq_price = entry_price - notional_initial / oi_initial
+    #             + (mm * notional_initial + debt) / oi_current
+    # liq_price = entry_price + notional_initial / oi_initial
+    #             - (mm * notional_initial + debt) / oi_current
+    if is_long:
+        liq_price = Decimal(expect_entry_price) / Decimal(1e18) \
+            - liq_notional / liq_oi_initial \
+            + (maintenance_fraction * liq_notional / (1-liq_fee_rate)
+               + liq_debt) / liq_oi
+        liq_price = liq_price * Decimal(1e18) * Decimal(1 + tol)
+    else:
+        liq_price = Decimal(expect_entry_price) / Decimal(1e18) \
+            + liq_notional / liq_oi_initial \
+            - (maintenance_fraction * liq_notional / (1-liq_fee_rate)
+               + liq_debt) / liq_oi
+        liq_price = liq_price * Decimal(1e18) * Decimal(1 - tol)
+
+    mock_feed.setPrice(liq_price, {"from": rando})
+
+    # input values for liquidate
+    input_pos_id = pos_id
+    input_owner = alice.address
+
+    # check attempting to liquidate position reverts when not liquidatable
+    with reverts("OVLV1:!liquidatable"):
+        mock_market.liquidate(input_owner, input_pos_id, {"from": rando})
+
+    # calculate the liquidation price factor
+    # then infer market impact required to slip to this price
+    # liq_price = entry_price - notional_initial / oi_initial
+    #             + (mm * notional_initial + debt) / oi_current
+    # liq_price = entry_price + notional_initial / oi_initial
+    #             - (mm * notional_initial + debt) / oi_current
+    if is_long:
+        liq_price = Decimal(expect_entry_price) / Decimal(1e18) \
+            - liq_notional / liq_oi_initial \
+            + (maintenance_fraction * liq_notional / (1-liq_fee_rate)
+               + liq_debt) / liq_oi
+        liq_price = liq_price * Decimal(1e18) * Decimal(1 - tol)
+    else:
+        liq_price = Decimal(expect_entry_price) / Decimal(1e18) \
+            + liq_notional / liq_oi_initial \
+            - (maintenance_fraction * liq_notional / (1-liq_fee_rate)
+               + liq_debt) / liq_oi
+        liq_price = liq_price * Decimal(1e18) * Decimal(1 + tol)
+
+    mock_feed.setPrice(liq_price, {"from": rando})
+
+    # check can liquidate position when liquidatable
+    mock_market.liquidate(input_owner, input_pos_id, {"from": rando})
+
+    # check position has been liquidated
+    (_, _, _, _, _, actual_liquidated, actual_oi_shares,
+     actual_fraction_remaining) = mock_market.positions(pos_key)
+    assert actual_liquidated is True
+    assert actual_oi_shares == 0
+    assert actual_fraction_remaining == 0
+
+
+def test_liquidate_reverts_when_has_shutdown(factory, mock_feed, mock_market,
+                                             ovl, alice, guardian, rando):
+    # build inputs
+    input_collateral = int(1e18)
+    input_leverage = int(2e18)
+    input_is_long = True
+
+    # NOTE: slippage tests in test_slippage.py
+    # NOTE: setting to min/max here, so never reverts with slippage>max
+    input_price_limit = 2**256-1
+
+    # approve market for spending before build. use max
+    ovl.approve(mock_market, 2**256 - 1, {"from": alice})
+
+    # build two positions prior to shutdown
+    tx_0 = mock_market.build(input_collateral, input_leverage, input_is_long,
+                             input_price_limit, {"from": alice})
+    tx_1 = mock_market.build(input_collateral, input_leverage, input_is_long,
+                             input_price_limit, {"from": alice})
+
+    # cache the pos ids
+    input_pos_id_0 = tx_0.return_value
+    input_pos_id_1 = tx_1.return_value
+
+    # set price so liquidatable
+    liq_price = int(mock_feed.price() / 2.0)
+    mock_feed.setPrice(liq_price, {"from": rando})
+
+    # liquidate the first position to check works prior to shutdown
+    mock_market.liquidate(alice, input_pos_id_0, {"from": rando})
+
+    # shutdown market
+    # NOTE: factory.shutdown() tests in factories/market/test_setters.py
+    factory.shutdown(mock_feed, {"from": guardian})
+
+    # attempt to liquidate
+    with reverts("OVLV1: shutdown"):
+        mock_market.liquidate(alice, input_pos_id_1, {"from": rando})
+
+
+# TODO: add tests with multiple positions and only one liquidated
@@ -0,0 +1,643 @@
+import pytest
+from pytest import approx
+from brownie import chain
+from brownie.test import given, strategy
+from decimal import Decimal
+
+from .utils import (
+    calculate_position_info,
+    get_position_key,
+    tick_to_price,
+    RiskParameter
+)
+
+
+# NOTE: Tests passing with isolation fixture
+# TODO: Fix tests to pass even without isolation fixture (?)
+@pytest.fixture(autouse=True)
+def isolation(fn_isolation):
+    pass
+
+
+@given(is_long=strategy('bool'))
+def test_liquidate_executes_transfers(mock_market, mock_feed, alice, rando,
+                                      factory, ovl, is_long):
+    # position build attributes
+    notional_initial = Decimal(1000)
+    leverage = Decimal(1.5)
+    is_long = True
+
+    # tolerance
+    tol = 1e-4
+
+    # calculate expected pos info data
+    idx_trade = RiskParameter.TRADING_FEE_RATE.value
+    trading_fee_rate = Decimal(mock_market.params(idx_trade) / 1e18)
+    collateral, _, _, trade_fee \
+        = calculate_position_info(notional_initial, leverage, trading_fee_rate)
+
+    # input values for build
+    input_collateral = int(collateral * Decimal(1e18))
+    input_leverage = int(leverage * Decimal(1e18))
+    input_is_long = is_long
+
+    # NOTE: slippage tests in test_slippage.py
+    # NOTE: setting to min/max here, so never reverts with slippage>max
+    input_price_limit = 2**256-1 if is_long else 0
+
+    # approve collateral amount: collateral + trade fee
+    approve_collateral = int((collateral + trade_fee) * Decimal(1e18))
+
+    # approve then build
+    # NOTE: build() tests in test_build.py
+    ovl.approve(mock_market, approve_collateral, {"from": alice})
+    tx = mock_market.build(input_collateral, input_leverage, input_is_long,
+                           input_price_limit, {"from": alice})
+    pos_id = tx.return_value
+
+    # get position info
+    pos_key = get_position_key(alice.address, pos_id)
+    (expect_notional, expect_debt, expect_mid_tick, expect_entry_tick,
+     expect_is_long, expect_liquidated, expect_oi_shares,
+     expect_fraction_remaining) = mock_market.positions(pos_key)
+
+    # calculate the entry and mid prices
+    expect_mid_price = tick_to_price(expect_mid_tick)
+    expect_entry_price = tick_to_price(expect_entry_tick)
+
+    # mine the chain forward for some time difference with build and liquidate
+    # funding should occur within this interval.
+    # Use update() to update state to query values for checks vs expected
+    # after liquidate.
+    # NOTE: update() tests in test_update.py
+    chain.mine(timedelta=3600)
+    tx = mock_market.update({"from": rando})
+
+    # calculate current oi, debt values of position
+    expect_total_oi = mock_market.oiLong() if is_long \
+        else mock_market.oiShort()
+    expect_total_oi_shares = mock_market.oiLongShares() if is_long \
+        else mock_market.oiShortShares()
+    expect_oi_current = (Decimal(expect_total_oi)*Decimal(expect_oi_shares)) \
+        / Decimal(expect_total_oi_shares)
+    expect_oi_initial = Decimal(expect_notional) * \
+        Decimal(1e18) / Decimal(expect_mid_price)
+
+    # calculate position attributes at current time, ignore payoff cap
+    liq_oi = expect_oi_current
+    liq_oi_initial = expect_oi_initial
+    liq_notional = Decimal(expect_notional)
+    liq_cost = Decimal(expect_notional - expect_debt)
+    liq_debt = Decimal(expect_debt)
+    liq_collateral = liq_notional * (liq_oi / liq_oi_initial) - liq_debt
+
+    # calculate expected liquidation price
+    # NOTE: p_liq = p_entry * ( MM * OI(0) + D ) / OI if long
+    # NOTE:       = p_entry * ( 2 - ( MM * OI(0) + D ) / OI ) if short
+    idx_mmf = RiskParameter.MAINTENANCE_MARGIN_FRACTION.value
+    idx_liq = RiskParameter.LIQUIDATION_FEE_RATE.value
+    maintenance_fraction = Decimal(mock_market.params(idx_mmf)) \
+        / Decimal(1e18)
+    liq_fee_rate = Decimal(mock_market.params(idx_liq)) / Decimal(1e18)
+
+    # calculate the liquidation price factor
+    # then infer market impact required to slip to this price
+    # liq_price = entry_price - notional_initial / oi_initial
+    #             + (mm * notional_initial + debt) / oi_current
+    # liq_price = entry_price + notional_initial / oi_initial
+    #             - (mm * notional_initial + debt) / oi_current
+    if is_long:
+        liq_price = Decimal(expect_entry_price) / Decimal(1e18) \
+            - liq_notional / liq_oi_initial \
+            + (maintenance_fraction * liq_notional / (1-liq_fee_rate)
+               + liq_debt) / liq_oi
+        liq_price = liq_price * Decimal(1e18) * Decimal(1 - tol)
+    else:
+        liq_price = Decimal(expect_entry_price) / Decimal(1e18) \
+            + liq_notional / liq_oi_initial \
+            - (maintenance_fraction * liq_notional / (1-liq_fee_rate)
+               + liq_debt) / liq_oi
+        liq_price = liq_price * Decimal(1e18) * Decimal(1 + tol)
+
+    # change price to liq_price so position becomes liquidatable
+    mock_feed.setPrice(liq_price, {"from": rando})
+
+    # input values for liquidate
+    input_owner = alice.address
+    input_pos_id = pos_id
+
+    # liquidate alice's position by rando
+    tx = mock_market.liquidate(input_owner, input_pos_id, {"from": rando})
+
+    # get expected exit price
+    price = tx.events["Liquidate"]["price"]
+
+    # calculate expected values for burn comparison
+    if is_long:
+        liq_pnl = Decimal(expect_oi_current) * \
+            (Decimal(price) - Decimal(expect_entry_price)) \
+            / Decimal(1e18)
+    else:
+        liq_pnl = Decimal(expect_oi_current) * \
+            (Decimal(expect_entry_price) - Decimal(price)) \
+            / Decimal(1e18)
+
+    liq_value = int(liq_collateral + liq_pnl)
+    liq_cost = int(liq_cost)
+
+    # remove liquiation fee from remaining margin
+    liq_fee = int(liq_value * liq_fee_rate)
+    margin_remaining = liq_value - liq_fee
+
+    # adjust value for maintenance burn
+    idx_mmbr = RiskParameter.MAINTENANCE_MARGIN_BURN_RATE.value
+    maintenance_burn = Decimal(mock_market.params(idx_mmbr)) \
+        / Decimal(1e18)
+    margin_burned = int(margin_remaining * maintenance_burn)
+    margin_remaining -= margin_burned
+
+    # calculate expected values
+    # expect_value -= int(remaining_margin * maintenance_burn)
+    expect_mint = int(liq_value - liq_cost - margin_burned)
+
+    # check expected pnl in line with Liquidate event first
+    actual_mint = tx.events["Liquidate"]["mint"]
+    assert int(actual_mint) == approx(expect_mint)
+
+    # Examine transfer event to verify burn happened
+    expect_mint_from = mock_market.address
+    expect_mint_to = "0x0000000000000000000000000000000000000000"
+    expect_mint_mag = abs(expect_mint)
+
+    # liquidation fee expected
+    expect_liq_fee = int(liq_fee)
+
+    # value less fees expected
+    expect_value_out = int(margin_remaining)
+
+    # check Transfer events for:
+    # 1. burn pnl; 2. value less liq fees out for reward; 3. liq fees out
+    assert 'Transfer' in tx.events
+    assert len(tx.events['Transfer']) == 3
+
+    # check actual amount burned is in line with expected (1)
+    assert tx.events["Transfer"][0]["from"] == expect_mint_from
+    assert tx.events["Transfer"][0]["to"] == expect_mint_to
+    assert int(tx.events["Transfer"][0]["value"]) == approx(
+        expect_mint_mag, rel=1.05e-6)
+
+    # check liquidate event has same value for burn as transfer event (1)
+    actual_transfer_mint = -tx.events["Transfer"][0]["value"]
+    assert tx.events["Liquidate"]["mint"] == actual_transfer_mint
+
+    # check liquidation fee paid to liquidator in event (2)
+    assert tx.events['Transfer'][1]['from'] == mock_market.address
+    assert tx.events['Transfer'][1]['to'] == rando.address
+    assert int(tx.events['Transfer'][1]['value']) == approx(
+        expect_liq_fee, rel=1.05e-6)
+
+    # check remaining margin sent to fee recipient (3)
+    assert tx.events['Transfer'][2]['from'] == mock_market.address
+    assert tx.events['Transfer'][2]['to'] == factory.feeRecipient()
+    assert int(tx.events['Transfer'][2]['value']) == approx(
+        expect_value_out, rel=1.05e-6)
+
+
+# TODO: check for correctness again
+@given(is_long=strategy('bool'))
+def test_liquidate_transfers_fee_to_liquidator(mock_market, mock_feed, alice,
+                                               rando, ovl, is_long):
+    # position build attributes
+    notional_initial = Decimal(1000)
+    leverage = Decimal(1.5)
+    is_long = True
+
+    # tolerance
+    tol = 1e-4
+
+    # calculate expected pos info data
+    idx_trade = RiskParameter.TRADING_FEE_RATE.value
+    trading_fee_rate = Decimal(mock_market.params(idx_trade) / 1e18)
+    collateral, _, _, trade_fee \
+        = calculate_position_info(notional_initial, leverage, trading_fee_rate)
+
+    # input values for build
+    input_collateral = int(collateral * Decimal(1e18))
+    input_leverage = int(leverage * Decimal(1e18))
+    input_is_long = is_long
+
+    # NOTE: slippage tests in test_slippage.py
+    # NOTE: setting to min/max here, so never reverts with slippage>max
+    input_price_limit = 2**256-1 if is_long else 0
+
+    # approve collateral amount: collateral + trade fee
+    approve_collateral = int((collateral + trade_fee) * Decimal(1e18))
+
+    # approve then build
+    # NOTE: build() tests in test_build.py
+    ovl.approve(mock_market, approve_collateral, {"from": alice})
+    tx = mock_market.build(input_collateral, input_leverage, input_is_long,
+                           input_price_limit, {"from": alice})
+    pos_id = tx.return_value
+
+    # get position info
+    pos_key = get_position_key(alice.address, pos_id)
+    (expect_notional, expect_debt, expect_mid_tick, expect_entry_tick,
+     expect_is_long, expect_liquidated, expect_oi_shares,
+     expect_fraction_remaining) = mock_market.positions(pos_key)
+
+    # calculate the entry and mid prices
+    expect_mid_price = tick_to_price(expect_mid_tick)
+    expect_entry_price = tick_to_price(expect_entry_tick)
+
+    # mine the chain forward for some time difference with build and liquidate
+    # funding should occur within this interval.
+    # Use update() to update state to query values for checks vs expected
+    # after liquidate.
+    # NOTE: update() tests in test_update.py
+    chain.mine(timedelta=3600)
+    tx = mock_market.update({"from": rando})
+
+    # calculate current oi, debt values of position
+    expect_total_oi = mock_market.oiLong() if is_long \
+        else mock_market.oiShort()
+    expect_total_oi_shares = mock_market.oiLongShares() if is_long \
+        else mock_market.oiShortShares()
+    expect_oi_current = (Decimal(expect_total_oi)*Decimal(expect_oi_shares)) \
+        / Decimal(expect_total_oi_shares)
+    expect_oi_initial = Decimal(expect_notional) * \
+        Decimal(1e18) / Decimal(expect_mid_price)
+
+    # calculate position attributes at current time, ignore payoff cap
+    liq_oi = expect_oi_current
+    liq_oi_initial = expect_oi_initial
+    liq_notional = Decimal(expect_notional)
+    liq_cost = Decimal(expect_notional - expect_debt)
+    liq_debt = Decimal(expect_debt)
+    liq_collateral = liq_notional * (liq_oi / liq_oi_initial) - liq_debt
+
+    # calculate expected liquidation price
+    # NOTE: p_liq = p_entry * ( MM * OI(0) + D ) / OI if long
+    # NOTE:       = p_entry * ( 2 - ( MM * OI(0) + D ) / OI ) if short
+    idx_mmf = RiskParameter.MAINTENANCE_MARGIN_FRACTION.value
+    idx_liq = RiskParameter.LIQUIDATION_FEE_RATE.value
+    maintenance_fraction = Decimal(mock_market.params(idx_mmf)) \
+        / Decimal(1e18)
+    liq_fee_rate = Decimal(mock_market.params(idx_liq)) / Decimal(1e18)
+
+    # calculate the liquidation price factor
+    # then infer market impact required to slip to this price
+    # liq_price = entry_price - notional_initial / oi_initial
+    #             + (mm * notional_initial + debt) / oi_current
+    # liq_price = entry_price + notional_initial / oi_initial
+    #             - (mm * notional_initial + debt) / oi_current
+    if is_long:
+        liq_price = Decimal(expect_entry_price) / Decimal(1e18) \
+            - liq_notional / liq_oi_initial \
+            + (maintenance_fraction * liq_notional / (1-liq_fee_rate)
+               + liq_debt) / liq_oi
+        liq_price = liq_price * Decimal(1e18) * Decimal(1 - tol)
+    else:
+        liq_price = Decimal(expect_entry_price) / Decimal(1e18) \
+            + liq_notional / liq_oi_initial \
+            - (maintenance_fraction * liq_notional / (1-liq_fee_rate)
+               + liq_debt) / liq_oi
+        liq_price = liq_price * Decimal(1e18) * Decimal(1 + tol)
+
+    # change price to liq_price so position becomes liquidatable
+    mock_feed.setPrice(liq_price, {"from": rando})
+
+    # priors actual values
+    expect_balance_rando = ovl.balanceOf(rando)
+    expect_balance_market = ovl.balanceOf(mock_market)
+
+    # calculate position attributes at the current time
+    # ignore payoff cap
+    liq_cost = Decimal(expect_notional - expect_debt)
+
+    # input values for liquidate
+    input_owner = alice.address
+    input_pos_id = pos_id
+
+    # liquidate alice's position by rando
+    tx = mock_market.liquidate(input_owner, input_pos_id, {"from": rando})
+
+    # readjust expect market balance for burn
+    actual_mint = tx.events["Liquidate"]["mint"]
+    expect_balance_market += actual_mint
+
+    # calculate expected values
+    expect_cost_plus_mint = int(liq_cost + actual_mint)
+
+    # get expected exit price
+    price = tx.events["Liquidate"]["price"]
+
+    # calculate expected values for burn comparison
+    if is_long:
+        liq_pnl = Decimal(expect_oi_current) * \
+            (Decimal(price) - Decimal(expect_entry_price)) \
+            / Decimal(1e18)
+    else:
+        liq_pnl = Decimal(expect_oi_current) * \
+            (Decimal(expect_entry_price) - Decimal(price)) \
+            / Decimal(1e18)
+
+    liq_value = int(liq_collateral + liq_pnl)
+    liq_cost = int(liq_cost)
+
+    # get the liquidation fee
+    expect_liq_fee = int(liq_value * liq_fee_rate)
+
+    expect_balance_rando += expect_liq_fee
+    expect_balance_market -= expect_cost_plus_mint
+
+    actual_balance_rando = ovl.balanceOf(rando)
+    actual_balance_market = ovl.balanceOf(mock_market)
+
+    assert int(actual_balance_rando) == approx(
+        expect_balance_rando, rel=1.05e-6)
+    assert int(actual_balance_market) == approx(
+        expect_balance_market, rel=1.05e-6)
+
+
+# TODO: check for correctness again
+@given(is_long=strategy('bool'))
+def test_liquidate_transfers_remaining_margin(mock_market, mock_feed, alice,
+                                              factory, rando, ovl, is_long):
+    # position build attributes
+    notional_initial = Decimal(1000)
+    leverage = Decimal(1.5)
+    is_long = True
+
+    # tolerance
+    tol = 1e-4
+
+    # calculate expected pos info data
+    idx_trade = RiskParameter.TRADING_FEE_RATE.value
+    trading_fee_rate = Decimal(mock_market.params(idx_trade) / 1e18)
+    collateral, _, _, trade_fee \
+        = calculate_position_info(notional_initial, leverage, trading_fee_rate)
+
+    # input values for build
+    input_collateral = int(collateral * Decimal(1e18))
+    input_leverage = int(leverage * Decimal(1e18))
+    input_is_long = is_long
+
+    # NOTE: slippage tests in test_slippage.py
+    # NOTE: setting to min/max here, so never reverts with slippage>max
+    input_price_limit = 2**256-1 if is_long else 0
+
+    # approve collateral amount: collateral + trade fee
+    approve_collateral = int((collateral + trade_fee) * Decimal(1e18))
+
+    # approve then build
+    # NOTE: build() tests in test_build.py
+    ovl.approve(mock_market, approve_collateral, {"from": alice})
+    tx = mock_market.build(input_collateral, input_leverage, input_is_long,
+                           input_price_limit, {"from": alice})
+    pos_id = tx.return_value
+
+    # get position info
+    pos_key = get_position_key(alice.address, pos_id)
+    (expect_notional, expect_debt, expect_mid_tick, expect_entry_tick,
+     expect_is_long, expect_liquidated, expect_oi_shares,
+     expect_fraction_remaining) = mock_market.positions(pos_key)
+
+    # calculate the entry and mid prices
+    expect_mid_price = tick_to_price(expect_mid_tick)
+    expect_entry_price = tick_to_price(expect_entry_tick)
+
+    # mine the chain forward for some time difference with build and liquidate
+    # funding should occur within this interval.
+    # Use update() to update state to query values for checks vs expected
+    # after liquidate.
+    # NOTE: update() tests in test_update.py
+    chain.mine(timedelta=3600)
+    tx = mock_market.update({"from": rando})
+
+    # calculate current oi, debt values of position
+    expect_total_oi = mock_market.oiLong() if is_long \
+        else mock_market.oiShort()
+    expect_total_oi_shares = mock_market.oiLongShares() if is_long \
+        else mock_market.oiShortShares()
+    expect_oi_current = (Decimal(expect_total_oi)*Decimal(expect_oi_shares)) \
+        / Decimal(expect_total_oi_shares)
+    expect_oi_initial = Decimal(expect_notional) * \
+        Decimal(1e18) / Decimal(expect_mid_price)
+
+    # calculate position attributes at current time, ignore payoff cap
+    liq_oi = expect_oi_current
+    liq_oi_initial = expect_oi_initial
+    liq_notional = Decimal(expect_notional)
+    liq_cost = Decimal(expect_notional - expect_debt)
+    liq_debt = Decimal(expect_debt)
+    liq_collateral = liq_notional * (liq_oi / liq_oi_initial) - liq_debt
+
+    # calculate expected liquidation price
+    # NOTE: p_liq = p_entry * ( MM * OI(0) + D ) / OI if long
+    # NOTE:       = p_entry * ( 2 - ( MM * OI(0) + D ) / OI ) if short
+    idx_mmf = RiskParameter.MAINTENANCE_MARGIN_FRACTION.value
+    idx_liq = RiskParameter.LIQUIDATION_FEE_RATE.value
+    maintenance_fraction = Decimal(mock_market.params(idx_mmf)) \
+        / Decimal(1e18)
+    liq_fee_rate = Decimal(mock_market.params(idx_liq)) / Decimal(1e18)
+
+    # calculate the liquidation price factor
+    # then infer market impact required to slip to this price
+    # liq_price = entry_price - notional_initial / oi_initial
+    #             + (mm * notional_initial + debt) / oi_current
+    # liq_price = entry_price + notional_initial / oi_initial
+    #             - (mm * notional_initial + debt) / oi_current
+    if is_long:
+        liq_price = Decimal(expect_entry_price) / Decimal(1e18) \
+            - liq_notional / liq_oi_initial \
+            + (maintenance_fraction * liq_notional / (1-liq_fee_rate)
+               + liq_debt) / liq_oi
+        liq_price = liq_price * Decimal(1e18) * Decimal(1 - tol)
+    else:
+        liq_price = Decimal(expect_entry_price) / Decimal(1e18) \
+            + liq_notional / liq_oi_initial \
+            - (maintenance_fraction * liq_notional / (1-liq_fee_rate)
+               + liq_debt) / liq_oi
+        liq_price = liq_price * Decimal(1e18) * Decimal(1 + tol)
+
+    # change price to liq_price so position becomes liquidatable
+    mock_feed.setPrice(liq_price, {"from": rando})
+
+    # priors actual values
+    recipient = factory.feeRecipient()
+    expect_balance_recipient = ovl.balanceOf(recipient)
+    expect_balance_market = ovl.balanceOf(mock_market)
+
+    # input values for liquidate
+    input_owner = alice.address
+    input_pos_id = pos_id
+
+    # liquidate alice's position by rando
+    tx = mock_market.liquidate(input_owner, input_pos_id, {"from": rando})
+
+    # readjust expect market balance for burn
+    actual_mint = tx.events["Liquidate"]["mint"]
+    expect_balance_market += actual_mint
+
+    # calculate expected values
+    expect_cost_plus_mint = int(liq_cost + actual_mint)
+
+    # get expected exit price
+    price = tx.events["Liquidate"]["price"]
+
+    # calculate expected values for burn comparison
+    if is_long:
+        liq_pnl = Decimal(expect_oi_current) * \
+            (Decimal(price) - Decimal(expect_entry_price)) \
+            / Decimal(1e18)
+    else:
+        liq_pnl = Decimal(expect_oi_current) * \
+            (Decimal(expect_entry_price) - Decimal(price)) \
+            / Decimal(1e18)
+
+    liq_value = int(liq_collateral + liq_pnl)
+    liq_cost = int(liq_cost)
+
+    # remove liquiation fee from remaining margin
+    liq_fee = int(liq_value * liq_fee_rate)
+    margin_remaining = liq_value - liq_fee
+
+    # adjust value for maintenance burn
+    idx_mmbr = RiskParameter.MAINTENANCE_MARGIN_BURN_RATE.value
+    maintenance_burn = Decimal(mock_market.params(idx_mmbr)) \
+        / Decimal(1e18)
+    margin_burned = int(margin_remaining * maintenance_burn)
+    margin_remaining -= margin_burned
+
+    expect_margin_remaining = int(margin_remaining)
+
+    expect_balance_recipient += expect_margin_remaining
+    expect_balance_market -= expect_cost_plus_mint
+
+    actual_balance_recipient = ovl.balanceOf(recipient)
+    actual_balance_market = ovl.balanceOf(mock_market)
+
+    assert int(actual_balance_recipient) == approx(
+        expect_balance_recipient, rel=1.05e-6)
+    assert int(actual_balance_market) == approx(
+        expect_balance_market, rel=1.05e-6)
+
+
+def test_liquidate_floors_value_to_zero_when_position_underwater(mock_market,
+                                                                 mock_feed,
+                                                                 alice, rando,
+                                                                 ovl, factory):
+    # position build attributes
+    notional_initial = Decimal(1000)
+    leverage = Decimal(5.0)
+    is_long = True
+    price_multiplier = Decimal(0.700)  # close to underwater but not there yet
+
+    # exclude funding for testing edge case
+    mock_market.setRiskParam(RiskParameter.K.value, 0, {"from": factory})
+
+    # tolerance
+    tol = 1e-4
+
+    # calculate expected pos info data
+    idx_trade = RiskParameter.TRADING_FEE_RATE.value
+    trading_fee_rate = Decimal(mock_market.params(idx_trade) / 1e18)
+    collateral, _, _, trade_fee \
+        = calculate_position_info(notional_initial, leverage, trading_fee_rate)
+
+    # input values for build
+    input_collateral = int(collateral * Decimal(1e18))
+    input_leverage = int(leverage * Decimal(1e18))
+    input_is_long = is_long
+
+    # NOTE: slippage tests in test_slippage.py
+    # NOTE: setting to min/max here, so never reverts with slippage>max
+    input_price_limit = 2**256-1 if is_long else 0
+
+    # approve collateral amount: collateral + trade fee
+    approve_collateral = int((collateral + trade_fee) * Decimal(1e18))
+
+    # approve then build
+    # NOTE: build() tests in test_build.py
+    ovl.approve(mock_market, approve_collateral, {"from": alice})
+    tx = mock_market.build(input_collateral, input_leverage, input_is_long,
+                           input_price_limit, {"from": alice})
+    pos_id = tx.return_value
+
+    # get position info
+    pos_key = get_position_key(alice.address, pos_id)
+    (expect_notional, expect_debt, expect_mid_tick, expect_entry_tick,
+     expect_is_long, expect_liquidated, expect_oi_shares,
+     expect_fraction_remaining) = mock_market.positions(pos_key)
+
+    # mine the chain forward for some time difference with build and liquidate
+    # funding should occur within this interval.
+    # Use update() to update state to query values for checks vs expected
+    # after liquidate.
+    # NOTE: update() tests in test_update.py
+    chain.mine(timedelta=3600)
+    tx = mock_market.update({"from": rando})
+
+    # calculate price to set for liquidation
+    # NOTE: p_liq = p_entry * ( MM * OI(0) + D ) / OI if long
+    # NOTE:       = p_entry * ( 2 - ( MM * OI(0) + D ) / OI ) if short
+    if is_long:
+        # longs get the bid on exit, which has e**(-delta) multiplied to it
+        # mock feed price should then be liq price * e**(delta) to account
+        price_multiplier /= Decimal(1 + tol)
+    else:
+        # shorts get the ask on exit, which has e**(+delta) multiplied to it
+        # mock feed price should then be liq price * e**(-delta) to account
+        price_multiplier = 1 / price_multiplier
+        price_multiplier *= Decimal(1 + tol)
+
+    price = Decimal(mock_feed.price()) * price_multiplier
+    mock_feed.setPrice(price, {"from": rando})
+
+    # priors actual values
+    recipient = factory.feeRecipient()
+    expect_balance_recipient = ovl.balanceOf(recipient)
+    expect_balance_market = ovl.balanceOf(mock_market)
+    expect_balance_rando = ovl.balanceOf(rando)
+
+    # calculate position attributes at the current time
+    # ignore payoff cap
+    liq_cost = Decimal(expect_notional - expect_debt)
+
+    # input values for liquidate
+    input_owner = alice.address
+    input_pos_id = pos_id
+
+    # liquidate alice's position by rando
+    tx = mock_market.liquidate(input_owner, input_pos_id, {"from": rando})
+
+    # adjust market balance for burned amount
+    # check entire cost amount is burned
+    expect_mint = - int(liq_cost)
+    actual_mint = tx.events["Liquidate"]["mint"]
+
+    assert actual_mint == expect_mint
+
+    expect_balance_market += actual_mint
+
+    # value and fees should floor to zero
+    liq_value = 0
+    liq_fee = 0
+
+    # calculate expected values
+    expect_value = int(liq_value)
+    expect_liq_fee = int(liq_fee)
+
+    # check balance of liquidator and recipient doesn't change
+    # all initial collateral is burned
+    expect_balance_recipient += expect_liq_fee
+    expect_balance_market -= expect_value
+
+    actual_balance_recipient = ovl.balanceOf(recipient)
+    actual_balance_market = ovl.balanceOf(mock_market)
+    actual_balance_rando = ovl.balanceOf(rando)
+
+    assert int(actual_balance_recipient) == approx(expect_balance_recipient)
+    assert int(actual_balance_market) == approx(expect_balance_market)
+    assert int(actual_balance_rando) == approx(expect_balance_rando)
@@ -0,0 +1,85 @@
+import pytest
+from brownie import chain, reverts
+
+from scripts.libraries import position
+from scripts.libraries.oracle import Data, mid
+from scripts.libraries.position import Info
+from scripts.libraries.risk import Parameters
+from scripts.market.funding import pay_funding
+from .utils import get_position_key
+
+ONE = 10 ** 18
+
+
+@pytest.fixture(autouse=True)
+def isolation(fn_isolation):
+    pass
+
+
+def test_position_views_match_offchain(mock_market, mock_feed, ovl, alice,
+                                       bob):
+    ovl.approve(mock_market, 2**256-1, {"from": alice})
+    ovl.approve(mock_market, 2**256-1, {"from": bob})
+    _ = mock_market.build(100 * 10**18, 5 * 10**18, True, 2**256-1,
+                          {"from": alice})
+    _ = mock_market.build(100 * 10**18, 2 * 10**18, False, 0, {"from": bob})
+
+    params = [mock_market.params(i) for i in Parameters]
+    oi_long = mock_market.oiLong()
+    oi_short = mock_market.oiShort()
+    timestamp_last = mock_market.timestampUpdateLast()
+
+    # funding paid virtually through the block read at
+    chain.mine(timedelta=86400)
+    block = chain[-1]
+    kwargs = {"block_identifier": block.number}
+    oi_long, oi_short = pay_funding(oi_long, oi_short,
+                                    block.timestamp - timestamp_last,
+                                    params[Parameters.K])
+    price = mid(Data(*mock_feed.latest(**kwargs)))
+
+    for owner, id in ((alice, 0), (bob, 1)):
+        pos = Info(*mock_market.positions(get_position_key(owner.address,
+                                                           id)))
+        oi_total = oi_long if pos.is_long else oi_short
+        oi_total_shares = mock_market.oiLongShares() if pos.is_long \
+            else mock_market.oiShortShares()
+        args = (ONE, oi_total, oi_total_shares, price,
+                params[Parameters.CAP_PAYOFF])
+        assert mock_market.value(owner, id, **kwargs) \
+            == position.value(pos, *args)
+        assert mock_market.notionalWithPnl(owner, id, **kwargs) \
+            == position.notional_with_pnl(pos, *args)
+        assert mock_market.liquidationPrice(owner, id, **kwargs) \
+            == position.liquidation_price(
+                pos, oi_total, oi_total_shares,
+                params[Parameters.MAINTENANCE_MARGIN_FRACTION],
+                params[Parameters.LIQUIDATION_FEE_RATE])
+        assert not mock_market.liquidatable(owner, id, **kwargs)
+
+
+def test_liquidatable_matches_liquidate(mock_market, mock_feed, ovl, alice,
+                                        rando):
+    ovl.approve(mock_market, 2**256-1, {"from": alice})
+    tx = mock_market.build(100 * 10**18, 5 * 10**18, True, 2**256-1,
+                           {"from": alice})
+    pos_id = tx.return_value
+    liquidation_price = mock_market.liquidationPrice(alice, pos_id)
+    assert liquidation_price < mock_feed.price()
+
+    # liquidatable just below the liquidation price, not just above
+    mock_feed.setPrice(liquidation_price * 1001 // 1000, {"from": rando})
+    assert not mock_market.liquidatable(alice, pos_id)
+    with reverts("OVLV1:!liquidatable"):
+        mock_market.liquidate(alice, pos_id, {"from": rando})
+
+    mock_feed.setPrice(liquidation_price * 999 // 1000, {"from": rando})
+    assert mock_market.liquidatable(alice, pos_id)
+    mock_market.liquidate(alice, pos_id, {"from": rando})
+
+    # gone once liquidated
+    assert not mock_market.liquidatable(alice, pos_id)
+    with reverts("OVLV1:!position"):
+        mock_market.value(alice, pos_id)
+    with reverts("OVLV1:!position"):
+        mock_market.liquidationPrice(alice, pos_id)
@@ -0,0 +1,122 @@
+import pytest
+from brownie import chain
+from brownie.test import given, strategy
+
+from scripts.libraries.oracle import Data
+from scripts.libraries.position import Info
+from scripts.libraries.roller import Snapshot
+from scripts.market.funding import pay_funding
+from scripts.market.quote import Quoter
+from .utils import RiskParameter, get_position_key
+
+
+@pytest.fixture(autouse=True)
+def isolation(fn_isolation):
+    pass
+
+
+@given(volume=strategy('uint256', max_value='10000000000000000000'))
+def test_bid_ask_matches(mock_market, mock_feed, volume):
+    quoter = Quoter.from_market(mock_market)
+    data = mock_feed.latest()
+
+    assert quoter.bid(Data(*data), volume) == mock_market.bid(data, volume)
+    assert quoter.ask(Data(*data), volume) == mock_market.ask(data, volume)
+
+
+def test_caps_match(mock_market, mock_feed):
+    quoter = Quoter.from_market(mock_market)
+    data = mock_feed.latest()
+    cap = mock_market.params(RiskParameter.CAP_NOTIONAL.value)
+
+    assert quoter.cap_notional_adjusted_for_bounds(Data(*data), cap) \
+        == mock_market.capNotionalAdjustedForBounds(data, cap)
+
+    target = mock_market.params(
+        RiskParameter.CIRCUIT_BREAKER_MINT_TARGET.value)
+    for minted in (0, target, target * 3 // 2, 2 * target):
+        snapshot = (chain.time(), 2592000, minted)
+        assert quoter.circuit_breaker(Snapshot(*snapshot), cap) \
+            == mock_market.circuitBreaker(snapshot, cap)
+
+
+@given(
+    leverage=strategy('uint256', min_value='1000000000000000000',
+                      max_value='5000000000000000000'),
+    is_long=strategy('bool'))
+def test_build_quote_matches(mock_market, mock_feed, ovl, alice, bob,
+                             leverage, is_long):
+    quoter = Quoter.from_market(mock_market)
+    collateral = 100 * 10**18
+    ovl.approve(mock_market, 2**256-1, {"from": alice})
+
+    # existing volume on both sides to decay
+    ovl.approve(mock_market, 2**256-1, {"from": bob})
+    mock_market.build(collateral, 3 * 10**18, True, 2**256-1, {"from": bob})
+    mock_market.build(collateral, 3 * 10**18, False, 0, {"from": bob})
+    chain.mine(timedelta=60)
+
+    snapshot_volume = mock_market.snapshotVolumeAsk() if is_long \
+        else mock_market.snapshotVolumeBid()
+    snapshot_minted = mock_market.snapshotMinted()
+    oi_long, oi_short = mock_market.oiLong(), mock_market.oiShort()
+    timestamp_update_last = mock_market.timestampUpdateLast()
+
+    price_limit = 2**256-1 if is_long else 0
+    tx = mock_market.build(collateral, leverage, is_long, price_limit,
+                           {"from": alice})
+
+    # build pays funding first, so check the cap against oi after funding
+    k = mock_market.params(RiskParameter.K.value)
+    oi_long, oi_short = pay_funding(oi_long, oi_short,
+                                    tx.timestamp - timestamp_update_last, k)
+
+    data = Data(*mock_feed.latest())
+    quote = quoter.build(data, tx.timestamp, Snapshot(*snapshot_volume),
+                         collateral, leverage, is_long,
+                         Snapshot(*snapshot_minted),
+                         oi_long if is_long else oi_short)
+
+    assert quote.price == tx.events["Build"]["price"]
+    assert quote.oi == tx.events["Build"]["oi"]
+    expect_snapshot = mock_market.snapshotVolumeAsk() if is_long \
+        else mock_market.snapshotVolumeBid()
+    assert quote.snapshot == tuple(expect_snapshot)
+
+
+@given(
+    fraction=strategy('uint256', min_value='100000000000000',
+                      max_value='1000000000000000000'),
+    is_long=strategy('bool'))
+def test_unwind_quote_matches(mock_market, mock_feed, ovl, alice, fraction,
+                              is_long):
+    quoter = Quoter.from_market(mock_market)
+    ovl.approve(mock_market, 2**256-1, {"from": alice})
+    price_limit = 2**256-1 if is_long else 0
+    tx = mock_market.build(100 * 10**18, 2 * 10**18, is_long, price_limit,
+                           {"from": alice})
+    pos_id = tx.return_value
+    chain.mine(timedelta=600)
+
+    snapshot_volume = mock_market.snapshotVolumeBid() if is_long \
+        else mock_market.snapshotVolumeAsk()
+    oi_shares = mock_market.oiLongShares() if is_long \
+        else mock_market.oiShortShares()
+    pos = Info(*mock_market.positions(get_position_key(alice.address,
+                                                       pos_id)))
+
+    price_limit = 0 if is_long else 2**256-1
+    tx = mock_market.unwind(pos_id, fraction, price_limit, {"from": alice})
+
+    # unwind pays funding first, so quote against oi after funding
+    update = tx.events["Update"]
+    oi_total = update["oiLong"] if is_long else update["oiShort"]
+
+    data = Data(*mock_feed.latest())
+    quote = quoter.unwind(data, tx.timestamp, Snapshot(*snapshot_volume),
+                          pos, fraction, oi_total, oi_shares)
+
+    assert quote.price == tx.events["Unwind"]["price"]
+    expect_snapshot = mock_market.snapshotVolumeBid() if is_long \
+        else mock_market.snapshotVolumeAsk()
+    assert quote.snapshot == tuple(expect_snapshot)
@@ -0,0 +1,110 @@
+import pytest
+from brownie import chain
+
+from scripts.libraries.oracle import Data
+from scripts.libraries.position import Info
+from scripts.libraries.risk import Parameters
+from scripts.libraries.roller import Snapshot
+from scripts.market.simulator import MarketSimulator, Revert
+from .utils import get_position_key
+
+
+@pytest.fixture(autouse=True)
+def isolation(fn_isolation):
+    pass
+
+
+def mock_feed_data(mock_feed):
+    # mock feed data is constant apart from the timestamp
+    def feed(timestamp):
+        return Data(timestamp, *mock_feed.latest()[1:])
+    return feed
+
+
+def test_simulator_matches_market(mock_market, mock_feed, ovl, alice, bob,
+                                  rando):
+    params = [mock_market.params(i) for i in Parameters]
+    sim = MarketSimulator(params, mock_feed_data(mock_feed),
+                          mock_market.timestampUpdateLast())
+    assert sim.dp_upper_limit == mock_market.dpUpperLimit()
+
+    ovl.approve(mock_market, 2**256-1, {"from": alice})
+    ovl.approve(mock_market, 2**256-1, {"from": bob})
+    trades = [(alice, 5, True), (bob, 2, False), (alice, 1, False),
+              (bob, 3, True)]
+    for trader, leverage, is_long in trades:
+        chain.mine(timedelta=600)
+        price_limit = 2**256-1 if is_long else 0
+        tx = mock_market.build(100 * 10**18, leverage * 10**18, is_long,
+                               price_limit, {"from": trader})
+        event = sim.build(tx.timestamp, trader.address, 100 * 10**18,
+                          leverage * 10**18, is_long, price_limit)
+        assert tuple(tx.events["Build"].values())[1:] == event[1:-1]
+
+    chain.mine(timedelta=3600)
+    tx = mock_market.unwind(1, 5 * 10**17, 2**256-1, {"from": bob})
+    event = sim.unwind(tx.timestamp, bob.address, 1, 5 * 10**17)
+    assert tuple(tx.events["Unwind"].values())[1:] == event[1:-1]
+
+    # 15% drop leaves only the 5x long liquidatable
+    mock_feed.setPrice(850000000000000000, {"from": rando})
+    chain.mine(timedelta=60)
+    with pytest.raises(Revert, match="OVLV1:liquidatable"):
+        sim.unwind(chain.time(), alice.address, 0, 10**18)
+    with pytest.raises(Revert, match="OVLV1:!liquidatable"):
+        sim.liquidate(chain.time(), rando.address, bob.address, 3)
+
+    tx = mock_market.liquidate(alice, 0, {"from": rando})
+    event = sim.liquidate(tx.timestamp, rando.address, alice.address, 0)
+    assert tuple(tx.events["Liquidate"].values())[2:] == event[2:-1]
+
+    # storage matches after the run
+    assert (sim.oi_long, sim.oi_short) \
+        == (mock_market.oiLong(), mock_market.oiShort())
+    assert (sim.oi_long_shares, sim.oi_short_shares) \
+        == (mock_market.oiLongShares(), mock_market.oiShortShares())
+    assert sim.snapshot_volume_bid == mock_market.snapshotVolumeBid()
+    assert sim.snapshot_volume_ask == mock_market.snapshotVolumeAsk()
+    assert sim.snapshot_minted == mock_market.snapshotMinted()
+    for (owner, id), pos in sim.positions.items():
+        assert pos == Info(*mock_market.positions(get_position_key(owner,
+                                                                   id)))
+
+
+def test_simulator_reverts_leave_state(mock_market, mock_feed):
+    params = [mock_market.params(i) for i in Parameters]
+    start = mock_market.timestampUpdateLast()
+    sim = MarketSimulator(params, mock_feed_data(mock_feed), start)
+    sim.build(start + 10, "alice", 100 * 10**18, 5 * 10**18, True)
+    state = (sim.oi_long, sim.oi_short, sim.snapshot_volume_ask,
+             sim.timestamp_update_last)
+
+    # cap leverage exceeded and slippage, after funding would have paid
+    with pytest.raises(Revert, match="OVLV1:lev>max"):
+        sim.build(start + 3600, "bob", 100 * 10**18, 6 * 10**18, False)
+    with pytest.raises(Revert, match="OVLV1:slippage>max"):
+        sim.build(start + 3600, "bob", 100 * 10**18, 2 * 10**18, True, 1)
+    with pytest.raises(Revert, match="OVLV1:!liquidatable"):
+        sim.liquidate(start + 3600, "bob", "alice", 0)
+    assert (sim.oi_long, sim.oi_short, sim.snapshot_volume_ask,
+            sim.timestamp_update_last) == state
+
+
+def test_simulator_reverted_build_not_circuit_breaker_trip(mock_market,
+                                                           mock_feed):
+    params = [mock_market.params(i) for i in Parameters]
+    start = mock_market.timestampUpdateLast()
+    sim = MarketSimulator(params, mock_feed_data(mock_feed), start)
+
+    # minted past the target, so the oi cap is lowered
+    target = params[Parameters.CIRCUIT_BREAKER_MINT_TARGET]
+    window = params[Parameters.CIRCUIT_BREAKER_WINDOW]
+    sim.snapshot_minted = Snapshot(start, window, 3 * target // 2)
+
+    cap_notional = params[Parameters.CAP_NOTIONAL]
+    with pytest.raises(Revert, match="OVLV1:oi>cap"):
+        sim.build(start + 10, "alice", cap_notional, 10**18, True)
+    assert sim.circuit_breaker_trips == 0
+
+    sim.build(start + 10, "alice", 100 * 10**18, 10**18, True)
+    assert sim.circuit_breaker_trips == 1
@@ -0,0 +1,101 @@
+import pytest
+from brownie import OverlayV1MarketLens, chain
+
+from scripts.libraries import position
+from scripts.libraries.oracle import mid
+from scripts.libraries.risk import Parameters
+from scripts.market.state import (
+    MarketState, from_calls, load_positions, load_state
+)
+
+
+@pytest.fixture(autouse=True)
+def isolation(fn_isolation):
+    pass
+
+
+@pytest.fixture(scope="module")
+def lens(gov):
+    yield gov.deploy(OverlayV1MarketLens)
+
+
+def test_load_state_matches_getters(lens, mock_market, mock_feed, ovl,
+                                    alice, bob):
+    ovl.approve(mock_market, 2**256-1, {"from": alice})
+    ovl.approve(mock_market, 2**256-1, {"from": bob})
+    mock_market.build(100 * 10**18, 2 * 10**18, True, 2**256-1,
+                      {"from": alice})
+    mock_market.build(100 * 10**18, 3 * 10**18, False, 0, {"from": bob})
+    chain.mine(timedelta=600)
+
+    state = load_state(lens, mock_market)
+    assert isinstance(state, MarketState)
+    # block fields depend on the node's eth_call context
+    assert state[:-2] == from_calls(mock_market, mock_feed)[:-2]
+    assert state.timestamp == state.data.timestamp
+    assert state.oi_long > 0 and state.oi_short > 0
+    assert state.snapshot_volume_ask.accumulator > 0
+
+
+def test_oi_after_funding_matches_update(lens, mock_market, ovl, alice):
+    ovl.approve(mock_market, 2**256-1, {"from": alice})
+    mock_market.build(100 * 10**18, 2 * 10**18, True, 2**256-1,
+                      {"from": alice})
+    chain.mine(timedelta=3600)
+
+    state = load_state(lens, mock_market)
+    tx = mock_market.update({"from": alice})
+    update = tx.events["Update"]
+    assert state.oi_after_funding(tx.timestamp) \
+        == (update["oiLong"], update["oiShort"])
+
+
+def test_load_positions_matches_offchain(lens, mock_market, mock_feed, ovl,
+                                         alice, bob, rando):
+    ovl.approve(mock_market, 2**256-1, {"from": alice})
+    ovl.approve(mock_market, 2**256-1, {"from": bob})
+    keys = []
+    for leverage in (1, 3, 5):
+        for trader, is_long in ((alice, True), (bob, False)):
+            price_limit = 2**256-1 if is_long else 0
+            tx = mock_market.build(100 * 10**18, leverage * 10**18, is_long,
+                                   price_limit, {"from": trader})
+            keys.append((trader.address, tx.return_value))
+
+    # fully unwound and never built positions have no derived state
+    mock_market.unwind(keys[0][1], 10**18, 0, {"from": alice})
+    keys.append((rando.address, 1000))
+
+    # 15% drop leaves the 5x long liquidatable
+    chain.mine(timedelta=3600)
+    mock_feed.setPrice(850000000000000000, {"from": rando})
+
+    state = load_state(lens, mock_market)
+    positions = list(load_positions(lens, mock_market, keys, page_size=3))
+    assert [(p.owner, p.id) for p in positions] == keys
+
+    oi_long, oi_short = state.oi_after_funding(state.timestamp)
+    price = mid(state.data)
+    cap_payoff = state.params[Parameters.CAP_PAYOFF]
+    for pos in positions:
+        info = pos.info
+        assert info == position.Info(*mock_market.positions(
+            position.get_key(pos.owner, pos.id)))
+        if not position.exists(info):
+            assert pos.oi == pos.value == 0 and not pos.liquidatable
+            continue
+
+        oi_total = oi_long if info.is_long else oi_short
+        oi_shares = state.oi_long_shares if info.is_long \
+            else state.oi_short_shares
+        args = (info, 10**18, oi_total, oi_shares, price, cap_payoff)
+        assert pos.oi == position.oi_current(*args[:4])
+        assert pos.value == position.value(*args)
+        assert pos.notional_with_pnl == position.notional_with_pnl(*args)
+        assert pos.liquidatable == position.liquidatable(
+            info, oi_total, oi_shares, price, cap_payoff,
+            state.params[Parameters.MAINTENANCE_MARGIN_FRACTION],
+            state.params[Parameters.LIQUIDATION_FEE_RATE])
+
+    liquidatable = [(p.owner, p.id) for p in positions if p.liquidatable]
+    assert liquidatable == [keys[4]]
@@ -0,0 +1,78 @@
+import pytest
+from brownie import chain
+from pytest import approx
+
+from scripts.libraries.tick import price_to_tick
+from scripts.market.indexer import PositionIndexer
+from scripts.market.store import MarketStore, to_float, to_int, to_int24
+
+
+@pytest.fixture(autouse=True)
+def isolation(fn_isolation):
+    pass
+
+
+def test_store_round_trips_rows(alice, bob, tmp_path):
+    path = str(tmp_path / "market")
+    store = MarketStore(path)
+    rows = [
+        {"sender": alice.address, "positionId": 0, "fraction": 10**18,
+         "mint": -123456789 * 10**18, "price": 2**256 - 1,
+         "oiAfterUnwind": 0, "oiSharesAfterUnwind": 0},
+        {"sender": bob.address, "positionId": 7, "fraction": 5 * 10**17,
+         "mint": 2**255 - 1, "price": 10**9,
+         "oiAfterUnwind": 10**24, "oiSharesAfterUnwind": 3},
+    ]
+    store.append("Unwind", rows[0], 10, 2)
+    store.append("Unwind", rows[1], 12, 0)
+
+    # not visible until flushed
+    assert len(MarketStore(path)["Unwind"]) == 0
+    store.flush()
+
+    # replays of already stored keys are ignored
+    store.append("Unwind", rows[1], 12, 0)
+    store.flush()
+
+    table = MarketStore(path)["Unwind"]
+    assert len(table) == 2
+    assert list(table.column("block")) == [10, 12]
+    assert list(to_int(table.column("mint"), signed=True)) \
+        == [r["mint"] for r in rows]
+    assert list(to_int(table.column("price"))) == [r["price"] for r in rows]
+    assert to_float(table.column("mint"), signed=True) \
+        == approx([float(r["mint"]) for r in rows])
+    assert bytes(table.column("sender")[1]).hex() \
+        == bob.address[2:].lower()
+    assert table.block_range(11, 12) == slice(1, 2)
+
+
+def test_indexer_appends_history(mock_market, ovl, alice, bob, rando,
+                                 tmp_path):
+    start_block = chain.height
+    ovl.approve(mock_market, 2**256-1, {"from": alice})
+    ovl.approve(mock_market, 2**256-1, {"from": bob})
+    txs = [
+        mock_market.build(100 * 10**18, 2 * 10**18, True, 2**256-1,
+                          {"from": alice}),
+        mock_market.build(100 * 10**18, 3 * 10**18, False, 0,
+                          {"from": bob}),
+    ]
+    chain.mine(timedelta=3600)
+    mock_market.unwind(0, 10**18, 0, {"from": alice})
+
+    store = MarketStore(str(tmp_path / "market"))
+    indexer = PositionIndexer(mock_market, start_block=start_block,
+                              store=store)
+    indexer.sync()
+
+    builds = store["Build"]
+    assert len(builds) == 2
+    assert len(store["Unwind"]) == 1
+    assert len(store["Update"]) == 3
+
+    prices = [tx.events["Build"]["price"] for tx in txs]
+    assert list(to_int(builds.column("price"))) == prices
+    assert list(to_int24(builds.column("entryTick"))) \
+        == [price_to_tick(p) for p in prices]
+    assert list(builds.column("isLong")) == [1, 0]
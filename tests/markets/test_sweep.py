@@ -0,0 +1,104 @@
+import brownie
+import pytest
+from brownie import chain
+
+from scripts.feeds.chainlink.replay import TwapReplay
+from scripts.libraries.oracle import Data
+from scripts.libraries.risk import Parameters
+from scripts.market.simulator import (
+    Event, MarketSimulator, ReplayFeed, Revert
+)
+from scripts.market.sweep import (
+    Scenario, feasible, gbm_rounds, grid, random_flow, simulate, sweep
+)
+
+
+@pytest.fixture(autouse=True)
+def isolation(fn_isolation):
+    pass
+
+
+def test_set_risk_param_matches_factory(factory, mock_market, mock_feed,
+                                        gov):
+    params = [mock_market.params(i) for i in Parameters]
+
+    def feed(timestamp):
+        return Data(timestamp, *mock_feed.latest()[1:])
+
+    sim = MarketSimulator(params, feed, mock_market.timestampUpdateLast())
+    macro_window = mock_feed.macroWindow()
+
+    # out of factory bounds, and past max leverage given the margin
+    updates = [
+        (Parameters.CAP_LEVERAGE, 100 * 10**18),
+        (Parameters.CAP_LEVERAGE, 10 * 10**18),
+        (Parameters.CAP_LEVERAGE, 9 * 10**18),
+        (Parameters.MAINTENANCE_MARGIN_FRACTION, 2 * 10**17),
+        (Parameters.MAINTENANCE_MARGIN_FRACTION, 5 * 10**16),
+        (Parameters.K, 2 * 10**11),
+    ]
+    for name, value in updates:
+        candidate = list(sim.params)
+        candidate[name] = value
+        try:
+            sim.set_risk_param(chain.time(), name, value)
+        except Revert:
+            assert not feasible(candidate, macro_window)
+            with brownie.reverts():
+                factory.setRiskParam(mock_feed, name, value, {"from": gov})
+            continue
+
+        assert feasible(candidate, macro_window)
+        factory.setRiskParam(mock_feed, name, value, {"from": gov})
+
+    assert sim.params == [mock_market.params(i) for i in Parameters]
+
+
+def test_sweep_prunes_and_matches_serial(mock_market):
+    base = [mock_market.params(i) for i in Parameters]
+    start = 10**6
+    scenarios = []
+    for seed in range(2):
+        rounds = gbm_rounds(seed, start, 300, 60, 2000.0, 0.002)
+        feed = ReplayFeed(TwapReplay(rounds, 600, 3600, 8))
+        events = random_flow(seed, start + 7200, start + 12000, 0.05)
+        scenarios.append(Scenario(feed, events, start + 7200))
+
+    # 10x leverage is infeasible with a 10% maintenance margin
+    candidates = list(grid(base, {
+        Parameters.CAP_LEVERAGE: [2 * 10**18, 5 * 10**18, 10 * 10**18],
+        Parameters.K: [base[Parameters.K], 2 * base[Parameters.K]],
+    }))
+    results, pruned = sweep(candidates, scenarios, processes=1)
+    assert pruned == 2
+    assert len(results) == 4 * len(scenarios)
+    assert {r.params for r in results} \
+        == {c for c in candidates if c[Parameters.CAP_LEVERAGE] < 10 * 10**18}
+
+    results_parallel, _ = sweep(candidates, scenarios, processes=2)
+    assert results_parallel == results
+
+
+def test_simulate_resolves_unwinds_by_build_index(mock_market):
+    params = [mock_market.params(i) for i in Parameters]
+    start = 10**6
+    rounds = gbm_rounds(0, start, 300, 60, 2000.0, 0.0)
+    feed = ReplayFeed(TwapReplay(rounds, 600, 3600, 8))
+    t = start + 7200
+    collateral = 100 * 10**18
+
+    # bob's build reverts past the leverage cap, so carol's build is the
+    # third build event but position id 1
+    events = [
+        Event(t + 10, "build", ("alice", collateral, 2 * 10**18, True)),
+        Event(t + 20, "build", ("bob", collateral, 100 * 10**18, True)),
+        Event(t + 30, "build", ("carol", collateral, 2 * 10**18, False)),
+        Event(t + 40, "unwind", ("carol", 2, 10**18)),
+        Event(t + 50, "unwind", ("bob", 1, 10**18)),
+        Event(t + 60, "unwind", ("alice", 0, 10**18)),
+    ]
+    result = simulate(params, Scenario(feed, events, t))
+
+    # only bob's build reverts, and his unwind is skipped
+    assert result.reverts == 1
+    assert result.max_imbalance_liability > 0
@@ -0,0 +1,101 @@
+import pytest
+from brownie import chain, reverts
+
+from scripts.libraries.oracle import Data
+from scripts.libraries.position import Info
+from scripts.libraries.risk import Parameters
+from scripts.market.simulator import MarketSimulator
+from .utils import get_position_key
+
+
+@pytest.fixture(autouse=True)
+def isolation(fn_isolation):
+    pass
+
+
+def test_unwind_batch_matches_simulator(mock_market, mock_feed, ovl, factory,
+                                        alice):
+    params = [mock_market.params(i) for i in Parameters]
+    sim = MarketSimulator(params,
+                          lambda t: Data(t, *mock_feed.latest()[1:]),
+                          mock_market.timestampUpdateLast())
+
+    ovl.approve(mock_market, 2**256-1, {"from": alice})
+    for leverage, is_long in [(5, True), (2, False), (3, True)]:
+        price_limit = 2**256-1 if is_long else 0
+        tx = mock_market.build(100 * 10**18, leverage * 10**18, is_long,
+                               price_limit, {"from": alice})
+        sim.build(tx.timestamp, alice.address, 100 * 10**18,
+                  leverage * 10**18, is_long, price_limit)
+
+    # unwinds a position in full, another in two parts and leaves one
+    chain.mine(timedelta=3600)
+    unwinds = [(0, 10**18, 0), (1, 5 * 10**17, 2**256-1),
+               (1, 10**18, 2**256-1)]
+    fee_recipient = factory.feeRecipient()
+    balance_alice = ovl.balanceOf(alice)
+    balance_recipient = ovl.balanceOf(fee_recipient)
+    balance_market = ovl.balanceOf(mock_market)
+    total_supply = ovl.totalSupply()
+
+    tx = mock_market.unwindBatch(*zip(*unwinds), {"from": alice})
+    assert len(tx.events["Update"]) == 1
+    # nets the pnl into a single mint or burn, and pays out in a single
+    # transfer to the trader and another to the fee recipient
+    assert len(tx.events["Transfer"]) == 3
+
+    expect = sim.unwind_batch(tx.timestamp, alice.address, unwinds)
+    assert [tuple(e.values())[1:] for e in tx.events["Unwind"]] \
+        == [e[1:-1] for e in expect]
+    fees = sum(e.trading_fee for e in expect)
+    minted = sum(e.mint for e in expect)
+    assert ovl.totalSupply() - total_supply == minted
+    assert ovl.balanceOf(fee_recipient) - balance_recipient == fees
+    # collateral backing the unwound fractions leaves the market
+    assert balance_market - ovl.balanceOf(mock_market) \
+        == ovl.balanceOf(alice) - balance_alice + fees - minted
+
+    assert (sim.oi_long, sim.oi_short) \
+        == (mock_market.oiLong(), mock_market.oiShort())
+    assert (sim.oi_long_shares, sim.oi_short_shares) \
+        == (mock_market.oiLongShares(), mock_market.oiShortShares())
+    assert sim.snapshot_volume_bid == mock_market.snapshotVolumeBid()
+    assert sim.snapshot_volume_ask == mock_market.snapshotVolumeAsk()
+    for (owner, id), pos in sim.positions.items():
+        assert pos == Info(*mock_market.positions(get_position_key(owner,
+                                                                   id)))
+
+
+def test_unwind_batch_reverts_when_any_unwind_reverts(mock_market, ovl,
+                                                      alice):
+    ovl.approve(mock_market, 2**256-1, {"from": alice})
+    for _ in range(2):
+        mock_market.build(100 * 10**18, 2 * 10**18, True, 2**256-1,
+                          {"from": alice})
+
+    with reverts("OVLV1:!position"):
+        mock_market.unwindBatch([0, 2], [10**18, 10**18], [0, 0],
+                                {"from": alice})
+    with reverts("OVLV1:slippage>max"):
+        mock_market.unwindBatch([0, 1], [10**18, 10**18], [0, 2**256-1],
+                                {"from": alice})
+    with reverts("OVLV1:fraction<min"):
+        mock_market.unwindBatch([0, 1], [10**18, 10**13], [0, 0],
+                                {"from": alice})
+    with reverts("OVLV1:!length"):
+        mock_market.unwindBatch([0, 1], [10**18], [0, 0], {"from": alice})
+
+    # untouched after the reverts
+    mock_market.unwindBatch([0, 1], [10**18, 10**18], [0, 0],
+                            {"from": alice})
+
+
+def test_unwind_batch_reverts_when_has_shutdown(factory, mock_feed,
+                                                mock_market, ovl, alice,
+                                                guardian):
+    ovl.approve(mock_market, 2**256-1, {"from": alice})
+    mock_market.build(10**18, 2 * 10**18, True, 2**256-1, {"from": alice})
+
+    factory.shutdown(mock_feed, {"from": guardian})
+    with reverts("OVLV1: shutdown"):
+        mock_market.unwindBatch([0], [10**18], [0], {"from": alice})
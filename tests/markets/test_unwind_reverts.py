@@ -0,0 +1,656 @@
+import pytest
+from pytest import approx
+from brownie import chain, reverts
+from brownie.test import given, strategy
+from decimal import Decimal
+from random import randint
+
+from .utils import (
+    calculate_position_info,
+    get_position_key,
+    tick_to_price,
+    RiskParameter
+)
+
+
+# NOTE: Tests passing with isolation fixture
+# TODO: Fix tests to pass even without isolation fixture (?)
+@pytest.fixture(autouse=True)
+def isolation(fn_isolation):
+    pass
+
+
+def test_unwind_reverts_when_fraction_zero(market, alice, ovl):
+    # position build attributes
+    notional_initial = Decimal(1000)
+    leverage = Decimal(1.5)
+    is_long = True
+
+    # calculate expected pos info data
+    idx_trade = RiskParameter.TRADING_FEE_RATE.value
+    trading_fee_rate = Decimal(market.params(idx_trade) / 1e18)
+    collateral, _, _, trade_fee \
+        = calculate_position_info(notional_initial, leverage, trading_fee_rate)
+
+    # input values for build
+    input_collateral = int(collateral * Decimal(1e18))
+    input_leverage = int(leverage * Decimal(1e18))
+    input_is_long = is_long
+
+    # NOTE: slippage tests in test_slippage.py
+    # NOTE: setting to min/max here, so never reverts with slippage>max
+    input_price_limit = 2**256-1 if is_long else 0
+
+    # approve collateral amount: collateral + trade fee
+    approve_collateral = int((collateral + trade_fee) * Decimal(1e18))
+
+    # approve then build
+    # NOTE: build() tests in test_build.py
+    ovl.approve(market, approve_collateral, {"from": alice})
+    tx = market.build(input_collateral, input_leverage, input_is_long,
+                      input_price_limit, {"from": alice})
+    pos_id = tx.return_value
+
+    # NOTE: slippage tests in test_slippage.py
+    # NOTE: setting to min/max here, so never reverts with slippage>max
+    input_price_limit = 0 if is_long else 2**256-1
+
+    # check unwind reverts when fraction is zero
+    input_fraction = 0
+    with reverts("OVLV1:fraction<min"):
+        market.unwind(pos_id, input_fraction, input_price_limit,
+                      {"from": alice})
+
+    # check unwind also reverts when fraction is zero after toUint16Fixed cast
+    input_fraction = int(1e14) - 1
+    with reverts("OVLV1:fraction<min"):
+        market.unwind(pos_id, input_fraction, input_price_limit,
+                      {"from": alice})
+
+    # test suceeds when equal to 1bps smallest amount
+    input_fraction = int(1e14)
+    market.unwind(pos_id, input_fraction, input_price_limit,
+                  {"from": alice})
+
+
+def test_unwind_reverts_when_fraction_greater_than_one(market, alice, ovl):
+    # position build attributes
+    notional_initial = Decimal(1000)
+    leverage = Decimal(1.5)
+    is_long = True
+
+    # calculate expected pos info data
+    idx_trade = RiskParameter.TRADING_FEE_RATE.value
+    trading_fee_rate = Decimal(market.params(idx_trade) / 1e18)
+    collateral, _, _, trade_fee \
+        = calculate_position_info(notional_initial, leverage, trading_fee_rate)
+
+    # input values for build
+    input_collateral = int(collateral * Decimal(1e18))
+    input_leverage = int(leverage * Decimal(1e18))
+    input_is_long = is_long
+
+    # NOTE: slippage tests in test_slippage.py
+    # NOTE: setting to min/max here, so never reverts with slippage>max
+    input_price_limit = 2**256-1 if is_long else 0
+
+    # approve collateral amount: collateral + trade fee
+    approve_collateral = int((collateral + trade_fee) * Decimal(1e18))
+
+    # approve then build
+    # NOTE: build() tests in test_build.py
+    ovl.approve(market, approve_collateral, {"from": alice})
+    tx = market.build(input_collateral, input_leverage, input_is_long,
+                      input_price_limit, {"from": alice})
+    pos_id = tx.return_value
+
+    # NOTE: slippage tests in test_slippage.py
+    # NOTE: setting to min/max here, so never reverts with slippage>max
+    input_price_limit = 0 if is_long else 2**256-1
+
+    # check unwind reverts when fraction is 1 more than 1e18
+    input_fraction = 1000000000000000001
+    with reverts("OVLV1:fraction>max"):
+        market.unwind(pos_id, input_fraction, input_price_limit,
+                      {"from": alice})
+
+    # check unwind succeeds when fraction is 1e18
+    input_fraction = 1000000000000000000
+    market.unwind(pos_id, input_fraction, input_price_limit, {"from": alice})
+
+
+def test_unwind_reverts_when_not_position_owner(market, alice, bob, ovl):
+    # position build attributes
+    notional_initial = Decimal(1000)
+    leverage = Decimal(1.5)
+    is_long = True
+
+    # calculate expected pos info data
+    idx_trade = RiskParameter.TRADING_FEE_RATE.value
+    trading_fee_rate = Decimal(market.params(idx_trade) / 1e18)
+    collateral, _, _, trade_fee \
+        = calculate_position_info(notional_initial, leverage, trading_fee_rate)
+
+    # input values for build
+    input_collateral = int(collateral * Decimal(1e18))
+    input_leverage = int(leverage * Decimal(1e18))
+    input_is_long = is_long
+
+    # NOTE: slippage tests in test_slippage.py
+    # NOTE: setting to min/max here, so never reverts with slippage>max
+    input_price_limit = 2**256-1 if is_long else 0
+
+    # approve collateral amount: collateral + trade fee
+    approve_collateral = int((collateral + trade_fee) * Decimal(1e18))
+
+    # approve then build
+    # NOTE: build() tests in test_build.py
+    ovl.approve(market, approve_collateral, {"from": alice})
+    tx = market.build(input_collateral, input_leverage, input_is_long,
+                      input_price_limit, {"from": alice})
+    pos_id = tx.return_value
+
+    # NOTE: slippage tests in test_slippage.py
+    # NOTE: setting to min/max here, so never reverts with slippage>max
+    input_price_limit = 0 if is_long else 2**256-1
+
+    # check unwind reverts when bob attempts
+    input_fraction = 1000000000000000000
+    with reverts("OVLV1:!position"):
+        market.unwind(pos_id, input_fraction, input_price_limit, {"from": bob})
+
+    # check unwind succeeds when alice attempts
+    market.unwind(pos_id, input_fraction, input_price_limit, {"from": alice})
+
+
+def test_unwind_reverts_when_position_never_built(market, alice, ovl):
+    pos_id = 100
+
+    # check unwind reverts when position does not exist since never built
+    input_fraction = 1000000000000000000
+    with reverts("OVLV1:!position"):
+        market.unwind(pos_id, input_fraction, 0, {"from": alice})
+
+
+def test_unwind_reverts_when_position_already_unwound_fully(
+        market, alice, ovl):
+    # build a position and unwind it fully
+    # check unwind reverts after unwound fully (fractionRemaining == 0)
+    # position build attributes
+    notional_initial = Decimal(1000)
+    leverage = Decimal(1.5)
+    is_long = True
+
+    # calculate expected pos info data
+    idx_trade = RiskParameter.TRADING_FEE_RATE.value
+    trading_fee_rate = Decimal(market.params(idx_trade) / 1e18)
+    collateral, _, _, trade_fee \
+        = calculate_position_info(notional_initial, leverage, trading_fee_rate)
+
+    # input values for build
+    input_collateral = int(collateral * Decimal(1e18))
+    input_leverage = int(leverage * Decimal(1e18))
+    input_is_long = is_long
+
+    # NOTE: slippage tests in test_slippage.py
+    # NOTE: setting to min/max here, so never reverts with slippage>max
+    input_price_limit = 2**256-1 if is_long else 0
+
+    # approve collateral amount: collateral + trade fee
+    approve_collateral = int((collateral + trade_fee) * Decimal(1e18))
+
+    # approve then build
+    # NOTE: build() tests in test_build.py
+    ovl.approve(market, approve_collateral, {"from": alice})
+    tx = market.build(input_collateral, input_leverage, input_is_long,
+                      input_price_limit, {"from": alice})
+    pos_id = tx.return_value
+
+    # NOTE: slippage tests in test_slippage.py
+    # NOTE: setting to min/max here, so never reverts with slippage>max
+    input_price_limit = 0 if is_long else 2**256-1
+
+    # unwind then try to unwind again
+    input_fraction = 1000000000000000000
+    market.unwind(pos_id, input_fraction, input_price_limit, {"from": alice})
+
+    # Attempting to unwind again should revert
+    with reverts("OVLV1:!position"):
+        market.unwind(pos_id, input_fraction,
+                      input_price_limit, {"from": alice})
+
+
+@given(is_long=strategy('bool'))
+def test_unwind_reverts_when_position_liquidated(mock_market, mock_feed,
+                                                 is_long,
+                                                 factory, alice, rando, ovl):
+    # position build attributes
+    notional_initial = Decimal(1000)
+    leverage = Decimal(1.5)
+
+    # tolerance
+    tol = 1e-4
+
+    # set k to zero to avoid funding calcs
+    mock_market.setRiskParam(RiskParameter.K.value, 0, {"from": factory})
+
+    # calculate expected pos info data
+    idx_trade = RiskParameter.TRADING_FEE_RATE.value
+    trading_fee_rate = Decimal(mock_market.params(idx_trade) / 1e18)
+    collateral, _, _, trade_fee \
+        = calculate_position_info(notional_initial, leverage, trading_fee_rate)
+
+    # input values for build
+    input_collateral = int(collateral * Decimal(1e18))
+    input_leverage = int(leverage * Decimal(1e18))
+    input_is_long = is_long
+
+    # NOTE: slippage tests in test_slippage.py
+    # NOTE: setting to min/max here, so never reverts with slippage>max
+    input_price_limit = 2**256-1 if is_long else 0
+
+    # approve collateral amount: collateral + trade fee
+    approve_collateral = int((collateral + trade_fee) * Decimal(1e18))
+
+    # approve then build
+    # NOTE: build() tests in test_build.py
+    ovl.approve(mock_market, approve_collateral, {"from": alice})
+    tx = mock_market.build(input_collateral, input_leverage, input_is_long,
+                           input_price_limit, {"from": alice})
+    pos_id = tx.return_value
+
+    # get position info
+    pos_key = get_position_key(alice.address, pos_id)
+    (expect_notional, expect_debt, expect_mid_tick, expect_entry_tick,
+     expect_is_long, expect_liquidated, expect_oi_shares,
+     expect_fraction_remaining) = mock_market.positions(pos_key)
+
+    # calculate the entry and mid prices
+    expect_mid_price = tick_to_price(expect_mid_tick)
+    expect_entry_price = tick_to_price(expect_entry_tick)
+
+    # mine the chain forward for some time difference with build and liquidate
+    # funding should occur within this interval.
+    # Use update() to update state to query values for checks vs expected
+    # after liquidate.
+    # NOTE: update() tests in test_update.py
+    chain.mine(timedelta=86400)
+    tx = mock_market.update({"from": rando})
+
+    # calculate current oi, debt values of position
+    expect_total_oi = mock_market.oiLong() if is_long \
+        else mock_market.oiShort()
+    expect_total_oi_shares = mock_market.oiLongShares() if is_long \
+        else mock_market.oiShortShares()
+    expect_oi_current = (Decimal(expect_total_oi)*Decimal(expect_oi_shares)) \
+        / Decimal(expect_total_oi_shares)
+    expect_oi_initial = Decimal(expect_notional) * \
+        Decimal(1e18) / Decimal(expect_mid_price)
+
+    # calculate expected liquidation price
+    # NOTE:
+    # ... if long ...
+    # p_liq = p_entry + ( MM * Q(0) / (1-LFR) + D - Q * OI / OI(0) ) / OI
+    # ... and if short ...
+    # p_liq = p_entry + (-MM * Q(0) / (1-LFR) - D + Q * OI / OI(0) ) / OI
+    idx_mmf = RiskParameter.MAINTENANCE_MARGIN_FRACTION.value
+    idx_liq = RiskParameter.LIQUIDATION_FEE_RATE.value
+    maintenance_fraction = Decimal(mock_market.params(idx_mmf)) \
+        / Decimal(1e18)
+    liq_fee_rate = Decimal(mock_market.params(idx_liq)) / Decimal(1e18)
+
+    if is_long:
+        expect_liquidation_price = Decimal(expect_entry_price) + \
+            (maintenance_fraction * Decimal(expect_notional) / (1-liq_fee_rate)
+             + Decimal(expect_debt) - Decimal(expect_notional)
+             * expect_oi_current / expect_oi_initial) / \
+            (expect_oi_current / Decimal(1e18))
+    else:
+        expect_liquidation_price = Decimal(expect_entry_price) + \
+            (-maintenance_fraction * Decimal(expect_notional)/(1-liq_fee_rate)
+             - Decimal(expect_debt) + Decimal(expect_notional)
+             * expect_oi_current / expect_oi_initial) / \
+            (expect_oi_current / Decimal(1e18))
+
+    # change price by factor so position becomes liquidatable
+    price_multiplier = 1
+    if is_long:
+        price_multiplier = Decimal(1) / Decimal(1 + tol)
+    else:
+        price_multiplier = Decimal(1) * Decimal(1 + tol)
+
+    price = int(expect_liquidation_price * price_multiplier)
+    mock_feed.setPrice(price, {"from": rando})
+
+    # input values for liquidate
+    input_pos_id = pos_id
+
+    # liquidate the position
+    input_owner = alice.address
+    mock_market.liquidate(input_owner, input_pos_id, {"from": rando})
+
+    # check attempting to unwind after liquidate reverts
+    input_fraction = 1000000000000000000
+    input_price_limit = 0 if is_long else 2**256-1
+    with reverts("OVLV1:!position"):
+        mock_market.unwind(input_pos_id, input_fraction, input_price_limit,
+                           {"from": alice})
+
+
+@given(is_long=strategy('bool'))
+def test_unwind_reverts_when_position_liquidatable(mock_market, mock_feed,
+                                                   is_long, factory,
+                                                   alice, rando, ovl):
+    # position build attributes
+    notional_initial = Decimal(1000)
+    leverage = Decimal(1.5)
+
+    # tolerance
+    tol = 1e-4
+
+    # set k to zero to avoid funding calcs
+    mock_market.setRiskParam(RiskParameter.K.value, 0, {"from": factory})
+
+    # calculate expected pos info data
+    idx_trade = RiskParameter.TRADING_FEE_RATE.value
+    trading_fee_rate = Decimal(mock_market.params(idx_trade) / 1e18)
+    collateral, _, _, trade_fee \
+        = calculate_position_info(notional_initial, leverage, trading_fee_rate)
+
+    # input values for build
+    input_collateral = int(collateral * Decimal(1e18))
+    input_leverage = int(leverage * Decimal(1e18))
+    input_is_long = is_long
+
+    # NOTE: slippage tests in test_slippage.py
+    # NOTE: setting to min/max here, so never reverts with slippage>max
+    input_price_limit = 2**256-1 if is_long else 0
+
+    # approve collateral amount: collateral + trade fee
+    approve_collateral = int((collateral + trade_fee) * Decimal(1e18))
+
+    # approve then build
+    # NOTE: build() tests in test_build.py
+    ovl.approve(mock_market, approve_collateral, {"from": alice})
+    tx = mock_market.build(input_collateral, input_leverage, input_is_long,
+                           input_price_limit, {"from": alice})
+    pos_id = tx.return_value
+
+    # get position info
+    pos_key = get_position_key(alice.address, pos_id)
+    (expect_notional, expect_debt, expect_mid_tick, expect_entry_tick,
+     expect_is_long, expect_liquidated, expect_oi_shares,
+     expect_fraction_remaining) = mock_market.positions(pos_key)
+
+    # calculate the entry and mid prices
+    expect_mid_price = tick_to_price(expect_mid_tick)
+    expect_entry_price = tick_to_price(expect_entry_tick)
+
+    # mine the chain forward for some time difference with build and liquidate
+    # funding should occur within this interval.
+    # Use update() to update state to query values for checks vs expected
+    # after liquidate.
+    # NOTE: update() tests in test_update.py
+    chain.mine(timedelta=86400)
+    tx = mock_market.update({"from": rando})
+
+    # calculate current oi, debt values of position
+    expect_total_oi = mock_market.oiLong() if is_long \
+        else mock_market.oiShort()
+    expect_total_oi_shares = mock_market.oiLongShares() if is_long \
+        else mock_market.oiShortShares()
+    expect_oi_current = (Decimal(expect_total_oi)*Decimal(expect_oi_shares)) \
+        / Decimal(expect_total_oi_shares)
+    expect_oi_initial = Decimal(expect_notional) * \
+        Decimal(1e18) / Decimal(expect_mid_price)
+
+    # calculate expected liquidation price
+    # ... if long ...
+    # p_liq = p_entry + ( MM * Q(0) / (1-LFR) + D - Q * OI / OI(0) ) / OI
+    # ... and if short ...
+    # p_liq = p_entry + (-MM * Q(0) / (1-LFR) - D + Q * OI / OI(0) ) / OI
+    idx_mmf = RiskParameter.MAINTENANCE_MARGIN_FRACTION.value
+    idx_liq = RiskParameter.LIQUIDATION_FEE_RATE.value
+    maintenance_fraction = Decimal(mock_market.params(idx_mmf)) \
+        / Decimal(1e18)
+    liq_fee_rate = Decimal(mock_market.params(idx_liq)) / Decimal(1e18)
+
+    if is_long:
+        expect_liquidation_price = Decimal(expect_entry_price) + \
+            (maintenance_fraction * Decimal(expect_notional) / (1-liq_fee_rate)
+             + Decimal(expect_debt) - Decimal(expect_notional)
+             * expect_oi_current / expect_oi_initial) / \
+            (expect_oi_current / Decimal(1e18))
+    else:
+        expect_liquidation_price = Decimal(expect_entry_price) + \
+            (-maintenance_fraction * Decimal(expect_notional)/(1-liq_fee_rate)
+             - Decimal(expect_debt) + Decimal(expect_notional)
+             * expect_oi_current / expect_oi_initial) / \
+            (expect_oi_current / Decimal(1e18))
+
+    # change price by factor so position becomes liquidatable
+    price_multiplier = 1
+    if is_long:
+        price_multiplier = Decimal(1) / Decimal(1 + tol)
+    else:
+        price_multiplier = Decimal(1) * Decimal(1 + tol)
+
+    price = int(expect_liquidation_price * price_multiplier)
+    mock_feed.setPrice(price, {"from": rando})
+
+    # input values for liquidate
+    input_pos_id = pos_id
+
+    # check attempting to unwind when liquidatable reverts
+    input_fraction = 1000000000000000000
+    with reverts("OVLV1:liquidatable"):
+        mock_market.unwind(input_pos_id, input_fraction, 0, {"from": alice})
+
+    # check attempting to unwind succeeds when no longer liquidatable
+    price_multiplier = 1
+    if is_long:
+        price_multiplier = Decimal(1) * Decimal(1 + tol)
+    else:
+        price_multiplier = Decimal(1) / Decimal(1 + tol)
+
+    price = int(expect_liquidation_price * price_multiplier)
+    mock_feed.setPrice(price, {"from": rando})
+
+    input_price_limit = 2**256 - 1 if not is_long else 0
+    input_fraction = int(1e14)
+    tx = mock_market.unwind(input_pos_id, input_fraction, input_price_limit,
+                            {"from": alice})
+
+
+def test_unwind_reverts_when_has_shutdown(factory, feed, market, ovl,
+                                          alice, guardian):
+    # build inputs
+    input_collateral = int(1e18)
+    input_leverage = int(1e18)
+    input_is_long = True
+
+    # NOTE: slippage tests in test_slippage.py
+    # NOTE: setting to min/max here, so never reverts with slippage>max
+    input_price_limit = 2**256-1
+
+    # approve market for spending before build. use max
+    ovl.approve(market, 2**256 - 1, {"from": alice})
+
+    # build one position prior to shutdown
+    tx = market.build(input_collateral, input_leverage, input_is_long,
+                      input_price_limit, {"from": alice})
+
+    # unwind a fraction of the position to check works fine prior to shutdown
+    input_pos_id = tx.return_value
+    input_price_limit = 0
+    input_fraction = int(0.5e18)
+    market.unwind(input_pos_id, input_fraction, input_price_limit,
+                  {"from": alice})
+
+    # shutdown market
+    # NOTE: factory.shutdown() tests in factories/market/test_setters.py
+    factory.shutdown(feed, {"from": guardian})
+
+    # attempt to unwind again
+    with reverts("OVLV1: shutdown"):
+        market.unwind(input_pos_id, input_fraction, input_price_limit,
+                      {"from": alice})
+
+
+def test_multiple_unwind_unwinds_multiple_positions(market, factory, ovl,
+                                                    alice, bob, rando):
+    # loop through 10 times
+    n = 10
+    total_notional_long = Decimal(10000)
+    total_notional_short = Decimal(7500)
+
+    # alice goes long and bob goes short n times
+    input_total_notional_long = total_notional_long * Decimal(1e18)
+    input_total_notional_short = total_notional_short * Decimal(1e18)
+
+    # calculate expected pos info data
+    idx_trade = RiskParameter.TRADING_FEE_RATE.value
+    trading_fee_rate = Decimal(market.params(idx_trade) / 1e18)
+
+    idx_cap_leverage = RiskParameter.CAP_LEVERAGE.value
+    leverage_cap = Decimal(market.params(idx_cap_leverage) / 1e18)
+
+    # approve collateral amount: collateral + trade fee
+    approve_collateral_alice = int((input_total_notional_long
+                                    * (1 + trading_fee_rate)))
+    approve_collateral_bob = int((input_total_notional_short
+                                  * (1 + trading_fee_rate)))
+
+    # approve market for spending then build
+    ovl.approve(market, approve_collateral_alice, {"from": alice})
+    ovl.approve(market, approve_collateral_bob, {"from": bob})
+
+    # per trade notional values
+    notional_alice = total_notional_long / Decimal(n)
+    notional_bob = total_notional_short / Decimal(n)
+    is_long_alice = True
+    is_long_bob = False
+
+    actual_pos_ids = []
+    for i in range(n):
+        chain.mine(timedelta=86400)
+
+        # choose a random leverage
+        leverage_alice = randint(1, leverage_cap)
+        leverage_bob = randint(1, leverage_cap)
+
+        # calculate collateral amounts
+        collateral_alice, _, debt_alice, _ = calculate_position_info(
+            notional_alice, leverage_alice, trading_fee_rate)
+        collateral_bob, _, debt_bob, _ = calculate_position_info(
+            notional_bob, leverage_bob, trading_fee_rate)
+
+        input_collateral_alice = int(collateral_alice * Decimal(1e18))
+        input_collateral_bob = int(collateral_bob * Decimal(1e18))
+        input_leverage_alice = int(leverage_alice * Decimal(1e18))
+        input_leverage_bob = int(leverage_bob * Decimal(1e18))
+
+        # NOTE: slippage tests in test_slippage.py
+        # NOTE: setting to min/max here, so never reverts with slippage>max
+        input_price_limit_alice = 2**256-1 if is_long_alice else 0
+        input_price_limit_bob = 2**256-1 if is_long_bob else 0
+
+        # build position for alice
+        tx_alice = market.build(input_collateral_alice, input_leverage_alice,
+                                is_long_alice, input_price_limit_alice,
+                                {"from": alice})
+        pos_id_alice = tx_alice.return_value
+
+        # build position for bob
+        tx_bob = market.build(input_collateral_bob, input_leverage_bob,
+                              is_long_bob, input_price_limit_bob,
+                              {"from": bob})
+        pos_id_bob = tx_bob.return_value
+
+        actual_pos_ids.append(pos_id_alice)  # alice ids are even
+        actual_pos_ids.append(pos_id_bob)  # bob ids are odd
+
+    # mine the chain into the future then unwind each
+    chain.mine(timedelta=600)
+
+    # unwind fractions of each position
+    for id in actual_pos_ids:
+        # mine the chain forward for some time difference with build and unwind
+        # more funding should occur within this interval.
+        # Use update() to update state to query values for checks vs expected
+        # after unwind.
+        # NOTE: update() tests in test_update.py
+        chain.mine(timedelta=86400)
+        _ = market.update({"from": rando})
+
+        # alice is even ids, bob is odd
+        is_alice = (id % 2 == 0)
+        trader = alice if is_alice else bob
+
+        # choose a random fraction of pos to unwind
+        fraction = randint(1, 1e4)  # fraction is only to 1bps precision
+        fraction = Decimal(fraction) / Decimal(1e4)
+        input_fraction = int(fraction * Decimal(1e18))
+
+        # NOTE: slippage tests in test_slippage.py
+        # NOTE: setting to min/max here, so never reverts with slippage>max
+        input_price_limit_trader = 0 if is_alice else 2**256-1
+
+        # cache current aggregate oi and oi shares for comparison later
+        expect_total_oi = market.oiLong() if is_alice else market.oiShort()
+        expect_total_oi_shares = market.oiLongShares() if is_alice \
+            else market.oiShortShares()
+
+        # cache position attributes for everything for later comparison
+        pos_key = get_position_key(trader.address, id)
+        expect_pos = market.positions(pos_key)
+        (expect_notional, expect_debt, expect_mid_tick, expect_entry_tick,
+         expect_is_long, expect_liquidated, expect_oi_shares,
+         expect_fraction_remaining) = expect_pos
+
+        # unwind fraction of position for trader
+        _ = market.unwind(id, input_fraction, input_price_limit_trader,
+                          {"from": trader})
+
+        # get updated actual position attributes
+        actual_pos = market.positions(pos_key)
+        (actual_notional, actual_debt, actual_mid_tick, actual_entry_tick,
+         actual_is_long, actual_liquidated, actual_oi_shares,
+         actual_fraction_remaining) = actual_pos
+
+        # check position info for id has decreased position fraction remaining
+        expect_oi_shares_unwound = int(
+            Decimal(expect_oi_shares) * Decimal(fraction))
+        expect_oi_unwound = int(
+            Decimal(expect_oi_shares_unwound) * Decimal(expect_total_oi)
+            / Decimal(expect_total_oi_shares))
+        expect_fraction_remaining = int(
+            Decimal(expect_fraction_remaining) * Decimal(1 - fraction))
+
+        # check fraction remaining reduced
+        assert int(actual_fraction_remaining) == approx(
+            expect_fraction_remaining)
+
+        # check aggregate oi and oi shares on side have decreased
+        actual_total_oi = market.oiLong() if is_alice else market.oiShort()
+        actual_total_oi_shares = market.oiLongShares() if is_alice \
+            else market.oiShortShares()
+        actual_unwound_oi_shares = expect_total_oi_shares \
+            - actual_total_oi_shares
+
+        expect_total_oi -= expect_oi_unwound
+        expect_total_oi_shares -= expect_oi_shares_unwound
+
+        assert int(actual_total_oi) == approx(expect_total_oi)
+        assert actual_total_oi_shares == expect_total_oi_shares
+
+        # check position oi shares have decreased by same amount as aggregate
+        actual_pos_unwound_oi_shares = expect_oi_shares - actual_oi_shares
+        assert actual_pos_unwound_oi_shares == actual_unwound_oi_shares
+
+
+# TODO: test_unwind when remove 99% of oi shares for attributes
+# TODO: test_unwind updates fraction remaining properly
+# TODO: test_unwind multiple unwinds in a row with small
+# TODO: fractions (for fractionRemaining updates => check can't get free OI)
+# TODO: think/test thru rounding possiblities with subFloor and fracRemain
@@ -0,0 +1,1037 @@
+import pytest
+from pytest import approx
+from brownie import chain
+from brownie.test import given, strategy
+from decimal import Decimal
+
+from .utils import (
+    calculate_position_info,
+    get_position_key,
+    tick_to_price,
+    RiskParameter
+)
+
+
+# NOTE: Tests passing with isolation fixture
+# TODO: Fix tests to pass even without isolation fixture (?)
+@pytest.fixture(autouse=True)
+def isolation(fn_isolation):
+    pass
+
+
+@given(
+    fraction=strategy('decimal', min_value='0.0001', max_value='1.0000',
+                      places=4),
+    is_long=strategy('bool'))
+def test_unwind_executes_transfers(market, feed, alice, rando, ovl,
+                                   factory, fraction, is_long):
+    # position build attributes
+    notional_initial = Decimal(1000)
+    leverage = Decimal(1.5)
+
+    # calculate expected pos info data
+    idx_trade = RiskParameter.TRADING_FEE_RATE.value
+    trading_fee_rate = Decimal(market.params(idx_trade) / 1e18)
+    collateral, _, _, trade_fee \
+        = calculate_position_info(notional_initial, leverage, trading_fee_rate)
+
+    # input values for build
+    input_collateral = int(collateral * Decimal(1e18))
+    input_leverage = int(leverage * Decimal(1e18))
+    input_is_long = is_long
+
+    # NOTE: slippage tests in test_slippage.py
+    # NOTE: setting to min/max here, so never reverts with slippage>max
+    input_price_limit = 2**256-1 if is_long else 0
+
+    # approve collateral amount: collateral + trade fee
+    approve_collateral = int((collateral + trade_fee) * Decimal(1e18))
+
+    # approve then build
+    # NOTE: build() tests in test_build.py
+    ovl.approve(market, approve_collateral, {"from": alice})
+    tx = market.build(input_collateral, input_leverage, input_is_long,
+                      input_price_limit, {"from": alice})
+    pos_id = tx.return_value
+
+    # get position info
+    pos_key = get_position_key(alice.address, pos_id)
+    (expect_notional, expect_debt, expect_mid_tick, expect_entry_tick,
+     expect_is_long, expect_liquidated, expect_oi_shares,
+     expect_fraction_remaining) = market.positions(pos_key)
+
+    # calculate the entry price
+    expect_mid_price = tick_to_price(expect_mid_tick)
+    expect_entry_price = tick_to_price(expect_entry_tick)
+
+    # mine the chain forward for some time difference with build and unwind
+    # funding should occur within this interval.
+    # Use update() to update state to query values for checks vs expected
+    # after unwind.
+    # NOTE: update() tests in test_update.py
+    chain.mine(timedelta=86400)
+    _ = market.update({"from": rando})
+
+    # calculate current oi, debt values of position
+    expect_total_oi = market.oiLong() if is_long else market.oiShort()
+    expect_total_oi_shares = market.oiLongShares() if is_long \
+        else market.oiShortShares()
+    expect_oi_initial = Decimal(expect_notional) * \
+        Decimal(1e18) / Decimal(expect_mid_price)
+    expect_oi_current = (Decimal(expect_total_oi)*Decimal(expect_oi_shares)) \
+        / Decimal(expect_total_oi_shares)
+
+    # input values for unwind
+    input_pos_id = pos_id
+    input_fraction = int(fraction * Decimal(1e18))
+
+    # NOTE: slippage tests in test_slippage.py
+    # NOTE: setting to min/max here, so never reverts with slippage>max
+    input_price_limit = 0 if is_long else 2**256-1
+
+    # unwind fraction of shares
+    tx = market.unwind(input_pos_id, input_fraction, input_price_limit,
+                       {"from": alice})
+
+    # get expected exit price
+    price = tx.events["Unwind"]["price"]
+
+    # calculate position attributes at the current time for fraction
+    # ignore payoff cap
+    unwound_oi = fraction * expect_oi_current
+    unwound_oi_initial = fraction * expect_oi_initial
+    unwound_notional = fraction * expect_notional
+    unwound_debt = fraction * Decimal(expect_debt)
+    unwound_cost = fraction * Decimal(expect_notional - expect_debt)
+
+    # unwound collateral here includes adjustments due to funding payments
+    unwound_collateral = unwound_notional * (unwound_oi / unwound_oi_initial) \
+        - unwound_debt
+    unwound_pnl = unwound_oi * \
+        (Decimal(price) - Decimal(expect_entry_price)) / Decimal(1e18)
+    if not is_long:
+        unwound_pnl *= -1
+
+    unwound_value = unwound_collateral + unwound_pnl
+    unwound_notional_w_pnl = unwound_value + unwound_debt
+    unwound_trading_fee = unwound_notional_w_pnl * trading_fee_rate
+    if unwound_trading_fee > unwound_value:
+        unwound_trading_fee = unwound_value
+
+    # calculate expected values
+    expect_mint = int(unwound_value - unwound_cost)
+
+    # check expected pnl in line with Unwind event first
+    actual_mint = tx.events["Unwind"]["mint"]
+
+    # TODO: why 1e-5 needed for ~ 1bps fraction?
+    assert int(actual_mint) == approx(expect_mint, rel=1e-5)
+
+    # Examine transfer event to verify mint or burn happened
+    # if expect_mint > 0, should have a mint with Transfer event
+    # If expect_mint < 0, should have a burn with Transfer event
+    minted = expect_mint > 0
+    expect_mint_from = "0x0000000000000000000000000000000000000000" if minted \
+        else market.address
+    expect_mint_to = market.address if minted \
+        else "0x0000000000000000000000000000000000000000"
+    expect_mint_mag = abs(expect_mint)
+
+    # value less fees expected
+    expect_value_out = int(unwound_value - unwound_trading_fee)
+
+    # trading fee expected
+    expect_trade_fee = int(unwound_trading_fee)
+
+    # check Transfer events for:
+    # 1. mint or burn of pnl; 2. value less trade fees out; 3. trade fees out
+    assert 'Transfer' in tx.events
+    assert len(tx.events['Transfer']) == 3
+
+    # check actual amount minted or burned is in line with expected (1)
+    assert tx.events["Transfer"][0]["from"] == expect_mint_from
+    assert tx.events["Transfer"][0]["to"] == expect_mint_to
+    assert int(tx.events["Transfer"][0]["value"]
+               ) == approx(expect_mint_mag, rel=1e-5)
+
+    # check unwind event has same value for pnl as transfer event (1)
+    actual_transfer_mint = tx.events["Transfer"][0]["value"] if minted \
+        else -tx.events["Transfer"][0]["value"]
+    assert tx.events["Unwind"]["mint"] == actual_transfer_mint
+
+    # check value less fees in event (2)
+    assert tx.events['Transfer'][1]['from'] == market.address
+    assert tx.events['Transfer'][1]['to'] == alice.address
+    assert int(tx.events['Transfer'][1]['value']) == approx(expect_value_out)
+
+    # check value less trade fees out (3)
+    assert tx.events['Transfer'][2]['from'] == market.address
+    assert tx.events['Transfer'][2]['to'] == factory.feeRecipient()
+    assert int(tx.events['Transfer'][2]['value']) == approx(expect_trade_fee)
+
+
+@given(
+    fraction=strategy('decimal', min_value='0.0001', max_value='1.0000',
+                      places=4),
+    is_long=strategy('bool'))
+def test_unwind_transfers_value_to_trader(market, feed, alice, rando, ovl,
+                                          fraction, is_long):
+    # position build attributes
+    notional_initial = Decimal(1000)
+    leverage = Decimal(1.5)
+
+    # calculate expected pos info data
+    idx_trade = RiskParameter.TRADING_FEE_RATE.value
+    trading_fee_rate = Decimal(market.params(idx_trade) / 1e18)
+    collateral, _, _, trade_fee \
+        = calculate_position_info(notional_initial, leverage, trading_fee_rate)
+
+    # input values for build
+    input_collateral = int(collateral * Decimal(1e18))
+    input_leverage = int(leverage * Decimal(1e18))
+    input_is_long = is_long
+
+    # NOTE: slippage tests in test_slippage.py
+    # NOTE: setting to min/max here, so never reverts with slippage>max
+    input_price_limit = 2**256-1 if is_long else 0
+
+    # approve collateral amount: collateral + trade fee
+    approve_collateral = int((collateral + trade_fee) * Decimal(1e18))
+
+    # approve then build
+    # NOTE: build() tests in test_build.py
+    ovl.approve(market, approve_collateral, {"from": alice})
+    tx = market.build(input_collateral, input_leverage, input_is_long,
+                      input_price_limit, {"from": alice})
+    pos_id = tx.return_value
+
+    # get position info
+    pos_key = get_position_key(alice.address, pos_id)
+    (expect_notional, expect_debt, expect_mid_tick, expect_entry_tick,
+     expect_is_long, expect_liquidated, expect_oi_shares,
+     expect_fraction_remaining) = market.positions(pos_key)
+
+    # mine the chain forward for some time difference with build and unwind
+    # funding should occur within this interval.
+    # Use update() to update state to query values for checks vs expected
+    # after unwind.
+    # NOTE: update() tests in test_update.py
+    chain.mine(timedelta=86400)
+    tx = market.update({"from": rando})
+
+    # priors actual values
+    expect_balance_alice = ovl.balanceOf(alice)
+    expect_balance_market = ovl.balanceOf(market)
+
+    # calculate position attributes at the current time for fraction
+    # ignore payoff cap
+    unwound_cost = fraction * Decimal(expect_notional - expect_debt)
+    unwound_debt = fraction * Decimal(expect_debt)
+
+    # input values for unwind
+    input_pos_id = pos_id
+    input_fraction = int(fraction * Decimal(1e18))
+
+    # NOTE: slippage tests in test_slippage.py
+    # NOTE: setting to min/max here, so never reverts with slippage>max
+    input_price_limit = 0 if is_long else 2**256-1
+
+    # unwind fraction of shares
+    tx = market.unwind(input_pos_id, input_fraction, input_price_limit,
+                       {"from": alice})
+    actual_mint = tx.events["Unwind"]["mint"]
+    expect_balance_market += actual_mint
+
+    # calculate expected values
+    expect_value = int(unwound_cost + actual_mint)
+    expect_notional_w_pnl = int(expect_value + unwound_debt)
+    expect_trade_fee = int(Decimal(expect_notional_w_pnl) * trading_fee_rate)
+    if expect_trade_fee > expect_value:
+        expect_trade_fee = expect_value
+
+    expect_value_out = expect_value - expect_trade_fee
+
+    expect_balance_alice += expect_value_out
+    expect_balance_market -= expect_value
+
+    actual_balance_alice = ovl.balanceOf(alice)
+    actual_balance_market = ovl.balanceOf(market)
+
+    assert int(actual_balance_alice) == approx(expect_balance_alice)
+    assert int(actual_balance_market) == approx(expect_balance_market)
+
+
+@given(is_long=strategy('bool'))
+def test_unwind_transfers_full_value_to_trader_when_fraction_one(
+        market, feed, alice, rando, ovl, is_long):
+    # position build attributes
+    notional_initial = Decimal(1000)
+    leverage = Decimal(1.5)
+    fraction = Decimal(1.0)
+
+    # calculate expected pos info data
+    idx_trade = RiskParameter.TRADING_FEE_RATE.value
+    trading_fee_rate = Decimal(market.params(idx_trade) / 1e18)
+    collateral, _, _, trade_fee \
+        = calculate_position_info(notional_initial, leverage, trading_fee_rate)
+
+    # input values for build
+    input_collateral = int(collateral * Decimal(1e18))
+    input_leverage = int(leverage * Decimal(1e18))
+    input_is_long = is_long
+
+    # NOTE: slippage tests in test_slippage.py
+    # NOTE: setting to min/max here, so never reverts with slippage>max
+    input_price_limit = 2**256-1 if is_long else 0
+
+    # approve collateral amount: collateral + trade fee
+    approve_collateral = int((collateral + trade_fee) * Decimal(1e18))
+
+    # approve then build
+    # NOTE: build() tests in test_build.py
+    ovl.approve(market, approve_collateral, {"from": alice})
+    tx = market.build(input_collateral, input_leverage, input_is_long,
+                      input_price_limit, {"from": alice})
+    pos_id = tx.return_value
+
+    # get position info
+    pos_key = get_position_key(alice.address, pos_id)
+    (expect_notional, expect_debt, expect_mid_tick, expect_entry_tick,
+     expect_is_long, expect_liquidated, expect_oi_shares,
+     expect_fraction_remaining) = market.positions(pos_key)
+
+    # mine the chain forward for some time difference with build and unwind
+    # funding should occur within this interval.
+    # Use update() to update state to query values for checks vs expected
+    # after unwind.
+    # NOTE: update() tests in test_update.py
+    chain.mine(timedelta=86400)
+    tx = market.update({"from": rando})
+
+    # priors actual values
+    expect_balance_alice = ovl.balanceOf(alice)
+    expect_balance_market = ovl.balanceOf(market)
+
+    # calculate position attributes at the current time for fraction
+    # ignore payoff cap
+    unwound_cost = fraction * Decimal(expect_notional - expect_debt)
+    unwound_debt = fraction * Decimal(expect_debt)
+
+    # input values for unwind
+    input_pos_id = pos_id
+    input_fraction = int(fraction * Decimal(1e18))
+
+    # NOTE: slippage tests in test_slippage.py
+    # NOTE: setting to min/max here, so never reverts with slippage>max
+    input_price_limit = 0 if is_long else 2**256-1
+
+    # unwind fraction of shares
+    tx = market.unwind(input_pos_id, input_fraction, input_price_limit,
+                       {"from": alice})
+    actual_mint = tx.events["Unwind"]["mint"]
+    expect_balance_market += actual_mint
+
+    # calculate expected values
+    expect_value = int(unwound_cost + actual_mint)
+    expect_notional_w_pnl = int(expect_value + unwound_debt)
+    expect_trade_fee = int(Decimal(expect_notional_w_pnl) * trading_fee_rate)
+    if expect_trade_fee > expect_value:
+        expect_trade_fee = expect_value
+
+    expect_value_out = expect_value - expect_trade_fee
+
+    expect_balance_alice += expect_value_out
+    expect_balance_market -= expect_value
+
+    actual_balance_alice = ovl.balanceOf(alice)
+    actual_balance_market = ovl.balanceOf(market)
+
+    assert int(actual_balance_alice) == approx(expect_balance_alice)
+    assert int(actual_balance_market) == approx(expect_balance_market)
+
+
+@given(
+    fraction=strategy('decimal', min_value='0.0001', max_value='1.0000',
+                      places=4),
+    is_long=strategy('bool'))
+def test_unwind_transfers_trading_fees(market, feed, alice, rando, ovl,
+                                       factory, fraction, is_long):
+    # position build attributes
+    notional_initial = Decimal(1000)
+    leverage = Decimal(1.5)
+
+    # calculate expected pos info data
+    idx_trade = RiskParameter.TRADING_FEE_RATE.value
+    trading_fee_rate = Decimal(market.params(idx_trade) / 1e18)
+    collateral, _, _, trade_fee \
+        = calculate_position_info(notional_initial, leverage, trading_fee_rate)
+
+    # input values for build
+    input_collateral = int(collateral * Decimal(1e18))
+    input_leverage = int(leverage * Decimal(1e18))
+    input_is_long = is_long
+
+    # NOTE: slippage tests in test_slippage.py
+    # NOTE: setting to min/max here, so never reverts with slippage>max
+    input_price_limit = 2**256-1 if is_long else 0
+
+    # approve collateral amount: collateral + trade fee
+    approve_collateral = int((collateral + trade_fee) * Decimal(1e18))
+
+    # approve then build
+    # NOTE: build() tests in test_build.py
+    ovl.approve(market, approve_collateral, {"from": alice})
+    tx = market.build(input_collateral, input_leverage, input_is_long,
+                      input_price_limit, {"from": alice})
+    pos_id = tx.return_value
+
+    # get position info
+    pos_key = get_position_key(alice.address, pos_id)
+    (expect_notional, expect_debt, expect_mid_tick, expect_entry_tick,
+     expect_is_long, expect_liquidated, expect_oi_shares,
+     expect_fraction_remaining) = market.positions(pos_key)
+
+    # mine the chain forward for some time difference with build and unwind
+    # funding should occur within this interval.
+    # Use update() to update state to query values for checks vs expected
+    # after unwind.
+    # NOTE: update() tests in test_update.py
+    chain.mine(timedelta=86400)
+    tx = market.update({"from": rando})
+
+    # priors actual values
+    recipient = factory.feeRecipient()
+    expect_balance_recipient = ovl.balanceOf(recipient)
+    expect_balance_market = ovl.balanceOf(market)
+
+    # calculate position attributes at the current time for fraction
+    # ignore payoff cap
+    unwound_cost = fraction * Decimal(expect_notional - expect_debt)
+    unwound_debt = fraction * Decimal(expect_debt)
+
+    # input values for unwind
+    input_pos_id = pos_id
+    input_fraction = int(fraction * Decimal(1e18))
+
+    # NOTE: slippage tests in test_slippage.py
+    # NOTE: setting to min/max here, so never reverts with slippage>max
+    input_price_limit = 0 if is_long else 2**256-1
+
+    # unwind fraction of shares
+    tx = market.unwind(input_pos_id, input_fraction, input_price_limit,
+                       {"from": alice})
+    actual_mint = tx.events["Unwind"]["mint"]
+    expect_balance_market += actual_mint
+
+    # calculate expected values
+    expect_value = int(unwound_cost + actual_mint)
+    expect_notional_w_pnl = int(expect_value + unwound_debt)
+    expect_trade_fee = int(Decimal(expect_notional_w_pnl) * trading_fee_rate)
+    if expect_trade_fee > expect_value:
+        expect_trade_fee = expect_value
+
+    expect_balance_recipient += expect_trade_fee
+    expect_balance_market -= expect_value
+
+    actual_balance_recipient = ovl.balanceOf(recipient)
+    actual_balance_market = ovl.balanceOf(market)
+
+    assert int(actual_balance_recipient) == approx(expect_balance_recipient)
+    assert int(actual_balance_market) == approx(expect_balance_market)
+
+
+# NOTE: use mock market to change exit price to whatever
+@given(
+    fraction=strategy('decimal', min_value='0.0001', max_value='1.0000',
+                      places=4),
+    is_long=strategy('bool'),
+    price_multiplier=strategy('decimal', min_value='1.1000',
+                              max_value='5.0000', places=4))
+def test_unwind_mints_when_profitable(mock_market, mock_feed,
+                                      alice, rando,
+                                      ovl, fraction, is_long,
+                                      price_multiplier):
+    # position build attributes
+    notional_initial = Decimal(1000)
+    leverage = Decimal(1.5)
+
+    # calculate expected pos info data
+    idx_trade = RiskParameter.TRADING_FEE_RATE.value
+    trading_fee_rate = Decimal(mock_market.params(idx_trade) / 1e18)
+    collateral, _, _, trade_fee \
+        = calculate_position_info(notional_initial, leverage, trading_fee_rate)
+
+    # input values for build
+    input_collateral = int(collateral * Decimal(1e18))
+    input_leverage = int(leverage * Decimal(1e18))
+    input_is_long = is_long
+
+    # NOTE: slippage tests in test_slippage.py
+    # NOTE: setting to min/max here, so never reverts with slippage>max
+    input_price_limit = 2**256-1 if is_long else 0
+
+    # approve collateral amount: collateral + trade fee
+    approve_collateral = int((collateral + trade_fee) * Decimal(1e18))
+
+    # approve then build
+    # NOTE: build() tests in test_build.py
+    ovl.approve(mock_market, approve_collateral, {"from": alice})
+    tx = mock_market.build(input_collateral, input_leverage, input_is_long,
+                           input_price_limit, {"from": alice})
+    pos_id = tx.return_value
+
+    # get position info
+    pos_key = get_position_key(alice.address, pos_id)
+    (expect_notional, expect_debt, expect_mid_tick, expect_entry_tick,
+     expect_is_long, expect_liquidated, expect_oi_shares,
+     expect_fraction_remaining) = mock_market.positions(pos_key)
+
+    # calculate the entry price
+    expect_mid_price = tick_to_price(expect_mid_tick)
+    expect_entry_price = tick_to_price(expect_entry_tick)
+
+    # mine the chain forward for some time difference with build and unwind
+    # funding should occur within this interval.
+    # Use update() to update state to query values for checks vs expected
+    # after unwind.
+    # NOTE: update() tests in test_update.py
+    chain.mine(timedelta=86400)
+    _ = mock_market.update({"from": rando})
+
+    # change price by factor
+    price = mock_feed.price() * price_multiplier if is_long \
+        else mock_feed.price() / price_multiplier
+    mock_feed.setPrice(price, {"from": rando})
+
+    # calculate current oi, debt values of position
+    expect_total_oi = mock_market.oiLong() if is_long \
+        else mock_market.oiShort()
+    expect_total_oi_shares = mock_market.oiLongShares() if is_long \
+        else mock_market.oiShortShares()
+    expect_oi_current = (Decimal(expect_total_oi)*Decimal(expect_oi_shares)) \
+        / Decimal(expect_total_oi_shares)
+    expect_oi_initial = Decimal(expect_notional) * \
+        Decimal(1e18) / Decimal(expect_mid_price)
+
+    # calculate position attributes at the current time for fraction
+    # ignore payoff cap
+    unwound_oi = fraction * expect_oi_current
+    unwound_oi_initial = fraction * expect_oi_initial
+    unwound_notional = fraction * expect_notional
+    unwound_cost = fraction * Decimal(expect_notional - expect_debt)
+    unwound_debt = fraction * Decimal(expect_debt)
+    unwound_collateral = unwound_notional * (unwound_oi / unwound_oi_initial) \
+        - unwound_debt
+
+    # input values for unwind
+    input_pos_id = pos_id
+    input_fraction = int(fraction * Decimal(1e18))
+
+    # NOTE: slippage tests in test_slippage.py
+    # NOTE: setting to min/max here, so never reverts with slippage>max
+    input_price_limit = 0 if is_long else 2**256-1
+
+    # unwind fraction of shares
+    tx = mock_market.unwind(input_pos_id, input_fraction, input_price_limit,
+                            {"from": alice})
+    expect_exit_price = tx.events["Unwind"]['price']
+
+    unwound_pnl = unwound_oi * (Decimal(expect_exit_price)
+                                - Decimal(expect_entry_price)) / Decimal(1e18)
+    if not is_long:
+        unwound_pnl *= -1
+
+    # calculate expected values
+    expect_value = int(unwound_collateral + unwound_pnl)
+    expect_cost = int(unwound_cost)
+    expect_mint = expect_value - expect_cost
+
+    # check tx events have a mint to the mock market address
+    assert tx.events["Transfer"][0]['from'] \
+        == "0x0000000000000000000000000000000000000000"
+    assert tx.events["Transfer"][0]['to'] == mock_market.address
+    assert int(tx.events["Transfer"][0]['value']) == approx(expect_mint,
+                                                            rel=1e-5)
+
+
+# NOTE: use mock market to change exit price to whatever
+@given(
+    fraction=strategy('decimal', min_value='0.0001', max_value='1.0000',
+                      places=4),
+    is_long=strategy('bool'),
+    price_multiplier=strategy('decimal', min_value='1.1000',
+                              max_value='1.50000', places=4))
+def test_unwind_burns_when_not_profitable(mock_market, mock_feed,
+                                          alice, rando,
+                                          ovl, fraction, is_long,
+                                          price_multiplier):
+    # position build attributes
+    notional_initial = Decimal(1000)
+    leverage = Decimal(1.5)
+
+    # calculate expected pos info data
+    idx_trade = RiskParameter.TRADING_FEE_RATE.value
+    trading_fee_rate = Decimal(mock_market.params(idx_trade) / 1e18)
+    collateral, _, _, trade_fee \
+        = calculate_position_info(notional_initial, leverage, trading_fee_rate)
+
+    # input values for build
+    input_collateral = int(collateral * Decimal(1e18))
+    input_leverage = int(leverage * Decimal(1e18))
+    input_is_long = is_long
+
+    # NOTE: slippage tests in test_slippage.py
+    # NOTE: setting to min/max here, so never reverts with slippage>max
+    input_price_limit = 2**256-1 if is_long else 0
+
+    # approve collateral amount: collateral + trade fee
+    approve_collateral = int((collateral + trade_fee) * Decimal(1e18))
+
+    # approve then build
+    # NOTE: build() tests in test_build.py
+    ovl.approve(mock_market, approve_collateral, {"from": alice})
+    tx = mock_market.build(input_collateral, input_leverage, input_is_long,
+                           input_price_limit, {"from": alice})
+    pos_id = tx.return_value
+
+    # get position info
+    pos_key = get_position_key(alice.address, pos_id)
+    (expect_notional, expect_debt, expect_mid_tick, expect_entry_tick,
+     expect_is_long, expect_liquidated, expect_oi_shares,
+     expect_fraction_remaining) = mock_market.positions(pos_key)
+
+    # calculate the entry and mid price
+    expect_mid_price = tick_to_price(expect_mid_tick)
+    expect_entry_price = tick_to_price(expect_entry_tick)
+
+    # mine the chain forward for some time difference with build and unwind
+    # funding should occur within this interval.
+    # Use update() to update state to query values for checks vs expected
+    # after unwind.
+    # NOTE: update() tests in test_update.py
+    chain.mine(timedelta=86400)
+    _ = mock_market.update({"from": rando})
+
+    # change price by factor
+    price = mock_feed.price() * price_multiplier if not is_long \
+        else mock_feed.price() / price_multiplier
+    mock_feed.setPrice(price, {"from": rando})
+
+    # calculate current oi, debt values of position
+    expect_total_oi = mock_market.oiLong() if is_long \
+        else mock_market.oiShort()
+    expect_total_oi_shares = mock_market.oiLongShares() if is_long \
+        else mock_market.oiShortShares()
+    expect_oi_current = (Decimal(expect_total_oi)*Decimal(expect_oi_shares)) \
+        / Decimal(expect_total_oi_shares)
+    expect_oi_initial = Decimal(expect_notional) * \
+        Decimal(1e18) / Decimal(expect_mid_price)
+
+    # calculate position attributes at the current time for fraction
+    # ignore payoff cap
+    unwound_oi = fraction * expect_oi_current
+    unwound_oi_initial = fraction * expect_oi_initial
+    unwound_notional = fraction * expect_notional
+    unwound_cost = fraction * Decimal(expect_notional - expect_debt)
+    unwound_debt = fraction * Decimal(expect_debt)
+    unwound_collateral = unwound_notional * (unwound_oi / unwound_oi_initial) \
+        - unwound_debt
+
+    # input values for unwind
+    input_pos_id = pos_id
+    input_fraction = int(fraction * Decimal(1e18))
+
+    # NOTE: slippage tests in test_slippage.py
+    # NOTE: setting to min/max here, so never reverts with slippage>max
+    input_price_limit = 0 if is_long else 2**256-1
+
+    # unwind fraction of shares
+    tx = mock_market.unwind(input_pos_id, input_fraction, input_price_limit,
+                            {"from": alice})
+    expect_exit_price = tx.events["Unwind"]['price']
+
+    unwound_pnl = unwound_oi * (Decimal(expect_exit_price)
+                                - Decimal(expect_entry_price)) / Decimal(1e18)
+    if not is_long:
+        unwound_pnl *= -1
+
+    # calculate expected values
+    expect_value = int(unwound_collateral + unwound_pnl)
+    if expect_value < 0:
+        # in case position went underwater, value should floor to zero
+        expect_value = 0
+
+    expect_cost = int(unwound_cost)
+    expect_burn = expect_cost - expect_value
+
+    # check tx events have a burn from the mock market address
+    assert tx.events["Transfer"][0]['from'] == mock_market.address
+    assert tx.events["Transfer"][0]['to'] \
+        == "0x0000000000000000000000000000000000000000"
+    assert int(tx.events["Transfer"][0]['value']) == approx(expect_burn,
+                                                            rel=1e-5)
+
+
+# NOTE: use mock market to change exit price to whatever
+# NOTE: min/max strategies assume capPayoff=5 from conftest.py
+@given(
+    fraction=strategy('decimal', min_value='0.0001', max_value='1.0000',
+                      places=4),
+    price_multiplier=strategy('decimal', min_value='6.0000',
+                              max_value='10.0000', places=4))
+def test_unwind_mints_when_greater_than_cap_payoff(mock_market, mock_feed,
+                                                   alice, rando,
+                                                   ovl, fraction,
+                                                   price_multiplier):
+    # position build attributes
+    notional_initial = Decimal(1000)
+    leverage = Decimal(1.5)
+    is_long = True
+
+    # calculate expected pos info data
+    idx_trade = RiskParameter.TRADING_FEE_RATE.value
+    trading_fee_rate = Decimal(mock_market.params(idx_trade) / 1e18)
+    collateral, _, _, trade_fee \
+        = calculate_position_info(notional_initial, leverage, trading_fee_rate)
+
+    # input values for build
+    input_collateral = int(collateral * Decimal(1e18))
+    input_leverage = int(leverage * Decimal(1e18))
+    input_is_long = is_long
+
+    # NOTE: slippage tests in test_slippage.py
+    # NOTE: setting to min/max here, so never reverts with slippage>max
+    input_price_limit = 2**256-1 if is_long else 0
+
+    # approve collateral amount: collateral + trade fee
+    approve_collateral = int((collateral + trade_fee) * Decimal(1e18))
+
+    # approve then build
+    # NOTE: build() tests in test_build.py
+    ovl.approve(mock_market, approve_collateral, {"from": alice})
+    tx = mock_market.build(input_collateral, input_leverage, input_is_long,
+                           input_price_limit, {"from": alice})
+    pos_id = tx.return_value
+
+    # get position info
+    pos_key = get_position_key(alice.address, pos_id)
+    (expect_notional, expect_debt, expect_mid_tick, expect_entry_tick,
+     expect_is_long, expect_liquidated, expect_oi_shares,
+     expect_fraction_remaining) = mock_market.positions(pos_key)
+
+    # calculate the entry price
+    expect_mid_price = tick_to_price(expect_mid_tick)
+    expect_entry_price = tick_to_price(expect_entry_tick)
+
+    # mine the chain forward for some time difference with build and unwind
+    # funding should occur within this interval.
+    # Use update() to update state to query values for checks vs expected
+    # after unwind.
+    # NOTE: update() tests in test_update.py
+    chain.mine(timedelta=86400)
+    _ = mock_market.update({"from": rando})
+
+    # change price by factor
+    price = mock_feed.price() * price_multiplier
+    mock_feed.setPrice(price, {"from": rando})
+
+    # calculate current oi, debt values of position
+    expect_total_oi = mock_market.oiLong() if is_long \
+        else mock_market.oiShort()
+    expect_total_oi_shares = mock_market.oiLongShares() if is_long \
+        else mock_market.oiShortShares()
+    expect_oi_current = (Decimal(expect_total_oi)*Decimal(expect_oi_shares)) \
+        / Decimal(expect_total_oi_shares)
+    expect_oi_initial = Decimal(expect_notional) * \
+        Decimal(1e18) / Decimal(expect_mid_price)
+
+    # calculate position attributes at the current time for fraction
+    # ignore payoff cap
+    unwound_oi = fraction * expect_oi_current
+    unwound_oi_initial = fraction * expect_oi_initial
+    unwound_notional = fraction * Decimal(expect_notional)
+    unwound_cost = fraction * Decimal(expect_notional - expect_debt)
+    unwound_debt = fraction * Decimal(expect_debt)
+    unwound_collateral = unwound_notional * (unwound_oi / unwound_oi_initial) \
+        - unwound_debt
+
+    # input values for unwind
+    input_pos_id = pos_id
+    input_fraction = int(fraction * Decimal(1e18))
+
+    # NOTE: slippage tests in test_slippage.py
+    # NOTE: setting to min/max here, so never reverts with slippage>max
+    input_price_limit = 0 if is_long else 2**256-1
+
+    # unwind fraction of shares
+    tx = mock_market.unwind(input_pos_id, input_fraction, input_price_limit,
+                            {"from": alice})
+    expect_exit_price = tx.events["Unwind"]['price']
+
+    # impose payoff cap on pnl
+    idx_cap_payoff = RiskParameter.CAP_PAYOFF.value
+    cap_payoff = Decimal(mock_market.params(idx_cap_payoff)) / Decimal(1e18)
+    unwound_pnl = unwound_oi * \
+        min(Decimal(expect_exit_price) - Decimal(expect_entry_price),
+            cap_payoff * Decimal(expect_entry_price)) / Decimal(1e18)
+
+    # calculate expected values
+    expect_value = int(unwound_collateral + unwound_pnl)
+    expect_cost = int(unwound_cost)
+    expect_mint = expect_value - expect_cost
+
+    # check tx events have a mint to the mock market address
+    assert tx.events["Transfer"][0]['from'] \
+        == "0x0000000000000000000000000000000000000000"
+    assert tx.events["Transfer"][0]['to'] == mock_market.address
+    assert int(tx.events["Transfer"][0]['value']) == approx(expect_mint,
+                                                            rel=1e-5)
+
+
+# test for trading fee edge case of tradingFee > value
+def test_unwind_transfers_fees_when_fees_greater_than_value(mock_market,
+                                                            mock_feed, alice,
+                                                            factory, rando,
+                                                            ovl):
+    # position build attributes
+    notional_initial = Decimal(1000)
+    leverage = Decimal(5.0)
+    is_long = True
+    fraction = Decimal(1.0)
+    price_multiplier = Decimal(0.8061)  # close to underwater but not there
+
+    # exclude funding for testing edge case of fees > value
+    mock_market.setRiskParam(RiskParameter.K.value, 0, {"from": factory})
+    mock_market.setRiskParam(
+        RiskParameter.MAINTENANCE_MARGIN_FRACTION.value, 0, {"from": factory})
+
+    # calculate expected pos info data
+    idx_trade = RiskParameter.TRADING_FEE_RATE.value
+    trading_fee_rate = Decimal(mock_market.params(idx_trade) / 1e18)
+    collateral, _, _, trade_fee \
+        = calculate_position_info(notional_initial, leverage, trading_fee_rate)
+
+    # input values for build
+    input_collateral = int(collateral * Decimal(1e18))
+    input_leverage = int(leverage * Decimal(1e18))
+    input_is_long = is_long
+
+    # NOTE: slippage tests in test_slippage.py
+    # NOTE: setting to min/max here, so never reverts with slippage>max
+    input_price_limit = 2**256-1 if is_long else 0
+
+    # approve collateral amount: collateral + trade fee
+    approve_collateral = int((collateral + trade_fee) * Decimal(1e18))
+
+    # approve then build
+    # NOTE: build() tests in test_build.py
+    ovl.approve(mock_market, approve_collateral, {"from": alice})
+    tx = mock_market.build(input_collateral, input_leverage, input_is_long,
+                           input_price_limit, {"from": alice})
+    pos_id = tx.return_value
+
+    # get position info
+    pos_key = get_position_key(alice.address, pos_id)
+    (expect_notional, expect_debt, expect_mid_tick, expect_entry_tick,
+     expect_is_long, expect_liquidated, expect_oi_shares,
+     expect_fraction_remaining) = mock_market.positions(pos_key)
+
+    # calculate the entry price
+    expect_mid_price = tick_to_price(expect_mid_tick)
+    expect_entry_price = tick_to_price(expect_entry_tick)
+
+    # mine the chain forward for some time difference with build and unwind
+    # funding should occur within this interval.
+    # Use update() to update state to query values for checks vs expected
+    # after unwind.
+    # NOTE: update() tests in test_update.py
+    chain.mine(timedelta=86400)
+    _ = mock_market.update({"from": rando})
+
+    # priors actual values
+    recipient = factory.feeRecipient()
+    expect_balance_recipient = ovl.balanceOf(recipient)
+    expect_balance_market = ovl.balanceOf(mock_market)
+    expect_balance_alice = ovl.balanceOf(alice)
+
+    # change price by factor
+    price = mock_feed.price() * price_multiplier if is_long \
+        else mock_feed.price() / price_multiplier
+    mock_feed.setPrice(price, {"from": rando})
+
+    # calculate current oi, debt values of position
+    expect_total_oi = mock_market.oiLong() if is_long \
+        else mock_market.oiShort()
+    expect_total_oi_shares = mock_market.oiLongShares() if is_long \
+        else mock_market.oiShortShares()
+    expect_oi_current = (Decimal(expect_total_oi)*Decimal(expect_oi_shares)) \
+        / Decimal(expect_total_oi_shares)
+    expect_oi_initial = Decimal(expect_notional) * \
+        Decimal(1e18) / Decimal(expect_mid_price)
+
+    # calculate position attributes at the current time for fraction
+    # ignore payoff cap
+    unwound_oi = fraction * expect_oi_current
+    unwound_oi_initial = fraction * expect_oi_initial
+    unwound_notional = fraction * expect_notional
+    unwound_debt = fraction * Decimal(expect_debt)
+    unwound_collateral = unwound_notional * (unwound_oi / unwound_oi_initial) \
+        - unwound_debt
+
+    # input values for unwind
+    input_pos_id = pos_id
+    input_fraction = int(fraction * Decimal(1e18))
+
+    # NOTE: slippage tests in test_slippage.py
+    # NOTE: setting to min/max here, so never reverts with slippage>max
+    input_price_limit = 0 if is_long else 2**256-1
+
+    # unwind fraction of shares
+    tx = mock_market.unwind(input_pos_id, input_fraction, input_price_limit,
+                            {"from": alice})
+
+    # get exit price and amount burnt
+    expect_exit_price = tx.events["Unwind"]['price']
+    actual_burn = -tx.events["Unwind"]['mint']
+
+    unwound_cost = fraction * Decimal(expect_notional - expect_debt)
+    unwound_pnl = unwound_oi * (Decimal(expect_exit_price)
+                                - Decimal(expect_entry_price)) / Decimal(1e18)
+    if not is_long:
+        unwound_pnl *= -1
+
+    # since notional * fee < value, trading_fee should equal value
+    unwound_value = unwound_collateral + unwound_pnl
+    unwound_notional_w_pnl = unwound_value + unwound_debt
+
+    expect_trade_fee = int(Decimal(unwound_notional_w_pnl) * trading_fee_rate)
+    assert unwound_value < expect_trade_fee
+    expect_trade_fee = unwound_value
+
+    # check balance of trader doesn't change but recipient gets fee
+    expect_balance_recipient += unwound_value
+    expect_balance_market = 0
+
+    # check amount burnt + unwound_value sent to recipient == unwound_cost
+    assert approx(int(unwound_cost)) == actual_burn + int(unwound_value)
+
+    actual_balance_recipient = ovl.balanceOf(recipient)
+    actual_balance_market = ovl.balanceOf(mock_market)
+    actual_balance_alice = ovl.balanceOf(alice)
+
+    assert int(actual_balance_recipient) == approx(expect_balance_recipient)
+    assert int(actual_balance_market) == approx(expect_balance_market)
+    assert int(actual_balance_alice) == approx(expect_balance_alice)
+
+
+# test for when value is underwater and unwind
+def test_unwind_floors_value_to_zero_when_position_underwater(mock_market,
+                                                              mock_feed, alice,
+                                                              rando, ovl,
+                                                              factory):
+    # position build attributes
+    notional_initial = Decimal(1000)
+    leverage = Decimal(5.0)
+    is_long = True
+    fraction = Decimal(1.0)
+    price_multiplier = Decimal(0.700)  # underwater
+
+    # exclude funding for testing edge case
+    mock_market.setRiskParam(RiskParameter.K.value, 0, {"from": factory})
+    mock_market.setRiskParam(
+        RiskParameter.MAINTENANCE_MARGIN_FRACTION.value, 0, {"from": factory})
+
+    # calculate expected pos info data
+    idx_trade = RiskParameter.TRADING_FEE_RATE.value
+    trading_fee_rate = Decimal(mock_market.params(idx_trade) / 1e18)
+    collateral, _, _, trade_fee \
+        = calculate_position_info(notional_initial, leverage, trading_fee_rate)
+
+    # input values for build
+    input_collateral = int(collateral * Decimal(1e18))
+    input_leverage = int(leverage * Decimal(1e18))
+    input_is_long = is_long
+
+    # NOTE: slippage tests in test_slippage.py
+    # NOTE: setting to min/max here, so never reverts with slippage>max
+    input_price_limit = 2**256-1 if is_long else 0
+
+    # approve collateral amount: collateral + trade fee
+    approve_collateral = int((collateral + trade_fee) * Decimal(1e18))
+
+    # approve then build
+    # NOTE: build() tests in test_build.py
+    ovl.approve(mock_market, approve_collateral, {"from": alice})
+    tx = mock_market.build(input_collateral, input_leverage, input_is_long,
+                           input_price_limit, {"from": alice})
+    pos_id = tx.return_value
+
+    # get position info
+    pos_key = get_position_key(alice.address, pos_id)
+    (expect_notional, expect_debt, expect_mid_tick, expect_entry_tick,
+     expect_is_long, expect_liquidated, expect_oi_shares,
+     expect_fraction_remaining) = mock_market.positions(pos_key)
+
+    # mine the chain forward for some time difference with build and unwind
+    # funding should occur within this interval.
+    # Use update() to update state to query values for checks vs expected
+    # after unwind.
+    # NOTE: update() tests in test_update.py
+    chain.mine(timedelta=86400)
+    _ = mock_market.update({"from": rando})
+
+    # priors actual values
+    recipient = factory.feeRecipient()
+    expect_balance_recipient = ovl.balanceOf(recipient)
+    expect_balance_market = ovl.balanceOf(mock_market)
+    expect_balance_alice = ovl.balanceOf(alice)
+
+    # change price by factor
+    price = mock_feed.price() * price_multiplier if is_long \
+        else mock_feed.price() / price_multiplier
+    mock_feed.setPrice(price, {"from": rando})
+
+    # calculate position attributes at the current time for fraction
+    # ignore payoff cap
+    unwound_cost = fraction * Decimal(expect_notional - expect_debt)
+
+    # input values for unwind
+    input_pos_id = pos_id
+    input_fraction = int(fraction * Decimal(1e18))
+
+    # NOTE: slippage tests in test_slippage.py
+    # NOTE: setting to min/max here, so never reverts with slippage>max
+    input_price_limit = 0 if is_long else 2**256-1
+
+    # unwind fraction of shares
+    tx = mock_market.unwind(input_pos_id, input_fraction, input_price_limit,
+                            {"from": alice})
+
+    # adjust market balance for burned amount
+    # check entire cost amount is burned
+    expect_mint = - int(unwound_cost)
+    actual_mint = tx.events["Unwind"]["mint"]
+    assert actual_mint == expect_mint
+
+    expect_balance_market += actual_mint
+
+    # value and fees should floor to zero
+    unwound_value = 0
+    unwound_trading_fee = 0
+
+    # calculate expected values
+    expect_value = int(unwound_value)
+    expect_trade_fee = int(unwound_trading_fee)
+
+    # check balance of trader and recipient doesn't change
+    # all initial collateral is burned
+    expect_balance_recipient += expect_trade_fee
+    expect_balance_market -= expect_value
+
+    actual_balance_recipient = ovl.balanceOf(recipient)
+    actual_balance_market = ovl.balanceOf(mock_market)
+    actual_balance_alice = ovl.balanceOf(alice)
+
+    assert int(actual_balance_recipient) == approx(expect_balance_recipient)
+    assert int(actual_balance_market) == approx(expect_balance_market)
+    assert int(actual_balance_alice) == approx(expect_balance_alice)
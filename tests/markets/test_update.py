@@ -2,6 +2,7 @@ from brownie import chain
 from brownie.test import given, strategy
 from decimal import Decimal
 
+from scripts.market.funding import pay_funding
 from .utils import RiskParameter
 
 
@@ -94,3 +95,35 @@ def test_update_sets_last_timestamp(market, rando):
     expect = chain[tx.block_number]['timestamp']
     assert expect == actual
     assert prior != actual
+
+
+def test_oi_current_pays_funding_without_update(market, ovl, alice, bob,
+                                                rando):
+    ovl.approve(market, 2**256-1, {"from": alice})
+    ovl.approve(market, 2**256-1, {"from": bob})
+    _ = market.build(300 * 10**18, 2 * 10**18, True, 2**256-1,
+                     {"from": alice})
+    _ = market.build(100 * 10**18, 10**18, False, 0, {"from": bob})
+
+    oi_long = market.oiLong()
+    oi_short = market.oiShort()
+    timestamp_last = market.timestampUpdateLast()
+    k = market.params(RiskParameter.K.value)
+
+    # funding paid virtually through the block read at, leaving storage
+    chain.mine(timedelta=86400)
+    block = chain[-1]
+    expect = pay_funding(oi_long, oi_short, block.timestamp - timestamp_last,
+                         k)
+    assert market.oiLongCurrent(block_identifier=block.number) == expect[0]
+    assert market.oiShortCurrent(block_identifier=block.number) == expect[1]
+    assert (market.oiLong(), market.oiShort()) == (oi_long, oi_short)
+
+    # matches what update stores
+    tx = market.update({"from": rando})
+    assert market.oiLongCurrent(block_identifier=tx.block_number) \
+        == market.oiLong()
+    assert market.oiShortCurrent(block_identifier=tx.block_number) \
+        == market.oiShort()
+    assert market.oiLong() < oi_long
+    assert market.oiShort() > oi_short
@@ -54,8 +54,8 @@ def create_token(gov, alice, bob, minter_role, request):
         tok.mint(gov, supply * 10 ** tok.decimals(), {"from": gov})
         tok.renounceRole(minter_role, gov, {"from": gov})
 
-        tok.transfer(alice, (supply/2) * 10 ** tok.decimals(), {"from": gov})
-        tok.transfer(bob, (supply/2) * 10 ** tok.decimals(), {"from": gov})
+        tok.transfer(alice, supply * 10 ** tok.decimals() // 2, {"from": gov})
+        tok.transfer(bob, supply * 10 ** tok.decimals() // 2, {"from": gov})
         return tok
 
     yield create_token